@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# benchmarks/alarm_store_benchmark.py
+# 报警事件存储基准测试
+#
+# 在临时数据库中写入相当于一年的模拟事件（N个摄像头，每个摄像头若干监测区域），
+# 测量批量写入吞吐量，以及按时间范围（一个班次）和按床位（一个月）查询的耗时，
+# 最后测量总线发布到后台写入完成的延迟。
+#
+# 用法：
+#   python benchmarks/alarm_store_benchmark.py --cameras 16 --events-per-day 200
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.alarm_store import AlarmStore
+from modules.event_bus import AlarmEscalated, EventBus
+
+KINDS = ('detection', 'alarm', 'reset', 'ack', 'error')
+
+def timed(func, repeat):
+    """多次执行函数，返回耗时列表（毫秒）和最后一次的结果"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+def summary(samples):
+    """格式化耗时统计"""
+    samples = sorted(samples)
+    return f"中位数 {statistics.median(samples):.2f} ms  最大 {samples[-1]:.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="测量报警事件存储的写入和查询性能")
+    parser.add_argument('--cameras', type=int, default=16, help="摄像头数量")
+    parser.add_argument('--rois', type=int, default=2, help="每个摄像头的监测区域数")
+    parser.add_argument('--days', type=int, default=365, help="模拟的天数")
+    parser.add_argument('--events-per-day', type=int, default=200, help="每个摄像头每天的事件数")
+    parser.add_argument('--repeat', type=int, default=20, help="每种查询的重复次数")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    bus = EventBus()
+    store = AlarmStore(os.path.join(directory, "alarms.db"), retention_days=0, bus=bus)
+    rng = random.Random(0)
+    end = time.time()
+    begin = end - args.days * 86400
+    try:
+        total = 0
+        write_start = time.perf_counter()
+        for day in range(args.days):
+            rows = []
+            for camera in range(args.cameras):
+                for _ in range(args.events_per_day):
+                    kind = rng.choice(KINDS)
+                    rows.append((begin + day * 86400 + rng.random() * 86400, kind, camera,
+                                 None if kind in ('ack', 'error') else rng.randrange(args.rois),
+                                 rng.randint(1, 4) if kind == 'alarm' else None,
+                                 5.0 if kind == 'alarm' else None, "断流" if kind == 'error' else None))
+            for i in range(0, len(rows), store.batch_size):
+                store.write(rows[i:i + store.batch_size])
+            total += len(rows)
+        elapsed = time.perf_counter() - write_start
+        size = os.path.getsize(store.path) / 1024 / 1024
+        print(f"写入 {total} 个事件: {elapsed:.1f} 秒 ({total / elapsed:.0f} 个/秒)，数据库 {size:.0f} MB")
+
+        shift = end - 30 * 86400
+        samples, events = timed(lambda: store.query(shift, shift + 8 * 3600), args.repeat)
+        print(f"一个班次（8小时）的全部事件（{len(events)}个）: {summary(samples)}")
+        samples, events = timed(lambda: store.query(end - 30 * 86400, end, camera=3, roi=1, kinds=['alarm']),
+                                args.repeat)
+        print(f"单个床位一个月的报警（{len(events)}个）: {summary(samples)}")
+        samples, rows = timed(lambda: store.summary(shift, shift + 8 * 3600), args.repeat)
+        print(f"一个班次的床位汇总（{len(rows)}行）: {summary(samples)}")
+
+        store.flush_interval = 0.05
+        store.start()
+        start = time.perf_counter()
+        for i in range(1000):
+            bus.publish(AlarmEscalated, 0, 0, end + i, 1, 5.0)
+        publish_ms = (time.perf_counter() - start) * 1000
+        store.stop()
+        print(f"总线发布1000个事件: {publish_ms:.2f} ms，后台写入 {store.get_stats()}")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
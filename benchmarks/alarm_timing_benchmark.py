@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# benchmarks/alarm_timing_benchmark.py
+# 报警时序回归基准测试
+#
+# 用合成视频源（modules/simulation.py）按不同的采集帧率运行摄像头处理流程，同时启动若干
+# 空转进程制造CPU竞争。每个监测区域按脚本周期性出现持续到最后一级报警之后的报警手势，
+# 测量：
+# - 各级报警升级的误差：AlarmEscalated 事件时间 - (手势开始 + 触发时长)
+# - 手势开始到第一次报警声音的延迟（报警声道替换为记录播放时间的 AudioSink）
+# 任一条件下升级误差绝对值的p99或第一次报警声音的超时（延迟 - 第一级触发时长）的p99超过上限，
+# 或有应触发的级别没有触发时，以非零状态退出。
+#
+# 推理耗时是实际时间，--speed 大于1时会按倍数放大为虚拟时间的误差，默认按实际时间运行。
+# 默认的报警级别最长30秒，每个条件约需 (30 + 间隔) × 周期数；可以用 --triggers 缩短做快速检查。
+#
+# 用法：
+#   python benchmarks/alarm_timing_benchmark.py --fps 10,15,30 --load 0,1,2 --cycles 3
+#   python benchmarks/alarm_timing_benchmark.py --triggers 1,2,3,6 --cycles 10 --max-p99 0.3
+
+import argparse
+import csv
+import logging
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from config import CONFIG, CameraConfig
+from modules.camera_manager import CameraManager
+from modules.event_bus import AlarmEscalated, event_bus
+from modules.simulation import GestureScript, Simulation, SyntheticSource, VirtualClock, alarm_timing, hand_landmarks
+
+RESOLUTION = (320, 240)
+
+def set_triggers(triggers):
+    """替换报警触发时长，报警音频按级别沿用已配置的文件"""
+    sounds = [CONFIG.alarm_sounds[t] for t in sorted(CONFIG.alarm_sounds)]
+    CONFIG.alarm_triggers = list(triggers)
+    CONFIG.alarm_sounds = {t: sounds[min(i, len(sounds) - 1)] for i, t in enumerate(triggers)}
+
+def run_condition(fps, load, args, triggers):
+    """在一种采集帧率和CPU竞争条件下运行，返回 alarm_timing() 的结果"""
+    hold = max(triggers) + args.hold
+    period = hold + args.gap
+    stagger = period / args.rois
+    width, height = RESOLUTION
+    CONFIG.cameras = [CameraConfig(source=0, roi=None, min_confidence=0.5, resolution=RESOLUTION,
+                                   rois=[{"name": f"Bed {i}", "x": i * width // args.rois, "y": 0,
+                                          "w": width // args.rois, "h": height} for i in range(args.rois)])]
+    clock = VirtualClock(speed=args.speed)
+    simulation = Simulation(clock)
+    simulation.sources[0] = SyntheticSource(clock, RESOLUTION, fps)
+    manager = CameraManager(processor_factory=simulation.processor)
+    subscription = event_bus.subscribe(event_types=(AlarmEscalated,), maxsize=100000)
+
+    # 每个空转进程占满一个CPU核心（不导入本项目的模块，启动开销很小）
+    burners = [subprocess.Popen([sys.executable, '-c', 'while True: pass']) for _ in range(load)]
+    try:
+        with clock.install():
+            if not manager.start_camera(0):
+                raise RuntimeError("仿真摄像头启动失败")
+            # 处理器初始化完成后再开始脚本，区域之间错开手势开始时间
+            start = clock.time() + args.warmup
+            pinch = hand_landmarks(0.1)
+            simulation.scripts[0] = [GestureScript([(0, hold, pinch)], start + i * stagger, period)
+                                     for i in range(args.rois)]
+            end = start + args.cycles * period
+            clock.sleep(end - clock.time())
+            manager.stop_all()
+    finally:
+        for burner in burners:
+            burner.kill()
+            burner.wait()
+        subscription.close()
+    # 只统计在结束前能走完全部报警级别的手势
+    onsets = {(0, i): script.onsets(end - hold) for i, script in enumerate(simulation.scripts[0])}
+    return alarm_timing(onsets, subscription.drain(), simulation.sink.plays, triggers)
+
+def main():
+    parser = argparse.ArgumentParser(description="测量不同采集帧率和CPU竞争下报警升级时间的误差")
+    parser.add_argument('--fps', default="15,30", help="采集帧率列表，逗号分隔")
+    parser.add_argument('--load', default="0,2", help="空转进程数列表（CPU竞争程度），逗号分隔")
+    parser.add_argument('--triggers', default=None, help="报警触发时长（秒），逗号分隔，默认为 alarm_triggers")
+    parser.add_argument('--cycles', type=int, default=2, help="每个区域的手势次数")
+    parser.add_argument('--rois', type=int, default=2, help="监测区域数")
+    parser.add_argument('--hold', type=float, default=1.5, help="手势在最后一级报警后继续保持的时长（秒）")
+    parser.add_argument('--gap', type=float, default=3.0, help="两次手势之间无手的时长（秒）")
+    parser.add_argument('--warmup', type=float, default=2.0, help="摄像头启动后开始第一次手势前的等待（秒）")
+    parser.add_argument('--speed', type=float, default=1.0, help="虚拟时间倍速（大于1时误差按倍数放大）")
+    parser.add_argument('--max-p99', type=float, default=0.5, help="误差p99上限（秒）")
+    parser.add_argument('--csv', default=None, help="保存每次升级误差的CSV路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s %(message)s')
+    if args.triggers:
+        set_triggers(sorted(float(t) for t in args.triggers.split(',')))
+    triggers = list(CONFIG.alarm_triggers)
+    conditions = [(float(fps), int(load)) for load in args.load.split(',') for fps in args.fps.split(',')]
+    period = max(triggers) + args.hold + args.gap
+    print(f"报警级别 {triggers}，{len(conditions)} 个条件，每个约 {args.warmup + args.cycles * period:.0f} 秒")
+    print(f"{'帧率':>6}{'竞争':>6}{'升级数':>8}{'误差均值':>10}{'p50':>8}{'p99':>8}{'最大':>8}"
+          f"{'首次声音p50':>13}{'p99':>8}{'缺失':>6}  结果")
+
+    rows = []
+    failed = False
+    for fps, load in conditions:
+        result = run_condition(fps, load, args, triggers)
+        errors = np.array([e for values in result['errors'].values() for e in values])
+        first = np.array(result['first_sound'])
+        late = first - triggers[0] if len(first) else first
+        p99 = float(np.percentile(np.abs(errors), 99)) if len(errors) else float('nan')
+        first_p99 = float(np.percentile(late, 99)) if len(late) else float('nan')
+        ok = (len(errors) > 0 and p99 <= args.max_p99 and len(late) > 0 and first_p99 <= args.max_p99
+              and result['missed'] == 0)
+        failed |= not ok
+        if len(errors):
+            print(f"{fps:>6g}{load:>6}{len(errors):>8}{errors.mean():>+10.3f}{np.median(errors):>+8.3f}"
+                  f"{p99:>8.3f}{np.abs(errors).max():>8.3f}{np.median(first):>13.3f}{np.percentile(first, 99):>8.3f}"
+                  f"{result['missed']:>6}  {'通过' if ok else '失败'}")
+        else:
+            print(f"{fps:>6g}{load:>6}{0:>8}{'':>58}{result['missed']:>6}  失败")
+        for trigger, values in result['errors'].items():
+            rows.extend({'fps': fps, 'load': load, 'trigger': trigger, 'error': round(e, 4)} for e in values)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['fps', 'load', 'trigger', 'error'])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if failed:
+        print(f"\n报警时序回归失败：误差p99超过 {args.max_p99} 秒或有报警级别未触发")
+        sys.exit(1)
+    print("\n报警时序回归通过")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# benchmarks/landmark_recorder_benchmark.py
+# 关键点记录基准测试
+#
+# 测量摄像头线程每次 append() 的耗时（包括块写满时交给后台线程的开销），
+# 与目标帧间隔比较得到记录开销占帧时间的比例。实际运行时写满一个块需要一分钟以上，
+# 基准测试在每个块交出后暂停片刻（不计入耗时），模拟后台线程有时间保存分段；然后在写出的数据上
+# 随机读取若干时间范围，测量按时间范围访问的耗时。
+#
+# 用法：
+#   python benchmarks/landmark_recorder_benchmark.py --rows 1000000 --rois 2
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.landmark_recorder import LandmarkArchive, LandmarkRecorder, SOURCE_INFERENCE
+
+def main():
+    parser = argparse.ArgumentParser(description="测量关键点记录的开销和读取速度")
+    parser.add_argument('--rows', type=int, default=1000000, help="记录的总行数")
+    parser.add_argument('--rois', type=int, default=2, help="每帧记录的区域数")
+    parser.add_argument('--fps', type=float, default=30.0, help="帧率，用于计算开销比例")
+    parser.add_argument('--block-rows', type=int, default=4096, help="每个分段的行数")
+    parser.add_argument('--reads', type=int, default=50, help="随机读取次数")
+    parser.add_argument('--window', type=float, default=60.0, help="每次读取的时间范围（秒）")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        recorder = LandmarkRecorder(directory, block_rows=args.block_rows)
+        landmarks = np.random.default_rng(0).random((21, 3), dtype=np.float32)
+        frame_interval = 1.0 / args.fps
+        start_time = 1.7e9
+        samples = []
+        for row in range(args.rows):
+            now = start_time + (row // args.rois) * frame_interval
+            t0 = time.perf_counter()
+            recorder.append(now, row % args.rois, SOURCE_INFERENCE, 0.9, landmarks, False)
+            samples.append(time.perf_counter() - t0)
+            if recorder._rows == 0:
+                time.sleep(0.02)
+        t0 = time.perf_counter()
+        recorder.close()
+        close_ms = (time.perf_counter() - t0) * 1000
+        end_time = start_time + (args.rows // args.rois) * frame_interval
+
+        samples = np.array(samples) * 1e6
+        per_frame_us = samples.mean() * args.rois
+        print(f"记录 {args.rows} 行（{args.rois}个区域，{(end_time - start_time) / 3600:.1f} 小时）: "
+              f"{recorder.get_stats()}")
+        print(f"append(): 平均 {samples.mean():.2f} us  中位数 {np.median(samples):.2f} us  "
+              f"p99.9 {np.percentile(samples, 99.9):.2f} us  最大 {samples.max():.0f} us")
+        print(f"每帧记录开销 {per_frame_us:.1f} us，占帧间隔 {per_frame_us / (frame_interval * 1e6) * 100:.3f}%")
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"磁盘占用 {size / 1024 / 1024:.0f} MB，关闭耗时 {close_ms:.1f} ms")
+
+        archive = LandmarkArchive(directory)
+        rng = np.random.default_rng(1)
+        reads = []
+        rows = 0
+        for _ in range(args.reads):
+            begin = rng.uniform(start_time, max(start_time, end_time - args.window))
+            t0 = time.perf_counter()
+            data = archive.read(begin, begin + args.window, roi=0)
+            reads.append((time.perf_counter() - t0) * 1000)
+            rows += len(data['time'])
+        print(f"随机读取 {args.window:.0f} 秒范围（单个区域，平均 {rows / args.reads:.0f} 行）: "
+              f"中位数 {statistics.median(reads):.2f} ms  最大 {max(reads):.2f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# benchmarks/language_switch_benchmark.py
+# 界面语言切换耗时基准测试
+#
+# 构造与控制面板相同的组件（N个摄像头，每个摄像头可配置多个监测区域），
+# 在中英文之间反复切换，测量 lang.refresh() 更新全部界面文本的耗时，
+# 以及包含Tk重绘在内的总耗时。
+# 需要图形界面环境；没有设置 DISPLAY 时自动用 xvfb-run 在虚拟显示中重新运行。
+#
+# 用法：
+#   python benchmarks/language_switch_benchmark.py --cameras 64 --switches 50
+#   xvfb-run -a python benchmarks/language_switch_benchmark.py --cameras 64
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import time
+import tkinter as tk
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG, CameraConfig
+from modules.language import lang
+from modules.ui.components import (
+    TimeDisplay, ThemeSelector, CameraSelector, SettingsPanel, ControlButtons, StatusDisplay
+)
+from modules.ui.language_selector import LanguageSelector
+
+def ensure_display():
+    """Linux下没有图形界面时在 xvfb-run 提供的虚拟显示中重新运行本脚本"""
+    if os.environ.get('DISPLAY') or not sys.platform.startswith('linux'):
+        return
+    xvfb_run = shutil.which('xvfb-run')
+    if xvfb_run is None:
+        sys.exit("需要图形界面环境：请设置 DISPLAY，或安装 Xvfb 后用 xvfb-run -a 运行本脚本")
+    os.execv(xvfb_run, [xvfb_run, '-a', '-s', '-screen 0 1920x1080x24', sys.executable] + sys.argv)
+
+def summary(samples):
+    """格式化耗时统计"""
+    samples = sorted(samples)
+    return (f"中位数 {statistics.median(samples):.3f} ms  "
+            f"p95 {samples[int(len(samples) * 0.95)]:.3f} ms  最大 {samples[-1]:.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="测量界面语言切换耗时")
+    parser.add_argument('--cameras', type=int, default=64, help="摄像头数量")
+    parser.add_argument('--rois', type=int, default=1, help="每个摄像头的监测区域数")
+    parser.add_argument('--wards', type=int, default=8, help="病区数量，摄像头依次分配到各病区")
+    parser.add_argument('--switches', type=int, default=50, help="切换次数")
+    args = parser.parse_args()
+    ensure_display()
+
+    CONFIG.cameras = [
+        CameraConfig(source=i, roi=None,
+                     rois=[{"name": f"床位{k + 1}", "x": 0, "y": 0, "w": 320, "h": 480} for k in range(args.rois)],
+                     min_confidence=0.7, resolution=(1280, 720), ward=f"病区{i % args.wards + 1}")
+        for i in range(args.cameras)
+    ]
+    root = tk.Tk()
+    for component in (TimeDisplay(root), ThemeSelector(root), LanguageSelector(root),
+                      CameraSelector(root), SettingsPanel(root), ControlButtons(root), StatusDisplay(root)):
+        component.pack(fill=tk.X)
+    root.update()
+
+    refresh_ms = []
+    total_ms = []
+    original = lang.get_current_language()
+    for n in range(args.switches):
+        start = time.perf_counter()
+        lang.switch_language(lang.languages[(lang.languages.index(original) + n + 1) % len(lang.languages)])
+        refresh_ms.append(lang.refresh())
+        root.update_idletasks()
+        total_ms.append((time.perf_counter() - start) * 1000)
+    lang.switch_language(original)
+
+    print(f"{args.cameras} 个摄像头，{args.cameras * args.rois} 个床位，{len(lang._bindings)} 个登记的界面文本，"
+          f"{args.switches} 次切换")
+    print(f"更新文本: {summary(refresh_ms)}")
+    print(f"含重绘:   {summary(total_ms)}")
+    root.destroy()
+
+if __name__ == '__main__':
+    main()
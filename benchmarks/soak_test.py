@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+# benchmarks/soak_test.py
+# 加速时间的浸泡测试（内存和句柄泄漏）
+#
+# 用合成视频源和虚拟时钟（modules/simulation.py）驱动 CameraManager，按虚拟时间反复执行：
+# - 摄像头停止/启动（轮流重启）
+# - 视频源断流和重连
+# - 监测区域坐标热更新
+# - 手势持续到各级报警、暂停报警和手势消失后复位
+# 报警事件同时写入临时的报警事件数据库并录制报警片段，覆盖事件总线的各个消费方。
+#
+# 按虚拟时间间隔采样进程RSS、打开的文件描述符（句柄）、线程数和tracemalloc跟踪的内存，
+# 在预热之后的样本上按最小二乘拟合每虚拟小时的增长斜率，超过上限时以非零状态退出，
+# 并列出tracemalloc中增长最多的分配位置。推理仍为实际耗时，倍速越高每虚拟秒处理的帧越少。
+#
+# 用法：
+#   python benchmarks/soak_test.py --hours 24 --speed 240 --cameras 2
+#   python benchmarks/soak_test.py --hours 2 --speed 120 --csv soak.csv
+
+import argparse
+import csv
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from config import CONFIG, CameraConfig
+from modules.alarm_store import AlarmStore
+from modules.camera_manager import CameraManager
+from modules.clip_recorder import clip_recorder
+from modules.simulation import GestureScript, Simulation, SyntheticSource, VirtualClock, hand_landmarks
+
+RESOLUTION = (320, 240)
+
+def _proc_status(field):
+    """读取 /proc/self/status 中的数值字段（Linux）"""
+    with open('/proc/self/status', encoding='ascii') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise OSError(field)
+
+def sample_resources():
+    """采样当前进程的资源占用
+
+    Returns:
+        dict: rss_mb、handles（文件描述符或Windows句柄）、threads（操作系统线程）、
+              py_threads（Python线程）、traced_mb（tracemalloc跟踪的内存）
+    """
+    if psutil is not None:
+        process = psutil.Process()
+        rss = process.memory_info().rss / 2 ** 20
+        handles = process.num_handles() if os.name == 'nt' else process.num_fds()
+        threads = process.num_threads()
+    else:
+        rss = _proc_status('VmRSS') / 1024
+        handles = len(os.listdir('/proc/self/fd'))
+        threads = _proc_status('Threads')
+    return {
+        'rss_mb': rss,
+        'handles': handles,
+        'threads': threads,
+        'py_threads': threading.active_count(),
+        'traced_mb': tracemalloc.get_traced_memory()[0] / 2 ** 20 if tracemalloc.is_tracing() else 0.0
+    }
+
+def slope_per_hour(samples, key, warmup):
+    """预热之后的样本按最小二乘拟合的增长斜率（每虚拟小时）"""
+    points = [(s['hours'], s[key]) for s in samples if s['hours'] >= warmup]
+    if len(points) < 3:
+        return 0.0
+    hours, values = np.array(points, dtype=np.float64).T
+    return float(np.polyfit(hours, values, 1)[0])
+
+class SoakWorkload:
+    """按虚拟时间调度的浸泡测试负载"""
+
+    def __init__(self, args, clock, directory):
+        self.args = args
+        self.clock = clock
+        self.simulation = Simulation(clock)
+        self.manager = CameraManager(processor_factory=self.simulation.processor)
+        self.random = random.Random(0)
+        self.counts = {'restarts': 0, 'start_failures': 0, 'roi_updates': 0, 'acks': 0, 'resets': 0}
+        start = clock.time()
+        width, height = RESOLUTION
+        CONFIG.cameras = []
+        for camera_id in range(args.cameras):
+            rois = [{"name": f"Bed {camera_id}-{i}", "x": i * width // args.rois, "y": 0,
+                     "w": width // args.rois, "h": height - 16} for i in range(args.rois)]
+            CONFIG.cameras.append(CameraConfig(source=camera_id, roi=None, min_confidence=0.5,
+                                               resolution=RESOLUTION, rois=rois))
+            self.simulation.sources[camera_id] = SyntheticSource(clock, RESOLUTION, args.fps,
+                                                                 disconnect_interval=args.reconnect_interval)
+            # 第一个区域：持续35秒的手势（触发全部报警级别）；第二个区域：短暂手势（只触发第一级）
+            scripts = [GestureScript([(0, 35, hand_landmarks(0.1))], start, period=120)]
+            scripts += [GestureScript([(10, 17, hand_landmarks(0.1)), (17, 30, hand_landmarks(1.5))],
+                                      start + 7 * camera_id, period=90)
+                        for _ in range(args.rois - 1)]
+            self.simulation.scripts[camera_id] = scripts
+        CONFIG.clip_dir = os.path.join(directory, "clips")
+        self.store = AlarmStore(os.path.join(directory, "alarms.db"), flush_interval=0.5)
+
+    def start(self):
+        self.store.start()
+        clip_recorder.start(directory=CONFIG.clip_dir, pre_seconds=5.0, post_seconds=5.0, fps=2.0,
+                            camera_memory_mb=4, total_memory_mb=16, workers=1)
+        for camera_id in range(self.args.cameras):
+            self._start(camera_id)
+
+    def stop(self):
+        self.manager.stop_all()
+        clip_recorder.stop()
+        self.store.stop()
+
+    def _start(self, camera_id):
+        if not self.manager.start_camera(camera_id):
+            self.counts['start_failures'] += 1
+
+    def restart(self, camera_id):
+        """停止并重新启动一个摄像头"""
+        self.manager.stop_camera(camera_id)
+        self._start(camera_id)
+        self.counts['restarts'] += 1
+
+    def update_roi(self):
+        """随机移动一个监测区域（热更新，不重启摄像头）"""
+        camera_id = self.random.randrange(self.args.cameras)
+        index = self.random.randrange(self.args.rois)
+        roi = CONFIG.cameras[camera_id].rois[index]
+        width = RESOLUTION[0] // self.args.rois
+        x = max(0, min(RESOLUTION[0] - roi['w'], index * width + self.random.randint(-8, 8)))
+        CONFIG.update_camera_rois(camera_id, {index: {"x": x, "y": self.random.randint(0, 8)}})
+        self.counts['roi_updates'] += 1
+
+    def acknowledge(self):
+        """暂停报警声音，偶尔请求复位"""
+        for processor in list(self.manager.processors.values()):
+            processor.pause_alarm()
+            self.counts['acks'] += 1
+            if self.random.random() < 0.2:
+                processor.request_reset()
+                self.counts['resets'] += 1
+
+    @property
+    def reconnects(self):
+        return sum(source.opened for source in self.simulation.sources.values()) - self.counts['restarts'] \
+            - self.args.cameras
+
+    @property
+    def open_captures(self):
+        return sum(source.open_captures for source in self.simulation.sources.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="用虚拟时钟压缩长时间运行，检测内存、句柄和线程的增长")
+    parser.add_argument('--hours', type=float, default=24.0, help="模拟的运行时长（虚拟小时）")
+    parser.add_argument('--speed', type=float, default=240.0, help="虚拟时间倍速")
+    parser.add_argument('--cameras', type=int, default=2, help="摄像头数量")
+    parser.add_argument('--rois', type=int, default=2, help="每个摄像头的监测区域数")
+    parser.add_argument('--fps', type=float, default=15.0, help="合成视频源帧率（虚拟时间）")
+    parser.add_argument('--restart-interval', type=float, default=600.0, help="轮流重启摄像头的间隔（虚拟秒）")
+    parser.add_argument('--reconnect-interval', type=float, default=300.0, help="视频源每次打开后断流的时长（虚拟秒）")
+    parser.add_argument('--roi-interval', type=float, default=30.0, help="监测区域热更新间隔（虚拟秒）")
+    parser.add_argument('--ack-interval', type=float, default=45.0, help="暂停报警的间隔（虚拟秒）")
+    parser.add_argument('--sample-interval', type=float, default=300.0, help="资源采样间隔（虚拟秒）")
+    parser.add_argument('--warmup', type=float, default=0.15, help="不参与斜率拟合的预热比例")
+    parser.add_argument('--max-rss-slope', type=float, default=4.0, help="RSS增长上限（MB/虚拟小时）")
+    parser.add_argument('--max-traced-slope', type=float, default=1.0, help="tracemalloc内存增长上限（MB/虚拟小时）")
+    parser.add_argument('--max-handle-slope', type=float, default=0.5, help="句柄增长上限（个/虚拟小时）")
+    parser.add_argument('--max-thread-slope', type=float, default=0.5, help="线程增长上限（个/虚拟小时）")
+    parser.add_argument('--no-tracemalloc', action='store_true', help="不启用tracemalloc（开销约为2倍）")
+    parser.add_argument('--csv', default=None, help="保存采样数据的CSV路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    if not args.no_tracemalloc:
+        tracemalloc.start(10)
+    directory = tempfile.mkdtemp(prefix="soak_")
+    clock = VirtualClock(speed=args.speed)
+    workload = SoakWorkload(args, clock, directory)
+    start = clock.time()
+    end = start + args.hours * 3600
+    samples = []
+    baseline = None
+    print(f"模拟 {args.hours:g} 小时，{args.speed:g} 倍速（预计 {args.hours * 3600 / args.speed / 60:.1f} 分钟），"
+          f"{args.cameras} 个摄像头 × {args.rois} 个区域")
+    print(f"{'虚拟时间':>8}{'RSS(MB)':>10}{'句柄':>6}{'线程':>6}{'Py线程':>8}{'跟踪(MB)':>10}"
+          f"{'报警':>7}{'重启':>6}{'重连':>6}{'区域更新':>9}")
+
+    real_start = time.perf_counter()
+    with clock.install():
+        workload.start()
+        deadlines = {'restart': start + args.restart_interval, 'roi': start + args.roi_interval,
+                     'ack': start + args.ack_interval, 'sample': start}
+        restart_camera = 0
+        try:
+            while True:
+                now = clock.time()
+                if now >= end:
+                    break
+                if now >= deadlines['restart']:
+                    workload.restart(restart_camera)
+                    restart_camera = (restart_camera + 1) % args.cameras
+                    deadlines['restart'] += args.restart_interval
+                if now >= deadlines['roi']:
+                    workload.update_roi()
+                    deadlines['roi'] += args.roi_interval
+                if now >= deadlines['ack']:
+                    workload.acknowledge()
+                    deadlines['ack'] += args.ack_interval
+                if now >= deadlines['sample']:
+                    sample = dict(sample_resources(), hours=(now - start) / 3600,
+                                  alarms=workload.simulation.sink.total, **workload.counts,
+                                  reconnects=workload.reconnects)
+                    samples.append(sample)
+                    if baseline is None and sample['hours'] >= args.hours * args.warmup and tracemalloc.is_tracing():
+                        baseline = tracemalloc.take_snapshot()
+                    print(f"{sample['hours']:>7.2f}h{sample['rss_mb']:>10.1f}{sample['handles']:>6}"
+                          f"{sample['threads']:>6}{sample['py_threads']:>8}{sample['traced_mb']:>10.1f}"
+                          f"{sample['alarms']:>7}{sample['restarts']:>6}{sample['reconnects']:>6}"
+                          f"{sample['roi_updates']:>9}", flush=True)
+                    deadlines['sample'] += args.sample_interval
+                clock.sleep(min(deadlines.values()) - clock.time())
+        finally:
+            workload.stop()
+    elapsed = time.perf_counter() - real_start
+    leaked_captures = workload.open_captures
+    final_threads = threading.active_count()
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+
+    warmup = args.hours * args.warmup
+    limits = [('rss_mb', args.max_rss_slope, "MB"), ('traced_mb', args.max_traced_slope, "MB"),
+              ('handles', args.max_handle_slope, "个"), ('threads', args.max_thread_slope, "个")]
+    failures = []
+    print(f"\n实际耗时 {elapsed / 60:.1f} 分钟，报警 {workload.simulation.sink.total} 次，"
+          f"重启 {workload.counts['restarts']} 次，重连 {workload.reconnects} 次，"
+          f"区域更新 {workload.counts['roi_updates']} 次，暂停报警 {workload.counts['acks']} 次")
+    for key, limit, unit in limits:
+        if key == 'traced_mb' and not tracemalloc.is_tracing():
+            continue
+        slope = slope_per_hour(samples, key, warmup)
+        ok = slope <= limit
+        print(f"{key:<10} 增长 {slope:+8.3f} {unit}/小时（上限 {limit:g}） {'通过' if ok else '失败'}")
+        if not ok:
+            failures.append(key)
+    if workload.counts['start_failures']:
+        failures.append('start_failures')
+        print(f"摄像头启动失败 {workload.counts['start_failures']} 次")
+    if leaked_captures:
+        failures.append('captures')
+        print(f"停止后仍有 {leaked_captures} 个视频捕获对象未释放")
+    print(f"停止全部摄像头后剩余Python线程 {final_threads} 个")
+
+    if baseline is not None:
+        print("\ntracemalloc 预热后增长最多的分配位置：")
+        for stat in tracemalloc.take_snapshot().compare_to(baseline, 'lineno')[:10]:
+            print(f"  {stat.size_diff / 1024:+10.1f} KB {stat.count_diff:+8d} 块  {stat.traceback}")
+    shutil.rmtree(directory, ignore_errors=True)
+
+    if failures:
+        print(f"\n浸泡测试失败: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n浸泡测试通过")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# benchmarks/startup_benchmark.py
+# 启动性能基准测试
+#
+# 每次测量都启动一个新的Python解释器（冷导入），统计：
+# - config导入耗时：导入配置模块本身（不应有任何副作用）
+# - 窗口显示耗时（time-to-window）：从解释器启动到控制面板窗口完成首次绘制
+# - 首帧耗时（time-to-first-frame）：从解释器启动到第一帧处理完成，包括导入cv2/mediapipe/pygame、
+#   初始化MediaPipe和打开视频源
+#
+# 用法：
+#   python benchmarks/startup_benchmark.py --repeat 5 --source /path/to/clip.mp4
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 子进程脚本：在 ROOT 目录下运行，最后一行输出JSON结果
+_CONFIG_IMPORT = """
+import json, sys, time
+t0 = time.perf_counter()
+import config
+elapsed = time.perf_counter() - t0
+heavy = [m for m in ('cv2', 'mediapipe', 'pygame') if m in sys.modules]
+print(json.dumps({'seconds': elapsed, 'heavy_modules': heavy}))
+"""
+
+_TIME_TO_WINDOW = """
+import json, os, sys, time
+start = float(os.environ['BENCH_START'])
+from config import init_system
+init_system()
+from modules.ui import ControlPanel
+panel = ControlPanel()
+panel.root.update()
+elapsed = time.time() - start
+heavy = [m for m in ('cv2', 'mediapipe', 'pygame') if m in sys.modules]
+panel.root.destroy()
+print(json.dumps({'seconds': elapsed, 'heavy_modules': heavy}))
+"""
+
+_TIME_TO_FIRST_FRAME = """
+import json, os, sys, time
+from threading import Event
+start = float(os.environ['BENCH_START'])
+from config import CONFIG, init_system
+source = os.environ.get('BENCH_SOURCE')
+if source:
+    CONFIG.cameras[0].source = int(source) if source.isdigit() else source
+init_system()
+from modules.video_processor import VideoProcessor
+processor = VideoProcessor(0, Event())
+ret, frame = processor.cap.read()
+if not ret:
+    raise RuntimeError('无法读取第一帧')
+processor._process_frame(frame)
+elapsed = time.time() - start
+processor._release_resources()
+print(json.dumps({'seconds': elapsed}))
+"""
+
+def run_child(script, source=None):
+    """在新解释器中运行测量脚本
+
+    Returns:
+        dict: 测量结果；失败时包含 'error'
+    """
+    env = dict(os.environ, BENCH_START=repr(time.time()))
+    env.setdefault('SDL_AUDIODRIVER', 'dummy')
+    if source is not None:
+        env['BENCH_SOURCE'] = str(source)
+    proc = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else f'exit code {proc.returncode}'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def measure(name, script, repeat, source=None):
+    """重复测量并打印中位数/最小值/最大值"""
+    samples = []
+    extra = {}
+    for _ in range(repeat):
+        result = run_child(script, source)
+        if 'error' in result:
+            print(f"{name:<24}失败: {result['error']}")
+            return None
+        samples.append(result.pop('seconds'))
+        extra = result
+    print(f"{name:<24}中位数 {statistics.median(samples) * 1000:8.1f} ms"
+          f"  最小 {min(samples) * 1000:8.1f} ms  最大 {max(samples) * 1000:8.1f} ms"
+          + (f"  已导入重量级库: {extra['heavy_modules']}" if 'heavy_modules' in extra else ''))
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="测量配置导入、窗口显示和首帧处理的耗时")
+    parser.add_argument('--repeat', type=int, default=5, help="每项测量的重复次数")
+    parser.add_argument('--source', default=None, help="视频源（默认使用摄像头0的配置）")
+    parser.add_argument('--skip-window', action='store_true', help="跳过窗口显示测量（无图形界面环境）")
+    args = parser.parse_args()
+
+    measure('config导入', _CONFIG_IMPORT, args.repeat)
+    if not args.skip_window:
+        measure('窗口显示 (time-to-window)', _TIME_TO_WINDOW, args.repeat)
+    measure('首帧 (time-to-first-frame)', _TIME_TO_FIRST_FRAME, args.repeat, args.source)
+
+if __name__ == '__main__':
+    main()
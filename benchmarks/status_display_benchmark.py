@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# benchmarks/status_display_benchmark.py
+# 状态显示刷新耗时基准测试
+#
+# 构造N个摄像头的状态显示组件，用模拟的状态快照驱动刷新，比较：
+# - 全量刷新：每次刷新前清除渲染缓存，重新配置所有指示器、报警计数标签并重建状态文本
+#   （与增量更新之前的实现开销相同）
+# - 增量刷新：只更新发生变化的控件和文本行
+# 每次刷新有少数摄像头进入检测/报警状态，其余摄像头只有帧率小幅波动。
+# 需要图形界面环境；没有设置 DISPLAY 时自动用 xvfb-run 在虚拟显示中重新运行。
+#
+# 用法：
+#   python benchmarks/status_display_benchmark.py --cameras 16 --refreshes 200
+#   xvfb-run -a python benchmarks/status_display_benchmark.py --cameras 16
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+import tkinter as tk
+from types import SimpleNamespace
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG, CameraConfig
+from modules.status_snapshot import CameraStatus, RoiStatus
+from modules.ui.components import StatusDisplay
+
+def ensure_display():
+    """Linux下没有图形界面时在 xvfb-run 提供的虚拟显示中重新运行本脚本"""
+    if os.environ.get('DISPLAY') or not sys.platform.startswith('linux'):
+        return
+    xvfb_run = shutil.which('xvfb-run')
+    if xvfb_run is None:
+        sys.exit("需要图形界面环境：请设置 DISPLAY，或安装 Xvfb 后用 xvfb-run -a 运行本脚本")
+    os.execv(xvfb_run, [xvfb_run, '-a', '-s', '-screen 0 1920x1080x24', sys.executable] + sys.argv)
+
+def make_snapshot(cam_id, alarm_level, detection_start, fps):
+    """构造单个摄像头的状态快照"""
+    played = tuple(CONFIG.alarm_triggers[:alarm_level])
+    status = "报警触发" if alarm_level else ("检测中" if detection_start else "无报警")
+    roi = RoiStatus(name=f"ROI {cam_id}", status=status, detection_start=detection_start,
+                    alarm_level=alarm_level, played_sounds=played, gestures=())
+    return CameraStatus(camera_id=cam_id, timestamp=time.time(), status=status, fps=fps, rois=[roi])
+
+def run(display, root, processors, refreshes, full, changing):
+    """执行多次刷新并返回每次刷新的耗时（毫秒）"""
+    rng = random.Random(0)
+    samples = []
+    now = time.time()
+    for n in range(refreshes):
+        # 轮流让少数摄像头改变检测/报警状态
+        for k in range(changing):
+            cam_id = (n + k * 5) % len(processors)
+            level = (n // len(processors) + k) % (len(CONFIG.alarm_triggers) + 1)
+            processors[cam_id].status_snapshot = make_snapshot(cam_id, level, now - 3 if level else 0,
+                                                               25 + rng.uniform(-0.5, 0.5))
+        if full:
+            display.invalidate()
+        start = time.perf_counter()
+        display.update_status(processors)
+        root.update_idletasks()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="测量状态显示组件的刷新耗时")
+    parser.add_argument('--cameras', type=int, default=16, help="摄像头数量")
+    parser.add_argument('--refreshes', type=int, default=200, help="刷新次数")
+    parser.add_argument('--changing', type=int, default=2, help="每次刷新状态发生变化的摄像头数")
+    parser.add_argument('--wards', type=int, default=4, help="病区数量，摄像头依次分配到各病区")
+    args = parser.parse_args()
+    ensure_display()
+
+    CONFIG.cameras = [
+        CameraConfig(source=i, roi={"x": 0, "y": 0, "w": 640, "h": 480},
+                     min_confidence=0.7, resolution=(1280, 720), ward=f"病区{i % args.wards + 1}")
+        for i in range(args.cameras)
+    ]
+    root = tk.Tk()
+    display = StatusDisplay(root)
+    display.pack(fill=tk.BOTH, expand=True)
+    root.update()
+
+    processors = [SimpleNamespace(status_snapshot=make_snapshot(i, 0, 0, 25.0)) for i in range(args.cameras)]
+    print(f"{args.cameras} 个摄像头，{args.refreshes} 次刷新，每次 {args.changing} 个摄像头状态变化")
+    for name, full in (('全量刷新', True), ('增量刷新', False)):
+        display.invalidate()
+        samples = run(display, root, processors, args.refreshes, full, args.changing)
+        samples.sort()
+        print(f"{name}: 中位数 {statistics.median(samples):.3f} ms  "
+              f"p95 {samples[int(len(samples) * 0.95)]:.3f} ms  最大 {samples[-1]:.3f} ms")
+    root.destroy()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# benchmarks/thread_budget_benchmark.py
+# 线程预算基准测试
+#
+# 用合成视频源（modules/simulation.py）同时运行多个摄像头，关闭级联检测和推理缓存并把检测间隔设为0，
+# 使每一帧都进行MediaPipe推理，比较以下方案的总吞吐量（处理帧数/秒）和单帧处理耗时的尾延迟：
+# - default：各库的默认线程数（MediaPipe图调度线程池与核心数相同，OpenCV使用全部核心）
+# - plan：按 modules/thread_budget.py 的线程预算限制线程数，预留一个核心给界面和声音
+# - pin：在 plan 的基础上把每个摄像头的线程绑定到分给它的核心
+# cv2.setNumThreads() 和MediaPipe线程池都是进程级的，每个方案在单独的子进程中运行。
+# 核心数不多于摄像头数时不预留核心，plan 与 default 的差别只在线程数。
+#
+# 用法：
+#   python benchmarks/thread_budget_benchmark.py --cameras 3 --duration 30
+#   python benchmarks/thread_budget_benchmark.py --modes default,pin --pool-size 8
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from config import CONFIG, CameraConfig
+from modules.thread_budget import available_cpus
+
+RESOLUTION = (640, 480)
+MODES = ('default', 'plan', 'pin')
+
+def run_mode(mode, args):
+    """在当前进程中按一种方案运行所有摄像头
+
+    Returns:
+        dict: fps（总吞吐量）、camera_fps（各摄像头）、latencies（单帧处理耗时，秒）、plan（线程预算摘要）
+    """
+    from modules.camera_manager import CameraManager
+    from modules.simulation import Simulation, SyntheticSource, VirtualClock
+    from modules.thread_budget import plan_threads, thread_budget
+
+    width, height = RESOLUTION
+    CONFIG.cameras = [CameraConfig(source=i, roi=None, min_confidence=0.5, resolution=RESOLUTION,
+                                   rois=[{"name": "Bed", "x": 0, "y": 0, "w": width, "h": height - 16}])
+                      for i in range(args.cameras)]
+    CONFIG.presence_gate_enabled = False
+    CONFIG.inference_cache_enabled = False
+    CONFIG.detection_interval = 0.0
+    CONFIG.max_fps = args.fps
+    description = "库默认线程数"
+    if mode != 'default':
+        plan = plan_threads(args.cameras, args.pool_size, pin=(mode == 'pin'))
+        thread_budget.apply(plan)
+        description = plan.describe()
+
+    clock = VirtualClock(speed=1)
+    simulation = Simulation(clock)
+    for camera_id in range(args.cameras):
+        simulation.sources[camera_id] = SyntheticSource(clock, RESOLUTION, args.fps)
+    manager = CameraManager(processor_factory=simulation.processor)
+    latencies = {camera_id: [] for camera_id in range(args.cameras)}
+
+    def timed(camera_id, process):
+        def process_frame(frame):
+            start = time.perf_counter()
+            result = process(frame)
+            latencies[camera_id].append(time.perf_counter() - start)
+            return result
+        return process_frame
+
+    with clock.install():
+        for camera_id in range(args.cameras):
+            if not manager.start_camera(camera_id):
+                raise RuntimeError(f"仿真摄像头{camera_id}启动失败")
+            processor = manager.get_processor(camera_id)
+            processor._process_frame = timed(camera_id, processor._process_frame)
+        time.sleep(args.warmup)
+        for values in latencies.values():
+            values.clear()
+        before = {camera_id: manager.get_processor(camera_id).frames_processed for camera_id in latencies}
+        start = time.perf_counter()
+        time.sleep(args.duration)
+        elapsed = time.perf_counter() - start
+        after = {camera_id: manager.get_processor(camera_id).frames_processed for camera_id in latencies}
+        manager.stop_all()
+    camera_fps = [(after[camera_id] - before[camera_id]) / elapsed for camera_id in sorted(latencies)]
+    return {
+        'fps': sum(camera_fps),
+        'camera_fps': camera_fps,
+        'latencies': [value for values in latencies.values() for value in values],
+        'plan': description
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="比较有无线程预算时多摄像头的吞吐量和尾延迟")
+    parser.add_argument('--cameras', type=int, default=3, help="摄像头数量")
+    parser.add_argument('--fps', type=int, default=30, help="合成视频源帧率和 max_fps")
+    parser.add_argument('--duration', type=float, default=20.0, help="每个方案的测量时长（秒）")
+    parser.add_argument('--warmup', type=float, default=3.0, help="摄像头启动后开始测量前的等待（秒）")
+    parser.add_argument('--pool-size', type=int, default=CONFIG.thread_pool_size, help="线程总数上限")
+    parser.add_argument('--modes', default=",".join(MODES), help="方案列表，逗号分隔")
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s %(message)s')
+    if args.worker:
+        result = run_mode(args.worker, args)
+        print(json.dumps(result))
+        return
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"未知方案: {mode}")
+    print(f"{args.cameras} 个摄像头，{len(available_cpus())} 个可用核心，每个方案 {args.duration:g} 秒")
+    print(f"{'方案':>8}{'总吞吐量':>10}{'最慢摄像头':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}  线程预算")
+    baseline = None
+    for mode in modes:
+        command = [sys.executable, os.path.abspath(__file__), '--worker', mode, '--cameras', str(args.cameras),
+                   '--fps', str(args.fps), '--duration', str(args.duration), '--warmup', str(args.warmup),
+                   '--pool-size', str(args.pool_size)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        latencies = np.array(result['latencies']) * 1000
+        print(f"{mode:>8}{result['fps']:>10.1f}{min(result['camera_fps']):>10.1f}"
+              f"{np.percentile(latencies, 50):>10.1f}{np.percentile(latencies, 99):>10.1f}"
+              f"{latencies.max():>10.1f}  {result['plan']}")
+        if baseline is None:
+            baseline = result['fps']
+        elif baseline > 0:
+            print(f"{'':>8}吞吐量相对 {modes[0]}: {result['fps'] / baseline - 1:+.1%}")
+
+if __name__ == '__main__':
+    main()
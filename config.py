@@ -7,9 +7,11 @@
 # - 报警设置（触发阈值、音频文件等）
 # - 日志配置（文件路径、大小限制等）
 
+import json
 import logging
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field, replace
 from logging.handlers import RotatingFileHandler
 import sys
 from typing import Dict, List, Tuple, Optional
@@ -20,22 +22,75 @@ class CameraConfig:
     
     Attributes:
         source: 视频源（摄像头ID或视频文件路径）
-        roi: 感兴趣区域，格式为 {"x": int, "y": int, "w": int, "h": int}
+        roi: 感兴趣区域，格式为 {"x": int, "y": int, "w": int, "h": int}；配置了 rois 时可为None
         min_confidence: 手势检测的最小置信度阈值
         resolution: 视频分辨率，格式为 (width, height)
         enabled: 是否启用该摄像头
         buffer_size: 视频缓冲区大小（帧数）
         auto_reconnect: 断开连接后是否自动重连
         reconnect_delay: 重连等待时间（秒）
+        rois: 多个命名监测区域（床位），格式为 [{"name": str, "x": int, "y": int, "w": int, "h": int}]，
+            每个区域拥有独立的手势、报警状态和报警声道；为空时使用 roi 作为唯一区域
+        name: 摄像头显示名称，为空时显示为"摄像头 N"
+        ward: 所属病区，状态显示按病区汇总
+        version: 配置版本号，每次热更新递增
+        updated_at: 该版本的发布时间戳，用于统计配置生效延迟
+        alarm_triggers: 报警触发时长（秒，升序），为空时使用 SystemConfig.alarm_triggers
+        alarm_sounds: 报警音频 {触发时长: 文件路径}，与 alarm_triggers 一起设置
+    
+    运行中的摄像头线程持有配置对象的引用，因此配置对象发布后不应再修改；
+    更新配置时用 with_rois()/with_alarms() 生成新版本，替换 CONFIG.cameras 中的引用（写时复制）。
     """
     source: int
-    roi: dict
+    roi: Optional[dict]
     min_confidence: float
     resolution: tuple
     enabled: bool = True
     buffer_size: int = 3
     auto_reconnect: bool = True
     reconnect_delay: float = 1.0
+    rois: List[dict] = field(default_factory=list)
+    name: str = ""
+    ward: str = ""
+    version: int = 0
+    updated_at: float = field(default=0.0, compare=False, repr=False)
+    alarm_triggers: Tuple[int, ...] = ()
+    alarm_sounds: Dict[int, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # 未配置多个区域时，roi 即为唯一区域；roi 始终指向第一个区域
+        if not self.rois:
+            self.rois = [self.roi]
+        self.roi = self.rois[0]
+
+    def roi_name(self, index: int) -> str:
+        """获取区域名称，未命名时返回 "ROI n" """
+        return self.rois[index].get("name") or f"ROI {index}"
+
+    def with_rois(self, updates: Dict[int, dict]) -> "CameraConfig":
+        """生成更新了部分区域坐标的新版本配置，原配置不变
+        
+        Args:
+            updates: {区域序号: {"x": int, "y": int, "w": int, "h": int}}，保留区域名称等其他字段
+            
+        Returns:
+            CameraConfig: 版本号加1的新配置
+        """
+        rois = [dict(roi, **updates.get(index, {})) for index, roi in enumerate(self.rois)]
+        return replace(self, roi=rois[0], rois=rois, version=self.version + 1, updated_at=time.time())
+
+    def with_alarms(self, triggers: List[int], sounds: Dict[int, str]) -> "CameraConfig":
+        """生成更新了报警触发时长和报警音频的新版本配置，原配置不变
+        
+        Args:
+            triggers: 报警触发时长（秒）
+            sounds: {触发时长: 音频文件路径}
+            
+        Returns:
+            CameraConfig: 版本号加1的新配置
+        """
+        return replace(self, alarm_triggers=tuple(sorted(triggers)), alarm_sounds=dict(sounds),
+                       version=self.version + 1, updated_at=time.time())
 
 class SystemConfig:
     """系统配置类
@@ -45,7 +100,10 @@ class SystemConfig:
     """
     
     def __init__(self):
-        # 摄像头配置列表
+        # 摄像头配置文件（JSON），由 init_system() 加载，摄像头数量不限
+        self.cameras_file: str = "cameras.json"
+        
+        # 摄像头配置列表（未找到摄像头配置文件时使用的默认配置）
         self.cameras: List[CameraConfig] = [
             CameraConfig(
                 source=0,
@@ -77,6 +135,8 @@ class SystemConfig:
         self.grid_spacing_y: int = 50  # 网格垂直间距
         self.window_title: str = "ICU手部行为监测系统 v3.2"
         self.status_update_interval: float = 1.0  # 状态更新间隔（秒）
+        self.status_publish_interval: float = 0.25  # 摄像头线程发布状态快照的最短间隔（秒）
+        self.camera_page_size: int = 8  # 摄像头列表每页显示的摄像头数量
         
         # 语言设置
         self.language_preference: str = "zh_CN"  # 默认使用中文
@@ -85,13 +145,115 @@ class SystemConfig:
         self.gesture_threshold: float = 0.8
         self.detection_interval: float = 0.1  # 检测间隔（秒）
         self.smooth_factor: float = 0.3  # 平滑因子（0-1）
+
+        # 手势规则：每条规则由若干条件组成，全部满足并持续 min_duration 秒即视为检测到该手势
+        # 条件是关键点特征（distance/angle/position）的加权和与阈值的比较，
+        # 阈值可写成CONFIG属性名（如"gesture_threshold"），运行时读取最新值
+        self.gesture_rules: List[dict] = [
+            {
+                "name": "thumb_pinky",  # 拇指与小指靠近
+                "conditions": [
+                    {"distance": ("THUMB_TIP", "PINKY_TIP"), "metric": "manhattan",
+                     "op": "<", "threshold": "gesture_threshold"},
+                ],
+                "min_duration": 0.0,
+                "alarm": True,
+            },
+            {
+                "name": "fist",  # 握拳：指尖到手腕的平均距离明显小于掌长
+                "enabled": False,
+                "conditions": [
+                    {"terms": [
+                        {"distance": ("INDEX_FINGER_TIP", "WRIST"), "weight": 0.25},
+                        {"distance": ("MIDDLE_FINGER_TIP", "WRIST"), "weight": 0.25},
+                        {"distance": ("RING_FINGER_TIP", "WRIST"), "weight": 0.25},
+                        {"distance": ("PINKY_TIP", "WRIST"), "weight": 0.25},
+                        {"distance": ("MIDDLE_FINGER_MCP", "WRIST"), "weight": -1.2},
+                    ], "op": "<", "threshold": 0.0},
+                ],
+                "min_duration": 1.0,
+                "alarm": True,
+            },
+            {
+                "name": "hand_near_head",  # 手部进入ROI上方（床头）区域
+                "enabled": False,
+                "conditions": [
+                    {"position": ("WRIST", "y"), "op": "<", "threshold": 0.25},
+                ],
+                "min_duration": 2.0,
+                "alarm": True,
+            },
+        ]
+
+        # 手部存在性级联检测：先用肤色直方图反向投影判断ROI内是否可能有手，再决定是否进行MediaPipe推理
+        self.presence_gate_enabled: bool = True
+        self.presence_gate_size: int = 64  # 降采样尺寸（像素）
+        self.presence_min_skin_ratio: float = 0.02  # 判定为有手的最小肤色像素比例
+        self.presence_max_skip_interval: float = 1.0  # 连续跳过推理的最长时间（秒），超过后强制推理一次
+        self.presence_learn_interval: float = 1.0  # 用检测到的手部更新肤色模型的间隔（秒）
+        
+        # 关键点跟踪：两次推理之间用稀疏LK光流传播规则用到的关键点，每帧评估手势
+        self.tracking_enabled: bool = True
+        self.tracking_detection_interval: float = 0.5  # 跟踪正常时的完整推理间隔（秒）
+        self.tracking_max_fb_error: float = 2.0  # 前后向光流误差上限（像素），超过视为漂移并强制推理
+        
+        # 推理结果缓存：以ROI降采样图像的感知哈希为键，画面几乎不变时复用上次的关键点
+        self.inference_cache_enabled: bool = True
+        self.inference_cache_size: int = 16  # 每个区域的最大缓存条目数
+        self.inference_cache_max_age: float = 2.0  # 缓存结果的最长有效时间（秒）
+        self.inference_cache_max_distance: int = 3  # 判定为相同画面的最大哈希汉明距离（0-64）
+        self.inference_cache_motion_budget: int = 12  # 连续复用期间允许的画面变化累计值，超过后强制推理
+        
+        # 护士站推送服务：向中央护士站推送状态和报警事件，并接受远程控制命令
+        self.station_server_enabled: bool = False
+        self.station_server_host: str = "127.0.0.1"  # 只监听本机地址，远程访问应通过SSH隧道等方式转发
+        self.station_server_port: int = 8765
+        self.station_server_socket: str = ""  # Unix套接字路径，设置后不监听TCP端口
+        self.station_server_queue_size: int = 64  # 每个客户端的最大待发送消息数，超过后断开该客户端
+        
+        # 报警事件存储：把报警升级、复位、确认和断流写入本地SQLite数据库，供交班和事后查询
+        self.alarm_store_enabled: bool = True
+        self.alarm_store_path: str = "logs/alarms.db"
+        self.alarm_store_retention_days: int = 365  # 事件保留天数，0表示不删除
+        self.alarm_store_batch_size: int = 200  # 单次批量写入的最大事件数
+        self.alarm_store_flush_interval: float = 1.0  # 最长写入间隔（秒）
+        
+        # 报警片段录制：缓冲各区域最近的JPEG图像，报警升级时保存报警前后的视频片段
+        self.clip_enabled: bool = False
+        self.clip_dir: str = "clips"
+        self.clip_pre_seconds: float = 10.0  # 报警前缓冲的时长（秒）
+        self.clip_post_seconds: float = 10.0  # 报警后继续录制的时长（秒）
+        self.clip_fps: float = 5.0  # 采样帧率
+        self.clip_jpeg_quality: int = 80
+        self.clip_camera_memory_mb: float = 32  # 单个摄像头缓冲区的内存上限（MB）
+        self.clip_total_memory_mb: float = 128  # 所有摄像头缓冲区的内存上限（MB）
+        self.clip_encode_workers: int = 2  # JPEG压缩线程数
+        
+        # 关键点记录：按列记录每次手势评估的关键点、置信度和判定结果，用于离线分析和调整阈值
+        self.landmark_record_enabled: bool = False
+        self.landmark_record_dir: str = "recordings"  # 每个摄像头一个子目录
+        self.landmark_record_block_rows: int = 4096  # 每个分段文件的行数
+        
+        # 线程CPU统计：定期读取每个线程的CPU时间，按摄像头（读取/处理/显示/推理）和子系统汇总到状态中（仅Linux）
+        self.thread_cpu_enabled: bool = True
+        self.thread_cpu_interval: float = 5.0  # 采样间隔（秒）
+        
+        # 采样分析：由控制面板按钮或 SIGUSR1 信号触发，采集摄像头线程的调用栈并写出折叠栈文件（可生成火焰图）
+        self.profiler_dir: str = "logs"
+        self.profiler_duration: float = 30.0  # 采样时长（秒）
+        self.profiler_interval: float = 0.01  # 最短采样间隔（秒）
+        self.profiler_max_overhead: float = 0.02  # 采样耗时占经过时间的比例上限
+        self.profiler_thread_prefix: str = "Camera"  # 只采集名称以此开头的线程，空字符串表示所有线程
+        self.profiler_signal: bool = True  # 是否允许用 SIGUSR1 信号触发（仅POSIX）
+        
+        # 指标服务：在本机HTTP端口上以Prometheus文本格式提供各摄像头的计数器和直方图（/metrics）
+        self.metrics_enabled: bool = False
+        self.metrics_host: str = "127.0.0.1"  # 只监听本机地址，由本机的指标采集程序抓取
+        self.metrics_port: int = 9108
         
         # 报警设置
         self.alarm_triggers: List[int] = [5, 10, 15, 30]
-        self.alarm_sounds: Dict[int, str] = {
-            t: f"sounds/{t}S报警音.wav" if t < 30 else "sounds/alarm.wav"
-            for t in self.alarm_triggers
-        }
+        self.alarm_sounds: Dict[int, str] = {t: self.alarm_sound_path(t) for t in self.alarm_triggers}
         self.fallback_sound: str = "sounds/fallback_beep.wav"
         self.alarm_volume: float = 1.0  # 音量（0-1）
         
@@ -102,9 +264,13 @@ class SystemConfig:
         self.log_level: int = logging.INFO
         
         # 性能优化参数
-        self.thread_pool_size: int = 6  # 增加线程池大小以支持三个摄像头
+        self.thread_pool_size: int = 6  # 所有摄像头的MediaPipe/OpenCV线程总数上限，由线程预算平均分给各摄像头
+        self.thread_budget_enabled: bool = True  # 按核心数和摄像头数限制各库的线程数
+        self.thread_budget_reserve_ui: bool = True  # 预留一个核心给界面和声音线程（核心数多于摄像头数时）
+        self.thread_budget_pin: bool = False  # 把每个摄像头的线程绑定到分给它的核心（仅Linux）
         self.frame_buffer_size: int = 3
         self.max_fps: Optional[int] = 30  # 限制帧率以优化性能
+        self.frame_pacer_spin: float = 0.0005  # 帧截止时间前改为让出CPU轮询的时长（秒），补偿sleep()的唤醒误差
 
     def validate(self) -> None:
         """验证所有配置参数的有效性
@@ -120,9 +286,10 @@ class SystemConfig:
         """
         # 验证摄像头配置
         for i, cam in enumerate(self.cameras):
-            if not (0 <= cam.roi["x"] < cam.resolution[0] and 
-                    0 <= cam.roi["y"] < cam.resolution[1]):
-                raise ValueError(f"摄像头{cam.source} ROI 超出分辨率范围")
+            for roi in cam.rois:
+                if not (0 <= roi["x"] < cam.resolution[0] and 
+                        0 <= roi["y"] < cam.resolution[1]):
+                    raise ValueError(f"摄像头{cam.source} ROI 超出分辨率范围")
             
             if not (0 < cam.min_confidence <= 1):
                 raise ValueError(f"摄像头{cam.source} 置信度阈值必须在0-1之间")
@@ -148,6 +315,93 @@ class SystemConfig:
             logging.warning(f"不支持的语言设置: {self.language_preference}，将使用默认语言(zh_CN)")
             self.language_preference = "zh_CN"
 
+    def load_cameras(self, path: str) -> None:
+        """从JSON文件加载摄像头配置，替换当前的摄像头列表
+        
+        文件格式为 {"defaults": {...}, "cameras": [{...}, ...]}，每个摄像头的字段与
+        CameraConfig 相同，未填写的字段使用 defaults 中的值。
+        
+        Args:
+            path: 配置文件路径
+            
+        Raises:
+            ValueError: 当配置文件格式无效时抛出
+        """
+        with open(path, encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"摄像头配置文件 {path} 格式错误: {e}")
+        if not isinstance(data, dict) or not isinstance(data.get("cameras"), list):
+            raise ValueError(f"摄像头配置文件 {path} 缺少 cameras 列表")
+        
+        defaults = data.get("defaults", {})
+        cameras = []
+        for i, entry in enumerate(data["cameras"]):
+            values = {"roi": None, **defaults, **entry}
+            if "resolution" in values:
+                values["resolution"] = tuple(values["resolution"])
+            try:
+                cameras.append(CameraConfig(**values))
+            except TypeError as e:
+                raise ValueError(f"摄像头配置文件 {path} 第{i}个摄像头配置无效: {e}")
+            if cameras[-1].roi is None:
+                raise ValueError(f"摄像头配置文件 {path} 第{i}个摄像头未配置 roi 或 rois")
+        self.cameras = cameras
+        logging.info(f"已从 {path} 加载 {len(cameras)} 个摄像头配置")
+
+    def update_camera_rois(self, camera_id: int, updates: Dict[int, dict]) -> CameraConfig:
+        """发布摄像头区域坐标的新版本配置
+
+        生成新的配置对象并替换列表中的引用，运行中的摄像头线程在下一帧开始时
+        发现引用变化后切换到新配置，无需重启摄像头。
+
+        Args:
+            camera_id: 摄像头ID
+            updates: {区域序号: 区域坐标}
+
+        Returns:
+            CameraConfig: 新发布的配置
+        """
+        camera = self.cameras[camera_id].with_rois(updates)
+        self.cameras[camera_id] = camera
+        return camera
+
+    def update_alarm_triggers(self, triggers: List[int]) -> List[CameraConfig]:
+        """设置报警触发时长，并为每个摄像头发布包含触发时长和报警音频的新版本配置
+
+        运行中的摄像头线程在下一帧开始时切换到新配置并重新加载报警音频，
+        报警判断只使用已切换配置中的触发时长，不会出现触发时长与已加载音频不一致的情况。
+
+        Args:
+            triggers: 报警触发时长（秒）
+
+        Returns:
+            list: 新发布的各摄像头配置
+        """
+        self.alarm_triggers = sorted(triggers)
+        self.alarm_sounds = {t: self.alarm_sound_path(t) for t in self.alarm_triggers}
+        for camera_id, camera in enumerate(self.cameras):
+            self.cameras[camera_id] = camera.with_alarms(self.alarm_triggers, self.alarm_sounds)
+        return list(self.cameras)
+
+    @staticmethod
+    def alarm_sound_path(trigger: int) -> str:
+        """获取触发时长对应的报警音频路径，30秒及以上为持续报警音"""
+        return f"sounds/{trigger}S报警音.wav" if trigger < 30 else "sounds/alarm.wav"
+
+    def wards(self) -> List[str]:
+        """获取所有病区名称（按首次出现的顺序）"""
+        return list(dict.fromkeys(cam.ward for cam in self.cameras))
+
+    def alarm_channel_index(self, camera_id: int, roi_index: int) -> int:
+        """获取监测区域对应的报警声道编号，所有摄像头的区域依次编号"""
+        return sum(len(cam.rois) for cam in self.cameras[:camera_id]) + roi_index
+
+    def total_roi_count(self) -> int:
+        """获取所有摄像头的监测区域总数"""
+        return sum(len(cam.rois) for cam in self.cameras)
+
     def save_language_preference(self, language_code):
         """保存语言偏好设置
         
@@ -203,10 +457,25 @@ def setup_logging() -> None:
     logging.getLogger('mediapipe').setLevel(logging.WARNING)
     logging.getLogger('pygame').setLevel(logging.WARNING)
 
-# 系统初始化
-os.makedirs("sounds", exist_ok=True)
-os.makedirs("logs", exist_ok=True)
-setup_logging()
-CONFIG.validate()
+_initialized = False
 
-logging.info("系统配置初始化完成")
\ No newline at end of file
+def init_system() -> None:
+    """初始化系统运行环境
+
+    创建所需目录、配置日志系统并验证配置。导入本模块不会产生任何副作用，
+    由程序入口在启动时显式调用一次；重复调用不会重复添加日志处理器。
+
+    Raises:
+        ValueError: 当配置参数无效时抛出
+    """
+    global _initialized
+    if _initialized:
+        return
+    os.makedirs("sounds", exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
+    setup_logging()
+    if os.path.exists(CONFIG.cameras_file):
+        CONFIG.load_cameras(CONFIG.cameras_file)
+    CONFIG.validate()
+    _initialized = True
+    logging.info("系统配置初始化完成")
@@ -3,36 +3,39 @@
 
 import os
 import logging
-import numpy as np
 import wave
-import pygame
-from config import CONFIG
-from modules.ui import ControlPanel
-from modules.language import lang
+from config import CONFIG, init_system
+
+def ensure_fallback_sound(lang):
+    """确保备用音频文件存在"""
+    if os.path.exists(CONFIG.fallback_sound):
+        return
+    import numpy as np
+    
+    logging.info(lang.get_text("creating_fallback_audio"))
+    sample_rate = 44100
+    duration = 0.5
+    t = np.linspace(0, duration, int(sample_rate * duration))
+    data = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+    with wave.open(CONFIG.fallback_sound, 'w') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(data.tobytes())
 
 if __name__ == '__main__':
+    # 创建目录、配置日志并验证配置
+    init_system()
+    from modules.language import lang
     try:
-        # 确保备用音频文件存在
-        if not os.path.exists(CONFIG.fallback_sound):
-            logging.info(lang.get_text("creating_fallback_audio"))
-            sample_rate = 44100
-            duration = 0.5
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            data = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
-            with wave.open(CONFIG.fallback_sound, 'w') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(data.tobytes())
-        
-        # 初始化音频系统
-        pygame.init()
+        ensure_fallback_sound(lang)
         logging.info(lang.get_text("system_starting"))
         
-        # 启动应用
+        # 启动应用（音频系统在首次启动摄像头时初始化）
+        from modules.ui import ControlPanel
         app = ControlPanel()
         app.run()
     except Exception as e:
         logging.critical(f"{lang.get_text('system_crash')}: {str(e)}")
         from tkinter import messagebox
-        messagebox.showerror(lang.get_text("fatal_error"), f"{lang.get_text('unrecoverable_error')}: {str(e)}")
\ No newline at end of file
+        messagebox.showerror(lang.get_text("fatal_error"), f"{lang.get_text('unrecoverable_error')}: {str(e)}")
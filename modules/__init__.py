@@ -2,7 +2,24 @@
 # modules/__init__.py
 # 模块包初始化文件
 
-# 导出所有模块中的类，保持与原始processor.py相同的导入接口
-from .video_processor import VideoProcessor
-from .fps_counter import FPSCounter
-from .camera_manager import CameraManager
\ No newline at end of file
+# 导出所有模块中的类，保持与原始processor.py相同的导入接口。
+# VideoProcessor 和 FPSCounter 依赖 cv2/mediapipe/pygame/numpy，按需延迟导入，
+# 使控制面板和测试在不启动摄像头时不必承担这些库的导入开销。
+from .camera_manager import CameraManager
+
+_LAZY_EXPORTS = {
+    'VideoProcessor': '.video_processor',
+    'FPSCounter': '.fps_counter',
+}
+
+def __getattr__(name):
+    """首次访问时导入重量级模块中的类"""
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['VideoProcessor', 'FPSCounter', 'CameraManager']
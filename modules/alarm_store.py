@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+# modules/alarm_store.py
+# 报警事件存储模块
+#
+# 订阅事件总线，把检测开始、报警升级、报警复位、报警确认和摄像头错误写入本地SQLite数据库。
+# 写入在后台线程中批量进行，摄像头线程只做一次非阻塞入队，不接触磁盘。
+# 数据库按时间和床位（摄像头ID、区域序号）建立索引，并按保留天数定期删除旧数据。
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from .event_bus import event_bus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    kind TEXT NOT NULL,
+    camera INTEGER NOT NULL,
+    roi INTEGER,
+    level INTEGER,
+    duration REAL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_bed_time ON events (camera, roi, time);
+"""
+
+_COLUMNS = ('time', 'kind', 'camera', 'roi', 'level', 'duration', 'message')
+
+def event_row(event):
+    """把事件对象转换为数据库行"""
+    return (event.timestamp, event.kind, event.camera_id, event.roi,
+            getattr(event, 'level', None), getattr(event, 'duration', None), getattr(event, 'message', None))
+
+class AlarmStore:
+    """报警事件存储
+
+    后台写入线程从事件总线订阅中取出事件，累积到 batch_size 条或距上次写入超过
+    flush_interval 秒时在一个事务中批量写入。写入失败时保留待写入事件，关闭连接并在
+    逐次加倍的间隔后重新连接重试，写入线程不会因单次错误退出。查询使用独立的只读连接，
+    数据库使用WAL模式，查询不会阻塞写入。
+    """
+
+    def __init__(self, path, retention_days=365, batch_size=200, flush_interval=1.0, bus=None,
+                 max_pending=10000, max_backoff=30.0):
+        """初始化事件存储
+
+        Args:
+            path: 数据库文件路径
+            retention_days: 事件保留天数，0表示不删除
+            batch_size: 单次批量写入的最大事件数
+            flush_interval: 最长写入间隔（秒）
+            bus: 订阅的事件总线，默认为全局事件总线
+            max_pending: 写入失败时最多保留的待写入事件数，超过后丢弃最早的事件
+            max_backoff: 写入失败后重试间隔的上限（秒），间隔从 flush_interval 开始逐次加倍
+        """
+        self.path = path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.bus = bus or event_bus
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self._subscription = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._last_prune = 0
+        # 统计信息
+        self.written = 0
+        self.batches = 0
+        self.pruned = 0
+        self.failures = 0  # 写入或删除过期事件失败（之后重试）的次数
+        self.malformed = 0  # 格式错误而跳过的事件数
+        self.discarded = 0  # 数据库长时间不可用时丢弃的事件数
+        self._init_db()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _init_db(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+        connection.close()
+
+    def start(self):
+        """订阅事件总线并启动后台写入线程"""
+        self._subscription = self.bus.subscribe(maxsize=10000)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="AlarmStore", daemon=True)
+        self._thread.start()
+        logging.info(f"报警事件存储已启动: {self.path}")
+
+    def stop(self):
+        """取消订阅，写入剩余事件后停止后台线程"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self._subscription.close()
+        if self._subscription.dropped:
+            logging.warning(f"报警事件存储队列已满，丢弃了 {self._subscription.dropped} 个事件")
+        logging.info(f"报警事件存储已停止，共写入 {self.written} 个事件")
+
+    def _run(self):
+        connection = None
+        pending = []
+        last_flush = time.monotonic()
+        retry_at = 0.0  # 写入失败后下一次重试的时间
+        backoff = self.flush_interval
+        while True:
+            stopping = self._stopping.is_set()
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                events = [self._subscription.get(timeout=min(timeout, 0.5))]
+                events.extend(self._subscription.drain())
+            except queue.Empty:
+                events = []
+            # 逐个转换，格式错误的事件记录后跳过，不影响其他事件
+            for event in events:
+                try:
+                    pending.append(event_row(event))
+                except Exception as e:
+                    self.malformed += 1
+                    logging.error(f"报警事件格式错误，已跳过: {event!r} ({str(e)})")
+            if len(pending) > self.max_pending:
+                # 数据库长时间不可用时只保留最新的事件，内存占用有上限
+                discarded = len(pending) - self.max_pending
+                del pending[:discarded]
+                self.discarded += discarded
+                logging.error(f"报警事件数据库不可用，丢弃了 {discarded} 个最早的待写入事件")
+            now = time.monotonic()
+            if pending and (stopping or now >= retry_at) and (
+                    len(pending) >= self.batch_size or stopping or now - last_flush >= self.flush_interval):
+                try:
+                    connection = connection or self._connect()
+                    self.write(pending, connection)
+                    pending = []
+                    backoff = self.flush_interval
+                    retry_at = 0.0
+                except Exception as e:
+                    self.failures += 1
+                    logging.error(f"报警事件写入失败，{backoff:.1f}秒后重试（待写入 {len(pending)} 个）: {str(e)}")
+                    connection = self._close(connection)
+                    retry_at = now + backoff
+                    backoff = min(backoff * 2, self.max_backoff)
+                last_flush = time.monotonic()
+            elif not pending:
+                last_flush = time.monotonic()
+            # 删除过期事件与写入共用重试时间，数据库不可用时按同样的退避间隔重试
+            now = time.monotonic()
+            if time.time() - self._last_prune >= 3600 and not stopping and now >= retry_at:
+                try:
+                    connection = connection or self._connect()
+                    self.prune(connection=connection)
+                except Exception as e:
+                    self.failures += 1
+                    logging.error(f"删除过期报警事件失败，{backoff:.1f}秒后重试: {str(e)}")
+                    connection = self._close(connection)
+                    retry_at = now + backoff
+                    backoff = min(backoff * 2, self.max_backoff)
+            if stopping:
+                break
+        if pending:
+            logging.error(f"报警事件存储停止时仍有 {len(pending)} 个事件未能写入")
+        self._close(connection)
+
+    @staticmethod
+    def _close(connection):
+        """关闭连接（忽略关闭时的错误），返回None"""
+        if connection is not None:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        return None
+
+    def write(self, rows, connection=None):
+        """在一个事务中批量写入事件行
+
+        Args:
+            rows: event_row() 格式的行列表
+            connection: 数据库连接，默认使用新连接
+        """
+        own = connection is None
+        connection = connection or self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    f"INSERT INTO events ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})", rows)
+            self.written += len(rows)
+            self.batches += 1
+        finally:
+            if own:
+                connection.close()
+
+    def prune(self, now=None, connection=None):
+        """删除超过保留天数的事件
+
+        Args:
+            now: 当前时间戳，默认为当前时间
+            connection: 数据库连接，默认使用新连接
+
+        Returns:
+            int: 删除的事件数
+        """
+        now = time.time() if now is None else now
+        self._last_prune = now
+        if not self.retention_days:
+            return 0
+        own = connection is None
+        connection = connection or self._connect()
+        try:
+            with connection:
+                deleted = connection.execute("DELETE FROM events WHERE time < ?",
+                                             (now - self.retention_days * 86400,)).rowcount
+        finally:
+            if own:
+                connection.close()
+        if deleted:
+            self.pruned += deleted
+            logging.info(f"已删除 {deleted} 个超过 {self.retention_days} 天的报警事件")
+        return deleted
+
+    def query(self, start, end, camera=None, roi=None, kinds=None, limit=None):
+        """按时间范围查询事件
+
+        Args:
+            start: 开始时间戳（含）
+            end: 结束时间戳（不含）
+            camera: 可选的摄像头ID
+            roi: 可选的区域序号（需要同时指定camera）
+            kinds: 可选的事件类型列表，如 ['alarm', 'reset']
+            limit: 最大返回条数
+
+        Returns:
+            list: 按时间排序的事件字典列表
+        """
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM events WHERE time >= ? AND time < ?"
+        params = [start, end]
+        if camera is not None:
+            sql += " AND camera = ?"
+            params.append(camera)
+            if roi is not None:
+                sql += " AND roi = ?"
+                params.append(roi)
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        sql += " ORDER BY time"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        connection = self._connect()
+        try:
+            rows = connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def summary(self, start, end):
+        """按床位汇总时间范围内的报警，用于交班报告
+
+        Returns:
+            list: [{'camera', 'roi', 'alarms', 'max_level', 'detections'}]，按摄像头和区域排序
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT camera, roi, SUM(kind = 'alarm'), MAX(CASE WHEN kind = 'alarm' THEN level END), "
+                "SUM(kind = 'detection') FROM events WHERE time >= ? AND time < ? AND roi IS NOT NULL "
+                "GROUP BY camera, roi ORDER BY camera, roi", (start, end)).fetchall()
+        finally:
+            connection.close()
+        return [dict(zip(('camera', 'roi', 'alarms', 'max_level', 'detections'), row)) for row in rows]
+
+    def get_stats(self):
+        """获取统计信息"""
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'pruned': self.pruned,
+            'failures': self.failures,
+            'malformed': self.malformed,
+            'discarded': self.discarded,
+            'dropped': self._subscription.dropped if self._subscription else 0
+        }
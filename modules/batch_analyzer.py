@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+# modules/batch_analyzer.py
+# 录制视频的离线批量分析模块
+#
+# 实时处理循环（VideoProcessor.process_stream）按摄像头帧率节流并显示画面，不适合审查
+# 数小时的录像。批量分析把视频文件按时间切分为若干段，由多个工作进程并行推理（不节流、
+# 不显示），再把各段的关键点按时间拼接，用与运行时相同的平滑、手势规则和报警逻辑
+# 在完整序列上重放，得到连续的报警时间线：
+# - 推理是逐帧独立的，只有MediaPipe视频模式的跟踪依赖前几帧，每段从段首之前
+#   overlap 秒开始预热，预热帧的结果丢弃
+# - 平滑、规则持续时间和报警计时是有状态的，在拼接后的序列上计算，跨段的检测和报警
+#   与整段连续处理完全一致
+# - 段边界对齐到采样步长，拼接后的采样时间与不分段时相同
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .hand_landmarks import NUM_LANDMARKS, landmarks_to_array
+from .roi_monitor import RoiMosaic
+from .threshold_sweep import sweep_stream
+
+@dataclass(frozen=True)
+class ChunkTask:
+    """一个视频分段的分析任务（可在进程间传递）
+
+    Attributes:
+        path: 视频文件路径
+        index: 分段在该文件中的序号
+        start: 第一个输出的帧号
+        end: 结束帧号（不含），None表示读到文件结尾
+        warmup_start: 开始读取的帧号（预热帧不输出）
+        step: 采样步长（每隔多少帧推理一次）
+        fps: 视频帧率，用于把帧号换算为时间
+        rois: 监测区域 ((x, y, w, h), ...)
+        min_confidence: 手部检测置信度阈值
+    """
+    path: str
+    index: int
+    start: int
+    end: Optional[int]
+    warmup_start: int
+    step: int
+    fps: float
+    rois: Tuple[Tuple[int, int, int, int], ...]
+    min_confidence: float = 0.5
+
+def probe_video(path):
+    """读取视频的帧率和帧数
+
+    容器中没有帧数信息时逐帧计数（只解复用，不解码为图像）。
+
+    Returns:
+        tuple: (帧率, 帧数)
+
+    Raises:
+        RuntimeError: 当无法打开视频时抛出
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"无法打开视频: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if frames <= 0:
+        logging.warning(f"视频没有帧数信息，逐帧计数: {path}")
+        frames = 0
+        while cap.grab():
+            frames += 1
+    cap.release()
+    return fps, frames
+
+def plan_chunks(path, fps, frames, rois, chunk_seconds=120.0, overlap_seconds=2.0,
+                sample_interval=0.1, min_confidence=0.5):
+    """把视频切分为分段任务
+
+    Args:
+        path: 视频文件路径
+        fps: 视频帧率
+        frames: 视频帧数（最后一段总是读到文件结尾，帧数不准确时不会丢帧）
+        rois: 监测区域 ((x, y, w, h), ...)
+        chunk_seconds: 每段的时长（秒）
+        overlap_seconds: 每段开始前预热的时长（秒）
+        sample_interval: 推理间隔（秒），对应运行时的 detection_interval
+        min_confidence: 手部检测置信度阈值
+
+    Returns:
+        list: ChunkTask 列表
+    """
+    step = max(1, int(round(fps * sample_interval)))
+    # 段长和预热长度取采样步长的整数倍，保证各段的采样帧与不分段时相同
+    length = max(step, int(round(fps * chunk_seconds / step)) * step)
+    warmup = int(round(fps * overlap_seconds / step)) * step
+    tasks = []
+    for index, start in enumerate(range(0, max(frames, 1), length)):
+        end = start + length if start + length < frames else None
+        tasks.append(ChunkTask(path, index, start, end, max(0, start - warmup), step, fps,
+                               tuple(tuple(roi) for roi in rois), min_confidence))
+    return tasks
+
+def _crop_coords(roi, frame_shape):
+    """与 RoiMonitor.update_coords 相同的裁剪坐标计算"""
+    h, w = frame_shape[:2]
+    x, y, rw, rh = roi
+    x1 = max(0, min(x, w - 1))
+    y1 = max(0, min(y, h - 1))
+    return y1, min(y1 + rh, h), x1, min(x1 + rw, w)
+
+def analyze_chunk(task):
+    """分析一个视频分段（在工作进程中运行）
+
+    与运行时相同：单个区域直接推理裁剪图像，多个区域拼接为一张图像推理一次。
+    不使用级联检测、推理缓存和光流跟踪，每个采样帧都完整推理。
+
+    Args:
+        task: ChunkTask
+
+    Returns:
+        dict: {'path', 'index', 'frames', 'samples', 'cpu_seconds', 'wall_seconds',
+               'rois': [每个区域 {'time', 'score', 'landmarks'}，只包含检测到手的采样帧]}
+    """
+    import mediapipe as mp
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    cap = cv2.VideoCapture(task.path)
+    if not cap.isOpened():
+        raise RuntimeError(f"无法打开视频: {task.path}")
+    if task.warmup_start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, task.warmup_start)
+    rows = [{'time': [], 'score': [], 'landmarks': []} for _ in task.rois]
+    mosaic = RoiMosaic()
+    coords = None
+    samples = 0
+    index = task.warmup_start
+    with mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=len(task.rois),
+                                  min_detection_confidence=task.min_confidence,
+                                  min_tracking_confidence=0.5, model_complexity=0) as hands:
+        while task.end is None or index < task.end:
+            if index % task.step:
+                # 非采样帧只解复用，不转换为图像
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if coords is None:
+                coords = [_crop_coords(roi, frame.shape) for roi in task.rois]
+            crops = [frame[y1:y2, x1:x2] for y1, y2, x1, x2 in coords]
+            if len(crops) == 1:
+                results = hands.process(cv2.cvtColor(crops[0], cv2.COLOR_BGR2RGB))
+                found = [landmarks_to_array(results.multi_hand_landmarks[0])
+                         if results.multi_hand_landmarks else None]
+                scores = [results.multi_handedness[0].classification[0].score
+                          if results.multi_hand_landmarks and results.multi_handedness else float('nan')]
+            else:
+                found = mosaic.split(hands.process(mosaic.compose(crops)))
+                scores = mosaic.scores
+            if index >= task.start:
+                samples += 1
+                now = index / task.fps
+                for roi_rows, landmarks, score in zip(rows, found, scores):
+                    if landmarks is not None:
+                        roi_rows['time'].append(now)
+                        roi_rows['score'].append(score)
+                        roi_rows['landmarks'].append(landmarks)
+            index += 1
+    cap.release()
+    frames = index - task.start
+    for roi_rows in rows:
+        roi_rows['time'] = np.array(roi_rows['time'], dtype=np.float64)
+        roi_rows['score'] = np.array(roi_rows['score'], dtype=np.float32)
+        roi_rows['landmarks'] = (np.array(roi_rows['landmarks'], dtype=np.float32) if roi_rows['landmarks']
+                                 else np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32))
+    return {
+        'path': task.path,
+        'index': task.index,
+        'frames': max(frames, 0),
+        'samples': samples,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'wall_seconds': time.perf_counter() - wall_start,
+        'rois': rows
+    }
+
+def stitch(results):
+    """按分段顺序拼接同一视频各分段的结果
+
+    Args:
+        results: 同一视频的 analyze_chunk 结果（顺序任意）
+
+    Returns:
+        list: 每个区域 {'time', 'score', 'landmarks'}，按时间排序
+    """
+    results = sorted(results, key=lambda result: result['index'])
+    stitched = []
+    for roi in range(len(results[0]['rois'])):
+        parts = [result['rois'][roi] for result in results]
+        stitched.append({name: np.concatenate([part[name] for part in parts]) for name in parts[0]})
+    return stitched
+
+def match_stream(engine, times, landmarks, max_gap):
+    """在拼接后的关键点序列上逐行重放运行时的手势判定
+
+    与 RoiMonitor.detect_gesture 相同：每行调用 engine.evaluate()，相邻两行间隔超过 max_gap
+    视为手部消失，清除规则持续时间计时（平滑历史保留）。
+
+    Args:
+        engine: GestureRuleEngine（params 提供 smooth_factor 和阈值）
+        times: 检测到手的采样时间，按时间排序
+        landmarks: 对应的关键点，形状为 (N, 21, 3)
+        max_gap: 相邻两行间隔超过该值（秒）视为手部消失
+
+    Returns:
+        np.ndarray: 形状为 (N,) 的布尔数组，每行是否判定为需要报警的手势
+    """
+    engine.reset()
+    matched = np.zeros(len(times), dtype=bool)
+    previous = None
+    for row, now in enumerate(times):
+        if previous is not None and now - previous > max_gap:
+            engine.clear()
+        matched[row] = engine.should_alarm(engine.evaluate(landmarks[row], now))
+        previous = now
+    engine.reset()
+    return matched
+
+def alarm_timeline(engine, times, landmarks, alarm_triggers, max_gap):
+    """在拼接后的关键点序列上重放手势和报警逻辑
+
+    Args:
+        engine: GestureRuleEngine（params 提供 smooth_factor 和阈值）
+        times: 检测到手的采样时间，按时间排序
+        landmarks: 对应的关键点，形状为 (N, 21, 3)
+        alarm_triggers: 报警触发时长（秒）
+        max_gap: 相邻两行间隔超过该值（秒）视为手部消失
+
+    Returns:
+        list: 事件 (时间, 类型, 报警级别, 触发时长)，类型与事件总线一致：
+              'detection' 检测开始，'alarm' 报警升级，'reset' 检测结束（最后一个满足条件的采样帧）
+    """
+    # 触发时长为0时每次检测都是一个区间：(开始时间, 开始时间, 结束时间)
+    result = sweep_stream(engine, times, landmarks, [getattr(engine.params, 'smooth_factor', 1.0)], [0.0],
+                          [0.0], threshold_attr=None, max_gap=max_gap)
+    times = np.asarray(times, dtype=np.float64)
+    events = []
+    for _, start, end in result.episodes[0, 0]:
+        events.append((start, 'detection', 0, 0.0))
+        lo, hi = np.searchsorted(times, (start, end), side='left')
+        durations = times[lo:hi + 1] - start
+        level = 0
+        for trigger in sorted(alarm_triggers):
+            # 与运行时相同，持续时长第一次达到触发时长的采样帧触发报警
+            row = np.searchsorted(durations, trigger)
+            if row == len(durations):
+                break
+            level += 1
+            events.append((times[lo + row], 'alarm', level, float(trigger)))
+        events.append((end, 'reset', level, 0.0))
+    return events
+
+def throughput(results, wall_seconds, workers):
+    """汇总批量分析的吞吐量
+
+    Args:
+        results: analyze_chunk 结果列表
+        wall_seconds: 整体耗时（秒）
+        workers: 工作进程数
+
+    Returns:
+        dict: 视频帧数、采样帧数、整体帧率、每核帧率和按CPU时间计算的帧率
+    """
+    frames = sum(result['frames'] for result in results)
+    cpu = sum(result['cpu_seconds'] for result in results)
+    fps = frames / wall_seconds if wall_seconds else 0.0
+    return {
+        'frames': frames,
+        'samples': sum(result['samples'] for result in results),
+        'fps': round(fps, 1),
+        'fps_per_core': round(fps / min(workers, os.cpu_count() or 1), 1),
+        'fps_per_cpu_second': round(frames / cpu, 1) if cpu else 0.0,
+        'cpu_seconds': round(cpu, 1)
+    }
@@ -2,12 +2,12 @@
 # modules/camera_manager.py
 # 摄像头管理器模块
 
+import importlib
 import logging
 from threading import Thread, Event
 from config import CONFIG
-
-# 导入VideoProcessor类，这里使用相对导入
-from .video_processor import VideoProcessor
+from .thread_budget import thread_budget
+from .thread_cpu import thread_cpu
 
 class CameraManager:
     """摄像头管理器类，负责管理多个摄像头的生命周期
@@ -18,12 +18,30 @@ class CameraManager:
     - 提供摄像头状态查询接口
     """
     
-    def __init__(self):
-        """初始化摄像头管理器"""
+    def __init__(self, processor_factory=None):
+        """初始化摄像头管理器
+
+        Args:
+            processor_factory: 可选的处理器工厂 (camera_id, stop_event) -> VideoProcessor，
+                               默认为VideoProcessor，仿真测试时替换为模拟处理器
+        """
+        self.processor_factory = processor_factory
         self.processors = {}
         self.stop_events = {}
         self.threads = {}
         
+    def preload(self):
+        """在后台线程中预先导入视频处理模块（cv2/mediapipe/pygame）
+
+        界面显示后调用，使首次启动摄像头时不必等待这些库的导入。
+        """
+        def _import():
+            try:
+                importlib.import_module('.video_processor', __package__)
+            except Exception as e:
+                logging.warning(f"预加载视频处理模块失败: {str(e)}")
+        Thread(target=_import, name="VideoProcessorPreload", daemon=True).start()
+
     def start_camera(self, camera_id):
         """启动指定摄像头
         
@@ -49,15 +67,23 @@ class CameraManager:
             if camera_id >= len(CONFIG.cameras):
                 raise ValueError(f"摄像头{camera_id}未配置")
                 
+            # 首次启动摄像头时才导入cv2/mediapipe/pygame
+            factory = self.processor_factory
+            if factory is None:
+                from .video_processor import VideoProcessor as factory
+            
             stop_event = Event()
-            processor = VideoProcessor(camera_id, stop_event)
-            thread = Thread(target=processor.process_stream)
+            # 创建处理器时启动的MediaPipe推理线程计入该摄像头的CPU占用，按线程预算绑定到该摄像头的核心
+            with thread_cpu.track(camera_id), thread_budget.pinned(camera_id):
+                processor = factory(camera_id, stop_event)
+            thread = Thread(target=processor.process_stream, name=f"Camera{camera_id}")
             
             self.processors[camera_id] = processor
             self.stop_events[camera_id] = stop_event
             self.threads[camera_id] = thread
             
-            thread.start()
+            with thread_budget.pinned(camera_id):
+                thread.start()
             return True
         except Exception as e:
             logging.error(f"启动摄像头{camera_id}失败: {str(e)}")
@@ -92,4 +118,24 @@ class CameraManager:
         Returns:
             VideoProcessor: 摄像头处理器实例
         """
-        return self.processors.get(camera_id)
\ No newline at end of file
+        return self.processors.get(camera_id)
+
+    def cpu_usage(self):
+        """获取最近一次线程CPU采样结果
+
+        Returns:
+            dict: 见 ThreadCpuMonitor.sample()，未启用线程CPU统计时为None
+        """
+        return thread_cpu.latest
+
+    def snapshots(self):
+        """获取所有运行中摄像头的最新状态快照
+
+        只读取各摄像头线程已发布的快照，可以在任意线程中调用。
+
+        Returns:
+            dict: {摄像头ID: CameraStatus}
+        """
+        return {camera_id: processor.status_snapshot
+                for camera_id, processor in list(self.processors.items())
+                if processor.status_snapshot is not None}
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+# modules/clip_recorder.py
+# 报警片段录制模块
+#
+# 每个摄像头维护最近若干秒监测区域图像的环形缓冲区，图像以JPEG压缩后保存，
+# 压缩在线程池中进行，摄像头线程只复制区域图像并提交任务。
+# 事件总线上出现报警升级时，把该区域报警前的缓冲图像和报警后若干秒的图像写成一个视频片段。
+# 缓冲区的内存占用同时受单个摄像头和整个进程的上限约束。
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .event_bus import AlarmEscalated, event_bus
+
+class _Clip:
+    """正在录制的报警片段"""
+
+    def __init__(self, camera_id, roi, timestamp, level, frames, post_until):
+        self.camera_id = camera_id
+        self.roi = roi
+        self.timestamp = timestamp
+        self.level = level
+        self.frames = frames  # [(时间戳, JPEG数据)]
+        self.post_until = post_until
+
+class _CameraBuffer:
+    """单个摄像头的环形缓冲区，按时间戳排序保存 (时间戳, 区域序号, JPEG数据)"""
+
+    def __init__(self):
+        self.entries = deque()
+        self.times = deque()
+        self.bytes = 0
+        self.pending = 0  # 已提交但尚未压缩完成的任务数
+        self.last_submit = 0
+
+    def insert(self, timestamp, roi, data):
+        # 不同工作线程的压缩可能乱序完成，按时间戳插入
+        index = len(self.times)
+        if index and self.times[-1] > timestamp:
+            index = bisect.bisect_right(self.times, timestamp)
+        self.times.insert(index, timestamp)
+        self.entries.insert(index, (timestamp, roi, data))
+        self.bytes += len(data)
+
+    def evict_oldest(self):
+        self.times.popleft()
+        self.bytes -= len(self.entries.popleft()[2])
+
+class ClipRecorder:
+    """报警片段录制器
+
+    调用 start() 后才会缓冲图像；摄像头线程每帧调用 due() 判断是否需要采样，
+    需要时调用 add_frame() 提交区域图像。压缩完成的图像在锁内写入缓冲区，
+    超过缓冲时长或内存上限时淘汰最旧的图像（进程上限优先淘汰占用最多的摄像头）。
+    报警片段的图像与缓冲区共享同一份JPEG数据，片段结束后在线程池中写入磁盘。
+    """
+
+    def __init__(self):
+        self.running = False
+        self._buffers = {}  # 摄像头ID -> _CameraBuffer
+        self._clips = {}  # (摄像头ID, 区域序号) -> _Clip
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pool = None
+        self._subscription = None
+        self._writing = 0  # 正在写入磁盘的片段数
+        # 统计信息
+        self.frames_encoded = 0
+        self.frames_dropped = 0
+        self.frames_evicted = 0
+        self.encode_seconds = 0.0
+        self.raw_bytes = 0
+        self.jpeg_bytes = 0
+        self.clips_written = 0
+        self._started_at = 0
+
+    def start(self, directory="clips", pre_seconds=10.0, post_seconds=10.0, fps=5.0, quality=80,
+              camera_memory_mb=32, total_memory_mb=128, workers=2, bus=None):
+        """启动录制器并订阅报警升级事件
+
+        Args:
+            directory: 片段保存目录
+            pre_seconds: 报警前缓冲的时长（秒）
+            post_seconds: 报警后继续录制的时长（秒），期间再次升级时顺延
+            fps: 采样帧率
+            quality: JPEG压缩质量（0-100）
+            camera_memory_mb: 单个摄像头缓冲区的内存上限（MB）
+            total_memory_mb: 所有摄像头缓冲区的内存上限（MB）
+            workers: 压缩线程数
+            bus: 订阅的事件总线，默认为全局事件总线
+        """
+        if self.running:
+            return
+        self.directory = directory
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.interval = 1.0 / fps
+        self.fps = fps
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.camera_limit = int(camera_memory_mb * 1024 * 1024)
+        self.total_limit = int(total_memory_mb * 1024 * 1024)
+        self.max_pending = workers * 2  # 每个摄像头最多排队的待压缩任务数（每个任务包含全部区域）
+        os.makedirs(directory, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ClipEncode")
+        self._subscription = (bus or event_bus).subscribe(event_types=(AlarmEscalated,), callback=self.on_event)
+        self._started_at = time.perf_counter()
+        self.running = True
+        logging.info(f"报警片段录制已启动: 报警前{pre_seconds}秒，报警后{post_seconds}秒，{fps}帧/秒")
+
+    def stop(self):
+        """停止录制，写出正在录制的片段"""
+        if not self.running:
+            return
+        self.running = False
+        self._subscription.close()
+        self.join()
+        with self._lock:
+            clips = list(self._clips.values())
+            self._clips.clear()
+            self._buffers.clear()
+        for clip in clips:
+            self._pool.submit(self._write_clip, clip)
+        self._pool.shutdown(wait=True)
+        logging.info(f"报警片段录制已停止: {self.get_stats()}")
+
+    def due(self, camera_id, now):
+        """判断摄像头是否需要提交新的一帧（只应由该摄像头线程调用）"""
+        if not self.running:
+            return False
+        buffer = self._buffers.get(camera_id)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(camera_id, _CameraBuffer())
+        # 留出10%的余量，摄像头帧率与采样帧率相同或成整数倍时帧间隔抖动不会导致隔帧采样
+        return now - buffer.last_submit >= self.interval * 0.9
+
+    def add_frame(self, camera_id, crops, now):
+        """提交各监测区域的图像，由线程池压缩后放入缓冲区
+
+        压缩任务积压时丢弃该帧并计数，不阻塞摄像头线程。
+
+        Args:
+            camera_id: 摄像头ID
+            crops: 各监测区域的图像（按区域序号排列，可以是原始帧的视图）
+            now: 帧时间戳
+        """
+        buffer = self._buffers.get(camera_id)
+        if buffer is None:
+            return
+        buffer.last_submit = now
+        if buffer.pending >= self.max_pending:
+            self.frames_dropped += len(crops)
+            return
+        # 先复制全部区域图像再提交一个任务：摄像头线程随后会在原始帧上绘制叠加信息，
+        # 一次提交也避免复制过程中被刚唤醒的压缩线程抢占
+        images = [np.array(crop) for crop in crops]
+        with self._lock:
+            buffer.pending += 1
+        try:
+            self._pool.submit(self._encode, camera_id, images, now)
+        except RuntimeError:
+            # 录制器正在停止
+            with self._lock:
+                buffer.pending -= 1
+
+    def _encode(self, camera_id, images, timestamp):
+        encoded = []
+        for image in images:
+            start = time.perf_counter()
+            ok, data = cv2.imencode('.jpg', image, self.encode_params)
+            encoded.append((image.nbytes, data.tobytes() if ok else None, time.perf_counter() - start))
+        finished = []
+        with self._lock:
+            buffer = self._buffers.get(camera_id)
+            if buffer is not None:
+                buffer.pending -= 1
+                for roi, (raw_bytes, data, elapsed) in enumerate(encoded):
+                    self.encode_seconds += elapsed
+                    if data is None:
+                        continue
+                    self.frames_encoded += 1
+                    self.raw_bytes += raw_bytes
+                    self.jpeg_bytes += len(data)
+                    buffer.insert(timestamp, roi, data)
+                    clip = self._extend_clip(camera_id, roi, timestamp, data)
+                    if clip is not None:
+                        finished.append(clip)
+                self._evict(buffer, timestamp)
+                self._writing += len(finished)
+            self._idle.notify_all()
+        for clip in finished:
+            try:
+                self._write_clip(clip)
+            finally:
+                with self._lock:
+                    self._writing -= 1
+                    self._idle.notify_all()
+
+    def _evict(self, buffer, now):
+        """淘汰超过缓冲时长或内存上限的图像（持有锁时调用）"""
+        while buffer.entries and (buffer.times[0] < now - self.pre_seconds or buffer.bytes > self.camera_limit):
+            buffer.evict_oldest()
+            self.frames_evicted += 1
+        while self.memory_bytes() > self.total_limit:
+            largest = max(self._buffers.values(), key=lambda b: b.bytes)
+            if not largest.entries:
+                break
+            largest.evict_oldest()
+            self.frames_evicted += 1
+
+    def _extend_clip(self, camera_id, roi, timestamp, data):
+        """把图像追加到正在录制的片段，片段结束时返回该片段（持有锁时调用）"""
+        clip = self._clips.get((camera_id, roi))
+        if clip is None or timestamp < clip.timestamp:
+            return None
+        if timestamp > clip.post_until:
+            return self._clips.pop((camera_id, roi))
+        clip.frames.append((timestamp, data))
+        return None
+
+    def on_event(self, event):
+        """处理报警升级事件：开始录制片段，已在录制时顺延结束时间
+
+        Args:
+            event: AlarmEscalated 事件
+        """
+        with self._lock:
+            key = (event.camera_id, event.roi)
+            clip = self._clips.get(key)
+            if clip is not None:
+                clip.post_until = event.timestamp + self.post_seconds
+                clip.level = max(clip.level, event.level)
+                return
+            buffer = self._buffers.get(event.camera_id)
+            frames = [(t, data) for t, roi, data in buffer.entries if roi == event.roi] if buffer else []
+            self._clips[key] = _Clip(event.camera_id, event.roi, event.timestamp, event.level,
+                                     frames, event.timestamp + self.post_seconds)
+        logging.info(f"摄像头{event.camera_id} 区域{event.roi + 1} 开始录制报警片段（已缓冲{len(frames)}帧）")
+
+    def _write_clip(self, clip):
+        """把片段的JPEG图像写成MJPG编码的AVI文件
+
+        Returns:
+            str: 片段文件路径，没有图像时为None
+        """
+        if not clip.frames:
+            logging.warning(f"摄像头{clip.camera_id} 区域{clip.roi + 1} 报警片段没有可用图像")
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(clip.timestamp))
+        path = os.path.join(self.directory, f"camera{clip.camera_id}_roi{clip.roi + 1}_{stamp}_L{clip.level}.avi")
+        writer = None
+        try:
+            for _, data in sorted(clip.frames, key=lambda frame: frame[0]):
+                image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    size = (image.shape[1], image.shape[0])
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), self.fps, size)
+                elif (image.shape[1], image.shape[0]) != size:
+                    # 片段期间修改了区域大小
+                    image = cv2.resize(image, size)
+                writer.write(image)
+        except Exception as e:
+            logging.error(f"写入报警片段失败 {path}: {str(e)}")
+            return None
+        finally:
+            if writer is not None:
+                writer.release()
+        self.clips_written += 1
+        logging.info(f"报警片段已保存: {path}（{len(clip.frames)}帧）")
+        return path
+
+    def join(self, timeout=None):
+        """等待已提交的图像全部压缩完成、已结束的片段全部写入磁盘
+
+        Returns:
+            bool: 超时前是否全部完成
+        """
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: not self._writing and all(b.pending <= 0 for b in self._buffers.values()), timeout)
+
+    def memory_bytes(self, camera_id=None):
+        """缓冲区占用的JPEG数据字节数
+
+        Args:
+            camera_id: 摄像头ID，None表示所有摄像头
+        """
+        if camera_id is not None:
+            buffer = self._buffers.get(camera_id)
+            return buffer.bytes if buffer else 0
+        return sum(buffer.bytes for buffer in self._buffers.values())
+
+    def get_stats(self):
+        """获取统计信息，包括压缩吞吐量（帧/秒）和压缩比"""
+        wall = time.perf_counter() - self._started_at if self._started_at else 0
+        return {
+            'frames_encoded': self.frames_encoded,
+            'frames_dropped': self.frames_dropped,
+            'frames_evicted': self.frames_evicted,
+            'encode_fps': round(self.frames_encoded / wall, 1) if wall else 0.0,
+            'encode_ms': round(self.encode_seconds * 1000 / self.frames_encoded, 2) if self.frames_encoded else 0.0,
+            'compression': round(self.raw_bytes / self.jpeg_bytes, 1) if self.jpeg_bytes else 0.0,
+            'memory_mb': round(self.memory_bytes() / 1024 / 1024, 2),
+            'clips_written': self.clips_written
+        }
+
+# 全局报警片段录制器，未启动时 due() 始终返回False
+clip_recorder = ClipRecorder()
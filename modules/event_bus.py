@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# modules/event_bus.py
+# 进程内事件总线模块
+#
+# 摄像头线程把检测开始、报警升级、报警复位、报警确认和摄像头错误作为事件发布到总线，
+# 录制、网络推送、界面等消费方各自订阅，不需要轮询或修改摄像头线程的处理逻辑。
+# 每个订阅拥有有界队列，发布方只做非阻塞入队，队列满时丢弃事件并计数，
+# 慢速的订阅方不会阻塞摄像头线程；没有订阅方时发布只需一次字典查询。
+
+import logging
+import queue
+import threading
+from collections import deque
+
+class Event:
+    """事件基类
+
+    事件对象在多个订阅线程之间共享，发布后不应修改。
+
+    Attributes:
+        camera_id: 摄像头ID
+        roi: 监测区域序号，摄像头级事件为None
+        timestamp: 事件时间戳
+    """
+    __slots__ = ('camera_id', 'roi', 'timestamp')
+    kind = 'event'
+
+    def as_dict(self):
+        """转换为可序列化为JSON的字典"""
+        values = {'event': self.kind, 'camera': self.camera_id, 'roi': self.roi, 'time': self.timestamp}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name not in Event.__slots__:
+                    values[name] = getattr(self, name)
+        return values
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()})"
+
+class DetectionStarted(Event):
+    """区域开始检测到需要报警的手势"""
+    __slots__ = ()
+    kind = 'detection'
+
+    def __init__(self, camera_id, roi, timestamp):
+        self.camera_id = camera_id
+        self.roi = roi
+        self.timestamp = timestamp
+
+class AlarmEscalated(Event):
+    """区域触发新的报警级别
+
+    Attributes:
+        level: 报警级别（已触发的报警数）
+        duration: 触发该级别的检测时长（秒）
+    """
+    __slots__ = ('level', 'duration')
+    kind = 'alarm'
+
+    def __init__(self, camera_id, roi, timestamp, level, duration):
+        self.camera_id = camera_id
+        self.roi = roi
+        self.timestamp = timestamp
+        self.level = level
+        self.duration = duration
+
+class AlarmReset(Event):
+    """区域的检测和报警状态复位
+
+    Attributes:
+        level: 复位前的报警级别
+    """
+    __slots__ = ('level',)
+    kind = 'reset'
+
+    def __init__(self, camera_id, roi, timestamp, level):
+        self.camera_id = camera_id
+        self.roi = roi
+        self.timestamp = timestamp
+        self.level = level
+
+class CameraError(Event):
+    """摄像头断流、重连失败或处理异常
+
+    Attributes:
+        message: 错误信息
+    """
+    __slots__ = ('message',)
+    kind = 'error'
+
+    def __init__(self, camera_id, timestamp, message):
+        self.camera_id = camera_id
+        self.roi = None
+        self.timestamp = timestamp
+        self.message = message
+
+class AlarmAcknowledged(Event):
+    """值班人员确认报警（暂停报警声音）
+
+    Attributes:
+        level: 确认时该摄像头的最高报警级别
+    """
+    __slots__ = ('level',)
+    kind = 'ack'
+
+    def __init__(self, camera_id, timestamp, level):
+        self.camera_id = camera_id
+        self.roi = None
+        self.timestamp = timestamp
+        self.level = level
+
+EVENT_TYPES = (DetectionStarted, AlarmEscalated, AlarmReset, CameraError, AlarmAcknowledged)
+
+class Subscription:
+    """事件订阅，持有一个有界事件队列
+
+    发布方只向队列尾部追加事件；只有队列从空变为非空时才唤醒等待的消费方。
+    """
+
+    def __init__(self, bus, event_types, maxsize):
+        self.bus = bus
+        self.event_types = tuple(event_types)
+        self.maxsize = maxsize
+        self._queue = deque()
+        self._ready = threading.Event()
+        self.dropped = 0  # 队列满时丢弃的事件数
+        self.closed = False
+
+    def offer(self, event):
+        """非阻塞入队，队列满时丢弃事件"""
+        if len(self._queue) >= self.maxsize:
+            self.dropped += 1
+            return
+        self._queue.append(event)
+        if not self._ready.is_set():
+            self._ready.set()
+
+    def get(self, timeout=None):
+        """取出下一个事件
+
+        Args:
+            timeout: 等待时间（秒），None表示一直等待
+
+        Raises:
+            queue.Empty: 超时仍没有事件时
+        """
+        while True:
+            try:
+                return self._queue.popleft()
+            except IndexError:
+                pass
+            self._ready.clear()
+            # 清除标志后再检查一次，避免错过清除前入队的事件
+            if self._queue:
+                continue
+            if not self._ready.wait(timeout):
+                raise queue.Empty
+
+    def drain(self):
+        """取出当前队列中的所有事件（不等待）"""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.popleft())
+            except IndexError:
+                return events
+
+    def close(self):
+        """取消订阅"""
+        self.closed = True
+        self.bus.unsubscribe(self)
+
+class EventBus:
+    """进程内发布/订阅事件总线
+
+    按事件类型维护订阅列表，订阅变化时整体替换路由表（写时复制），
+    发布方不加锁。
+    """
+
+    def __init__(self):
+        self._routes = {}  # 事件类型 -> 订阅元组
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_types=EVENT_TYPES, maxsize=256, callback=None):
+        """订阅事件
+
+        Args:
+            event_types: 订阅的事件类型
+            maxsize: 订阅队列的最大长度
+            callback: 可选的回调函数，设置后在独立的守护线程中依次调用
+
+        Returns:
+            Subscription: 订阅对象
+        """
+        subscription = Subscription(self, event_types, maxsize)
+        with self._lock:
+            self._subscriptions.append(subscription)
+            self._rebuild()
+        if callback is not None:
+            threading.Thread(target=self._dispatch, args=(subscription, callback),
+                             name="EventDispatch", daemon=True).start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """取消订阅"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                self._rebuild()
+
+    def _rebuild(self):
+        routes = {}
+        for subscription in self._subscriptions:
+            for event_type in subscription.event_types:
+                routes.setdefault(event_type, []).append(subscription)
+        self._routes = {event_type: tuple(subs) for event_type, subs in routes.items()}
+
+    def publish(self, event_type, *args):
+        """发布事件
+
+        只有存在订阅方时才创建事件对象，摄像头线程可以无条件调用。
+
+        Args:
+            event_type: 事件类型
+            *args: 事件类型的构造参数
+        """
+        subscriptions = self._routes.get(event_type)
+        if not subscriptions:
+            return
+        event = event_type(*args)
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    @staticmethod
+    def _dispatch(subscription, callback):
+        """在订阅线程中依次把事件交给回调"""
+        while not subscription.closed:
+            try:
+                event = subscription.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"事件处理失败 {event!r}: {str(e)}")
+
+# 全局事件总线
+event_bus = EventBus()
@@ -2,8 +2,6 @@
 # modules/fps_counter.py
 # FPS计数器模块
 
-import numpy as np
-
 class FPSCounter:
     """FPS计数器类，用于计算和平滑帧率显示
     
@@ -32,4 +30,4 @@ class FPSCounter:
         Returns:
             float: 平均帧率
         """
-        return np.mean(self.fps_history) if self.fps_history else 0
\ No newline at end of file
+        return sum(self.fps_history) / len(self.fps_history) if self.fps_history else 0
\ No newline at end of file
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# modules/frame_pacer.py
+# 帧节拍器模块
+#
+# 摄像头线程的每一帧（读取、处理、显示）共用一个节拍器：
+# - 使用单调时钟（monotonic_ns），不受NTP校时或手动修改系统时间影响
+# - 按截止时间调度：下一帧的截止时间由上一帧的截止时间加帧间隔得到，而不是由实际唤醒时间得到，
+#   单次唤醒的误差在下一帧得到补偿，长时间运行的平均帧率不漂移
+# - 混合等待：先用 sleep() 睡到截止时间前 spin 秒，剩余时间让出CPU轮询，避免系统定时器精度带来的迟到；
+#   任何情况下都不会在不让出CPU的情况下空转
+# - 某一帧耗时超过一个或多个帧间隔时放弃错过的节拍，不连续补帧
+# 各阶段用 mark() 记录从节拍开始的耗时，唤醒迟到、实际帧间隔和各阶段耗时保存为直方图，由指标服务输出。
+
+import time
+
+from .metrics import Histogram
+
+# 唤醒迟到（秒）
+LATENESS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+# 实际帧间隔和阶段耗时（秒）
+INTERVAL_BUCKETS = (0.005, 0.01, 0.02, 0.03, 0.04, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0)
+
+class FramePacer:
+    """基于单调时钟和截止时间的帧节拍器
+
+    只由一个线程调用 wait() 和 mark()，直方图可在其他线程中读取。
+    """
+
+    def __init__(self, interval, spin=0.0005, clock=time):
+        """初始化节拍器
+
+        Args:
+            interval: 帧间隔（秒）
+            spin: 截止时间前改为让出CPU轮询的时长（秒），0表示只用 sleep()
+            clock: 提供 monotonic_ns() 和 sleep() 的时钟，仿真时为虚拟时钟
+        """
+        self.interval_ns = max(1, int(interval * 1e9))
+        self.spin_ns = int(spin * 1e9)
+        self.clock = clock
+        self.lateness = Histogram(LATENESS_BUCKETS)  # 唤醒时间相对截止时间的迟到
+        self.intervals = Histogram(INTERVAL_BUCKETS)  # 相邻两帧开始时间的实际间隔
+        self.stages = {}  # 阶段名 -> 阶段耗时直方图
+        self.ticks = 0
+        self.missed = 0  # 因某一帧耗时过长而放弃的节拍数
+        self._deadline = None
+        self._tick = None
+        self._mark = None
+
+    @property
+    def interval(self):
+        """帧间隔（秒）"""
+        return self.interval_ns / 1e9
+
+    def reset(self):
+        """重新开始计时（断流重连等长时间停顿之后调用），下一次 wait() 立即返回"""
+        self._deadline = None
+        self._tick = None
+
+    def wait(self):
+        """等待下一帧的截止时间
+
+        Returns:
+            float: 与上一帧开始时间的实际间隔（秒），第一帧为0
+        """
+        now = self.clock.monotonic_ns()
+        if self._deadline is None:
+            self._deadline = now
+        elif now < self._deadline:
+            now = self._sleep_until(self._deadline)
+        self.lateness.observe((now - self._deadline) / 1e9)
+        elapsed = 0.0
+        if self._tick is not None:
+            elapsed = (now - self._tick) / 1e9
+            self.intervals.observe(elapsed)
+        self._tick = self._mark = now
+        self.ticks += 1
+        # 从计划时间推进，单次迟到在下一帧得到补偿；已错过的节拍直接放弃
+        self._deadline += self.interval_ns
+        if now >= self._deadline:
+            behind = (now - self._deadline) // self.interval_ns + 1
+            self._deadline += behind * self.interval_ns
+            self.missed += behind
+        return elapsed
+
+    def mark(self, stage):
+        """记录一个阶段结束
+
+        Args:
+            stage: 阶段名（如 capture、processing、display），耗时从上一个阶段结束（或节拍开始）算起
+
+        Returns:
+            float: 从节拍开始到现在的时间（秒）
+        """
+        now = self.clock.monotonic_ns()
+        if self._tick is None:
+            self._tick = self._mark = now
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram(INTERVAL_BUCKETS)
+        histogram.observe((now - self._mark) / 1e9)
+        self._mark = now
+        return (now - self._tick) / 1e9
+
+    def _sleep_until(self, deadline):
+        """混合等待到截止时间，返回唤醒时的时间（纳秒）"""
+        now = self.clock.monotonic_ns()
+        coarse = deadline - now - self.spin_ns
+        if coarse > 0:
+            self.clock.sleep(coarse / 1e9)
+            now = self.clock.monotonic_ns()
+        while now < deadline:
+            # sleep(0) 释放GIL并让出CPU，其他线程可以继续运行
+            time.sleep(0)
+            now = self.clock.monotonic_ns()
+        return now
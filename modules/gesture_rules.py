@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# modules/gesture_rules.py
+# 声明式手势规则引擎模块
+
+import numpy as np
+
+from .hand_landmarks import resolve_landmark
+
+# 条件比较运算符对应的符号：sign * (score - threshold) < 0 即为满足
+_OP_SIGNS = {"<": 1.0, ">": -1.0}
+_AXES = {"x": 0, "y": 1, "z": 2}
+_METRICS = ("manhattan", "euclidean")
+
+
+class CompiledRules:
+    """编译后的手势规则
+
+    规则在初始化时一次性编译为NumPy索引数组和权重矩阵：
+    - 特征向量由关键点距离、夹角和坐标组成，所有规则共享同一组特征
+    - 每个条件是特征的加权和与阈值的比较，对应权重矩阵的一行
+    - 每条规则是若干条件的合取，对应规则-条件矩阵的一行
+
+    Attributes:
+        names: 规则名称元组
+        dist_a, dist_b: 距离特征的两端关键点序号
+        dist_manhattan: 距离特征是否使用曼哈顿距离
+        ang_a, ang_b, ang_c: 夹角特征的关键点序号（ang_b为顶点）
+        pos_idx, pos_axis: 坐标特征的关键点序号和坐标轴
+        weights: 条件权重矩阵，形状为 (条件数, 特征数)
+        thresholds: 条件阈值，形状为 (条件数,)
+        signs: 条件比较符号，形状为 (条件数,)
+        threshold_refs: 需要从参数对象读取阈值的条件，格式为 [(条件序号, 属性名)]
+        membership: 规则-条件矩阵，形状为 (规则数, 条件数)
+        condition_counts: 每条规则包含的条件数
+        min_durations: 每条规则需持续的最短时间（秒）
+        alarm_mask: 每条规则是否参与报警
+        landmark_indices: 规则用到的全部关键点序号
+    """
+
+    def __init__(self, rules):
+        """编译规则
+
+        Args:
+            rules: 规则定义列表，见 config.py 中的 gesture_rules
+
+        Raises:
+            ValueError: 当规则定义无效时抛出
+        """
+        features = {}
+        conditions = []
+        names = []
+        rule_conditions = []
+        min_durations = []
+        alarm_mask = []
+
+        for rule in rules:
+            if not rule.get("enabled", True):
+                continue
+            name = rule.get("name")
+            if not name:
+                raise ValueError("手势规则缺少名称")
+            if name in names:
+                raise ValueError(f"手势规则名称重复: {name}")
+            rule_conds = rule.get("conditions")
+            if not rule_conds:
+                raise ValueError(f"手势规则 {name} 没有定义条件")
+
+            indices = []
+            for cond in rule_conds:
+                indices.append(len(conditions))
+                conditions.append(self._parse_condition(name, cond, features))
+
+            names.append(name)
+            rule_conditions.append(indices)
+            min_durations.append(float(rule.get("min_duration", 0.0)))
+            alarm_mask.append(bool(rule.get("alarm", True)))
+
+        # 按类型整理特征：距离 -> 夹角 -> 坐标，保证特征向量可一次拼接得到
+        dist_keys = [k for k in features if k[0] == "distance"]
+        ang_keys = [k for k in features if k[0] == "angle"]
+        pos_keys = [k for k in features if k[0] == "position"]
+        order = dist_keys + ang_keys + pos_keys
+        column = {key: i for i, key in enumerate(order)}
+
+        self.dist_a = np.array([k[1] for k in dist_keys], dtype=np.intp)
+        self.dist_b = np.array([k[2] for k in dist_keys], dtype=np.intp)
+        self.dist_manhattan = np.array([k[3] == "manhattan" for k in dist_keys], dtype=bool)
+        self.ang_a = np.array([k[1] for k in ang_keys], dtype=np.intp)
+        self.ang_b = np.array([k[2] for k in ang_keys], dtype=np.intp)
+        self.ang_c = np.array([k[3] for k in ang_keys], dtype=np.intp)
+        self.pos_idx = np.array([k[1] for k in pos_keys], dtype=np.intp)
+        self.pos_axis = np.array([k[2] for k in pos_keys], dtype=np.intp)
+
+        self.weights = np.zeros((len(conditions), len(order)), dtype=np.float64)
+        self.thresholds = np.zeros(len(conditions), dtype=np.float64)
+        self.signs = np.zeros(len(conditions), dtype=np.float64)
+        self.threshold_refs = []
+        for i, (terms, sign, threshold) in enumerate(conditions):
+            for key, weight in terms:
+                self.weights[i, column[key]] += weight
+            self.signs[i] = sign
+            if isinstance(threshold, str):
+                self.threshold_refs.append((i, threshold))
+            else:
+                self.thresholds[i] = threshold
+
+        self.membership = np.zeros((len(names), len(conditions)), dtype=np.int32)
+        for r, indices in enumerate(rule_conditions):
+            self.membership[r, indices] = 1
+        self.condition_counts = self.membership.sum(axis=1)
+
+        self.names = tuple(names)
+        self.min_durations = np.array(min_durations, dtype=np.float64)
+        self.alarm_mask = np.array(alarm_mask, dtype=bool)
+
+        used = set(self.dist_a) | set(self.dist_b) | set(self.ang_a) | set(self.ang_b) \
+            | set(self.ang_c) | set(self.pos_idx)
+        self.landmark_indices = np.array(sorted(int(i) for i in used), dtype=np.intp)
+
+    @staticmethod
+    def _parse_condition(rule_name, cond, features):
+        """解析单个条件
+
+        条件可以直接写成单个特征（简写），也可以用 terms 列出多个加权特征。
+
+        Returns:
+            tuple: (terms, sign, threshold)，terms为 [(特征键, 权重)]
+        """
+        op = cond.get("op", "<")
+        if op not in _OP_SIGNS:
+            raise ValueError(f"手势规则 {rule_name} 使用了不支持的比较运算符: {op}")
+        if "threshold" not in cond:
+            raise ValueError(f"手势规则 {rule_name} 的条件缺少阈值")
+        threshold = cond["threshold"]
+        if not isinstance(threshold, str):
+            threshold = float(threshold)
+
+        raw_terms = cond.get("terms", [cond])
+        terms = []
+        for term in raw_terms:
+            key = CompiledRules._feature_key(rule_name, term)
+            features[key] = True
+            terms.append((key, float(term.get("weight", 1.0))))
+        return terms, _OP_SIGNS[op], threshold
+
+    @staticmethod
+    def _feature_key(rule_name, term):
+        """将特征定义转换为可去重的特征键"""
+        if "distance" in term:
+            a, b = term["distance"]
+            metric = term.get("metric", "euclidean")
+            if metric not in _METRICS:
+                raise ValueError(f"手势规则 {rule_name} 使用了不支持的距离度量: {metric}")
+            return ("distance", resolve_landmark(a), resolve_landmark(b), metric)
+        if "angle" in term:
+            a, b, c = term["angle"]
+            return ("angle", resolve_landmark(a), resolve_landmark(b), resolve_landmark(c))
+        if "position" in term:
+            point, axis = term["position"]
+            if axis not in _AXES:
+                raise ValueError(f"手势规则 {rule_name} 使用了不支持的坐标轴: {axis}")
+            return ("position", resolve_landmark(point), _AXES[axis])
+        raise ValueError(f"手势规则 {rule_name} 的条件缺少 distance/angle/position 特征")
+
+
+class GestureRuleEngine:
+    """手势规则引擎
+
+    每帧只做一次向量化计算：先求出所有规则共享的特征向量，
+    再通过矩阵运算得到所有条件和规则的结果，计算量与规则数量基本无关。
+    """
+
+    def __init__(self, rules, params=None):
+        """初始化规则引擎
+
+        Args:
+            rules: 规则定义列表
+            params: 参数对象（通常为CONFIG），提供 smooth_factor 和以字符串引用的阈值
+        """
+        self.rules = CompiledRules(rules)
+        self.params = params
+        self._smoothed = None
+        self._start_times = np.full(len(self.rules.names), np.nan)
+        self._no_rules = np.zeros(len(self.rules.names), dtype=bool)
+
+    @property
+    def names(self):
+        return self.rules.names
+
+    @property
+    def landmark_indices(self):
+        return self.rules.landmark_indices
+
+    def compute_features(self, landmarks):
+        """计算特征向量
+
+        Args:
+            landmarks: 形状为 (21, 3) 的关键点数组，或形状为 (N, 21, 3) 的批量数组
+
+        Returns:
+            np.ndarray: 形状为 (特征数,) 或 (N, 特征数) 的特征数组
+        """
+        r = self.rules
+        xy = landmarks[..., :2].astype(np.float64, copy=False)
+
+        d = xy[..., r.dist_a, :] - xy[..., r.dist_b, :]
+        dist = np.where(r.dist_manhattan,
+                        np.abs(d).sum(axis=-1),
+                        np.sqrt((d * d).sum(axis=-1)))
+
+        v1 = xy[..., r.ang_a, :] - xy[..., r.ang_b, :]
+        v2 = xy[..., r.ang_c, :] - xy[..., r.ang_b, :]
+        norm = np.sqrt((v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1)) + 1e-9
+        cos = np.clip((v1 * v2).sum(axis=-1) / norm, -1.0, 1.0)
+        angle = np.degrees(np.arccos(cos))
+
+        pos = landmarks[..., r.pos_idx, r.pos_axis].astype(np.float64, copy=False)
+        return np.concatenate((dist, angle, pos), axis=-1)
+
+    def evaluate_conditions(self, features):
+        """根据特征计算所有规则是否满足（不含持续时间判断）
+
+        Args:
+            features: 形状为 (特征数,) 或 (N, 特征数) 的特征数组
+
+        Returns:
+            np.ndarray: 形状为 (规则数,) 或 (N, 规则数) 的布尔数组
+        """
+        r = self.rules
+        thresholds = r.thresholds
+        if r.threshold_refs:
+            thresholds = thresholds.copy()
+            for i, attr in r.threshold_refs:
+                thresholds[i] = getattr(self.params, attr)
+        scores = features @ r.weights.T
+        satisfied = r.signs * (scores - thresholds) < 0
+        return satisfied.astype(np.int32) @ r.membership.T == r.condition_counts
+
+    def evaluate(self, landmarks, now):
+        """评估单帧关键点
+
+        Args:
+            landmarks: 形状为 (21, 3) 的关键点数组
+            now: 当前时间戳（秒）
+
+        Returns:
+            np.ndarray: 每条规则当前是否激活的布尔数组
+        """
+        if not self.rules.names:
+            return self._no_rules
+        features = self.compute_features(landmarks)
+
+        # 应用平滑因子，减少抖动
+        if self._smoothed is None:
+            self._smoothed = features
+        else:
+            alpha = getattr(self.params, "smooth_factor", 1.0)
+            self._smoothed = alpha * features + (1 - alpha) * self._smoothed
+
+        matched = self.evaluate_conditions(self._smoothed)
+        self._start_times = np.where(
+            matched,
+            np.where(np.isnan(self._start_times), now, self._start_times),
+            np.nan)
+        return matched & (now - self._start_times >= self.rules.min_durations)
+
+    def clear(self):
+        """清除规则持续时间计时（如手部消失时调用）"""
+        self._start_times.fill(np.nan)
+
+    def reset(self):
+        """完全重置引擎状态，包括平滑历史"""
+        self.clear()
+        self._smoothed = None
+
+    def should_alarm(self, active):
+        """判断激活的规则中是否有参与报警的规则"""
+        return bool((active & self.rules.alarm_mask).any())
+
+    def active_names(self, active):
+        """获取激活规则的名称元组"""
+        if not active.any():
+            return ()
+        return tuple(name for name, on in zip(self.rules.names, active) if on)
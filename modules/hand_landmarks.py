@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# modules/hand_landmarks.py
+# 手部关键点定义模块
+
+import numpy as np
+
+# MediaPipe Hands 的21个关键点名称，顺序与 mp.solutions.hands.HandLandmark 一致
+LANDMARK_NAMES = (
+    "WRIST",
+    "THUMB_CMC", "THUMB_MCP", "THUMB_IP", "THUMB_TIP",
+    "INDEX_FINGER_MCP", "INDEX_FINGER_PIP", "INDEX_FINGER_DIP", "INDEX_FINGER_TIP",
+    "MIDDLE_FINGER_MCP", "MIDDLE_FINGER_PIP", "MIDDLE_FINGER_DIP", "MIDDLE_FINGER_TIP",
+    "RING_FINGER_MCP", "RING_FINGER_PIP", "RING_FINGER_DIP", "RING_FINGER_TIP",
+    "PINKY_MCP", "PINKY_PIP", "PINKY_DIP", "PINKY_TIP",
+)
+
+NUM_LANDMARKS = len(LANDMARK_NAMES)
+
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+# 关键点连线，与 mp.solutions.hands.HAND_CONNECTIONS 一致
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def resolve_landmark(ref):
+    """将关键点名称或序号解析为序号
+
+    Args:
+        ref: 关键点名称（如"THUMB_TIP"）或0-20之间的整数
+
+    Returns:
+        int: 关键点序号
+
+    Raises:
+        ValueError: 当关键点不存在时抛出
+    """
+    if isinstance(ref, str):
+        index = LANDMARK_INDEX.get(ref.upper())
+        if index is None:
+            raise ValueError(f"未知的手部关键点: {ref}")
+        return index
+    if isinstance(ref, int) and 0 <= ref < NUM_LANDMARKS:
+        return ref
+    raise ValueError(f"未知的手部关键点: {ref}")
+
+
+def landmarks_to_array(hand_landmarks, out=None):
+    """将MediaPipe关键点列表转换为 (21, 3) 的NumPy数组
+
+    Args:
+        hand_landmarks: MediaPipe NormalizedLandmarkList
+        out: 可选的预分配数组，避免每帧重新分配内存
+
+    Returns:
+        np.ndarray: 形状为 (21, 3) 的归一化坐标数组 (x, y, z)
+    """
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    for i, lm in enumerate(hand_landmarks.landmark):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+    return out
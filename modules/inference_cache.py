@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# modules/inference_cache.py
+# 基于感知哈希的推理结果缓存模块
+
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+def dhash(roi_frame, hash_size=8):
+    """计算ROI图像的差值哈希（dHash）
+
+    图像降采样为 (hash_size+1) x hash_size 的灰度图，比较水平相邻像素的亮度，
+    得到 hash_size*hash_size 位的整数。画面基本不变时哈希值几乎不变，
+    对传感器噪声和轻微亮度变化不敏感。
+
+    Args:
+        roi_frame: BGR格式的ROI图像
+        hash_size: 哈希边长
+
+    Returns:
+        int: 感知哈希值
+    """
+    # 先用最近邻采样缩小到哈希尺寸的8倍，再区域平均，避免对整幅ROI做INTER_AREA
+    sampled = cv2.resize(roi_frame, ((hash_size + 1) * 8, hash_size * 8), interpolation=cv2.INTER_NEAREST)
+    small = cv2.resize(sampled, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (gray[:, 1:] > gray[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming(a, b):
+    """计算两个哈希值的汉明距离"""
+    return bin(a ^ b).count('1')
+
+class InferenceCache:
+    """手部推理结果LRU缓存
+
+    以降采样ROI图像的感知哈希为键缓存推理得到的关键点（包括“无手”结果）。
+    画面与某个缓存条目几乎相同时直接复用该结果，跳过MediaPipe推理。
+
+    为防止结果过时：
+    - 条目超过 max_age 秒后失效，静止画面也至少每 max_age 秒推理一次
+    - 运动预算：自上次真实推理以来，相邻帧哈希距离的累计值超过 motion_budget
+      时强制推理，避免缓慢移动或移走再移回的手复用旧结果
+    """
+
+    def __init__(self, max_entries=16, max_age=2.0, max_distance=3, motion_budget=12, hash_size=8):
+        """初始化缓存
+
+        Args:
+            max_entries: 最大条目数
+            max_age: 条目最长有效时间（秒）
+            max_distance: 判定为相同画面的最大汉明距离
+            motion_budget: 连续命中期间允许的相邻帧哈希距离累计值
+            hash_size: 感知哈希边长
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.max_distance = max_distance
+        self.motion_budget = motion_budget
+        self.hash_size = hash_size
+        self._entries = OrderedDict()  # 哈希值 -> (存入时间, 关键点数组)
+        self._key = None  # 最近一次查询的哈希值
+        self._motion = 0
+        self._inference_ms = 0.0  # 单次推理耗时的滑动平均（毫秒）
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def lookup(self, roi_frame, now):
+        """查询缓存
+
+        Args:
+            roi_frame: BGR格式的ROI图像
+            now: 当前时间戳（秒）
+
+        Returns:
+            tuple: (是否命中, 关键点数组)，缓存的“无手”结果为 (True, None)
+        """
+        key = dhash(roi_frame, self.hash_size)
+        if self._key is not None:
+            self._motion += hamming(key, self._key)
+        self._key = key
+
+        # 淘汰过期条目
+        expired = [k for k, (stored, _) in self._entries.items() if now - stored > self.max_age]
+        for k in expired:
+            del self._entries[k]
+
+        if self._motion <= self.motion_budget and self._entries:
+            best = min(self._entries, key=lambda k: hamming(k, key))
+            if hamming(best, key) <= self.max_distance:
+                self._entries.move_to_end(best)
+                self.hits += 1
+                self.saved_ms += self._inference_ms
+                landmarks = self._entries[best][1]
+                return True, None if landmarks is None else landmarks.copy()
+
+        self.misses += 1
+        return False, None
+
+    def store(self, landmarks, now, inference_ms):
+        """保存最近一次查询画面的推理结果
+
+        Args:
+            landmarks: 推理得到的关键点数组，无手时为None
+            now: 当前时间戳（秒）
+            inference_ms: 本次推理分摊到该区域的耗时（毫秒）
+        """
+        if self._key is None:
+            return
+        self._entries[self._key] = (now, None if landmarks is None else landmarks.copy())
+        self._entries.move_to_end(self._key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._motion = 0
+        if self._inference_ms:
+            self._inference_ms += 0.1 * (inference_ms - self._inference_ms)
+        else:
+            self._inference_ms = inference_ms
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self._key = None
+        self._motion = 0
+
+    def get_stats(self):
+        """获取统计信息
+
+        Returns:
+            dict: 命中次数、未命中次数、命中率和估算节省的推理时间（毫秒）
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'saved_ms': self.saved_ms
+        }
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+# modules/landmark_recorder.py
+# 关键点时间序列记录模块
+#
+# 把每次手势评估使用的关键点按列记录下来，用于离线分析和调整手势阈值。
+# 摄像头线程把数据写入预分配的NumPy块，块写满后交给后台线程保存为分段的.npy文件
+# （每列一个文件，通过内存映射写入），并在索引文件中追加该分段的时间范围。
+# 读取时根据索引只打开与时间范围重叠的分段，按内存映射读取需要的列。
+#
+# 目录结构：
+#   index.csv                    每行一个分段：segment,start,end,rows
+#   segment_000001.time.npy      float64 (N,)       时间戳
+#   segment_000001.roi.npy       uint8 (N,)         监测区域序号
+#   segment_000001.source.npy    uint8 (N,)         关键点来源，见 SOURCE_*
+#   segment_000001.score.npy     float32 (N,)       手部置信度，非推理结果时为NaN
+#   segment_000001.matched.npy   bool (N,)          是否判定为需要报警的手势
+#   segment_000001.landmarks.npy float32 (N, 21, 3) 区域内归一化坐标
+
+import bisect
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .hand_landmarks import NUM_LANDMARKS
+
+# 关键点来源
+SOURCE_INFERENCE = 0  # 模型推理
+SOURCE_CACHE = 1  # 推理结果缓存
+SOURCE_TRACKING = 2  # 光流跟踪
+
+COLUMNS = {
+    'time': (np.float64, ()),
+    'roi': (np.uint8, ()),
+    'source': (np.uint8, ()),
+    'score': (np.float32, ()),
+    'matched': (np.bool_, ()),
+    'landmarks': (np.float32, (NUM_LANDMARKS, 3)),
+}
+
+INDEX_FILE = "index.csv"
+
+def segment_path(directory, segment, column):
+    """分段中某一列的文件路径"""
+    return os.path.join(directory, f"segment_{segment:06d}.{column}.npy")
+
+def _new_block(rows):
+    return {name: np.empty((rows,) + shape, dtype=dtype) for name, (dtype, shape) in COLUMNS.items()}
+
+class LandmarkRecorder:
+    """单个摄像头的关键点记录器
+
+    append() 只由摄像头线程调用，不加锁。内存中最多保留 max_pending + 1 个块：
+    一个正在写入的块和最多 max_pending 个等待保存的块；磁盘写入跟不上时
+    丢弃当前块中的数据并计数，不阻塞摄像头线程。
+    """
+
+    def __init__(self, directory, block_rows=4096, max_pending=2):
+        """初始化记录器
+
+        Args:
+            directory: 记录目录（每个摄像头一个目录）
+            block_rows: 每个块（分段）的行数
+            max_pending: 最多等待保存的块数
+        """
+        self.directory = directory
+        self.block_rows = block_rows
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            with open(index_path, 'w', encoding='utf-8') as f:
+                f.write("segment,start,end,rows\n")
+        segments = read_index(directory)
+        self._next_segment = segments[-1][0] + 1 if segments else 1
+        self._free = queue.Queue()
+        for _ in range(max_pending):
+            self._free.put(_new_block(block_rows))
+        self._pending = queue.Queue()
+        self._block = _new_block(block_rows)
+        self._rows = 0
+        self._thread = threading.Thread(target=self._write_loop, name="LandmarkRecorder", daemon=True)
+        self._thread.start()
+        # 统计信息
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.segments_written = 0
+        self.write_seconds = 0.0
+
+    def append(self, timestamp, roi, source, score, landmarks, matched):
+        """追加一行记录
+
+        Args:
+            timestamp: 时间戳
+            roi: 监测区域序号
+            source: 关键点来源（SOURCE_*）
+            score: 手部置信度，未知时为NaN
+            landmarks: (21, 3) 关键点数组
+            matched: 是否判定为需要报警的手势
+        """
+        block = self._block
+        row = self._rows
+        block['time'][row] = timestamp
+        block['roi'][row] = roi
+        block['source'][row] = source
+        block['score'][row] = score
+        block['matched'][row] = matched
+        block['landmarks'][row] = landmarks
+        self._rows = row + 1
+        if self._rows == self.block_rows:
+            self.flush()
+
+    def flush(self, wait=False):
+        """把当前块交给后台线程保存（只由摄像头线程调用）
+
+        Args:
+            wait: 没有空闲块时是否等待，为False时丢弃当前块
+        """
+        if not self._rows:
+            return
+        try:
+            spare = self._free.get(block=wait)
+        except queue.Empty:
+            # 磁盘写入跟不上，丢弃当前块
+            self.rows_dropped += self._rows
+            logging.warning(f"关键点记录写入过慢，丢弃 {self._rows} 行: {self.directory}")
+            self._rows = 0
+            return
+        self._pending.put((self._block, self._rows))
+        self._block = spare
+        self._rows = 0
+
+    def close(self):
+        """保存剩余数据并停止后台线程"""
+        if self._thread is None:
+            return
+        self.flush(wait=True)
+        self._pending.put(None)
+        self._thread.join()
+        self._thread = None
+        logging.info(f"关键点记录已保存: {self.directory}，共 {self.rows_written} 行，{self.segments_written} 个分段")
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            block, rows = item
+            try:
+                self._write_segment(block, rows)
+            except Exception as e:
+                self.rows_dropped += rows
+                logging.error(f"保存关键点分段失败: {str(e)}")
+            finally:
+                self._free.put(block)
+
+    def _write_segment(self, block, rows):
+        start = time.perf_counter()
+        segment = self._next_segment
+        for name, column in block.items():
+            out = np.lib.format.open_memmap(segment_path(self.directory, segment, name), mode='w+',
+                                            dtype=column.dtype, shape=(rows,) + column.shape[1:])
+            out[:] = column[:rows]
+            out.flush()
+            del out
+        times = block['time'][:rows]
+        # 各列文件完整写入后再登记到索引，读取方不会看到不完整的分段
+        with open(os.path.join(self.directory, INDEX_FILE), 'a', encoding='utf-8') as f:
+            f.write(f"{segment},{float(times.min())!r},{float(times.max())!r},{rows}\n")
+        self._next_segment = segment + 1
+        self.rows_written += rows
+        self.segments_written += 1
+        self.write_seconds += time.perf_counter() - start
+
+    def get_stats(self):
+        """获取统计信息"""
+        return {
+            'rows_written': self.rows_written,
+            'rows_buffered': self._rows,
+            'rows_dropped': self.rows_dropped,
+            'segments': self.segments_written,
+            'segment_write_ms': (round(self.write_seconds * 1000 / self.segments_written, 2)
+                                 if self.segments_written else 0.0)
+        }
+
+def read_index(directory):
+    """读取分段索引
+
+    Returns:
+        list: [(分段号, 开始时间, 结束时间, 行数)]，按开始时间排序
+    """
+    segments = []
+    with open(os.path.join(directory, INDEX_FILE), encoding='utf-8') as f:
+        next(f, None)
+        for line in f:
+            parts = line.strip().split(',')
+            if len(parts) == 4:
+                segments.append((int(parts[0]), float(parts[1]), float(parts[2]), int(parts[3])))
+    segments.sort(key=lambda segment: segment[1])
+    return segments
+
+class LandmarkArchive:
+    """关键点记录的只读访问
+
+    Example:
+        archive = LandmarkArchive("recordings/camera0")
+        data = archive.read(start, end, columns=('time', 'score', 'landmarks'), roi=1)
+        data['landmarks'].shape  # (N, 21, 3)
+    """
+
+    def __init__(self, directory):
+        """加载分段索引
+
+        Args:
+            directory: 记录目录
+        """
+        self.directory = directory
+        self.segments = read_index(directory)
+        self._starts = [segment[1] for segment in self.segments]
+
+    @property
+    def rows(self):
+        """记录的总行数"""
+        return sum(segment[3] for segment in self.segments)
+
+    def read(self, start, end, columns=None, roi=None):
+        """读取时间范围 [start, end) 内的记录
+
+        只打开与时间范围重叠的分段，各列按内存映射读取，未请求的列不会读入内存。
+
+        Args:
+            start: 开始时间戳
+            end: 结束时间戳
+            columns: 需要的列名，默认为全部列
+            roi: 可选的监测区域序号
+
+        Returns:
+            dict: {列名: NumPy数组}，各列行数相同，按时间排序
+        """
+        columns = tuple(columns or COLUMNS)
+        parts = {name: [] for name in columns}
+        # 开始时间不晚于 end 的分段中，结束时间不早于 start 的分段与范围重叠
+        for segment, seg_start, seg_end, _ in self.segments[:bisect.bisect_left(self._starts, end)]:
+            if seg_end < start:
+                continue
+            times = np.load(segment_path(self.directory, segment, 'time'), mmap_mode='r')
+            lo, hi = np.searchsorted(times, (start, end))
+            if lo == hi:
+                continue
+            mask = None
+            if roi is not None:
+                mask = np.load(segment_path(self.directory, segment, 'roi'), mmap_mode='r')[lo:hi] == roi
+            for name in columns:
+                data = times if name == 'time' else np.load(segment_path(self.directory, segment, name), mmap_mode='r')
+                data = data[lo:hi]
+                parts[name].append(np.array(data if mask is None else data[mask]))
+        result = {}
+        for name in columns:
+            dtype, shape = COLUMNS[name]
+            result[name] = np.concatenate(parts[name]) if parts[name] else np.empty((0,) + shape, dtype=dtype)
+        return result
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# modules/landmark_tracker.py
+# 关键点光流跟踪模块
+
+import cv2
+import numpy as np
+
+class LandmarkTracker:
+    """关键点光流跟踪器
+
+    在两次MediaPipe推理之间，用稀疏Lucas-Kanade光流传播手势规则用到的关键点，
+    使报警逻辑可以每帧评估，而完整推理的频率可以大幅降低。
+    采用前后向光流一致性检查检测漂移，漂移时停止跟踪，由调用方强制重新推理。
+    """
+
+    def __init__(self, indices, max_fb_error=2.0, win_size=(15, 15), max_level=2, margin=40):
+        """初始化跟踪器
+
+        Args:
+            indices: 需要跟踪的关键点序号数组
+            max_fb_error: 前后向光流误差上限（像素）
+            win_size: LK光流搜索窗口大小
+            max_level: 图像金字塔层数
+            margin: 跟踪窗口在关键点外接矩形基础上的扩展像素数，限制单帧最大位移
+        """
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.max_fb_error = max_fb_error
+        self.margin = margin
+        self._lk_params = dict(
+            winSize=win_size,
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+        self._size = None
+        self._window = None  # 跟踪窗口 (x1, y1, x2, y2)，只在窗口内计算光流
+        self._prev_patch = None
+        self._points = None  # 窗口坐标系下的关键点像素坐标
+        self.landmarks = None
+        # 统计信息
+        self.tracked_frames = 0
+        self.drifts = 0
+
+    @property
+    def active(self):
+        """是否正在跟踪"""
+        return self.landmarks is not None
+
+    def reset(self):
+        """停止跟踪"""
+        self._window = None
+        self._prev_patch = None
+        self._points = None
+        self.landmarks = None
+
+    def _set_window(self, roi_frame, xy):
+        """根据关键点像素坐标设置跟踪窗口，并保存窗口内的灰度图像"""
+        h, w = roi_frame.shape[:2]
+        x1, y1 = np.maximum(xy.min(axis=0) - self.margin, 0).astype(int)
+        x2, y2 = np.minimum(xy.max(axis=0) + self.margin + 1, (w, h)).astype(int)
+        self._window = (x1, y1, x2, y2)
+        self._prev_patch = cv2.cvtColor(roi_frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+        self._points = (xy - (x1, y1)).astype(np.float32).reshape(-1, 1, 2)
+
+    def start(self, roi_frame, landmarks):
+        """用推理结果初始化跟踪
+
+        Args:
+            roi_frame: BGR格式的ROI图像（推理时使用的同一帧）
+            landmarks: 区域内归一化坐标的关键点数组，None表示无手
+        """
+        if landmarks is None or not len(self.indices):
+            self.reset()
+            return
+        h, w = roi_frame.shape[:2]
+        self._size = (w, h)
+        self.landmarks = landmarks.copy()
+        xy = self.landmarks[self.indices, :2] * (w, h)
+        if not ((xy >= 0).all() and (xy < (w, h)).all()):
+            self.reset()
+            return
+        self._set_window(roi_frame, xy)
+
+    def track(self, roi_frame):
+        """将关键点传播到当前帧
+
+        Args:
+            roi_frame: BGR格式的ROI图像
+
+        Returns:
+            np.ndarray: 更新后的关键点数组；漂移或未在跟踪时返回None
+        """
+        if self.landmarks is None:
+            return None
+        h, w = roi_frame.shape[:2]
+        if (w, h) != self._size:
+            self.reset()
+            return None
+
+        x1, y1, x2, y2 = self._window
+        patch = cv2.cvtColor(roi_frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+        points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_patch, patch, self._points, None, **self._lk_params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(patch, self._prev_patch, points, None, **self._lk_params)
+        fb_error = np.linalg.norm((self._points - back).reshape(-1, 2), axis=1)
+        xy = points.reshape(-1, 2)
+        ph, pw = patch.shape
+        inside = (xy[:, 0] >= 0) & (xy[:, 0] < pw) & (xy[:, 1] >= 0) & (xy[:, 1] < ph)
+        if not (status.all() and back_status.all() and inside.all()) or fb_error.max() > self.max_fb_error:
+            self.drifts += 1
+            self.reset()
+            return None
+
+        xy = xy + (x1, y1)
+        self.landmarks[self.indices, :2] = xy / (w, h)
+        self._set_window(roi_frame, xy)
+        self.tracked_frames += 1
+        return self.landmarks
+
+    def get_stats(self):
+        """获取统计信息"""
+        return {'tracked_frames': self.tracked_frames, 'drifts': self.drifts}
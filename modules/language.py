@@ -3,6 +3,7 @@
 # 语言配置模块，负责管理系统的多语言支持
 
 import logging
+import time
 from config import CONFIG
 
 class LanguageManager:
@@ -10,6 +11,10 @@ class LanguageManager:
     
     负责管理系统的多语言支持，提供中英文切换功能。
     使用单例模式确保全局只有一个语言管理器实例。
+    
+    翻译字典在初始化时编译为每种语言一个扁平字典，查询只需一次字典访问。
+    界面控件创建时通过 bind() 登记翻译键和格式化参数，切换语言后 refresh()
+    只需遍历一次登记表即可更新所有文本。
     """
     
     _instance = None
@@ -30,8 +35,13 @@ class LanguageManager:
             "en_US": "English"
         }
         
-        # 初始化翻译字典
+        # 初始化翻译字典，并编译为每种语言一个扁平字典
         self._init_translations()
+        self._compile()
+        # 界面文本登记表：(控件, 选项名, 翻译键, 格式化参数, 文本模板)
+        self._bindings = []
+        # 切换语言时需要重新计算文本的组件回调
+        self._listeners = []
     
     def _init_translations(self):
         """初始化翻译字典"""
@@ -69,6 +79,30 @@ class LanguageManager:
                 "zh_CN": "摄像头",
                 "en_US": "Camera"
             },
+            "ward": {
+                "zh_CN": "病区",
+                "en_US": "Ward"
+            },
+            "unassigned_ward": {
+                "zh_CN": "未分配病区",
+                "en_US": "Unassigned"
+            },
+            "bed": {
+                "zh_CN": "床位",
+                "en_US": "Bed"
+            },
+            "page": {
+                "zh_CN": "第 {} / {} 页",
+                "en_US": "Page {} / {}"
+            },
+            "select_all": {
+                "zh_CN": "全选",
+                "en_US": "Select All"
+            },
+            "select_none": {
+                "zh_CN": "全不选",
+                "en_US": "Select None"
+            },
             
             # 参数设置
             "parameter_settings": {
@@ -87,6 +121,22 @@ class LanguageManager:
                 "zh_CN": "级别",
                 "en_US": "Level"
             },
+            "grid_settings": {
+                "zh_CN": "网格设置",
+                "en_US": "Grid Settings"
+            },
+            "show_grid": {
+                "zh_CN": "显示网格",
+                "en_US": "Show Grid"
+            },
+            "grid_spacing_x": {
+                "zh_CN": "水平间距",
+                "en_US": "Horizontal Spacing"
+            },
+            "grid_spacing_y": {
+                "zh_CN": "垂直间距",
+                "en_US": "Vertical Spacing"
+            },
             "roi_settings": {
                 "zh_CN": "ROI设置",
                 "en_US": "ROI Settings"
@@ -125,6 +175,10 @@ class LanguageManager:
                 "zh_CN": "重置状态",
                 "en_US": "Reset Status"
             },
+            "start_profiler": {
+                "zh_CN": "性能采样",
+                "en_US": "Profile"
+            },
             
             # 状态信息
             "system_status": {
@@ -187,6 +241,14 @@ class LanguageManager:
                 "zh_CN": "状态已重置",
                 "en_US": "Status Reset"
             },
+            "profiler_started": {
+                "zh_CN": "性能采样中（{}秒）",
+                "en_US": "Profiling ({}s)"
+            },
+            "profiler_running": {
+                "zh_CN": "性能采样正在进行",
+                "en_US": "Profiling already in progress"
+            },
             "settings_updated": {
                 "zh_CN": "设置已更新",
                 "en_US": "Settings Updated"
@@ -261,6 +323,15 @@ class LanguageManager:
             }
         }
     
+    def _compile(self):
+        """把 {键: {语言: 文本}} 形式的翻译字典编译为每种语言一个 {键: 文本} 字典"""
+        self._tables = {
+            code: {key: texts.get(code, key) for key, texts in self.translations.items()}
+            for code in self.languages
+        }
+        self._table = self._tables[self.current_language] if self.current_language in self._tables \
+            else self._tables[self.languages[0]]
+    
     def get_text(self, key, *args):
         """获取指定键的当前语言文本
         
@@ -271,10 +342,7 @@ class LanguageManager:
         Returns:
             str: 当前语言的文本
         """
-        if key not in self.translations:
-            return key  # 如果找不到翻译，返回键名本身
-        
-        text = self.translations[key].get(self.current_language, key)
+        text = self._table.get(key, key)  # 如果找不到翻译，返回键名本身
         if args:
             try:
                 return text.format(*args)
@@ -282,6 +350,56 @@ class LanguageManager:
                 return text
         return text
     
+    def bind(self, widget, key, *args, option="text", template="{}"):
+        """登记控件文本的翻译键，并立即设置当前语言的文本
+        
+        Args:
+            widget: 界面控件（任何提供 config(**options) 方法的对象）
+            key: 翻译键
+            *args: 格式化参数
+            option: 控件选项名，默认为 text
+            template: 文本模板，如 "{}:" 在翻译文本后加冒号
+            
+        Returns:
+            控件本身，便于在创建控件时直接登记
+        """
+        binding = (widget, option, key, args, template)
+        self._bindings.append(binding)
+        self._apply_binding(binding)
+        return widget
+    
+    def add_listener(self, callback):
+        """登记切换语言后需要调用的回调，用于文本由多个部分动态组成的组件"""
+        self._listeners.append(callback)
+    
+    def _apply_binding(self, binding):
+        widget, option, key, args, template = binding
+        widget.config(**{option: template.format(self.get_text(key, *args))})
+    
+    def refresh(self):
+        """按当前语言更新所有登记的控件文本并调用回调
+        
+        已销毁的控件会从登记表中移除。
+        
+        Returns:
+            float: 更新耗时（毫秒）
+        """
+        start = time.perf_counter()
+        alive = []
+        for binding in self._bindings:
+            try:
+                self._apply_binding(binding)
+                alive.append(binding)
+            except Exception as e:
+                logging.debug(f"移除失效的界面文本登记 {binding[2]}: {str(e)}")
+        self._bindings = alive
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"更新界面文本失败: {str(e)}")
+        return (time.perf_counter() - start) * 1000
+    
     def switch_language(self, language_code):
         """切换语言
         
@@ -293,6 +411,7 @@ class LanguageManager:
         """
         if language_code in self.languages:
             self.current_language = language_code
+            self._table = self._tables[language_code]
             # 保存语言偏好到配置
             CONFIG.save_language_preference(language_code)
             return True
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# modules/metrics.py
+# Prometheus指标模块
+#
+# 在本机HTTP端口上以Prometheus文本格式（0.0.4）提供 /metrics，供本机的指标采集程序抓取：
+# - 每个摄像头：读取、处理和跳过的帧数，推理次数和耗时分布，断流和重连次数，帧率，线程CPU占用，
+#   帧节拍器的帧间隔、唤醒迟到和各阶段耗时分布（见 modules/frame_pacer.py）
+# - 每个监测区域：报警升级次数，当前报警级别，从帧时间到报警声音提交给声道的延迟分布
+# - 每个线程：最近一次线程CPU采样的占用率（见 modules/thread_cpu.py）
+#
+# 计数器和直方图只由各摄像头线程写入，抓取时在服务线程中直接读取，不与摄像头线程共用任何锁；
+# 读取期间摄像头线程可能正在更新，同一次抓取中的不同指标之间可能相差一帧。
+# 摄像头重新启动后计数从0开始，Prometheus的 rate()/increase() 会按计数器重置处理。
+
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 推理耗时分桶（秒）
+INFERENCE_BUCKETS = (0.002, 0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0)
+# 报警声音延迟分桶（秒）：帧时间到声道开始播放，包含该帧的推理和处理
+SOUND_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class Histogram:
+    """分桶直方图，只由一个线程调用 observe()，其他线程用 snapshot() 读取"""
+
+    def __init__(self, buckets):
+        """初始化直方图
+
+        Args:
+            buckets: 递增的分桶上限，最后自动加上 +Inf
+        """
+        self.buckets = tuple(buckets)
+        # 各分桶（不累积）的计数，最后一个为 +Inf，再之后为观测值之和
+        self._values = [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value):
+        """记录一个观测值"""
+        values = self._values
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self):
+        """读取当前分布
+
+        Returns:
+            tuple: (累积计数列表（与分桶上限对应，最后一个为 +Inf）, 观测值之和)
+        """
+        values = list(self._values)  # 复制列表期间持有GIL，得到一致的副本
+        cumulative, total = [], 0
+        for count in values[:-1]:
+            total += count
+            cumulative.append(total)
+        return cumulative, values[-1]
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+class _Family:
+    """一个指标及其所有样本"""
+
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.samples = []
+
+    def add(self, labels, value):
+        self.samples.append((self.name, labels, value))
+
+    def add_histogram(self, labels, histogram):
+        cumulative, total = histogram.snapshot()
+        for bound, count in zip(histogram.buckets + (float('inf'),), cumulative):
+            self.samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), count))
+        self.samples.append((f"{self.name}_sum", labels, total))
+        self.samples.append((f"{self.name}_count", labels, cumulative[-1]))
+
+    def render(self, lines):
+        if not self.samples:
+            return
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for name, labels, value in self.samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+def render_metrics(processors, cpu_usage=None):
+    """生成Prometheus文本格式的指标
+
+    Args:
+        processors: {摄像头ID: VideoProcessor}，只读取计数器和直方图
+        cpu_usage: 最近一次线程CPU采样结果（ThreadCpuMonitor.sample()），None表示不输出CPU指标
+
+    Returns:
+        str: 指标文本
+    """
+    families = [
+        _Family("icu_frames_captured_total", "counter", "成功读取的视频帧数"),
+        _Family("icu_frames_processed_total", "counter", "完成检测处理的视频帧数"),
+        _Family("icu_frames_skipped_total", "counter", "高负载时只显示不处理的视频帧数"),
+        _Family("icu_inference_total", "counter", "MediaPipe推理次数"),
+        _Family("icu_inference_skipped_total", "counter", "跳过推理的帧数，reason为 presence（无手）或 cache（命中缓存）"),
+        _Family("icu_inference_duration_seconds", "histogram", "单次MediaPipe推理耗时（秒）"),
+        _Family("icu_stream_errors_total", "counter", "视频读取失败（断流）次数"),
+        _Family("icu_reconnects_total", "counter", "断流后重新打开视频源成功的次数"),
+        _Family("icu_camera_fps", "gauge", "平均处理帧率"),
+        _Family("icu_frame_interval_seconds", "histogram", "相邻两帧开始时间的实际间隔（秒）"),
+        _Family("icu_frame_lateness_seconds", "histogram", "帧开始时间相对截止时间的迟到（秒）"),
+        _Family("icu_frame_stage_seconds", "histogram", "每帧各阶段耗时（秒），stage为 capture、processing 或 display"),
+        _Family("icu_frame_pacer_missed_total", "counter", "因某一帧耗时过长而放弃的帧节拍数"),
+        _Family("icu_alarm_escalations_total", "counter", "报警升级次数"),
+        _Family("icu_alarm_level", "gauge", "当前报警级别，0表示未报警"),
+        _Family("icu_alarm_sound_latency_seconds", "histogram", "从帧时间到报警声音提交给声道的延迟（秒）"),
+        _Family("icu_camera_cpu_percent", "gauge", "摄像头各阶段的CPU占用（%，100为一个核心）"),
+        _Family("icu_thread_cpu_percent", "gauge", "各线程的CPU占用（%，100为一个核心）"),
+    ]
+    by_name = {family.name: family for family in families}
+
+    def add(name, labels, value):
+        by_name[name].add(labels, value)
+
+    for camera_id, processor in sorted(list(processors.items())):
+        camera = {'camera': str(camera_id)}
+        add("icu_frames_captured_total", camera, processor.frames_captured)
+        add("icu_frames_processed_total", camera, processor.frames_processed)
+        add("icu_frames_skipped_total", camera, processor.frames_skipped)
+        add("icu_inference_total", camera, processor.inference_calls)
+        add("icu_inference_skipped_total", dict(camera, reason="presence"), processor.inference_skipped)
+        add("icu_inference_skipped_total", dict(camera, reason="cache"), processor.inference_cache_hits)
+        by_name["icu_inference_duration_seconds"].add_histogram(camera, processor.inference_seconds)
+        add("icu_stream_errors_total", camera, processor.stream_errors)
+        add("icu_reconnects_total", camera, processor.reconnects)
+        add("icu_camera_fps", camera, float(processor.fps_counter.get_average()))
+        pacer = processor.pacer
+        by_name["icu_frame_interval_seconds"].add_histogram(camera, pacer.intervals)
+        by_name["icu_frame_lateness_seconds"].add_histogram(camera, pacer.lateness)
+        for stage, histogram in sorted(list(pacer.stages.items())):
+            by_name["icu_frame_stage_seconds"].add_histogram(dict(camera, stage=stage), histogram)
+        add("icu_frame_pacer_missed_total", camera, pacer.missed)
+        for monitor in list(processor.monitors):
+            roi = dict(camera, roi=str(monitor.index), name=monitor.name)
+            add("icu_alarm_escalations_total", roi, monitor.escalations)
+            add("icu_alarm_level", roi, len(monitor.played_sounds))
+            by_name["icu_alarm_sound_latency_seconds"].add_histogram(roi, monitor.sound_latency)
+
+    if cpu_usage is not None:
+        for camera_id, usage in sorted(cpu_usage['cameras'].items()):
+            for stage in ('capture', 'processing', 'display', 'inference'):
+                add("icu_camera_cpu_percent", {'camera': str(camera_id), 'stage': stage}, usage[stage])
+        for thread in cpu_usage['threads']:
+            labels = {'thread': thread['name'], 'tid': str(thread['tid']), 'subsystem': thread['subsystem'],
+                      'camera': '' if thread['camera'] is None else str(thread['camera'])}
+            add("icu_thread_cpu_percent", labels, thread['cpu'])
+
+    lines = []
+    for family in families:
+        family.render(lines)
+    return '\n'.join(lines) + '\n'
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    timeout = 5  # 客户端读取请求的超时（秒），避免慢客户端长时间占用服务线程
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = self.server.collect().encode('utf-8')
+        except Exception as e:
+            logging.error(f"生成指标失败: {str(e)}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"指标请求: {format % args}")
+
+class MetricsServer:
+    """Prometheus指标HTTP服务
+
+    在独立线程中逐个处理抓取请求，每次请求调用 collect() 生成指标文本。
+    """
+
+    def __init__(self, collect, host="127.0.0.1", port=9108):
+        """初始化指标服务
+
+        Args:
+            collect: 返回指标文本的函数，在服务线程中调用
+            host: 监听地址，只应使用本机地址
+            port: TCP端口，0表示自动分配
+        """
+        self.collect = collect
+        self.host = host
+        self.port = port
+        self.address = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """监听端口并在后台线程中开始服务
+
+        Raises:
+            RuntimeError: 当端口无法监听时
+        """
+        try:
+            self._server = HTTPServer((self.host, self.port), _MetricsHandler)
+        except OSError as e:
+            raise RuntimeError(f"指标服务启动失败: {str(e)}")
+        self._server.collect = self.collect
+        self.address = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.5,),
+                                        name="MetricsServer", daemon=True)
+        self._thread.start()
+        logging.info(f"指标服务已启动: http://{self.address[0]}:{self.address[1]}/metrics")
+
+    def stop(self):
+        """停止服务"""
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._thread = None
+        logging.info("指标服务已停止")
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# modules/presence_gate.py
+# 手部存在性快速检测模块（级联检测的第一级）
+
+import cv2
+import numpy as np
+
+# 肤色先验范围（YCrCb空间），用于初始化直方图
+_SKIN_CR_RANGE = (133, 173)
+_SKIN_CB_RANGE = (77, 127)
+_HIST_BINS = 32
+
+class SkinPresenceGate:
+    """基于肤色直方图反向投影的手部存在性检测
+
+    在降采样后的ROI图像上计算肤色像素比例，比例过低时认为区域内没有手，
+    从而跳过代价较高的MediaPipe推理。检测到手部后会用手部区域的颜色更新
+    肤色直方图，以适应病人肤色和病房光照。
+
+    为避免漏检，以下情况直接放行：
+    - 图像几乎没有色度信息（如夜间红外画面）
+    - 距离上次放行超过 max_skip_interval 秒
+    """
+
+    def __init__(self, size=64, min_ratio=0.02, max_skip_interval=1.0, learn_rate=0.2):
+        """初始化存在性检测
+
+        Args:
+            size: 降采样后的图像边长（像素）
+            min_ratio: 判定为有手的最小肤色像素比例
+            max_skip_interval: 连续拒绝的最长时间（秒），超过后强制放行一次
+            learn_rate: 更新肤色直方图的学习率（0-1）
+        """
+        self.size = size
+        self.min_ratio = min_ratio
+        self.max_skip_interval = max_skip_interval
+        self.learn_rate = learn_rate
+        self._hist = np.zeros((_HIST_BINS, _HIST_BINS), dtype=np.float32)
+        bin_width = 256 // _HIST_BINS
+        self._hist[_SKIN_CR_RANGE[0] // bin_width:_SKIN_CR_RANGE[1] // bin_width + 1,
+                   _SKIN_CB_RANGE[0] // bin_width:_SKIN_CB_RANGE[1] // bin_width + 1] = 255
+        self._ycrcb = None
+        self._last_pass = 0
+        self.last_ratio = 0.0
+        # 统计信息
+        self.checks = 0
+        self.rejected = 0
+
+    def _prepare(self, roi_frame):
+        """降采样并转换到YCrCb空间"""
+        small = cv2.resize(roi_frame, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        self._ycrcb = cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb)
+        return self._ycrcb
+
+    def check(self, roi_frame, now):
+        """判断区域内是否可能有手
+
+        Args:
+            roi_frame: BGR格式的ROI图像
+            now: 当前时间戳（秒）
+
+        Returns:
+            bool: 可能有手时返回True，需要进行完整推理
+        """
+        self.checks += 1
+        ycrcb = self._prepare(roi_frame)
+
+        # 无色度信息（红外/灰度画面）时肤色模型无效，直接放行
+        chroma = np.abs(ycrcb[:, :, 1:].astype(np.int16) - 128).mean()
+        if chroma < 3:
+            self._last_pass = now
+            return True
+
+        prob = cv2.calcBackProject([ycrcb], [1, 2], self._hist, [0, 256, 0, 256], 1)
+        self.last_ratio = np.count_nonzero(prob > 127) / prob.size
+        if self.last_ratio >= self.min_ratio or now - self._last_pass >= self.max_skip_interval:
+            self._last_pass = now
+            return True
+
+        self.rejected += 1
+        return False
+
+    def learn(self, roi_frame, landmarks):
+        """用检测到的手部区域更新肤色直方图
+
+        Args:
+            roi_frame: BGR格式的ROI图像
+            landmarks: 区域内归一化坐标的关键点数组
+        """
+        ycrcb = self._prepare(roi_frame)
+        x1, y1 = np.clip(landmarks[:, :2].min(axis=0) * self.size, 0, self.size - 1).astype(int)
+        x2, y2 = np.clip(landmarks[:, :2].max(axis=0) * self.size, 0, self.size - 1).astype(int)
+        if x2 <= x1 or y2 <= y1:
+            return
+        hand = np.ascontiguousarray(ycrcb[y1:y2 + 1, x1:x2 + 1])
+        hist = cv2.calcHist([hand], [1, 2], None, [_HIST_BINS, _HIST_BINS], [0, 256, 0, 256])
+        cv2.normalize(hist, hist, 0, 255, cv2.NORM_MINMAX)
+        self._hist = cv2.addWeighted(self._hist, 1 - self.learn_rate, hist, self.learn_rate, 0)
+
+    def get_stats(self):
+        """获取统计信息"""
+        return {'checks': self.checks, 'rejected': self.rejected}
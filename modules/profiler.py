@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# modules/profiler.py
+# 按需采样分析模块
+#
+# 在不停止监测的情况下，后台线程按间隔用 sys._current_frames() 采集摄像头线程的Python调用栈，
+# 采样窗口结束后以折叠栈格式（每行"线程;外层函数;...;内层函数 次数"）写入日志目录，
+# 可直接用 flamegraph.pl 或 speedscope 生成火焰图。
+# MediaPipe推理和OpenCV函数在C++中执行，显示为调用它们的Python函数（如 _detect_hands）。
+#
+# 开销上限：每次采样期间持有GIL，摄像头线程暂时不能执行Python代码。采样线程记录每次采样的耗时，
+# 并把下一次采样的等待时间延长到 耗时 / max_overhead，保证采样耗时占经过时间的比例不超过 max_overhead。
+
+import collections
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+def collapse_stack(frame, thread_name):
+    """把调用栈转换为折叠栈格式的一行（不含次数）
+
+    Args:
+        frame: 最内层的栈帧
+        thread_name: 线程名，作为最外层
+
+    Returns:
+        str: "线程;函数 (文件:行号);..."，从外到内
+    """
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ';'.join(reversed(labels))
+
+class SamplingProfiler:
+    """按需启动的调用栈采样器
+
+    同一时间只运行一个采样窗口，窗口结束（或 stop()）后写出折叠栈文件，
+    结果摘要保存在 last_result。
+    """
+
+    def __init__(self):
+        self.last_result = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        """是否正在采样"""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self, duration=30.0, interval=0.01, directory="logs", thread_prefix="Camera", max_overhead=0.02):
+        """启动一个采样窗口
+
+        Args:
+            duration: 采样时长（秒）
+            interval: 最短采样间隔（秒）
+            directory: 输出目录
+            thread_prefix: 只采集名称以此开头的线程，空字符串表示所有线程
+            max_overhead: 采样耗时占经过时间的比例上限
+
+        Returns:
+            bool: 是否已启动（已有采样窗口在运行时返回False）
+        """
+        with self._lock:
+            if self.running:
+                logging.warning("采样分析正在进行，忽略新的请求")
+                return False
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(duration, interval, directory, thread_prefix, max_overhead),
+                name="SamplingProfiler", daemon=True)
+            self._thread.start()
+        logging.info(f"采样分析已启动: {duration}秒，线程前缀 '{thread_prefix}'")
+        return True
+
+    def stop(self):
+        """提前结束采样窗口并写出结果"""
+        self._stopping.set()
+        self.join()
+
+    def join(self, timeout=None):
+        """等待当前采样窗口结束"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self, duration, interval, directory, thread_prefix, max_overhead):
+        counts = collections.Counter()
+        samples = 0
+        busy = 0.0
+        own = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + duration
+        while not self._stopping.is_set() and time.perf_counter() < deadline:
+            sample_start = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                name = names.get(ident)
+                if ident != own and name is not None and name.startswith(thread_prefix):
+                    counts[collapse_stack(frame, name)] += 1
+            del frames
+            cost = time.perf_counter() - sample_start
+            busy += cost
+            samples += 1
+            # 等待时间不少于 cost / max_overhead - cost，采样耗时占比不超过上限
+            self._stopping.wait(max(interval, cost / max_overhead - cost))
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.last_result = self._write(counts, directory, samples, elapsed, busy)
+
+    def _write(self, counts, directory, samples, elapsed, busy):
+        """写出折叠栈文件
+
+        Returns:
+            dict: path、samples（采样次数）、stacks（不同调用栈数）、elapsed（秒）、
+                  interval（平均采样间隔，秒）、overhead（采样耗时占比）
+        """
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, time.strftime("profile_%Y%m%d_%H%M%S"))
+        path, suffix = f"{base}.folded", 1
+        while os.path.exists(path):
+            suffix += 1
+            path = f"{base}_{suffix}.folded"
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(counts.items()):
+                f.write(f"{stack} {count}\n")
+        result = {
+            'path': path,
+            'samples': samples,
+            'stacks': len(counts),
+            'elapsed': round(elapsed, 3),
+            'interval': round(elapsed / max(samples, 1), 4),
+            'overhead': round(busy / elapsed, 5)
+        }
+        logging.info(f"采样分析完成: {samples} 次采样，平均间隔 {result['interval'] * 1000:.1f} 毫秒，"
+                     f"采样耗时占比 {result['overhead']:.2%}，已保存到 {path}")
+        return result
+
+def install_signal_trigger(callback):
+    """用 SIGUSR1 触发采样分析（仅POSIX，必须在主线程中调用）
+
+    Args:
+        callback: 收到信号时在主线程中调用的无参函数
+
+    Returns:
+        bool: 是否已安装
+    """
+    if not hasattr(signal, 'SIGUSR1'):
+        return False
+    signal.signal(signal.SIGUSR1, lambda signum, frame: callback())
+    logging.info(f"可用 kill -USR1 {os.getpid()} 触发采样分析")
+    return True
+
+# 全局采样分析器
+profiler = SamplingProfiler()
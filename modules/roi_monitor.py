@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+# modules/roi_monitor.py
+# 监测区域（床位）模块，包含单个区域的手势/报警状态和多区域批量推理拼图
+
+import logging
+import math
+import time
+
+import cv2
+import numpy as np
+
+from config import CONFIG
+from .event_bus import AlarmEscalated, AlarmReset, DetectionStarted, event_bus
+from .gesture_rules import GestureRuleEngine
+from .hand_landmarks import HAND_CONNECTIONS, landmarks_to_array
+from .inference_cache import InferenceCache
+from .landmark_tracker import LandmarkTracker
+from .metrics import SOUND_BUCKETS, Histogram
+from .presence_gate import SkinPresenceGate
+from .status_snapshot import RoiStatus
+
+class RoiMonitor:
+    """监测区域类，一个区域对应一个床位
+
+    主要功能：
+    - 计算并缓存区域在画面中的裁剪坐标
+    - 独立维护手势检测、报警计时和报警声道
+    - 提供区域状态查询接口
+    """
+
+    def __init__(self, camera_id, index, roi, alarm_channel, alarm_sounds, alarm_triggers=None):
+        """初始化监测区域
+
+        Args:
+            camera_id: 所属摄像头ID
+            index: 区域在摄像头中的序号
+            roi: 区域配置字典
+            alarm_channel: 该区域独占的pygame报警声道
+            alarm_sounds: 报警音频字典（同一摄像头的区域共享）
+            alarm_triggers: 报警触发时长（秒），默认为 alarm_sounds 中的全部时长
+        """
+        self.camera_id = camera_id
+        self.index = index
+        self.roi = roi
+        self.name = CONFIG.cameras[camera_id].roi_name(index)
+        self.alarm_channel = alarm_channel
+        self.alarm_sounds = alarm_sounds
+        self.alarm_triggers = tuple(sorted(alarm_sounds if alarm_triggers is None else alarm_triggers))
+        self.gesture_engine = GestureRuleEngine(CONFIG.gesture_rules, params=CONFIG)
+        self.detection_start_time = 0
+        self.alarm_active = False
+        self.played_sounds = set()
+        # 报警指标：升级次数和从帧时间到报警声音提交给声道的延迟
+        self.escalations = 0
+        self.sound_latency = Histogram(SOUND_BUCKETS)
+        self.active_gestures = ()
+        self.landmarks = None  # 区域内归一化坐标的关键点数组，无手时为None
+        self.coords = None  # 缓存的裁剪坐标 (y1, y2, x1, x2)
+        # 级联检测第一级：肤色存在性检测
+        self.presence_gate = None
+        if CONFIG.presence_gate_enabled:
+            self.presence_gate = SkinPresenceGate(
+                size=CONFIG.presence_gate_size,
+                min_ratio=CONFIG.presence_min_skin_ratio,
+                max_skip_interval=CONFIG.presence_max_skip_interval
+            )
+        self._last_presence_learn = 0
+        # 两次推理之间的关键点光流跟踪
+        self.tracker = None
+        if CONFIG.tracking_enabled:
+            self.tracker = LandmarkTracker(self.gesture_engine.landmark_indices,
+                                           max_fb_error=CONFIG.tracking_max_fb_error)
+        self.landmarks_tracked = False  # 当前关键点是否来自光流跟踪
+        self.last_inference = 0  # 本区域最近一次参与完整推理的时间
+        # 画面几乎不变时复用推理结果
+        self.inference_cache = None
+        if CONFIG.inference_cache_enabled:
+            self.inference_cache = InferenceCache(
+                max_entries=CONFIG.inference_cache_size,
+                max_age=CONFIG.inference_cache_max_age,
+                max_distance=CONFIG.inference_cache_max_distance,
+                motion_budget=CONFIG.inference_cache_motion_budget
+            )
+
+    @property
+    def label(self):
+        """日志中使用的区域标识"""
+        return f"Camera {self.camera_id} [{self.name}]"
+
+    def update_coords(self, frame_shape):
+        """根据画面尺寸计算裁剪坐标，确保区域在画面范围内"""
+        h, w = frame_shape[:2]
+        roi = self.roi
+        x1 = max(0, min(roi["x"], w - 1))
+        y1 = max(0, min(roi["y"], h - 1))
+        x2 = min(x1 + roi["w"], w)
+        y2 = min(y1 + roi["h"], h)
+        self.coords = (y1, y2, x1, x2)
+        return self.coords
+
+    def set_roi(self, roi):
+        """更新区域配置，清除依赖旧区域图像的缓存和跟踪状态"""
+        self.roi = roi
+        self.coords = None
+        if self.inference_cache is not None:
+            self.inference_cache.clear()
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def crop(self, frame):
+        """裁剪区域图像（返回视图，不复制数据）"""
+        if self.coords is None:
+            self.update_coords(frame.shape)
+        y1, y2, x1, x2 = self.coords
+        return frame[y1:y2, x1:x2]
+
+    def needs_inference(self, crop, now):
+        """级联检测第一级：判断本区域是否需要进行完整的手部推理
+
+        Args:
+            crop: 区域图像
+            now: 当前时间戳
+
+        Returns:
+            bool: 需要推理时返回True
+        """
+        # 正在跟踪手部时跳过级联检测，保持MediaPipe视频模式的跟踪连续性
+        if self.presence_gate is None or self.landmarks is not None:
+            return True
+        return self.presence_gate.check(crop, now)
+
+    def update_presence_model(self, crop, landmarks, now):
+        """用检测到的手部更新肤色模型（按间隔执行）"""
+        if self.presence_gate is None or landmarks is None:
+            return
+        if now - self._last_presence_learn >= CONFIG.presence_learn_interval:
+            self.presence_gate.learn(crop, landmarks)
+            self._last_presence_learn = now
+
+    def cached_landmarks(self, crop, now):
+        """查询推理结果缓存
+
+        Args:
+            crop: 区域图像
+            now: 当前时间戳
+
+        Returns:
+            tuple: (是否命中, 关键点数组)
+        """
+        if self.inference_cache is None:
+            return False, None
+        return self.inference_cache.lookup(crop, now)
+
+    def cache_result(self, landmarks, now, inference_ms):
+        """保存本区域的推理结果到缓存"""
+        if self.inference_cache is not None:
+            self.inference_cache.store(landmarks, now, inference_ms)
+
+    @property
+    def tracking(self):
+        """是否正在跟踪手部关键点"""
+        return self.tracker is not None and self.tracker.active
+
+    def start_tracking(self, crop, landmarks):
+        """用推理结果（重新）初始化光流跟踪"""
+        self.landmarks_tracked = False
+        if self.tracker is not None:
+            self.tracker.start(crop, landmarks)
+
+    def track(self, frame):
+        """用光流将关键点传播到当前帧
+
+        Args:
+            frame: 原始图像帧
+
+        Returns:
+            np.ndarray: 传播后的关键点数组；发生漂移时返回None
+        """
+        landmarks = self.tracker.track(self.crop(frame))
+        self.landmarks_tracked = landmarks is not None
+        return landmarks
+
+    def detect_gesture(self, landmarks, now):
+        """根据手势规则检测区域内的手势
+
+        Args:
+            landmarks: 区域内归一化坐标的关键点数组，无手时为None
+            now: 当前时间戳
+
+        Returns:
+            bool: 是否检测到需要报警的手势
+        """
+        self.landmarks = landmarks
+        if landmarks is None:
+            self.gesture_engine.clear()
+            self.active_gestures = ()
+            return False
+
+        active = self.gesture_engine.evaluate(landmarks, now)
+        self.active_gestures = self.gesture_engine.active_names(active)
+        return self.gesture_engine.should_alarm(active)
+
+    def update_alarm_state(self, now):
+        """更新报警状态，根据检测持续时间触发不同级别的报警"""
+        if self.detection_start_time == 0:
+            self.detection_start_time = now
+            self.played_sounds.clear()
+            logging.debug(f"{self.label} 开始计时")
+            event_bus.publish(DetectionStarted, self.camera_id, self.index, now)
+        detection_duration = now - self.detection_start_time
+        logging.debug(f"{self.label} 检测时长: {detection_duration:.1f}秒")
+
+        for duration in self.alarm_triggers:
+            if detection_duration >= duration and duration not in self.played_sounds:
+                logging.info(f"{self.label} 触发 {duration}秒 报警")
+                self.alarm_active = True
+                if self.trigger_alarm(duration, continuous=(duration == self.alarm_triggers[-1])):
+                    self.sound_latency.observe(max(0.0, time.time() - now))
+                self.played_sounds.add(duration)
+                self.escalations += 1
+                event_bus.publish(AlarmEscalated, self.camera_id, self.index, now, len(self.played_sounds), duration)
+
+    def set_alarm_triggers(self, triggers):
+        """切换报警触发时长（在摄像头线程中调用，报警音频已按新的触发时长加载）
+
+        已触发的级别中不再存在的时长被移除，正在计时的检测按新的触发时长继续升级。
+
+        Args:
+            triggers: 升序的报警触发时长元组
+        """
+        self.alarm_triggers = triggers
+        self.played_sounds &= set(triggers)
+
+    def trigger_alarm(self, duration, continuous=False):
+        """触发报警声音
+
+        Args:
+            duration: 报警触发的时长级别
+            continuous: 是否持续播放
+
+        Returns:
+            bool: 是否开始播放（声道正在播放上一级报警时不打断）
+        """
+        if self.alarm_channel.get_busy():
+            return False
+        loops = -1 if continuous else 0
+        self.alarm_channel.play(self.alarm_sounds[duration], loops=loops)
+        return True
+
+    def reset_alarm(self):
+        """重置报警状态"""
+        if self.detection_start_time > 0:
+            logging.debug(f"{self.label} 检测到手部消失，立即重置状态")
+            event_bus.publish(AlarmReset, self.camera_id, self.index, time.time(), len(self.played_sounds))
+        self.detection_start_time = 0
+        self.alarm_active = False
+        self.played_sounds.clear()
+        self.alarm_channel.stop()
+
+    def draw_landmarks(self, frame):
+        """在区域对应的画面位置绘制手部关键点"""
+        if self.landmarks is None or self.coords is None:
+            return
+        y1, y2, x1, x2 = self.coords
+        points = self.landmarks[:, :2] * (x2 - x1, y2 - y1) + (x1, y1)
+        points = points.astype(np.int32)
+        if self.landmarks_tracked:
+            # 光流跟踪期间只有规则用到的关键点是最新的
+            for x, y in points[self.tracker.indices]:
+                cv2.circle(frame, (int(x), int(y)), 4, (0, 255, 255), -1)
+            return
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(frame, tuple(points[a]), tuple(points[b]), (224, 224, 224), 2)
+        for x, y in points:
+            cv2.circle(frame, (int(x), int(y)), 3, (0, 0, 255), -1)
+
+    def get_detection_duration(self):
+        """获取当前检测持续时间（秒）"""
+        if self.detection_start_time > 0:
+            return time.time() - self.detection_start_time
+        return 0
+
+    def get_alarm_status(self):
+        """获取报警状态文本"""
+        if self.alarm_active and self.played_sounds:
+            last_played = max(self.played_sounds)
+            if last_played == self.alarm_triggers[-1]:
+                return f"持续报警 ({last_played}秒)"
+            return f"报警触发 ({last_played}秒)"
+        elif self.detection_start_time > 0:
+            return "检测中"
+        return "无报警"
+
+    def snapshot(self):
+        """生成区域状态快照（在摄像头线程中调用）
+
+        Returns:
+            RoiStatus: 不可变的区域状态
+        """
+        return RoiStatus(
+            name=self.name,
+            status=self.get_alarm_status(),
+            detection_start=self.detection_start_time,
+            alarm_level=len(self.played_sounds),
+            played_sounds=tuple(sorted(self.played_sounds)),
+            gestures=self.active_gestures,
+            presence_gate=self.presence_gate.get_stats() if self.presence_gate else None,
+            tracking=self.tracker.get_stats() if self.tracker else None,
+            inference_cache=self.inference_cache.get_stats() if self.inference_cache else None
+        )
+
+    def get_status(self):
+        """获取区域状态
+
+        Returns:
+            dict: 包括区域名称、报警状态、检测时间、报警级别和已触发的报警
+        """
+        return self.snapshot().as_dict()
+
+class RoiMosaic:
+    """多区域批量推理拼图
+
+    MediaPipe Hands 的Python接口每次只处理一张图像，因此将同一帧中各区域的裁剪图
+    按网格拼接为一张图像，只调用一次推理，再按手部中心所在的格子把结果分回各区域。
+    布局只在区域尺寸变化时重新计算，拼图缓冲区重复使用。
+    """
+
+    def __init__(self):
+        """初始化拼图"""
+        self._sizes = None
+        self._tiles = None  # 每个格子的 (x0, y0, w, h)
+        self._buffer = None
+        self._rgb = None
+        self.scores = []  # 最近一次 split() 各区域的手部置信度，无手时为NaN
+
+    def _build_layout(self, sizes):
+        """按近似正方形的网格排列各区域"""
+        cols = math.ceil(math.sqrt(len(sizes)))
+        tiles = []
+        y0 = 0
+        width = 0
+        for row_start in range(0, len(sizes), cols):
+            row = sizes[row_start:row_start + cols]
+            x0 = 0
+            for h, w in row:
+                tiles.append((x0, y0, w, h))
+                x0 += w
+            width = max(width, x0)
+            y0 += max(h for h, _ in row)
+        self._sizes = sizes
+        self._tiles = np.array(tiles, dtype=np.float64)
+        self._buffer = np.zeros((y0, width, 3), dtype=np.uint8)
+        self._rgb = np.empty_like(self._buffer)
+
+    def compose(self, crops, include=None):
+        """将各区域图像拼接为一张RGB图像
+
+        Args:
+            crops: BGR格式的区域图像列表
+            include: 可选的布尔列表，未包含的区域填充为黑色（布局保持不变）
+
+        Returns:
+            np.ndarray: RGB格式的拼图
+        """
+        sizes = tuple(crop.shape[:2] for crop in crops)
+        if sizes != self._sizes:
+            self._build_layout(sizes)
+        if include is None:
+            include = [True] * len(crops)
+        for crop, used, (x0, y0, w, h) in zip(crops, include, self._tiles.astype(int)):
+            self._buffer[y0:y0 + h, x0:x0 + w] = crop if used else 0
+        cv2.cvtColor(self._buffer, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def split(self, results):
+        """将拼图上的检测结果分配回各区域
+
+        Args:
+            results: MediaPipe手部检测结果
+
+        Returns:
+            list: 每个区域的关键点数组（区域内归一化坐标），无手时为None
+        """
+        assigned = [None] * len(self._sizes)
+        self.scores = [float('nan')] * len(self._sizes)
+        if not results.multi_hand_landmarks:
+            return assigned
+        handedness = getattr(results, 'multi_handedness', None)
+
+        height, width = self._buffer.shape[:2]
+        x0, y0, w, h = self._tiles.T
+        for index, hand in enumerate(results.multi_hand_landmarks):
+            points = landmarks_to_array(hand)
+            px = points[:, 0] * width
+            py = points[:, 1] * height
+            cx, cy = px.mean(), py.mean()
+            inside = np.flatnonzero((x0 <= cx) & (cx < x0 + w) & (y0 <= cy) & (cy < y0 + h))
+            if not len(inside):
+                continue
+            tile = inside[0]
+            if assigned[tile] is not None:
+                continue  # 每个区域只保留第一只手，与单区域时 max_num_hands=1 一致
+            points[:, 0] = (px - x0[tile]) / w[tile]
+            points[:, 1] = (py - y0[tile]) / h[tile]
+            points[:, 2] *= width / w[tile]
+            assigned[tile] = points
+            if handedness:
+                self.scores[tile] = handedness[index].classification[0].score
+        return assigned
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# modules/simulation.py
+# 仿真运行模块
+#
+# 在没有摄像头、显示器和声卡的环境中运行完整的摄像头处理流程，用于浸泡测试和报警时序测试：
+# - VirtualClock: 按倍速流逝的虚拟时钟，替换视频处理模块中的 time，sleep() 按比例缩短
+# - SyntheticSource: 按虚拟时钟的帧率产生合成画面的视频源，可定期模拟断流
+# - GestureScript: 按虚拟时间给出监测区域内的手部关键点（合成画面中没有真实的手）
+# - AudioSink: 记录报警声音的播放时间，代替pygame报警声道
+# - alarm_timing(): 按手势开始时间计算报警升级误差和第一次报警声音的延迟
+# - SimulatedProcessor: 使用以上组件的VideoProcessor，通过 CameraManager(processor_factory) 启动
+#
+# 推理、手势规则、报警计时、重连和资源释放都走正常的代码路径，只替换视频源、显示和声音输出。
+# 仅用于测试工具，正常运行时不导入本模块。
+
+import collections
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from .hand_landmarks import NUM_LANDMARKS
+from .landmark_recorder import SOURCE_INFERENCE
+from .video_processor import VideoProcessor
+
+class VirtualClock:
+    """加速的虚拟时钟
+
+    虚拟时间 = 起点 + 实际经过时间 × speed，sleep() 实际只等待 seconds / speed。
+    提供 time 模块中视频处理用到的函数，可通过 install() 替换模块中的 time；
+    perf_counter() 仍为实际时间，推理耗时等统计不受影响。
+    """
+
+    def __init__(self, speed=1.0, start=None):
+        """初始化时钟
+
+        Args:
+            speed: 虚拟时间相对实际时间的倍速
+            start: 虚拟时间起点（Unix时间戳），默认为当前时间
+        """
+        self.speed = float(speed)
+        self._start = time.time() if start is None else start
+        self._origin = time.perf_counter()
+        self._offset = 0.0
+
+    def time(self):
+        """当前虚拟时间"""
+        return self._start + self._offset + (time.perf_counter() - self._origin) * self.speed
+
+    def sleep(self, seconds):
+        """等待虚拟时间 seconds 秒"""
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def advance(self, seconds):
+        """让虚拟时间立即前进 seconds 秒（跳过空闲时段）"""
+        self._offset += seconds
+
+    def monotonic(self):
+        """虚拟单调时间（秒），与 time() 同步前进"""
+        return self.time()
+
+    def monotonic_ns(self):
+        """虚拟单调时间（纳秒）"""
+        return int(self._start * 1e9) + int((self._offset + (time.perf_counter() - self._origin) * self.speed) * 1e9)
+
+    def perf_counter(self):
+        return time.perf_counter()
+
+    def __getattr__(self, name):
+        # 其他函数（如 strftime）与 time 模块相同
+        return getattr(time, name)
+
+    @contextmanager
+    def install(self, *modules):
+        """在 with 块内用本时钟替换各模块的 time
+
+        Args:
+            modules: 模块对象，默认为视频处理和监测区域模块
+        """
+        if not modules:
+            from . import roi_monitor, video_processor
+            modules = (video_processor, roi_monitor)
+        saved = [module.time for module in modules]
+        for module in modules:
+            module.time = self
+        try:
+            yield self
+        finally:
+            for module, original in zip(modules, saved):
+                module.time = original
+
+class SyntheticCapture:
+    """合成视频源的捕获对象（与 cv2.VideoCapture 的接口相同）
+
+    read() 按虚拟时钟的帧率等待下一帧，处理跟不上时与摄像头一样丢弃过期的帧。
+    画面是渐变背景加一条逐帧移动的亮条，每帧内容不同（推理缓存不会全部命中）。
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.clock = source.clock
+        self._interval = 1.0 / source.fps
+        self._opened_at = self.clock.time()
+        self._next = self._opened_at
+        self._released = False
+        self.frames = 0
+        self.dropped = 0
+
+    def isOpened(self):
+        return not self._released
+
+    def read(self):
+        if self._released:
+            return False, None
+        now = self.clock.time()
+        disconnect = self.source.disconnect_interval
+        if disconnect and now - self._opened_at >= disconnect:
+            # 模拟断流：直到重新打开前都读取失败
+            return False, None
+        if now < self._next:
+            self.clock.sleep(self._next - now)
+        else:
+            # 处理跟不上时只返回最新的一帧
+            missed = int((now - self._next) / self._interval)
+            self.dropped += missed
+            self._next += missed * self._interval
+        self._next += self._interval
+        self.frames += 1
+        return True, self.source.render(self.frames)
+
+    def grab(self):
+        return self.read()[0]
+
+    def get(self, prop):
+        import cv2
+        width, height = self.source.resolution
+        return {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height,
+                cv2.CAP_PROP_FPS: self.source.fps}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.source.released += 1
+
+class SyntheticSource:
+    """合成视频源
+
+    每次 open() 创建一个新的捕获对象，统计打开和释放的次数，用于发现未释放的捕获对象。
+    """
+
+    def __init__(self, clock, resolution=(320, 240), fps=30.0, disconnect_interval=None):
+        """初始化视频源
+
+        Args:
+            clock: VirtualClock
+            resolution: 画面尺寸 (宽, 高)
+            fps: 帧率（虚拟时间）
+            disconnect_interval: 每次打开后经过该虚拟时长（秒）断流，None为不断流
+        """
+        self.clock = clock
+        self.resolution = tuple(resolution)
+        self.fps = fps
+        self.disconnect_interval = disconnect_interval
+        self.opened = 0
+        self.released = 0
+        width, height = self.resolution
+        gradient = np.linspace(40, 200, width, dtype=np.float32)
+        self._background = np.repeat(np.repeat(gradient[None, :, None], height, axis=0), 3, axis=2).astype(np.uint8)
+
+    def open(self):
+        """打开一个新的捕获对象"""
+        self.opened += 1
+        return SyntheticCapture(self)
+
+    @property
+    def open_captures(self):
+        """尚未释放的捕获对象数"""
+        return self.opened - self.released
+
+    def render(self, index):
+        """生成第 index 帧"""
+        frame = self._background.copy()
+        x = (index * 4) % frame.shape[1]
+        frame[:, x:x + 8] = 255
+        return frame
+
+def hand_landmarks(thumb_pinky=0.1):
+    """生成拇指与小指指尖距离为 thumb_pinky（区域内归一化坐标）的关键点
+
+    距离小于 gesture_threshold 时满足默认的 thumb_pinky 手势规则。
+    """
+    landmarks = np.full((NUM_LANDMARKS, 3), 0.5, dtype=np.float32)
+    landmarks[:, 2] = 0.0
+    landmarks[4, 0] = 0.5 - thumb_pinky / 2
+    landmarks[20, 0] = 0.5 + thumb_pinky / 2
+    return landmarks
+
+class GestureScript:
+    """按虚拟时间给出一个监测区域内的手部关键点
+
+    Example:
+        # 从 start 开始，每120秒出现一次持续35秒的报警手势
+        script = GestureScript([(0, 35, hand_landmarks(0.1))], start=clock.time(), period=120)
+    """
+
+    def __init__(self, segments, start, period=None):
+        """初始化脚本
+
+        Args:
+            segments: [(开始, 结束, 关键点)]，时间相对 start（秒），关键点为None表示没有手
+            start: 脚本起点（虚拟时间戳）
+            period: 重复周期（秒），None为不重复
+        """
+        self.segments = sorted(segments, key=lambda segment: segment[0])
+        self.start = start
+        self.period = period
+
+    def landmarks_at(self, now):
+        """获取虚拟时间 now 的关键点，没有手时返回None"""
+        offset = now - self.start
+        if self.period:
+            offset %= self.period
+        for begin, end, landmarks in self.segments:
+            if begin <= offset < end:
+                return landmarks
+            if offset < begin:
+                break
+        return None
+
+    def onsets(self, until):
+        """获取 until 之前每次出现手（从无手变为有手）的虚拟时间
+
+        Args:
+            until: 截止时间（虚拟时间戳）
+
+        Returns:
+            list: 手势开始时间，升序
+        """
+        starts = []
+        previous_end = None
+        for begin, end, landmarks in self.segments:
+            if landmarks is not None:
+                if begin != previous_end:
+                    starts.append(begin)
+                previous_end = end
+        times = []
+        cycle_start = self.start
+        while starts and cycle_start < until:
+            times.extend(cycle_start + begin for begin in starts if cycle_start + begin < until)
+            if not self.period:
+                break
+            cycle_start += self.period
+        return times
+
+class AudioSink:
+    """报警声音输出的记录器，代替pygame报警声道
+
+    Attributes:
+        plays: 最近的播放记录 (虚拟时间, 摄像头ID, 区域序号, 报警触发时长)
+        total: 累计播放次数
+    """
+
+    def __init__(self, clock, max_records=10000):
+        """初始化记录器
+
+        Args:
+            clock: VirtualClock
+            max_records: 最多保留的播放记录数（长时间运行时不无限增长）
+        """
+        self.clock = clock
+        self.plays = collections.deque(maxlen=max_records)
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def channel(self, camera_id, roi, sounds):
+        """为监测区域创建报警声道
+
+        Args:
+            camera_id: 摄像头ID
+            roi: 区域序号
+            sounds: 报警音频字典 {触发时长: pygame.mixer.Sound}
+        """
+        return RecordingChannel(self, camera_id, roi, sounds)
+
+    def record(self, camera_id, roi, trigger):
+        with self._lock:
+            self.plays.append((self.clock.time(), camera_id, roi, trigger))
+            self.total += 1
+
+class RecordingChannel:
+    """记录播放时间的报警声道（与 pygame.mixer.Channel 的接口相同）
+
+    播放期间 get_busy() 为True，时长与音频文件相同，循环播放时直到 stop()。
+    """
+
+    def __init__(self, sink, camera_id, roi, sounds):
+        self.sink = sink
+        self.camera_id = camera_id
+        self.roi = roi
+        # 在创建时读取音频时长：摄像头停止时会关闭混音器，之后不能再访问 Sound
+        self._sounds = {id(sound): (trigger, sound.get_length()) for trigger, sound in sounds.items()}
+        # 报警设置热更新时处理器原地替换共享的音频字典，播放新音频时再读取时长
+        self._shared = sounds
+        self._busy_until = 0.0
+
+    def play(self, sound, loops=0):
+        trigger, length = self._sounds.get(id(sound), (None, 0.0))
+        if self._shared.get(trigger) is not sound:
+            for candidate_trigger, candidate in self._shared.items():
+                if candidate is sound:
+                    trigger, length = candidate_trigger, sound.get_length()
+                    self._sounds[id(sound)] = (trigger, length)
+        now = self.sink.clock.time()
+        self._busy_until = math.inf if loops < 0 else now + length * (loops + 1)
+        self.sink.record(self.camera_id, self.roi, trigger)
+
+    def get_busy(self):
+        return self.sink.clock.time() < self._busy_until
+
+    def stop(self):
+        self._busy_until = 0.0
+
+class Simulation:
+    """一组仿真摄像头的共享环境
+
+    Example:
+        simulation = Simulation(VirtualClock(speed=100))
+        simulation.sources[0] = SyntheticSource(simulation.clock)
+        manager = CameraManager(processor_factory=simulation.processor)
+        with simulation.clock.install():
+            manager.start_camera(0)
+    """
+
+    def __init__(self, clock):
+        """初始化仿真环境
+
+        Args:
+            clock: VirtualClock
+        """
+        self.clock = clock
+        self.sources = {}  # {摄像头ID: SyntheticSource}
+        self.scripts = {}  # {摄像头ID: [每个区域的 GestureScript 或 None]}
+        self.sink = AudioSink(clock)
+        self.display = False
+
+    def processor(self, camera_id, stop_event):
+        """处理器工厂，用于 CameraManager(processor_factory=...)"""
+        return SimulatedProcessor(camera_id, stop_event, self)
+
+def alarm_timing(onsets, escalations, plays, triggers):
+    """把每次手势开始与之后的报警升级事件和报警声音对应起来
+
+    手势开始到下一次手势开始之间的事件归属于这次手势，每个级别取第一次升级。
+    预期的升级时间为手势开始 + 触发时长。
+
+    Args:
+        onsets: {(摄像头ID, 区域序号): [手势开始时间]}
+        escalations: AlarmEscalated 事件列表
+        plays: AudioSink.plays
+        triggers: 报警触发时长列表
+
+    Returns:
+        dict: errors {触发时长: [实际 - 预期（秒）]}、first_sound [手势开始到第一次报警声音（秒）]、
+              missed 应触发但没有升级事件的级别数、silent 没有报警声音的手势数
+    """
+    errors = {trigger: [] for trigger in triggers}
+    first_sound = []
+    missed = silent = 0
+    for key, starts in onsets.items():
+        events = [event for event in escalations if (event.camera_id, event.roi) == key]
+        sounds = [play[0] for play in plays if (play[1], play[2]) == key]
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else math.inf
+            fired = {}
+            for event in events:
+                if start <= event.timestamp < end:
+                    fired.setdefault(event.duration, event.timestamp)
+            for trigger in triggers:
+                if trigger in fired:
+                    errors[trigger].append(fired[trigger] - (start + trigger))
+                else:
+                    missed += 1
+            heard = [t for t in sounds if start <= t < end]
+            if heard:
+                first_sound.append(min(heard) - start)
+            else:
+                silent += 1
+    return {'errors': errors, 'first_sound': first_sound, 'missed': missed, 'silent': silent}
+
+class SimulatedProcessor(VideoProcessor):
+    """使用合成视频源、脚本手势和记录声道的视频处理器"""
+
+    def __init__(self, camera_id, stop_event, simulation):
+        """初始化处理器
+
+        Args:
+            camera_id: 摄像头ID
+            stop_event: 停止事件
+            simulation: Simulation
+        """
+        self.simulation = simulation
+        super().__init__(camera_id, stop_event)
+        for monitor in self.monitors:
+            monitor.alarm_channel = simulation.sink.channel(camera_id, monitor.index, self.alarm_sounds)
+
+    def _open_source(self):
+        return self.simulation.sources[self.camera_id].open()
+
+    def _detect_hands(self, frame, now, include=None):
+        """先对合成画面正常推理，再用脚本中的关键点覆盖参与检测且有手的区域"""
+        hands = super()._detect_hands(frame, now, include)
+        for i, script in enumerate(self.simulation.scripts.get(self.camera_id, ())):
+            landmarks = script.landmarks_at(now) if script is not None else None
+            if landmarks is not None and i < len(hands) and (include is None or include[i]):
+                hands[i] = landmarks
+                self._hand_sources[i] = SOURCE_INFERENCE
+        return hands
+
+    def _display_frame(self, frame):
+        if self.simulation.display:
+            super()._display_frame(frame)
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# modules/station_server.py
+# 护士站推送服务模块
+#
+# 在本机TCP端口或Unix套接字上提供基于asyncio的推送服务，中央护士站可以同时
+# 订阅多台床旁电脑的状态和报警事件，并远程启动、停止摄像头或暂停、重置报警。
+#
+# 协议为每行一个JSON对象（UTF-8）：
+# - 服务端 -> 客户端
+#   {"type": "hello", "seq": n, "cameras": {摄像头ID: 状态}}          连接后发送一次完整状态
+#   {"type": "status", "seq": n, "cameras": {摄像头ID: 变化的字段}}     之后只发送变化的字段，
+#                                                                      摄像头停止时值为 null
+#   {"type": "event", "event": "detection"|"alarm"|"reset"|"error", "camera": id, "roi": 区域序号, "time": t, ...}
+#                                                                      其余字段见 modules/event_bus.py
+#   {"type": "ack", "id": 请求ID, "ok": true|false, "error": 错误信息}
+# - 客户端 -> 服务端
+#   {"cmd": "start"|"stop"|"pause"|"reset", "camera": 摄像头ID（可选，省略表示全部）, "id": 请求ID（可选）}
+#
+# 摄像头状态格式：{"status": 报警状态, "fps": 帧率, "level": 最高报警级别,
+#                 "rois": [[区域名称, 报警级别, 检测开始时间戳]]}
+# JSON对象的键只能是字符串，摄像头ID以字符串形式出现。
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+
+def encode_status(status):
+    """把摄像头状态快照编码为紧凑的字典
+
+    Args:
+        status: CameraStatus 状态快照
+
+    Returns:
+        dict: 可序列化为JSON的摄像头状态
+    """
+    return {
+        'status': status.status,
+        'fps': round(status.fps, 1),
+        'level': status.alarm_level,
+        'rois': [[roi.name, roi.alarm_level, round(roi.detection_start, 1)] for roi in status.rois]
+    }
+
+def status_delta(previous, current):
+    """计算两次编码状态之间的差异
+
+    Args:
+        previous: 上次发送的 {摄像头ID: 编码状态}
+        current: 当前的 {摄像头ID: 编码状态}
+
+    Returns:
+        dict: {摄像头ID: 变化的字段}，新出现的摄像头为完整状态，已停止的摄像头为None
+    """
+    delta = {}
+    for cam_id, state in current.items():
+        old = previous.get(cam_id)
+        if old is None:
+            delta[cam_id] = state
+            continue
+        changed = {key: value for key, value in state.items() if old.get(key) != value}
+        if changed:
+            delta[cam_id] = changed
+    for cam_id in previous.keys() - current.keys():
+        delta[cam_id] = None
+    return delta
+
+def status_events(previous, current, now):
+    """根据两次编码状态的差异生成检测和报警事件
+
+    Args:
+        previous: 上次的 {摄像头ID: 编码状态}
+        current: 当前的 {摄像头ID: 编码状态}
+        now: 事件时间戳
+
+    Returns:
+        list: 事件消息列表
+    """
+    events = []
+    for cam_id, state in current.items():
+        old = previous.get(cam_id)
+        if old is None or len(old['rois']) != len(state['rois']):
+            continue
+        for index, ((_, level, start), (_, old_level, old_start)) in enumerate(zip(state['rois'], old['rois'])):
+            if level > old_level:
+                event = 'alarm'
+            elif start and not old_start:
+                event = 'detection'
+            elif not level and not start and (old_level or old_start):
+                event = 'reset'
+            else:
+                continue
+            events.append({'type': 'event', 'event': event, 'camera': int(cam_id), 'roi': index,
+                           'level': level, 'time': round(now, 3)})
+    return events
+
+class _Client:
+    """已连接的订阅客户端"""
+
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.peer = writer.get_extra_info('peername') or 'unix'
+        self.closed = False
+
+class StationServer:
+    """护士站推送服务
+
+    在独立线程中运行asyncio事件循环，按固定间隔读取各摄像头的状态快照，
+    向所有订阅客户端推送增量状态和检测、报警事件。
+    提供事件总线订阅时转发总线上的事件（不会遗漏两次推送之间的事件），
+    否则根据相邻两次状态的差异生成事件。
+
+    每个客户端拥有有界发送队列，队列满（客户端读取过慢）时断开该客户端，
+    避免占用内存或拖慢其他客户端；客户端重连后会重新收到完整状态。
+    客户端命令通过 commands 中的回调执行，回调在服务线程中调用，应尽快返回。
+    """
+
+    def __init__(self, snapshot_source, commands=None, host="127.0.0.1", port=8765, path=None,
+                 queue_size=64, interval=0.25, events=None):
+        """初始化推送服务
+
+        Args:
+            snapshot_source: 返回 {摄像头ID: CameraStatus} 的函数
+            commands: {命令名: 回调}，回调参数为摄像头ID（None表示全部），失败时抛出异常
+            host: 监听地址，只应使用本机地址
+            port: TCP端口，0表示自动分配
+            path: Unix套接字路径，设置后不监听TCP端口
+            queue_size: 每个客户端的最大待发送消息数
+            interval: 状态推送间隔（秒）
+            events: 可选的事件总线订阅（Subscription），服务停止时取消订阅
+        """
+        self.snapshot_source = snapshot_source
+        self.commands = commands or {}
+        self.host = host
+        self.port = port
+        self.path = path
+        self.queue_size = queue_size
+        self.interval = interval
+        self.events = events
+        self.address = None
+        self._clients = set()
+        self._state = {}
+        self._seq = 0
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        # 统计信息
+        self.messages_sent = 0
+        self.clients_dropped = 0
+
+    def start(self):
+        """在后台线程中启动服务，监听成功后返回
+
+        Raises:
+            RuntimeError: 当服务启动失败时
+        """
+        self._thread = threading.Thread(target=self._run, name="StationServer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError(f"护士站推送服务启动失败: {self._error}")
+        logging.info(f"护士站推送服务已启动: {self.address}")
+
+    def stop(self):
+        """停止服务并断开所有客户端"""
+        if self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join()
+            logging.info("护士站推送服务已停止")
+        self._thread = None
+        if self.events is not None:
+            self.events.close()
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            self._error = e
+            logging.error(f"护士站推送服务异常: {str(e)}")
+        finally:
+            self._ready.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self.path and hasattr(socket, 'AF_UNIX'):
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+            self.address = self.path
+        else:
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            self.address = server.sockets[0].getsockname()[:2]
+        self._ready.set()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    self._poll()
+        finally:
+            server.close()
+            for client in list(self._clients):
+                self._drop(client)
+            await server.wait_closed()
+            if self.path and os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def _poll(self):
+        """读取最新状态快照，推送增量状态和事件"""
+        try:
+            snapshots = self.snapshot_source()
+        except Exception as e:
+            logging.error(f"读取摄像头状态失败: {str(e)}")
+            return
+        current = {str(cam_id): encode_status(status) for cam_id, status in snapshots.items()}
+        now = max((status.timestamp for status in snapshots.values()), default=0)
+        if self.events is not None:
+            events = [dict(type='event', **event.as_dict()) for event in self.events.drain()]
+        else:
+            events = status_events(self._state, current, now)
+        delta = status_delta(self._state, current)
+        self._state = current
+        if delta:
+            self._seq += 1
+            self._broadcast({'type': 'status', 'seq': self._seq, 'cameras': delta})
+        for event in events:
+            self._broadcast(event)
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def _broadcast(self, message):
+        """把消息放入所有客户端的发送队列，只序列化一次"""
+        if not self._clients:
+            return
+        data = self._encode(message)
+        for client in list(self._clients):
+            self._enqueue(client, data)
+
+    def _enqueue(self, client, data):
+        try:
+            client.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logging.warning(f"护士站客户端 {client.peer} 接收过慢，已断开连接")
+            self.clients_dropped += 1
+            self._drop(client)
+
+    def _drop(self, client):
+        """断开客户端"""
+        if client.closed:
+            return
+        client.closed = True
+        self._clients.discard(client)
+        client.writer.close()
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(writer, self.queue_size)
+        self._clients.add(client)
+        logging.info(f"护士站客户端已连接: {client.peer}")
+        self._enqueue(client, self._encode({'type': 'hello', 'seq': self._seq, 'cameras': self._state}))
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            while not client.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self._execute(line)
+                if reply is not None:
+                    self._enqueue(client, self._encode(reply))
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logging.debug(f"护士站客户端 {client.peer} 连接异常: {str(e)}")
+        finally:
+            self._drop(client)
+            sender.cancel()
+            logging.info(f"护士站客户端已断开: {client.peer}")
+
+    async def _send_loop(self, client):
+        try:
+            while not client.closed:
+                data = await client.queue.get()
+                client.writer.write(data)
+                await client.writer.drain()
+                self.messages_sent += 1
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._drop(client)
+
+    def _execute(self, line):
+        """执行客户端命令
+
+        Args:
+            line: 一行JSON命令
+
+        Returns:
+            dict: 应答消息
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'type': 'ack', 'id': None, 'ok': False, 'error': "无效的JSON"}
+        if not isinstance(request, dict):
+            return {'type': 'ack', 'id': None, 'ok': False, 'error': "无效的命令"}
+        request_id = request.get('id')
+        command = self.commands.get(request.get('cmd'))
+        if command is None:
+            return {'type': 'ack', 'id': request_id, 'ok': False, 'error': f"未知命令: {request.get('cmd')}"}
+        camera = request.get('camera')
+        if camera is not None and (not isinstance(camera, int) or isinstance(camera, bool)):
+            return {'type': 'ack', 'id': request_id, 'ok': False, 'error': f"无效的摄像头ID: {camera}"}
+        try:
+            command(camera)
+        except Exception as e:
+            return {'type': 'ack', 'id': request_id, 'ok': False, 'error': str(e)}
+        logging.info(f"护士站命令已执行: {request.get('cmd')} 摄像头={camera}")
+        return {'type': 'ack', 'id': request_id, 'ok': True}
+
+    def get_stats(self):
+        """获取统计信息"""
+        return {
+            'clients': len(self._clients),
+            'messages_sent': self.messages_sent,
+            'clients_dropped': self.clients_dropped
+        }
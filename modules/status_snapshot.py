@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# modules/status_snapshot.py
+# 摄像头状态快照模块
+#
+# 摄像头线程定期把当前状态打包为不可变的快照对象，通过一次引用赋值发布；
+# 界面线程和其他读取方只读取最新快照，不加锁，也不接触摄像头线程正在修改的对象。
+
+import time
+
+class _Frozen:
+    """不可变对象基类：构造完成后禁止修改属性"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 是不可变对象")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} 是不可变对象")
+
+    def _init(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+class RoiStatus(_Frozen):
+    """单个监测区域（床位）的状态快照
+
+    Attributes:
+        name: 区域名称
+        status: 报警状态文本
+        detection_start: 检测开始时间戳，未在检测时为0
+        alarm_level: 报警级别（已触发的报警数）
+        played_sounds: 已触发的报警时长（有序元组）
+        gestures: 当前成立的手势规则名称
+        presence_gate: 级联检测统计，未启用时为None
+        tracking: 光流跟踪统计，未启用时为None
+        inference_cache: 推理结果缓存统计，未启用时为None
+    """
+    __slots__ = ('name', 'status', 'detection_start', 'alarm_level', 'played_sounds',
+                 'gestures', 'presence_gate', 'tracking', 'inference_cache')
+
+    def __init__(self, name, status, detection_start, alarm_level, played_sounds, gestures,
+                 presence_gate=None, tracking=None, inference_cache=None):
+        self._init(name=name, status=status, detection_start=detection_start,
+                   alarm_level=alarm_level, played_sounds=played_sounds, gestures=gestures,
+                   presence_gate=presence_gate, tracking=tracking, inference_cache=inference_cache)
+
+    @property
+    def detection_time(self):
+        """读取时刻的检测持续时间（秒）"""
+        if self.detection_start > 0:
+            return time.time() - self.detection_start
+        return 0
+
+    def as_dict(self):
+        """转换为 get_status() 使用的字典格式"""
+        return {
+            'name': self.name,
+            'status': self.status,
+            'detection_time': self.detection_time,
+            'alarm_level': self.alarm_level,
+            'played_sounds': self.played_sounds,
+            'gestures': self.gestures,
+            'presence_gate': self.presence_gate,
+            'tracking': self.tracking,
+            'inference_cache': self.inference_cache
+        }
+
+class CameraStatus(_Frozen):
+    """摄像头状态快照
+
+    Attributes:
+        camera_id: 摄像头ID
+        timestamp: 快照发布时间戳
+        status: 报警状态文本
+        fps: 平均帧率
+        rois: 各监测区域的 RoiStatus 元组
+        inference_calls: 实际推理次数
+        inference_skipped: 被级联检测跳过的推理次数
+        inference_cache: 推理结果缓存汇总统计，未启用时为None
+        config_version: 正在使用的配置版本号
+        config_apply_ms: 最近一次配置热更新从发布到生效的延迟（毫秒），未热更新时为None
+        cpu: 最近一次线程CPU采样中该摄像头的占用（%，100为一个核心）
+             {capture, processing, display, inference, total, threads}，未启用时为None
+    """
+    __slots__ = ('camera_id', 'timestamp', 'status', 'fps', 'rois',
+                 'inference_calls', 'inference_skipped', 'inference_cache',
+                 'config_version', 'config_apply_ms', 'cpu')
+
+    def __init__(self, camera_id, timestamp, status, fps, rois,
+                 inference_calls=0, inference_skipped=0, inference_cache=None,
+                 config_version=0, config_apply_ms=None, cpu=None):
+        self._init(camera_id=camera_id, timestamp=timestamp, status=status, fps=fps,
+                   rois=tuple(rois), inference_calls=inference_calls,
+                   inference_skipped=inference_skipped, inference_cache=inference_cache,
+                   config_version=config_version, config_apply_ms=config_apply_ms, cpu=cpu)
+
+    @property
+    def alarm_level(self):
+        """所有区域中最高的报警级别"""
+        return max((roi.alarm_level for roi in self.rois), default=0)
+
+    @property
+    def gestures(self):
+        """所有区域当前成立的手势规则名称"""
+        return tuple(g for roi in self.rois for g in roi.gestures)
+
+    def as_dict(self):
+        """转换为 get_status() 使用的字典格式"""
+        rois = [roi.as_dict() for roi in self.rois]
+        return {
+            'status': self.status,
+            'fps': self.fps,
+            'detection_time': max((roi['detection_time'] for roi in rois), default=0),
+            'alarm_level': self.alarm_level,
+            'gestures': self.gestures,
+            'rois': rois,
+            'inference_calls': self.inference_calls,
+            'inference_skipped': self.inference_skipped,
+            'inference_cache': self.inference_cache,
+            'config_version': self.config_version,
+            'config_apply_ms': self.config_apply_ms,
+            'cpu': self.cpu
+        }
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# modules/thread_budget.py
+# CPU亲和性和线程预算模块
+#
+# 多个摄像头同时运行时，每个MediaPipe图的调度线程池（默认与核心数相同）、XNNPACK推理线程、
+# OpenCV的全局线程池和界面线程互相竞争CPU。本模块按可用核心数和摄像头数制定线程预算：
+# - 预留一个核心给界面（Tk主线程）和声音线程，摄像头相关线程不使用该核心（核心数不足时不预留）
+# - 其余核心按 thread_pool_size 的总线程数平均分给各摄像头，得到每个摄像头的
+#   MediaPipe图调度线程数和XNNPACK推理线程数，以及进程级的 cv2.setNumThreads()；
+#   OpenCV线程池由所有摄像头共用，绑定核心时关闭（设为1），避免线程池随创建它的摄像头线程绑定到少数核心
+# - 可选把每个摄像头的处理线程和推理线程绑定到分给它的核心（os.sched_setaffinity，仅Linux）
+# 绑定利用新线程继承创建者CPU亲和性的特点：创建处理器和启动摄像头线程时临时绑定当前线程，
+# 结束后恢复；pygame在第一次创建处理器时启动的声音线程恢复为不绑定。
+
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from .thread_cpu import read_task_times, supported
+
+def available_cpus():
+    """获取本进程可以使用的CPU编号
+
+    Returns:
+        list: 排序后的CPU编号（容器或 taskset 限制后的结果）
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+@dataclass(frozen=True)
+class ThreadPlan:
+    """线程预算
+
+    Attributes:
+        cpus: 本进程可用的CPU编号
+        reserved: 预留给界面和声音线程的CPU编号，不预留时为空
+        camera_cpus: {摄像头ID: 分给该摄像头的CPU编号}
+        camera_threads: 每个摄像头的MediaPipe图调度线程数和XNNPACK推理线程数
+        opencv_threads: cv2.setNumThreads() 的线程数
+        pin: 是否把摄像头线程绑定到 camera_cpus
+    """
+    cpus: tuple
+    reserved: tuple
+    camera_cpus: dict = field(default_factory=dict)
+    camera_threads: int = 1
+    opencv_threads: int = 1
+    pin: bool = False
+
+    def describe(self):
+        """日志中使用的摘要"""
+        parts = [f"{len(self.cpus)} 个核心", f"每个摄像头 {self.camera_threads} 个推理线程",
+                 f"OpenCV {self.opencv_threads} 个线程"]
+        if self.reserved:
+            parts.append(f"预留核心 {list(self.reserved)} 给界面和声音")
+        if self.pin:
+            parts.append("绑定 " + ", ".join(f"摄像头{camera_id}->{list(cpus)}"
+                                            for camera_id, cpus in sorted(self.camera_cpus.items())))
+        return "，".join(parts)
+
+def plan_threads(cameras, pool_size, cpus=None, reserve_ui=True, pin=False):
+    """按核心数和摄像头数制定线程预算
+
+    Args:
+        cameras: 摄像头数量
+        pool_size: 所有摄像头的线程总数上限（CONFIG.thread_pool_size）
+        cpus: 可用的CPU编号，默认为 available_cpus()
+        reserve_ui: 是否预留一个核心给界面和声音线程
+        pin: 是否把摄像头线程绑定到分给它的核心
+
+    Returns:
+        ThreadPlan: 线程预算
+    """
+    cpus = tuple(available_cpus() if cpus is None else cpus)
+    cameras = max(1, cameras)
+    # 每个摄像头至少要有一个核心时才预留，否则预留只会让摄像头之间的竞争更激烈
+    reserved = cpus[:1] if reserve_ui and len(cpus) > cameras else ()
+    workers = cpus[len(reserved):]
+    camera_threads = max(1, min(max(1, pool_size), len(workers)) // cameras)
+    camera_cpus = {}
+    for camera_id in range(cameras):
+        if len(workers) >= cameras:
+            # 核心按摄像头连续分组，余下的核心分给编号小的摄像头
+            size, extra = divmod(len(workers), cameras)
+            start = camera_id * size + min(camera_id, extra)
+            camera_cpus[camera_id] = workers[start:start + size + (camera_id < extra)]
+        else:
+            camera_cpus[camera_id] = (workers[camera_id % len(workers)],)
+    return ThreadPlan(cpus=cpus, reserved=reserved, camera_cpus=camera_cpus, camera_threads=camera_threads,
+                      opencv_threads=1 if pin else camera_threads, pin=pin and hasattr(os, 'sched_setaffinity'))
+
+class ThreadBudget:
+    """当前生效的线程预算
+
+    apply() 之前 plan 为None，各模块保持库的默认线程数且不绑定核心。
+    """
+
+    def __init__(self):
+        self.plan = None
+
+    def apply(self, plan):
+        """应用线程预算（在启动摄像头之前调用）
+
+        为了不在启动时导入cv2，OpenCV线程数在创建处理器时设置。
+
+        Args:
+            plan: ThreadPlan
+        """
+        self.plan = plan
+        logging.info(f"线程预算: {plan.describe()}")
+
+    def clear(self):
+        """取消线程预算（之后创建的处理器恢复库的默认线程数）"""
+        self.plan = None
+
+    def camera_threads(self):
+        """每个摄像头的MediaPipe图调度线程数和推理线程数，未应用预算时为None"""
+        plan = self.plan
+        return None if plan is None else plan.camera_threads
+
+    def opencv_threads(self):
+        """cv2.setNumThreads() 的线程数，未应用预算时为None"""
+        plan = self.plan
+        return None if plan is None else plan.opencv_threads
+
+    @contextmanager
+    def pinned(self, camera_id):
+        """在 with 块内把当前线程绑定到摄像头的核心，块内创建的线程继承该绑定
+
+        Args:
+            camera_id: 摄像头ID
+        """
+        plan = self.plan
+        if plan is None or not plan.pin or camera_id not in plan.camera_cpus:
+            yield
+            return
+        previous = os.sched_getaffinity(0)
+        before = set(os.listdir("/proc/self/task")) if supported() else set()
+        try:
+            os.sched_setaffinity(0, plan.camera_cpus[camera_id])
+        except OSError as e:
+            logging.warning(f"摄像头{camera_id}绑定核心失败: {str(e)}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
+            if supported():
+                self._release_audio_threads(before, previous)
+
+    def _release_audio_threads(self, before, cpus):
+        """把块内新建的pygame声音线程恢复为不绑定"""
+        created = set(os.listdir("/proc/self/task")) - before
+        if not created:
+            return
+        for tid, (name, _) in read_task_times().items():
+            if str(tid) in created and name.startswith("SDLAudio"):
+                try:
+                    os.sched_setaffinity(tid, cpus)
+                except OSError:
+                    pass
+
+# 全局线程预算，由控制面板按配置应用
+thread_budget = ThreadBudget()
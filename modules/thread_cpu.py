@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+# modules/thread_cpu.py
+# 线程CPU占用统计模块
+#
+# 后台线程按较长的间隔读取 /proc/self/task/*/stat 中每个线程的用户态和内核态CPU时间，
+# 按摄像头和子系统分组计算占用率（100%为一个核心）：
+# - 摄像头线程：视频读取（capture）、帧处理（processing）和显示（display），
+#   线程内的分段由摄像头线程用 time.thread_time() 累计，处理为其余部分
+# - 推理（inference）：创建处理器时新出现的线程（MediaPipe图及其线程池）归属该摄像头
+# - 界面（ui）、声音（audio）、日志（logging）、后台服务（services）和其他线程按线程名分类
+# 摄像头线程启动时把操作系统线程名设为 CameraN，由它创建的OpenCV工作线程继承该名称，计入该摄像头的处理。
+# 统计结果每次整体替换发布，摄像头线程生成状态快照时只读取引用，不加锁。
+# 只支持Linux（/proc），其他平台上不启动采样线程，状态中的CPU统计为None。
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_TASK_DIR = "/proc/self/task"
+
+# 按线程名前缀分类的子系统：(前缀, 子系统)，先匹配Python线程名，再匹配操作系统线程名
+_SUBSYSTEM_PREFIXES = (
+    ("MainThread", "ui"),
+    ("VideoProcessorPreload", "ui"),
+    ("SDLAudio", "audio"),
+    ("Log", "logging"),
+    ("AlarmStore", "services"),
+    ("ClipEncode", "services"),
+    ("LandmarkRecorder", "services"),
+    ("StationServer", "services"),
+    ("EventDispatch", "services"),
+    ("ThreadCpuMonitor", "services"),
+    ("SamplingProfiler", "services"),
+    ("MetricsServer", "services"),
+    ("mediapipe", "inference"),
+)
+
+CAMERA_STAGES = ('capture', 'processing', 'display', 'inference')
+SUBSYSTEMS = ('ui', 'audio', 'logging', 'services', 'inference', 'other')
+
+def supported():
+    """当前平台是否可以读取线程CPU时间"""
+    return os.path.isdir(_TASK_DIR)
+
+def read_task_times():
+    """读取本进程每个线程的CPU时间
+
+    Returns:
+        dict: {线程ID: (操作系统线程名, CPU秒数)}，读取期间退出的线程被忽略
+    """
+    tick = os.sysconf('SC_CLK_TCK')
+    tasks = {}
+    for name in os.listdir(_TASK_DIR):
+        try:
+            with open(f"{_TASK_DIR}/{name}/stat", 'rb') as f:
+                stat = f.read().decode('utf-8', 'replace')
+        except OSError:
+            continue
+        # 线程名在括号内且可能包含空格，字段从最后一个右括号之后开始（utime、stime为第14、15个字段）
+        close = stat.rindex(')')
+        fields = stat[close + 2:].split()
+        tasks[int(name)] = (stat[stat.index('(') + 1:close], (int(fields[11]) + int(fields[12])) / tick)
+    return tasks
+
+def _set_os_thread_name(name):
+    """设置当前线程的操作系统线程名（之后由该线程创建的线程继承此名称）"""
+    try:
+        with open(f"{_TASK_DIR}/{threading.get_native_id()}/comm", 'w') as f:
+            f.write(name[:15])
+    except OSError:
+        pass
+
+def _classify(name):
+    for prefix, subsystem in _SUBSYSTEM_PREFIXES:
+        if name.startswith(prefix):
+            return subsystem
+    return None
+
+class ThreadCpuMonitor:
+    """线程CPU占用采样器
+
+    start() 后在后台线程中每 interval 秒调用一次 sample()，结果保存在 latest；
+    摄像头线程通过 register_current() 登记自己和分段计时字典，
+    CameraManager 创建处理器时用 track() 把新出现的线程归属到该摄像头。
+    """
+
+    def __init__(self):
+        self.latest = None  # 最近一次采样结果（只整体替换）
+        self.interval = 5.0
+        self._registry = {}  # 线程ID -> (摄像头ID, 子系统, 分段计时字典)
+        self._lock = threading.Lock()
+        self._previous = None  # 上次采样：(时间, {线程ID: CPU秒数}, {线程ID: 分段计时副本})
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def register_current(self, camera_id, subsystem, stages=None):
+        """登记当前线程
+
+        Args:
+            camera_id: 所属摄像头ID，进程级线程为None
+            subsystem: 子系统名称
+            stages: 线程内分段的累计CPU秒数字典（如 {'capture': 0.0, 'display': 0.0}），由该线程更新
+        """
+        if camera_id is not None and subsystem == 'camera':
+            _set_os_thread_name(f"Camera{camera_id}")
+        with self._lock:
+            self._registry[threading.get_native_id()] = (camera_id, subsystem, stages)
+
+    def unregister_current(self):
+        """取消登记当前线程（线程退出前调用）"""
+        with self._lock:
+            self._registry.pop(threading.get_native_id(), None)
+
+    @contextmanager
+    def track(self, camera_id):
+        """把 with 块内新出现的线程归属到摄像头
+
+        创建处理器时MediaPipe启动推理图线程，pygame启动声音线程；声音线程由所有摄像头共用，
+        计入进程级的 audio，其余线程计入该摄像头的 inference。
+
+        Args:
+            camera_id: 摄像头ID
+        """
+        if not supported():
+            yield
+            return
+        before = set(os.listdir(_TASK_DIR))
+        try:
+            yield
+        finally:
+            created = set(os.listdir(_TASK_DIR)) - before
+            tasks = read_task_times() if created else {}
+            with self._lock:
+                for name in created:
+                    tid = int(name)
+                    if tid in tasks and tid not in self._registry:
+                        if _classify(tasks[tid][0]) == 'audio':
+                            self._registry[tid] = (None, 'audio', None)
+                        else:
+                            self._registry[tid] = (camera_id, 'inference', None)
+
+    def start(self, interval=5.0):
+        """启动后台采样线程
+
+        Args:
+            interval: 采样间隔（秒）
+
+        Returns:
+            bool: 是否已启动（不支持的平台返回False）
+        """
+        if self._thread is not None:
+            return True
+        if not supported():
+            logging.info("当前平台不支持线程CPU统计")
+            return False
+        self.interval = interval
+        self._stopping.clear()
+        self._previous = None
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="ThreadCpuMonitor", daemon=True)
+        self._thread.start()
+        logging.info(f"线程CPU统计已启动: 每{interval}秒采样一次")
+        return True
+
+    def stop(self):
+        """停止后台采样线程"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"线程CPU采样失败: {str(e)}")
+
+    def sample(self):
+        """采样一次，计算与上次采样之间各线程和各分组的CPU占用
+
+        Returns:
+            dict: 统计结果（第一次采样只记录基准，返回None）：
+                interval: 实际采样间隔（秒）
+                cores: CPU核心数
+                total: 进程总占用（%，100为一个核心）
+                cameras: {摄像头ID: {capture, processing, display, inference, total, threads}}
+                subsystems: {ui, audio, logging, services, inference, other}，不属于摄像头的线程
+                threads: 各线程 {tid, name, camera, subsystem, cpu}，按占用降序
+        """
+        now = time.monotonic()
+        tasks = read_task_times()
+        names = {thread.native_id: thread.name for thread in threading.enumerate()}
+        with self._lock:
+            # 清理已退出的线程
+            for tid in [tid for tid in self._registry if tid not in tasks]:
+                del self._registry[tid]
+            registry = dict(self._registry)
+        stages = {tid: dict(entry[2]) for tid, entry in registry.items() if entry[2] is not None}
+        previous = self._previous
+        self._previous = (now, {tid: cpu for tid, (_, cpu) in tasks.items()}, stages)
+        if previous is None:
+            return None
+        elapsed = max(now - previous[0], 1e-6)
+
+        def percent(seconds):
+            return round(100.0 * seconds / elapsed, 1)
+
+        cameras = {}
+        subsystems = dict.fromkeys(SUBSYSTEMS, 0.0)
+        threads = []
+        total = 0.0
+        for tid, (os_name, cpu) in tasks.items():
+            if tid not in previous[1]:
+                # 本次采样期间新出现的线程从下次开始统计
+                continue
+            used = max(0.0, cpu - previous[1][tid])
+            total += used
+            name = names.get(tid, os_name)
+            camera_id, subsystem, _ = registry.get(tid, (None, None, None))
+            if subsystem is None and os_name.startswith("Camera") and os_name[6:].isdigit():
+                # 摄像头线程创建的OpenCV工作线程
+                camera_id, subsystem = int(os_name[6:]), 'processing'
+            if subsystem is None:
+                subsystem = _classify(name) or _classify(os_name) or 'other'
+            threads.append({'tid': tid, 'name': name, 'camera': camera_id, 'subsystem': subsystem,
+                            'cpu': percent(used)})
+            if camera_id is None:
+                subsystems[subsystem] = subsystems.get(subsystem, 0.0) + used
+                continue
+            usage = cameras.setdefault(camera_id, dict(dict.fromkeys(CAMERA_STAGES, 0.0), threads=0))
+            usage['threads'] += 1
+            if subsystem == 'camera':
+                # 摄像头线程按分段计时拆分，分段之外的部分为帧处理
+                split = 0.0
+                for stage in ('capture', 'display'):
+                    delta = stages.get(tid, {}).get(stage, 0.0) - previous[2].get(tid, {}).get(stage, 0.0)
+                    delta = min(max(0.0, delta), used - split)
+                    usage[stage] += delta
+                    split += delta
+                usage['processing'] += used - split
+            else:
+                usage[subsystem if subsystem in CAMERA_STAGES else 'processing'] += used
+
+        camera_stats = {}
+        for camera_id, usage in cameras.items():
+            stats = {stage: percent(usage[stage]) for stage in CAMERA_STAGES}
+            stats['total'] = percent(sum(usage[stage] for stage in CAMERA_STAGES))
+            stats['threads'] = usage['threads']
+            camera_stats[camera_id] = stats
+        result = {
+            'interval': round(elapsed, 3),
+            'cores': os.cpu_count() or 1,
+            'total': percent(total),
+            'cameras': camera_stats,
+            'subsystems': {key: percent(value) for key, value in subsystems.items()},
+            'threads': sorted(threads, key=lambda thread: -thread['cpu'])
+        }
+        self.latest = result
+        return result
+
+    def camera_usage(self, camera_id):
+        """获取最近一次采样中某个摄像头的CPU占用
+
+        Returns:
+            dict: {capture, processing, display, inference, total, threads}，未采样时为None
+        """
+        latest = self.latest
+        if latest is None:
+            return None
+        return latest['cameras'].get(camera_id)
+
+# 全局线程CPU统计，未启动时 camera_usage() 返回None
+thread_cpu = ThreadCpuMonitor()
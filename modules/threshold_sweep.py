@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# modules/threshold_sweep.py
+# 离线阈值扫描模块
+#
+# 把录制的关键点序列（见 modules/landmark_recorder.py）按与运行时相同的平滑、手势规则和
+# alarm_triggers 报警逻辑重放，一次计算一组 smooth_factor × 阈值 的全部组合：
+# - 条件得分是特征的线性组合，对特征做指数平滑等价于对条件得分做指数平滑，
+#   每个平滑因子只需对 (行数, 条件数) 的得分序列平滑一次
+# - 指数平滑按块用闭式解计算，不逐行循环
+# - 阈值比较、规则持续时间和报警升级都在 (阈值数, 行数) 的矩阵上向量化计算
+#
+# 录制数据只包含检测到手的行，相邻两行间隔超过 max_gap 视为手部消失：
+# 与运行时相同，清除规则计时并复位报警状态，平滑状态保留。
+
+import math
+
+import numpy as np
+
+def ema(values, alpha):
+    """与 GestureRuleEngine 相同的指数平滑：y0 = x0，yn = alpha * xn + (1 - alpha) * y(n-1)
+
+    按块计算闭式解 yj = b^(j+1) * y(-1) + alpha * b^j * Σ(xk * b^-k)，b = 1 - alpha，
+    块长度保证 b^-k 不溢出。
+
+    Args:
+        values: 形状为 (N, C) 的序列
+        alpha: 平滑因子（0-1）
+
+    Returns:
+        np.ndarray: 平滑后的序列，形状为 (N, C)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0 or alpha >= 1.0:
+        return values.copy()
+    b = 1.0 - alpha
+    if alpha <= 0.0:
+        return np.broadcast_to(values[:1], values.shape).copy()
+    block = max(1, min(4096, int(200 / -math.log10(b))))
+    exponents = np.arange(block)
+    carry = b ** (exponents + 1)
+    scale = alpha * b ** exponents
+    inverse = b ** -exponents
+    out = np.empty_like(values)
+    out[0] = values[0]
+    prev = values[0]
+    for start in range(1, len(values), block):
+        x = values[start:start + block]
+        n = len(x)
+        y = carry[:n, None] * prev + scale[:n, None] * np.cumsum(x * inverse[:n, None], axis=0)
+        out[start:start + n] = y
+        prev = y[-1]
+    return out
+
+def _runs(matched, times, breaks):
+    """计算连续满足区间
+
+    Args:
+        matched: 形状为 (K, N) 的布尔矩阵
+        times: 形状为 (N,) 的时间戳
+        breaks: 形状为 (N,) 的布尔数组，该行之前手部消失（强制开始新的区间）
+
+    Returns:
+        tuple: (starts, continues, durations)
+            starts: 区间开始的行
+            continues: 与上一行属于同一区间的行
+            durations: 当前行距区间开始的时间（不满足的行为-1）
+    """
+    previous = np.zeros_like(matched)
+    previous[:, 1:] = matched[:, :-1]
+    continues = matched & previous & ~breaks
+    starts = matched & ~continues
+    index = np.where(starts, np.arange(matched.shape[1], dtype=np.int64), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    durations = np.where(matched, times - times[index], -1.0)
+    return starts, continues, durations
+
+class SweepResult:
+    """一个检测区域在参数网格上的重放结果
+
+    Attributes:
+        smooth_factors: 平滑因子网格，形状为 (S,)
+        thresholds: 阈值网格，形状为 (T,)
+        detections: 检测开始次数，形状为 (S, T)
+        escalations: 报警升级次数（所有级别），形状为 (S, T)
+        episodes: 形状为 (S, T) 的对象数组，每项为 (N, 3) 数组，
+                  每行是一次达到报警的检测：(首次报警时间, 检测开始时间, 检测结束时间)
+        span: 数据覆盖的时长（秒）
+    """
+
+    def __init__(self, smooth_factors, thresholds, span):
+        self.smooth_factors = np.asarray(smooth_factors, dtype=np.float64)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        shape = (len(self.smooth_factors), len(self.thresholds))
+        self.detections = np.zeros(shape, dtype=np.int64)
+        self.escalations = np.zeros(shape, dtype=np.int64)
+        self.episodes = np.empty(shape, dtype=object)
+        self.span = span
+
+    @property
+    def alarms(self):
+        """达到报警的检测次数，形状为 (S, T)"""
+        return np.vectorize(len, otypes=[np.int64])(self.episodes)
+
+def sweep_stream(engine, times, landmarks, smooth_factors, thresholds, alarm_triggers,
+                 threshold_attr="gesture_threshold", max_gap=0.5, chunk_elements=4_000_000):
+    """在参数网格上重放单个检测区域的关键点序列
+
+    Args:
+        engine: GestureRuleEngine，提供规则和非扫描阈值（通过其 params）
+        times: 形状为 (N,) 的时间戳，按时间排序
+        landmarks: 形状为 (N, 21, 3) 的关键点
+        smooth_factors: 平滑因子网格
+        thresholds: threshold_attr 的取值网格
+        alarm_triggers: 报警触发时长（秒）
+        threshold_attr: 扫描的阈值属性名，规则中以该名称引用阈值的条件使用网格取值；
+                        为None时所有阈值取当前参数值（只重放，thresholds 只决定结果的列数）
+        max_gap: 相邻两行间隔超过该值（秒）视为手部消失
+        chunk_elements: 每次计算的 阈值数 × 行数 上限，控制内存占用
+
+    Returns:
+        SweepResult: 重放结果
+
+    Raises:
+        ValueError: 当规则中没有引用 threshold_attr 时抛出
+    """
+    rules = engine.rules
+    swept = [i for i, attr in rules.threshold_refs if attr == threshold_attr]
+    if threshold_attr is not None and not swept:
+        raise ValueError(f"手势规则中没有以 {threshold_attr} 引用的阈值")
+    times = np.asarray(times, dtype=np.float64)
+    result = SweepResult(smooth_factors, thresholds, float(times[-1] - times[0]) if len(times) else 0.0)
+    triggers = np.array(sorted(alarm_triggers), dtype=np.float64)
+    n = len(times)
+    if n == 0:
+        result.episodes.fill(np.empty((0, 3)))
+        return result
+
+    # 固定阈值和其他引用阈值取当前参数值，扫描的阈值按网格展开为 (T, C)
+    base = rules.thresholds.copy()
+    for i, attr in rules.threshold_refs:
+        if attr != threshold_attr:
+            base[i] = getattr(engine.params, attr)
+    grid = np.repeat(base[None, :], len(result.thresholds), axis=0)
+    grid[:, swept] = result.thresholds[:, None]
+
+    breaks = np.zeros(n, dtype=bool)
+    breaks[1:] = np.diff(times) > max_gap
+    scores = engine.compute_features(landmarks) @ rules.weights.T  # (N, C)
+    alarm_rules = np.flatnonzero(rules.alarm_mask)
+    chunk = max(1, chunk_elements // n)
+
+    for s, alpha in enumerate(result.smooth_factors):
+        smoothed = ema(scores, alpha)
+        for t0 in range(0, len(result.thresholds), chunk):
+            thr = grid[t0:t0 + chunk]  # (K, C)
+            satisfied = rules.signs[None, None, :] * (smoothed[None, :, :] - thr[:, None, :]) < 0  # (K, N, C)
+            alarm = np.zeros((len(thr), n), dtype=bool)
+            for r in alarm_rules:
+                matched = satisfied[:, :, rules.membership[r].astype(bool)].all(axis=2)
+                if rules.min_durations[r] > 0:
+                    _, _, held = _runs(matched, times, breaks)
+                    matched = held >= rules.min_durations[r]
+                alarm |= matched
+            starts, continues, durations = _runs(alarm, times, breaks)
+            result.detections[s, t0:t0 + len(thr)] = starts.sum(axis=1)
+            # 每个触发时长在区间内第一次达到的行即为一次报警升级
+            previous = np.full_like(durations, -1.0)
+            previous[:, 1:] = durations[:, :-1]
+            previous[~continues] = -1.0
+            escalations = np.zeros(len(thr), dtype=np.int64)
+            first_alarm = np.zeros_like(alarm)
+            for k, trigger in enumerate(triggers):
+                crossed = (durations >= trigger) & (previous < trigger)
+                escalations += crossed.sum(axis=1)
+                if k == 0:
+                    first_alarm = crossed
+            result.escalations[s, t0:t0 + len(thr)] = escalations
+            # 区间结束行：满足且下一行不属于同一区间
+            following = np.zeros_like(continues)
+            following[:, :-1] = continues[:, 1:]
+            ends = alarm & ~following
+            start_index = np.where(starts, np.arange(n), 0)
+            np.maximum.accumulate(start_index, axis=1, out=start_index)
+            for k in range(len(thr)):
+                rows = np.flatnonzero(first_alarm[k])
+                if len(rows) == 0:
+                    result.episodes[s, t0 + k] = np.empty((0, 3))
+                    continue
+                # 报警行所在区间的开始行和结束行
+                end_rows = np.flatnonzero(ends[k])
+                end_rows = end_rows[np.searchsorted(end_rows, rows)]
+                result.episodes[s, t0 + k] = np.column_stack(
+                    (times[rows], times[start_index[k, rows]], times[end_rows]))
+    return result
+
+def compare_episodes(episodes, reference, tolerance=2.0):
+    """把报警与参考事件匹配
+
+    Args:
+        episodes: (N, 3) 报警数组，第一列为首次报警时间
+        reference: (M, 2) 参考事件 (开始时间, 结束时间)，按开始时间排序且互不重叠；
+                   可以是人工标注的真实事件，也可以是参考配置的检测区间。
+                   可选的第三列为计算延迟的基准时间（如参考配置的首次报警时间），默认为开始时间
+        tolerance: 允许报警早于开始或晚于结束的时间（秒）
+
+    Returns:
+        tuple: (matched, false_alarms, delays)
+            matched: 至少有一次报警的参考事件数
+            false_alarms: 不在任何参考事件内的报警数
+            delays: 每个匹配的参考事件第一次报警相对基准时间的延迟（秒）
+    """
+    if len(episodes) == 0:
+        return 0, 0, np.empty(0)
+    alarm_times = episodes[:, 0]
+    if len(reference) == 0:
+        return 0, len(alarm_times), np.empty(0)
+    # 优先匹配开始时间不晚于报警的最近事件，不在其容差内时再尝试下一个事件
+    index = np.searchsorted(reference[:, 0], alarm_times, side='right') - 1
+    valid = index >= 0
+    valid[valid] = alarm_times[valid] <= reference[index[valid], 1] + tolerance
+    following = np.minimum(index + 1, len(reference) - 1)
+    early = ~valid & (index + 1 < len(reference)) & (alarm_times >= reference[following, 0] - tolerance)
+    index[early] = following[early]
+    valid |= early
+    hit, first = np.unique(index[valid], return_index=True)
+    origin = reference[:, 2] if reference.shape[1] > 2 else reference[:, 0]
+    delays = alarm_times[valid][first] - origin[hit]
+    return len(hit), int((~valid).sum()), delays
@@ -11,10 +11,35 @@ from config import CONFIG
 from styles import UIStyles
 from modules.language import lang
 
+def bed_keys():
+    """获取所有床位（监测区域）的 (摄像头ID, 区域序号) 列表"""
+    return [(cam_id, roi_index)
+            for cam_id, camera in enumerate(CONFIG.cameras)
+            for roi_index in range(len(camera.rois))]
+
+def camera_label(cam_id):
+    """获取摄像头的显示名称，未命名时显示为"摄像头 N" """
+    return CONFIG.cameras[cam_id].name or f"{lang.get_text('camera')} {cam_id}"
+
+def ward_label(ward):
+    """获取病区的显示名称"""
+    return ward or lang.get_text("unassigned_ward")
+
+def bed_label(cam_id, roi_index):
+    """获取床位（监测区域）的显示名称
+    
+    单区域且未命名的摄像头只显示摄像头名称，多区域时附加区域名称。
+    """
+    camera = CONFIG.cameras[cam_id]
+    label = camera_label(cam_id)
+    if len(camera.rois) == 1 and not camera.rois[0].get("name"):
+        return label
+    return f"{label} · {camera.roi_name(roi_index)}"
+
 class TimeDisplay:
     """时间显示组件"""
     def __init__(self, parent):
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("current_time"), padding=5)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=5), "current_time")
         self.label = ttk.Label(self.frame, font=UIStyles.FONTS['subtitle'], anchor="center")
         self.label.pack(fill=tk.X, expand=True, pady=5)
         self.update()
@@ -30,28 +55,24 @@ class TimeDisplay:
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-        
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("current_time"))
 
 class ThemeSelector:
     """主题选择器组件"""
     def __init__(self, parent, callback=None):
         self.current_theme = "light"
         self.theme_var = tk.StringVar(value="light")
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("theme_settings"), padding=5)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=5), "theme_settings")
         
-        self.light_radio = ttk.Radiobutton(self.frame, text=lang.get_text("light_theme"), value="light", 
-                        variable=self.theme_var, command=self._on_change)
+        self.light_radio = lang.bind(ttk.Radiobutton(self.frame, value="light", 
+                        variable=self.theme_var, command=self._on_change), "light_theme")
         self.light_radio.pack(side=tk.LEFT, padx=5)
         
-        self.dark_radio = ttk.Radiobutton(self.frame, text=lang.get_text("dark_theme"), value="dark", 
-                        variable=self.theme_var, command=self._on_change)
+        self.dark_radio = lang.bind(ttk.Radiobutton(self.frame, value="dark", 
+                        variable=self.theme_var, command=self._on_change), "dark_theme")
         self.dark_radio.pack(side=tk.LEFT, padx=5)
         
-        self.auto_radio = ttk.Radiobutton(self.frame, text=lang.get_text("auto_theme"), value="auto", 
-                        variable=self.theme_var, command=self._on_change)
+        self.auto_radio = lang.bind(ttk.Radiobutton(self.frame, value="auto", 
+                        variable=self.theme_var, command=self._on_change), "auto_theme")
         self.auto_radio.pack(side=tk.LEFT, padx=5)
         
         self.callback = callback
@@ -110,18 +131,18 @@ class ThemeSelector:
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-        
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("theme_settings"))
-        self.light_radio.config(text=lang.get_text("light_theme"))
-        self.dark_radio.config(text=lang.get_text("dark_theme"))
-        self.auto_radio.config(text=lang.get_text("auto_theme"))
 
 class CameraSelector:
-    """摄像头选择器组件"""
+    """摄像头选择器组件
+    
+    摄像头列表分页显示，只为当前页创建一组复选框并在翻页时重复使用，
+    选择状态保存在集合中，配置几十个摄像头时界面控件数量不变。
+    """
     def __init__(self, parent):
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("camera_selection"), padding=10)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=10), "camera_selection")
+        self.page_size = max(1, CONFIG.camera_page_size)
+        self.page = 0
+        self.selected = set(range(len(CONFIG.cameras)))
         self.cam_vars = []
         self.cam_checkbuttons = []
         
@@ -129,40 +150,92 @@ class CameraSelector:
         cam_grid.pack(fill=tk.X)
         
         # 使用网格布局，每行放置2个摄像头选项
-        for i in range(len(CONFIG.cameras)):
-            var = tk.BooleanVar(value=True)
+        for i in range(self.page_size):
+            var = tk.BooleanVar(value=False)
             self.cam_vars.append(var)
             row, col = divmod(i, 2)
-            checkbutton = ttk.Checkbutton(cam_grid, text=f"{lang.get_text('camera')} {i}", variable=var, padding=5)
+            checkbutton = ttk.Checkbutton(cam_grid, variable=var, padding=5,
+                                          command=lambda slot=i: self._on_toggle(slot))
             checkbutton.grid(row=row, column=col, sticky=tk.W, padx=10, pady=5)
             self.cam_checkbuttons.append(checkbutton)
             
         # 配置网格列权重，使选项均匀分布
         cam_grid.columnconfigure(0, weight=1)
         cam_grid.columnconfigure(1, weight=1)
+        
+        # 翻页和批量选择
+        nav = ttk.Frame(self.frame)
+        nav.pack(fill=tk.X, pady=(5, 0))
+        self.prev_button = ttk.Button(nav, text="<", width=3, command=lambda: self.show_page(self.page - 1))
+        self.prev_button.pack(side=tk.LEFT)
+        self.page_label = ttk.Label(nav, anchor="center")
+        self.page_label.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        self.next_button = ttk.Button(nav, text=">", width=3, command=lambda: self.show_page(self.page + 1))
+        self.next_button.pack(side=tk.LEFT)
+        self.select_all_button = lang.bind(ttk.Button(nav, command=self.select_all), "select_all")
+        self.select_all_button.pack(side=tk.LEFT, padx=(10, 0))
+        self.select_none_button = lang.bind(ttk.Button(nav, command=self.select_none), "select_none")
+        self.select_none_button.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.show_page(0)
+        # 复选框文本和页码由多个部分组成，切换语言后重新显示当前页
+        lang.add_listener(lambda: self.show_page(self.page))
+    
+    @property
+    def page_count(self):
+        """总页数"""
+        return max(1, -(-len(CONFIG.cameras) // self.page_size))
+    
+    def show_page(self, page):
+        """显示指定页，只更新当前页复选框的文本和选择状态"""
+        self.page = max(0, min(page, self.page_count - 1))
+        first = self.page * self.page_size
+        for slot, (var, checkbutton) in enumerate(zip(self.cam_vars, self.cam_checkbuttons)):
+            cam_id = first + slot
+            if cam_id < len(CONFIG.cameras):
+                var.set(cam_id in self.selected)
+                checkbutton.config(text=camera_label(cam_id))
+                checkbutton.grid()
+            else:
+                checkbutton.grid_remove()
+        self.page_label.config(text=lang.get_text("page", self.page + 1, self.page_count))
+        self.prev_button.state(['!disabled'] if self.page > 0 else ['disabled'])
+        self.next_button.state(['!disabled'] if self.page < self.page_count - 1 else ['disabled'])
+    
+    def _on_toggle(self, slot):
+        """复选框点击处理，同步到选择集合"""
+        cam_id = self.page * self.page_size + slot
+        if self.cam_vars[slot].get():
+            self.selected.add(cam_id)
+        else:
+            self.selected.discard(cam_id)
+    
+    def select_all(self):
+        """选中所有摄像头"""
+        self.selected = set(range(len(CONFIG.cameras)))
+        self.show_page(self.page)
+    
+    def select_none(self):
+        """取消选中所有摄像头"""
+        self.selected.clear()
+        self.show_page(self.page)
     
     def get_selected(self):
         """获取选中的摄像头ID列表"""
-        return [i for i, var in enumerate(self.cam_vars) if var.get()]
+        return sorted(cam_id for cam_id in self.selected if cam_id < len(CONFIG.cameras))
     
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-        
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("camera_selection"))
-        for i, checkbutton in enumerate(self.cam_checkbuttons):
-            checkbutton.config(text=f"{lang.get_text('camera')} {i}")
 
 class SettingsPanel:
     """设置面板组件"""
     def __init__(self, parent, apply_callback=None):
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("parameter_settings"), padding=10)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=10), "parameter_settings")
         self.apply_callback = apply_callback
         
         # 手势灵敏度设置
-        ttk.Label(self.frame, text=f"{lang.get_text('gesture_sensitivity')}:").pack(anchor=tk.W)
+        lang.bind(ttk.Label(self.frame), "gesture_sensitivity", template="{}:").pack(anchor=tk.W)
         self.gesture_scale = ttk.Scale(self.frame, from_=0.1, to=1.0, orient=tk.HORIZONTAL)
         self.gesture_scale.set(CONFIG.gesture_threshold)
         self.gesture_scale.pack(fill=tk.X)
@@ -175,27 +248,27 @@ class SettingsPanel:
         grid_header = ttk.Frame(grid_frame)
         grid_header.pack(fill=tk.X)
         
-        ttk.Label(grid_header, text="网格设置:").pack(side=tk.LEFT, anchor=tk.W)
+        lang.bind(ttk.Label(grid_header), "grid_settings", template="{}:").pack(side=tk.LEFT, anchor=tk.W)
         
         self.grid_enabled_var = tk.BooleanVar(value=CONFIG.show_grid)
-        ttk.Checkbutton(grid_header, text="显示网格", variable=self.grid_enabled_var).pack(side=tk.LEFT, padx=10)
+        lang.bind(ttk.Checkbutton(grid_header, variable=self.grid_enabled_var), "show_grid").pack(side=tk.LEFT, padx=10)
         
         # 网格间距设置
         grid_spacing = ttk.Frame(grid_frame)
         grid_spacing.pack(fill=tk.X, pady=5)
         
-        ttk.Label(grid_spacing, text="水平间距:").grid(row=0, column=0, padx=5)
+        lang.bind(ttk.Label(grid_spacing), "grid_spacing_x", template="{}:").grid(row=0, column=0, padx=5)
         self.grid_spacing_x_var = tk.StringVar(value=str(CONFIG.grid_spacing_x))
         ttk.Entry(grid_spacing, textvariable=self.grid_spacing_x_var, width=5).grid(row=0, column=1, padx=5)
         
-        ttk.Label(grid_spacing, text="垂直间距:").grid(row=0, column=2, padx=5)
+        lang.bind(ttk.Label(grid_spacing), "grid_spacing_y", template="{}:").grid(row=0, column=2, padx=5)
         self.grid_spacing_y_var = tk.StringVar(value=str(CONFIG.grid_spacing_y))
         ttk.Entry(grid_spacing, textvariable=self.grid_spacing_y_var, width=5).grid(row=0, column=3, padx=5)
         
         # 报警间隔设置
         alarm_interval_frame = ttk.Frame(self.frame)
         alarm_interval_frame.pack(fill=tk.X, pady=5)
-        ttk.Label(alarm_interval_frame, text=f"{lang.get_text('alarm_interval')}:").pack(anchor=tk.W)
+        lang.bind(ttk.Label(alarm_interval_frame), "alarm_interval", template="{}:").pack(anchor=tk.W)
         
         # 报警间隔输入框
         alarm_inputs = ttk.Frame(alarm_interval_frame)
@@ -205,36 +278,72 @@ class SettingsPanel:
         for i, trigger in enumerate(CONFIG.alarm_triggers):
             var = tk.StringVar(value=str(trigger))
             self.alarm_vars.append(var)
-            ttk.Label(alarm_inputs, text=f"{lang.get_text('level')}{i+1}:").grid(row=0, column=i*2, padx=5)
+            lang.bind(ttk.Label(alarm_inputs), "level", template=f"{{}}{i+1}:").grid(row=0, column=i*2, padx=5)
             ttk.Entry(alarm_inputs, textvariable=var, width=5).grid(row=0, column=i*2+1, padx=5)
         
-        # ROI设置 - 为每个摄像头创建单独的ROI设置
-        roi_notebook = ttk.Notebook(self.frame)
-        roi_notebook.pack(fill=tk.X, pady=5)
+        # ROI设置 - 先选择床位（监测区域）再编辑其ROI，只创建一组输入框
+        roi_frame = ttk.Frame(self.frame)
+        roi_frame.pack(fill=tk.X, pady=5)
+        
+        self.beds = bed_keys()
+        self.roi_edits = {}  # 编辑过的床位ROI（输入框文本），键为 (摄像头ID, 区域序号)
+        self.current_bed = None
+        titles = [self.roi_tab_title(cam_id, roi_index) for cam_id, roi_index in self.beds]
+        self.bed_picker = ttk.Combobox(roi_frame, state="readonly", values=titles)
+        self.bed_picker.pack(fill=tk.X)
+        self.bed_picker.bind("<<ComboboxSelected>>", self._on_bed_selected)
         
+        roi_inputs = ttk.Frame(roi_frame)
+        roi_inputs.pack(fill=tk.X, pady=5)
+        
+        # 使用固定的键名存储width和height参数
         self.roi_vars = {}
-        for cam_id in range(len(CONFIG.cameras)):
-            roi_frame = ttk.Frame(roi_notebook)
-            roi_notebook.add(roi_frame, text=f"{lang.get_text('camera')} {cam_id} ROI")
-            
-            roi_inputs = ttk.Frame(roi_frame)
-            roi_inputs.pack(fill=tk.X, pady=5)
-            
-            # 为每个摄像头创建ROI输入框
-            self.roi_vars[cam_id] = {}
-            # 使用固定的键名存储width和height参数
-            roi_labels = ['X', 'Y', 'width', 'height']
-            roi_display_labels = ['X', 'Y', lang.get_text('width'), lang.get_text('height')]
-            roi_keys = ['x', 'y', 'w', 'h']
-            
-            for i, (label, display_label) in enumerate(zip(roi_labels, roi_display_labels)):
-                ttk.Label(roi_inputs, text=display_label).grid(row=0, column=i*2)
-                var = tk.StringVar(value=str(CONFIG.cameras[cam_id].roi[roi_keys[i]]))
-                self.roi_vars[cam_id][label] = var
-                ttk.Entry(roi_inputs, textvariable=var, width=8).grid(row=0, column=i*2+1, padx=5)
+        self.roi_labels = {}
+        for i, label in enumerate(['X', 'Y', 'width', 'height']):
+            self.roi_labels[label] = ttk.Label(roi_inputs, text=label)
+            if label in ('width', 'height'):
+                lang.bind(self.roi_labels[label], label)
+            self.roi_labels[label].grid(row=0, column=i*2)
+            self.roi_vars[label] = tk.StringVar()
+            ttk.Entry(roi_inputs, textvariable=self.roi_vars[label], width=8).grid(row=0, column=i*2+1, padx=5)
+        
+        if self.beds:
+            self.bed_picker.current(0)
+            self._load_bed(self.beds[0])
         
         # 应用按钮
-        ttk.Button(self.frame, text=lang.get_text("apply_settings"), command=self._on_apply).pack(fill=tk.X, pady=5)
+        lang.bind(ttk.Button(self.frame, command=self._on_apply), "apply_settings").pack(fill=tk.X, pady=5)
+        
+        lang.add_listener(self._update_bed_picker)
+    
+    def roi_tab_title(self, cam_id, roi_index):
+        """获取床位ROI设置的显示标题"""
+        return f"{bed_label(cam_id, roi_index)} ROI"
+    
+    _ROI_KEYS = {'X': 'x', 'Y': 'y', 'width': 'w', 'height': 'h'}
+    
+    def _config_roi_text(self, bed):
+        """获取床位当前配置的ROI（输入框文本格式）"""
+        cam_id, roi_index = bed
+        roi = CONFIG.cameras[cam_id].rois[roi_index]
+        return {label: str(roi[key]) for label, key in self._ROI_KEYS.items()}
+    
+    def _store_current(self):
+        """保存当前床位输入框中的内容"""
+        if self.current_bed is not None:
+            self.roi_edits[self.current_bed] = {label: var.get() for label, var in self.roi_vars.items()}
+    
+    def _load_bed(self, bed):
+        """把床位的ROI（编辑过的内容或当前配置）填入输入框"""
+        values = self.roi_edits.get(bed) or self._config_roi_text(bed)
+        for label, var in self.roi_vars.items():
+            var.set(values[label])
+        self.current_bed = bed
+    
+    def _on_bed_selected(self, event=None):
+        """床位选择变化处理"""
+        self._store_current()
+        self._load_bed(self.beds[self.bed_picker.current()])
     
     def _on_apply(self):
         """应用设置按钮点击处理"""
@@ -259,14 +368,11 @@ class SettingsPanel:
             except ValueError:
                 pass
         
-        # 获取ROI设置
-        for cam_id in self.roi_vars:
-            settings['roi_settings'][cam_id] = {
-                'x': int(self.roi_vars[cam_id]['X'].get()),
-                'y': int(self.roi_vars[cam_id]['Y'].get()),
-                'w': int(self.roi_vars[cam_id]['width'].get()),
-                'h': int(self.roi_vars[cam_id]['height'].get())
-            }
+        # 获取ROI设置，键为 (摄像头ID, 区域序号)，只包含与当前配置不同的床位
+        self._store_current()
+        for bed, values in self.roi_edits.items():
+            if values != self._config_roi_text(bed):
+                settings['roi_settings'][bed] = {key: int(values[label]) for label, key in self._ROI_KEYS.items()}
             
         # 获取网格设置
         try:
@@ -285,67 +391,21 @@ class SettingsPanel:
         
         return settings
     
+    def _update_bed_picker(self):
+        """按当前语言更新床位选择框中的床位名称"""
+        index = self.bed_picker.current()
+        self.bed_picker.config(values=[self.roi_tab_title(cam_id, roi_index) for cam_id, roi_index in self.beds])
+        if index >= 0:
+            self.bed_picker.current(index)
+    
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-        
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("parameter_settings"))
-        
-        # 更新手势灵敏度标签
-        for child in self.frame.winfo_children():
-            if isinstance(child, ttk.Label) and child.cget("text").startswith(lang.get_text("gesture_sensitivity")):
-                child.config(text=f"{lang.get_text('gesture_sensitivity')}:")
-        
-        # 更新报警间隔标签
-        for child in self.frame.winfo_children():
-            if isinstance(child, ttk.Frame):
-                for subchild in child.winfo_children():
-                    if isinstance(subchild, ttk.Label) and subchild.cget("text").startswith(lang.get_text("alarm_interval")):
-                        subchild.config(text=f"{lang.get_text('alarm_interval')}:")
-        
-        # 更新报警级别标签
-        for i in range(len(CONFIG.alarm_triggers)):
-            for child in self.frame.winfo_children():
-                if isinstance(child, ttk.Frame):
-                    for subchild in child.winfo_children():
-                        if isinstance(subchild, ttk.Frame):
-                            for label in subchild.winfo_children():
-                                if isinstance(label, ttk.Label) and label.cget("text") == f"{lang.get_text('level')}{i+1}:":
-                                    label.config(text=f"{lang.get_text('level')}{i+1}:")
-        
-        # 更新ROI设置标签
-        for cam_id in range(len(CONFIG.cameras)):
-            # 更新标签页标题
-            for child in self.frame.winfo_children():
-                if isinstance(child, ttk.Notebook):
-                    for i in range(child.index("end")):
-                        if child.tab(i, "text").startswith(f"{lang.get_text('camera')}"):
-                            child.tab(i, text=f"{lang.get_text('camera')} {i} ROI")
-                    
-                    # 更新ROI输入框标签
-                    for tab_id in range(child.index("end")):
-                        tab = child.winfo_children()[tab_id]
-                        for frame in tab.winfo_children():
-                            if isinstance(frame, ttk.Frame):
-                                labels = frame.winfo_children()
-                                for j, label in enumerate(labels):
-                                    if isinstance(label, ttk.Label):
-                                        if j == 2:  # width标签
-                                            label.config(text=lang.get_text('width'))
-                                        elif j == 3:  # height标签
-                                            label.config(text=lang.get_text('height'))
-        
-        # 更新应用按钮文本
-        for child in self.frame.winfo_children():
-            if isinstance(child, ttk.Button) and child.cget("text") == lang.get_text("apply_settings"):
-                child.config(text=lang.get_text("apply_settings"))
 
 class ControlButtons:
     """控制按钮组件"""
     def __init__(self, parent, callbacks=None):
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("control_buttons"), padding=10)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=10), "control_buttons")
         self.callbacks = callbacks or {}
         
         # 使用网格布局，每行放置2个按钮
@@ -353,23 +413,23 @@ class ControlButtons:
         button_grid.pack(fill=tk.X, pady=5)
         
         # 第一行按钮
-        start_btn = ttk.Button(button_grid, text=lang.get_text("start_selected"), 
-                              command=self._on_start, style="Accent.TButton")
+        start_btn = lang.bind(ttk.Button(button_grid, command=self._on_start, style="Accent.TButton"), "start_selected")
         start_btn.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
         
-        stop_btn = ttk.Button(button_grid, text=lang.get_text("stop_all"), 
-                             command=self._on_stop)
+        stop_btn = lang.bind(ttk.Button(button_grid, command=self._on_stop), "stop_all")
         stop_btn.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
         
         # 第二行按钮
-        pause_btn = ttk.Button(button_grid, text=lang.get_text("pause_alarm"), 
-                              command=self._on_pause)
+        pause_btn = lang.bind(ttk.Button(button_grid, command=self._on_pause), "pause_alarm")
         pause_btn.grid(row=1, column=0, padx=5, pady=5, sticky="ew")
         
-        reset_btn = ttk.Button(button_grid, text=lang.get_text("reset_status"), 
-                              command=self._on_reset)
+        reset_btn = lang.bind(ttk.Button(button_grid, command=self._on_reset), "reset_status")
         reset_btn.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
         
+        # 第三行：性能采样
+        profile_btn = lang.bind(ttk.Button(button_grid, command=self._on_profile), "start_profiler")
+        profile_btn.grid(row=2, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        
         # 配置网格列权重，使按钮均匀分布
         button_grid.columnconfigure(0, weight=1)
         button_grid.columnconfigure(1, weight=1)
@@ -390,54 +450,70 @@ class ControlButtons:
         if 'reset' in self.callbacks:
             self.callbacks['reset']()
     
+    def _on_profile(self):
+        if 'profile' in self.callbacks:
+            self.callbacks['profile']()
+    
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-        
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("control_buttons"))
 
 class StatusDisplay:
-    """状态显示组件"""
+    """状态显示组件
+    
+    指示器区域按病区汇总，每个病区一行：颜色表示病区内最严重的床位状态，
+    报警计数为处于各报警级别的床位数；各运行中床位的详细状态显示在状态信息文本中。
+    """
     def __init__(self, parent):
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("system_status"), padding=10)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=10), "system_status")
         
-        # 摄像头状态指示区域
+        # 病区状态指示区域
         self.cam_status_frame = ttk.Frame(self.frame)
         self.cam_status_frame.pack(fill=tk.X, pady=5)
         
         # 添加状态标题行 - 使用更美观的标题样式
         header_frame = ttk.Frame(self.cam_status_frame, style="Header.TFrame")
         header_frame.pack(fill=tk.X, pady=(0, 5))
-        ttk.Label(header_frame, text=lang.get_text("status"), width=6, font=UIStyles.FONTS['subtitle']).pack(side=tk.LEFT, padx=5)
-        ttk.Label(header_frame, text=lang.get_text("camera"), width=10, font=UIStyles.FONTS['subtitle']).pack(side=tk.LEFT, padx=5)
-        ttk.Label(header_frame, text=lang.get_text("alarm_level"), width=30, font=UIStyles.FONTS['subtitle']).pack(side=tk.LEFT, padx=5)
+        self.header_labels = {}
+        for key, width in (("status", 6), ("ward", 16), ("alarm_level", 30)):
+            label = lang.bind(ttk.Label(header_frame, width=width, font=UIStyles.FONTS['subtitle']), key)
+            label.pack(side=tk.LEFT, padx=5)
+            self.header_labels[key] = label
         
         # 分隔线
         separator = ttk.Separator(self.cam_status_frame, orient="horizontal")
         separator.pack(fill=tk.X, pady=5)
         
+        # 每个床位（监测区域）所属的病区
+        self.beds = bed_keys()
+        self.wards = CONFIG.wards()
+        ward_index = {ward: w for w, ward in enumerate(self.wards)}
+        self.bed_wards = [ward_index[CONFIG.cameras[cam_id].ward] for cam_id, _ in self.beds]
+        self.ward_bed_counts = [self.bed_wards.count(w) for w in range(len(self.wards))]
+        
+        # 每个病区一行
         self.cam_status_labels = []
+        self.ward_name_labels = []
         self.alarm_count_labels = []
-        for i in range(len(CONFIG.cameras)):
-            cam_label_frame = ttk.Frame(self.cam_status_frame)
-            cam_label_frame.pack(fill=tk.X, pady=4)
+        for ward in self.wards:
+            ward_frame = ttk.Frame(self.cam_status_frame)
+            ward_frame.pack(fill=tk.X, pady=4)
             
             # 状态指示器
-            status_indicator = tk.Label(cam_label_frame, width=4, height=2, 
+            status_indicator = tk.Label(ward_frame, width=4, height=2, 
                                        bg=UIStyles.STATUS_COLORS['disabled'])
             status_indicator.pack(side=tk.LEFT, padx=5)
             
-            cam_label = ttk.Label(cam_label_frame, text=f"{lang.get_text('camera')} {i}", font=UIStyles.FONTS['body'])
-            cam_label.pack(side=tk.LEFT, padx=5)
+            ward_name = ttk.Label(ward_frame, width=16, font=UIStyles.FONTS['body'])
+            ward_name.pack(side=tk.LEFT, padx=5)
+            self.ward_name_labels.append(ward_name)
             
-            # 报警计数显示
-            alarm_count_frame = ttk.Frame(cam_label_frame)
+            # 报警计数显示（处于各报警级别的床位数）
+            alarm_count_frame = ttk.Frame(ward_frame)
             alarm_count_frame.pack(side=tk.LEFT, padx=10)
             
-            alarm_counts = {}
-            for j, trigger in enumerate(CONFIG.alarm_triggers):
+            alarm_counts = []
+            for j in range(len(CONFIG.alarm_triggers)):
                 # 使用更美观的标签样式
                 count_frame = ttk.Frame(alarm_count_frame)
                 count_frame.pack(side=tk.LEFT, padx=5)
@@ -445,85 +521,169 @@ class StatusDisplay:
                 level_label = ttk.Label(count_frame, text=f"L{j+1}", font=UIStyles.FONTS['small'])
                 level_label.pack(anchor=tk.CENTER)
                 
-                count_label = ttk.Label(count_frame, text="0", width=2, font=UIStyles.FONTS['body'])
+                count_label = ttk.Label(count_frame, text="0", width=3, font=UIStyles.FONTS['body'])
                 count_label.pack(anchor=tk.CENTER)
                 
-                alarm_counts[trigger] = count_label
+                alarm_counts.append(count_label)
             
             self.alarm_count_labels.append(alarm_counts)
             self.cam_status_labels.append(status_indicator)
         
         # 状态信息显示区域
-        info_frame = ttk.LabelFrame(self.frame, text=lang.get_text("system_info"), padding=5)
+        info_frame = lang.bind(ttk.LabelFrame(self.frame, padding=5), "system_info")
         info_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
         self.status_label = ttk.Label(info_frame, text=lang.get_text("system_ready"), font=UIStyles.FONTS['subtitle'])
         self.status_label.pack(anchor=tk.W, pady=5)
         
-        self.status_text = tk.Text(info_frame, height=8, wrap=tk.WORD, font=UIStyles.FONTS['body'])
-        self.status_text.pack(fill=tk.BOTH, expand=True)
+        text_frame = ttk.Frame(info_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        self.status_text = tk.Text(text_frame, height=8, wrap=tk.WORD, font=UIStyles.FONTS['body'])
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.status_text.yview)
+        self.status_text.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.status_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.status_text.config(state='disabled')
+        
+        # 上次渲染的状态，只更新发生变化的控件
+        self._cache_text()
+        self.invalidate()
+        lang.add_listener(self._on_language_change)
     
-    def update_status(self, camera_processors):
-        """更新摄像头状态显示"""
-        try:
-            status_str = ""
+    def _cache_text(self):
+        """缓存状态信息用到的翻译文本（只在初始化和切换语言时调用）"""
+        self._text = {
+            'beds': [bed_label(cam_id, roi_index) for cam_id, roi_index in self.beds],
+            'wards': [ward_label(ward) for ward in self.wards],
+            'status': lang.get_text('status'),
+            'detection_time': lang.get_text('detection_time'),
+            'seconds': lang.get_text('seconds'),
+            'alarm_level': lang.get_text('alarm_level'),
+            'no_active_camera': lang.get_text('no_active_camera'),
+        }
+    
+    def _on_language_change(self):
+        """切换语言后重新缓存翻译文本，病区名称和状态文本在下次更新时按新语言重建"""
+        self._cache_text()
+        self.invalidate()
+    
+    def invalidate(self):
+        """清除上次渲染的状态，下次更新时重新配置所有控件并重建状态文本"""
+        self._indicator_colors = [None] * len(self.wards)
+        self._ward_titles = [None] * len(self.wards)
+        self._alarm_counts = [None] * len(self.wards)
+        self._active_beds = None  # 状态文本中各行对应的床位序号
+        self._lines = []
+    
+    def _format_line(self, i, status, roi_status, detection_time):
+        """格式化单个床位的状态行"""
+        text = self._text
+        line = f"{text['beds'][i]}: {text['status']}: {roi_status.status} "
+        if status.fps > 0:
+            line += f"FPS: {status.fps:.1f} "
+        if status.cpu is not None:
+            line += f"CPU: {status.cpu['total']:.0f}% "
+        if detection_time > 0:
+            line += f"{text['detection_time']}: {detection_time:.1f}{text['seconds']} "
+        if roi_status.alarm_level > 0:
+            line += f"{text['alarm_level']}: {roi_status.alarm_level} "
+        return line
+    
+    def _set_indicator(self, w, color):
+        """更新病区状态指示器颜色（颜色未变化时不操作控件）"""
+        if self._indicator_colors[w] != color:
+            self.cam_status_labels[w].config(bg=color)
+            self._indicator_colors[w] = color
+    
+    def _set_ward_title(self, w, running):
+        """更新病区名称和运行中的床位数"""
+        title = f"{self._text['wards'][w]} ({running}/{self.ward_bed_counts[w]})"
+        if self._ward_titles[w] != title:
+            self.ward_name_labels[w].config(text=title)
+            self._ward_titles[w] = title
+    
+    def _set_alarm_counts(self, w, counts):
+        """更新病区各报警级别的床位数，只配置数值发生变化的标签"""
+        previous = self._alarm_counts[w]
+        if previous == counts:
+            return
+        for j, (label, count) in enumerate(zip(self.alarm_count_labels[w], counts)):
+            if previous is not None and previous[j] == count:
+                continue
+            label.config(
+                text=str(count),
+                foreground=UIStyles.get_alarm_level_color(j+1) if count > 0 else 'black'
+            )
+        self._alarm_counts[w] = counts
+    
+    def _render_lines(self, active_beds, lines):
+        """更新状态文本：运行中的床位不变时只替换内容变化的行，否则重建全部文本"""
+        if active_beds == self._active_beds:
+            changed = [k for k, line in enumerate(lines) if line != self._lines[k]]
+            if not changed:
+                return
+            self.status_text.config(state='normal')
+            for k in changed:
+                self.status_text.delete(f"{k + 1}.0", f"{k + 1}.end")
+                self.status_text.insert(f"{k + 1}.0", lines[k])
+        else:
             self.status_text.config(state='normal')
             self.status_text.delete(1.0, tk.END)
+            self.status_text.insert(tk.END, "\n".join(lines) if lines else self._text['no_active_camera'])
+            self._active_beds = active_beds
+        self._lines = lines
+        self.status_text.config(state='disabled')
+    
+    def update_status(self, camera_processors):
+        """更新状态显示：病区汇总行和每个运行中床位（监测区域）的状态文本
+        
+        与上次渲染的结果比较，只更新发生变化的指示器、标签和状态文本行。
+        """
+        try:
+            triggers = CONFIG.alarm_triggers[:len(self.alarm_count_labels[0])] if self.wards else []
+            running = [0] * len(self.wards)
+            detecting = [False] * len(self.wards)
+            levels = [0] * len(self.wards)
+            counts = [[0] * len(triggers) for _ in self.wards]
+            active_beds = []
+            lines = []
+            for i, (cam_id, roi_index) in enumerate(self.beds):
+                processor = camera_processors[cam_id] if cam_id < len(camera_processors) else None
+                # 读取摄像头线程发布的最新快照，不访问摄像头线程正在修改的状态
+                status = processor.status_snapshot if processor else None
+                if not status:
+                    continue
+                
+                w = self.bed_wards[i]
+                roi_status = status.rois[roi_index]
+                detection_time = roi_status.detection_time
+                running[w] += 1
+                detecting[w] = detecting[w] or detection_time > 0
+                levels[w] = max(levels[w], roi_status.alarm_level)
+                # 从床位状态获取已触发的报警
+                for j, trigger in enumerate(triggers):
+                    if trigger in roi_status.played_sounds:
+                        counts[w][j] += 1
+                
+                active_beds.append(i)
+                lines.append(self._format_line(i, status, roi_status, detection_time))
             
-            for i, processor in enumerate(camera_processors):
-                if processor:
-                    status = processor.get_status()
-                    
-                    # 更新状态指示器颜色
-                    if status['alarm_level'] > 0:
-                        status_color = UIStyles.get_alarm_level_color(status['alarm_level'])
-                        self.cam_status_labels[i].config(bg=status_color)
-                    elif status['detection_time'] > 0:
-                        self.cam_status_labels[i].config(bg=UIStyles.STATUS_COLORS['detecting'])
-                    else:
-                        self.cam_status_labels[i].config(bg=UIStyles.STATUS_COLORS['normal'])
-                    
-                    # 更新报警计数显示
-                    if i < len(self.alarm_count_labels):
-                        alarm_counts = {}
-                        for trigger in CONFIG.alarm_triggers:
-                            alarm_counts[trigger] = 0
-                        
-                        # 从processor获取已触发的报警
-                        for trigger in processor.played_sounds:
-                            if trigger in alarm_counts:
-                                alarm_counts[trigger] = 1
-                        
-                        # 更新显示
-                        for j, trigger in enumerate(CONFIG.alarm_triggers):
-                            if trigger in self.alarm_count_labels[i]:
-                                count = alarm_counts[trigger]
-                                level_color = UIStyles.get_alarm_level_color(j+1) if count > 0 else 'black'
-                                self.alarm_count_labels[i][trigger].config(
-                                    text=str(count),
-                                    foreground=level_color
-                                )
-                    
-                    # 格式化状态信息
-                    status_str += f"{lang.get_text('camera')} {i}: "
-                    status_str += f"{lang.get_text('status')}: {status['status']} "
-                    if status['fps'] > 0:
-                        status_str += f"FPS: {status['fps']:.1f} "
-                    if status['detection_time'] > 0:
-                        status_str += f"{lang.get_text('detection_time')}: {status['detection_time']:.1f}{lang.get_text('seconds')} "
-                    if status['alarm_level'] > 0:
-                        status_str += f"{lang.get_text('alarm_level')}: {status['alarm_level']} "
-                    status_str += "\n"
+            for w in range(len(self.wards)):
+                # 病区指示器显示最严重的床位状态
+                if levels[w] > 0:
+                    color = UIStyles.get_alarm_level_color(levels[w])
+                elif detecting[w]:
+                    color = UIStyles.STATUS_COLORS['detecting']
+                elif running[w]:
+                    color = UIStyles.STATUS_COLORS['normal']
                 else:
-                    # 摄像头未运行，显示为禁用状态
-                    self.cam_status_labels[i].config(bg=UIStyles.STATUS_COLORS['disabled'])
+                    # 病区内没有运行中的摄像头，显示为禁用状态
+                    color = UIStyles.STATUS_COLORS['disabled']
+                self._set_indicator(w, color)
+                self._set_ward_title(w, running[w])
+                self._set_alarm_counts(w, tuple(counts[w]))
             
-            if not status_str:
-                status_str = lang.get_text("no_active_camera")
-                
-            self.status_text.insert(tk.END, status_str)
-            self.status_text.config(state='disabled')
+            self._render_lines(active_beds, lines)
         except Exception as e:
             logging.error(f"更新状态失败: {str(e)}")
     
@@ -534,12 +694,3 @@ class StatusDisplay:
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-        
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("system_status"))
-        # 更新状态信息区域的标题
-        for child in self.frame.winfo_children():
-            if isinstance(child, ttk.LabelFrame):
-                if child.cget("text") in ["系统信息", "System Info", "System Information"]:
-                    child.config(text=lang.get_text("system_info"))
\ No newline at end of file
@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 import datetime
+import sqlite3
 import sv_ttk
 
 from config import CONFIG
@@ -39,9 +40,21 @@ class ControlPanel:
             self.root.geometry("1000x800")  # 调整窗口大小为更合理的尺寸
             self.root.minsize(800, 600)  # 设置最小窗口大小
             self.manager = CameraManager()
+            self._apply_thread_budget()
             self._setup_ui()
             self._center_window()
             self._start_status_update()
+            self.station_server = self._start_station_server()
+            self.alarm_store = self._start_alarm_store()
+            self.clip_recorder = self._start_clip_recorder()
+            self.thread_cpu = self._start_thread_cpu()
+            self.metrics_server = self._start_metrics_server()
+            if CONFIG.profiler_signal:
+                from modules.profiler import install_signal_trigger
+                # 信号处理函数在主线程中执行，转交给界面事件循环
+                install_signal_trigger(lambda: self.root.after(0, self.start_profiler))
+            # 窗口显示后再在后台导入视频处理相关的重量级库
+            self.root.after_idle(self.manager.preload)
             logging.info("控制面板初始化完成")
         except Exception as e:
             logging.critical(f"控制面板初始化失败: {str(e)}")
@@ -110,7 +123,8 @@ class ControlPanel:
                     'start': self.start_selected,
                     'stop': self.stop_all,
                     'pause': self.pause_alarm,
-                    'reset': self.reset_status
+                    'reset': self.reset_status,
+                    'profile': self.start_profiler
                 }
             )
             self.control_buttons.pack(fill=tk.X, pady=5)
@@ -132,124 +146,19 @@ class ControlPanel:
         self.current_theme = theme
         
     def _on_language_change(self):
-        """语言变更回调，更新所有UI组件的文本"""
+        """语言变更回调，更新所有UI组件的文本
+        
+        各组件创建控件时已登记翻译键，这里只需遍历一次登记表。
+        """
         # 更新窗口标题
         self.root.title(lang.get_text("window_title"))
         
-        # 更新各组件文本
-        self.theme_selector.update_text()
-        self.camera_selector.update_text()
-        self.time_display.update_text()
-        self.settings_panel.frame.config(text=lang.get_text("parameter_settings"))
-        self.control_buttons.frame.config(text=lang.get_text("control_buttons"))
-        self.status_display.frame.config(text=lang.get_text("system_status"))
-        self.language_selector.update_text()
-        
-        # 更新设置面板中的文本
-        # 更新手势灵敏度标签
-        for child in self.settings_panel.frame.winfo_children():
-            if isinstance(child, ttk.Label) and ("手势检测灵敏度" in child.cget("text") or "Gesture Detection" in child.cget("text")):
-                child.config(text=f"{lang.get_text('gesture_sensitivity')}:")
-        
-        # 更新报警间隔标签
-        for child in self.settings_panel.frame.winfo_children():
-            if isinstance(child, ttk.Frame):
-                for subchild in child.winfo_children():
-                    if isinstance(subchild, ttk.Label) and ("报警间隔" in subchild.cget("text") or "Alarm Interval" in subchild.cget("text")):
-                        subchild.config(text=f"{lang.get_text('alarm_interval')}:")
-        
-        # 更新级别标签
-        for child in self.settings_panel.frame.winfo_children():
-            if isinstance(child, ttk.Frame):
-                for subchild in child.winfo_children():
-                    if isinstance(subchild, ttk.Frame):
-                        for label in subchild.winfo_children():
-                            if isinstance(label, ttk.Label) and (label.cget("text").startswith("级别") or label.cget("text").startswith("Level")):
-                                level_num = label.cget("text").replace("级别", "").replace("Level", "")
-                                label.config(text=f"{lang.get_text('level')}{level_num}")
-        
-        # 更新ROI设置中的宽度和高度标签
-        for notebook in self.settings_panel.frame.winfo_children():
-            if isinstance(notebook, ttk.Notebook):
-                # 更新每个标签页的标题
-                for i, tab_id in enumerate(notebook.tabs()):
-                    notebook.tab(tab_id, text=f"{lang.get_text('camera')} {i} ROI")
-                    
-                    # 更新标签页内容
-                    tab = notebook.nametowidget(tab_id)
-                    for frame in tab.winfo_children():
-                        if isinstance(frame, ttk.Frame):
-                            for label in frame.winfo_children():
-                                if isinstance(label, ttk.Label):
-                                    if label.cget("text") == "宽度" or label.cget("text") == "Width":
-                                        label.config(text=lang.get_text("width"))
-                                    elif label.cget("text") == "高度" or label.cget("text") == "Height":
-                                        label.config(text=lang.get_text("height"))
-        
-        # 更新应用按钮文本
-        for child in self.settings_panel.frame.winfo_children():
-            if isinstance(child, ttk.Button):
-                child.config(text=lang.get_text("apply_settings"))
-        
-        # 更新摄像头选择器中的复选框文本
-        for child in self.camera_selector.frame.winfo_children():
-            if isinstance(child, ttk.Frame):  # 找到网格布局框架
-                for checkbox in child.winfo_children():
-                    if isinstance(checkbox, ttk.Checkbutton):
-                        text = checkbox.cget("text")
-                        if "摄像头" in text or "Camera" in text:
-                            # 提取摄像头编号
-                            cam_num = text.split()[-1] if " " in text else text[-1]
-                            checkbox.config(text=f"{lang.get_text('camera')} {cam_num}")
-        
-        # 更新控制按钮文本
-        for child in self.control_buttons.frame.winfo_children():
-            if isinstance(child, ttk.Frame):  # 找到按钮网格布局框架
-                for button in child.winfo_children():
-                    if isinstance(button, ttk.Button):
-                        text = button.cget("text")
-                        if "启动选中" in text or "Start Selected" in text:
-                            button.config(text=lang.get_text("start_selected"))
-                        elif "停止所有" in text or "Stop All" in text:
-                            button.config(text=lang.get_text("stop_all"))
-                        elif "暂停报警" in text or "Pause Alarm" in text:
-                            button.config(text=lang.get_text("pause_alarm"))
-                        elif "重置状态" in text or "Reset Status" in text:
-                            button.config(text=lang.get_text("reset_status"))
-        
-        # 更新状态显示组件中的标题行
-        for child in self.status_display.cam_status_frame.winfo_children():
-            if isinstance(child, ttk.Frame) and child.winfo_children():  # 找到标题行框架
-                header_labels = [widget for widget in child.winfo_children() if isinstance(widget, ttk.Label)]
-                if header_labels:  # 确保有标签
-                    for label in header_labels:
-                        text = label.cget("text")
-                        if text in ["状态", "Status"]:
-                            label.config(text=lang.get_text("status"))
-                        elif text in ["摄像头", "Camera"]:
-                            label.config(text=lang.get_text("camera"))
-                        elif text in ["报警级别", "Alarm Level"]:
-                            label.config(text=lang.get_text("alarm_level"))
-        
-        # 更新摄像头状态标签
-        for i, cam_label in enumerate(self.status_display.cam_status_labels):
-            cam_label_parent = cam_label.master
-            for child in cam_label_parent.winfo_children():
-                if isinstance(child, ttk.Label):
-                    text = child.cget("text")
-                    if "摄像头" in text or "Camera" in text:
-                        child.config(text=f"{lang.get_text('camera')} {i}")
-        
-        # 更新系统信息标签框
-        for child in self.status_display.frame.winfo_children():
-            if isinstance(child, ttk.LabelFrame):
-                if child.cget("text") in ["系统信息", "System Info", "System Information"]:
-                    child.config(text=lang.get_text("system_info"))
+        elapsed = lang.refresh()
         
         # 更新状态文本
         self.status_display.set_status_text(lang.get_text("settings_updated"))
         
-        logging.info(f"界面语言已更新为: {lang.get_language_name()}")
+        logging.info(f"界面语言已更新为: {lang.get_language_name()}，耗时 {elapsed:.1f}ms")
         
     def _apply_settings(self):
         """应用参数设置更新"""
@@ -266,16 +175,14 @@ class ControlPanel:
             # 更新手势检测灵敏度
             CONFIG.gesture_threshold = settings['gesture_threshold']
             
-            # 更新报警间隔设置
+            # 更新报警间隔设置 - 触发时长和报警音频随各摄像头的新版本配置发布，
+            # 运行中的摄像头在下一帧开始时重新加载报警音频后使用新的触发时长
+            published = {}
             new_triggers = settings['alarm_triggers']
-            if new_triggers:
-                new_triggers.sort()
-                CONFIG.alarm_triggers = new_triggers
-                # 更新报警音频映射
-                CONFIG.alarm_sounds = {
-                    t: f"sounds/{t}S报警音.wav" if t < 30 else "sounds/alarm.wav"
-                    for t in CONFIG.alarm_triggers
-                }
+            if new_triggers and sorted(new_triggers) != CONFIG.alarm_triggers:
+                for cam_id, camera in enumerate(CONFIG.update_alarm_triggers(new_triggers)):
+                    published[cam_id] = camera.version
+                logging.info(f"报警间隔已发布为 {CONFIG.alarm_triggers}")
                 
             # 更新网格设置
             if 'grid_settings' in settings:
@@ -291,56 +198,20 @@ class ControlPanel:
                         processor.grid_overlay.grid_spacing_x = CONFIG.grid_spacing_x
                         processor.grid_overlay.grid_spacing_y = CONFIG.grid_spacing_y
             
-            # 更新ROI设置 - 为每个摄像头单独更新
-            roi_updated = False
-            for cam_id, roi in settings['roi_settings'].items():
-                CONFIG.cameras[cam_id].roi = roi
-                roi_updated = True
+            # 更新ROI设置 - 每个摄像头发布一个新版本配置（写时复制），
+            # 运行中的摄像头在下一帧开始时切换，无需重启，未变化的摄像头不受影响
+            roi_updates = {}
+            for (cam_id, roi_index), roi in settings['roi_settings'].items():
+                roi_updates.setdefault(cam_id, {})[roi_index] = roi
+            for cam_id, updates in roi_updates.items():
+                camera = CONFIG.update_camera_rois(cam_id, updates)
+                published[cam_id] = camera.version
+                logging.info(f"摄像头{cam_id} ROI设置已发布为配置版本 {camera.version}")
             
-            # 如果ROI设置已更新且有摄像头正在运行，询问用户是否重启摄像头
-            if roi_updated and running_cameras:
-                restart = messagebox.askyesno(
-                    lang.get_text("apply_settings"), 
-                    "ROI设置已更新，是否重启摄像头以应用新设置？\n\n选择'是'将重启摄像头\n选择'否'将动态更新ROI设置（不中断监测）"
-                )
-                if restart:
-                    # 停止所有运行的摄像头
-                    self.manager.stop_all()
-                    # 重新启动之前运行的摄像头
-                    for cam_id in running_cameras:
-                        try:
-                            self.manager.start_camera(cam_id)
-                            logging.info(f"摄像头 {cam_id} 已重启以应用新的ROI设置")
-                        except Exception as e:
-                            logging.error(f"重启摄像头 {cam_id} 失败: {str(e)}")
-                            messagebox.showerror(lang.get_text("runtime_error"), f"{lang.get_text('camera_start_failed', cam_id)}: {str(e)}")
-                else:
-                    # 动态更新ROI设置，不重启摄像头
-                    update_success = True
-                    failed_cameras = []
-                    for cam_id in running_cameras:
-                        processor = self.manager.get_processor(cam_id)
-                        if processor:
-                            if not processor.update_roi():
-                                update_success = False
-                                failed_cameras.append(cam_id)
-                                logging.warning(f"摄像头 {cam_id} ROI设置动态更新失败")
-                    
-                    if update_success:
-                        self.status_display.set_status_text(lang.get_text("settings_updated"))
-                        logging.info("ROI设置已动态更新，无需重启摄像头")
-                    else:
-                        if len(failed_cameras) == len(running_cameras):
-                            # 所有摄像头更新失败
-                            messagebox.showwarning(lang.get_text("config_error"), "所有摄像头ROI设置更新失败，建议重启摄像头以应用新设置。")
-                            self.status_display.set_status_text(lang.get_text("settings_updated"))
-                            logging.warning("所有摄像头ROI设置更新失败")
-                        else:
-                            # 部分摄像头更新失败
-                            failed_str = ", ".join([str(cam) for cam in failed_cameras])
-                            messagebox.showwarning(lang.get_text("config_error"), f"摄像头 {failed_str} 的ROI设置未能动态更新，建议重启这些摄像头以确保设置生效。")
-                            self.status_display.set_status_text("ROI设置部分更新，建议重启部分摄像头")
-                            logging.warning(f"摄像头 {failed_str} ROI设置更新失败")
+            running = {cam_id: version for cam_id, version in published.items() if cam_id in running_cameras}
+            if running:
+                # 摄像头在下一帧切换配置，稍后统计生效延迟
+                self.root.after(1000, lambda: self._report_config_apply(running))
             
             self.status_display.set_status_text(lang.get_text("settings_updated"))
             logging.info("参数设置已更新")
@@ -351,6 +222,28 @@ class ControlPanel:
             messagebox.showerror(lang.get_text("unknown_error"), f"更新设置失败: {str(e)}")
             logging.error(f"参数设置更新失败: {str(e)}")
             
+    def _report_config_apply(self, published):
+        """统计已发布配置在运行中摄像头上的生效情况
+        
+        Args:
+            published: {摄像头ID: 发布的配置版本号}
+        """
+        delays = []
+        pending = []
+        for cam_id, version in published.items():
+            processor = self.manager.get_processor(cam_id)
+            status = processor.status_snapshot if processor else None
+            if status is None:
+                continue
+            if status.config_version >= version and status.config_apply_ms is not None:
+                delays.append(status.config_apply_ms)
+            else:
+                pending.append(cam_id)
+        if delays:
+            logging.info(f"{len(delays)} 个摄像头已应用新配置，最大生效延迟 {max(delays):.1f}ms")
+        if pending:
+            logging.warning(f"摄像头 {pending} 尚未应用新配置（区域数量变化或ROI无效时需要重启摄像头）")
+    
     def start_selected(self):
         """启动选中的摄像头"""
         selected_cameras = self.camera_selector.get_selected()
@@ -394,7 +287,7 @@ class ControlPanel:
             for i in range(len(CONFIG.cameras)):
                 processor = self.manager.get_processor(i)
                 if processor:
-                    processor.alarm_channel.stop()
+                    processor.pause_alarm()
             self.status_display.set_status_text(lang.get_text("alarm_paused"))
             logging.info("报警已暂停")
         except Exception as e:
@@ -407,8 +300,7 @@ class ControlPanel:
             for i in range(len(CONFIG.cameras)):
                 processor = self.manager.get_processor(i)
                 if processor:
-                    processor._reset_alarm()
-                    processor.alarm_channel.stop()
+                    processor.request_reset()
             self.status_display.set_status_text(lang.get_text("status_reset"))
             self._update_status()
             logging.info("所有摄像头状态已重置")
@@ -416,11 +308,185 @@ class ControlPanel:
             logging.error(f"重置状态失败: {str(e)}")
             messagebox.showerror("错误", f"重置状态失败: {str(e)}")
             
+    def start_profiler(self):
+        """启动一次摄像头线程的采样分析，结果写入 profiler_dir"""
+        try:
+            from modules.profiler import profiler
+            if profiler.start(duration=CONFIG.profiler_duration, interval=CONFIG.profiler_interval,
+                              directory=CONFIG.profiler_dir, thread_prefix=CONFIG.profiler_thread_prefix,
+                              max_overhead=CONFIG.profiler_max_overhead):
+                self.status_display.set_status_text(lang.get_text("profiler_started", CONFIG.profiler_duration))
+            else:
+                self.status_display.set_status_text(lang.get_text("profiler_running"))
+        except Exception as e:
+            logging.error(f"启动采样分析失败: {str(e)}")
+            
+    def _start_station_server(self):
+        """按配置启动护士站推送服务
+        
+        Returns:
+            StationServer: 推送服务实例，未启用或启动失败时为None
+        """
+        if not CONFIG.station_server_enabled:
+            return None
+        from modules.event_bus import event_bus
+        from modules.station_server import StationServer
+        server = StationServer(
+            self.manager.snapshots,
+            commands={name: self._station_command(name) for name in ('start', 'stop', 'pause', 'reset')},
+            host=CONFIG.station_server_host,
+            port=CONFIG.station_server_port,
+            path=CONFIG.station_server_socket or None,
+            queue_size=CONFIG.station_server_queue_size,
+            interval=CONFIG.status_publish_interval,
+            events=event_bus.subscribe()
+        )
+        try:
+            server.start()
+        except RuntimeError as e:
+            logging.error(str(e))
+            return None
+        return server
+    
+    def _start_alarm_store(self):
+        """按配置启动报警事件存储
+        
+        Returns:
+            AlarmStore: 事件存储实例，未启用或打开数据库失败时为None
+        """
+        if not CONFIG.alarm_store_enabled:
+            return None
+        from modules.alarm_store import AlarmStore
+        try:
+            store = AlarmStore(
+                CONFIG.alarm_store_path,
+                retention_days=CONFIG.alarm_store_retention_days,
+                batch_size=CONFIG.alarm_store_batch_size,
+                flush_interval=CONFIG.alarm_store_flush_interval
+            )
+        except (sqlite3.Error, OSError) as e:
+            logging.error(f"打开报警事件数据库失败: {str(e)}")
+            return None
+        store.start()
+        return store
+    
+    def _start_clip_recorder(self):
+        """按配置启动报警片段录制
+        
+        Returns:
+            ClipRecorder: 全局录制器，未启用时为None
+        """
+        if not CONFIG.clip_enabled:
+            return None
+        from modules.clip_recorder import clip_recorder
+        clip_recorder.start(
+            directory=CONFIG.clip_dir,
+            pre_seconds=CONFIG.clip_pre_seconds,
+            post_seconds=CONFIG.clip_post_seconds,
+            fps=CONFIG.clip_fps,
+            quality=CONFIG.clip_jpeg_quality,
+            camera_memory_mb=CONFIG.clip_camera_memory_mb,
+            total_memory_mb=CONFIG.clip_total_memory_mb,
+            workers=CONFIG.clip_encode_workers
+        )
+        return clip_recorder
+    
+    def _start_thread_cpu(self):
+        """按配置启动线程CPU统计
+        
+        Returns:
+            ThreadCpuMonitor: 全局线程CPU统计，未启用或平台不支持时为None
+        """
+        if not CONFIG.thread_cpu_enabled:
+            return None
+        from modules.thread_cpu import thread_cpu
+        if not thread_cpu.start(CONFIG.thread_cpu_interval):
+            return None
+        return thread_cpu
+    
+    def _apply_thread_budget(self):
+        """按配置的摄像头数和本机核心数应用线程预算（在启动任何摄像头之前）"""
+        if not CONFIG.thread_budget_enabled:
+            return
+        from modules.thread_budget import plan_threads, thread_budget
+        thread_budget.apply(plan_threads(
+            len(CONFIG.cameras),
+            CONFIG.thread_pool_size,
+            reserve_ui=CONFIG.thread_budget_reserve_ui,
+            pin=CONFIG.thread_budget_pin
+        ))
+    
+    def _start_metrics_server(self):
+        """按配置启动Prometheus指标服务
+        
+        Returns:
+            MetricsServer: 指标服务实例，未启用或启动失败时为None
+        """
+        if not CONFIG.metrics_enabled:
+            return None
+        from modules.metrics import MetricsServer, render_metrics
+        server = MetricsServer(
+            lambda: render_metrics(self.manager.processors, self.manager.cpu_usage()),
+            host=CONFIG.metrics_host,
+            port=CONFIG.metrics_port
+        )
+        try:
+            server.start()
+        except RuntimeError as e:
+            logging.error(str(e))
+            return None
+        return server
+    
+    def _station_command(self, name):
+        """生成护士站命令回调：在服务线程中检查摄像头ID，再交给界面线程执行"""
+        def command(camera):
+            if camera is not None and not 0 <= camera < len(CONFIG.cameras):
+                raise ValueError(f"摄像头{camera}未配置")
+            self.root.after(0, lambda: self._run_station_command(name, camera))
+        return command
+    
+    def _run_station_command(self, name, camera):
+        """在界面线程中执行护士站命令
+        
+        Args:
+            name: 命令名（start/stop/pause/reset）
+            camera: 摄像头ID，None表示全部（启动时为当前选中的摄像头）
+        """
+        if camera is None:
+            {'start': self.start_selected, 'stop': self.stop_all,
+             'pause': self.pause_alarm, 'reset': self.reset_status}[name]()
+            return
+        processor = self.manager.get_processor(camera)
+        if name == 'start' and processor is None:
+            if self.manager.start_camera(camera):
+                self.status_display.set_status_text(lang.get_text("camera_running", camera))
+        elif name == 'stop' and processor is not None:
+            self.manager.stop_camera(camera)
+            self._update_status()
+        elif name == 'pause' and processor is not None:
+            processor.pause_alarm()
+        elif name == 'reset' and processor is not None:
+            processor.request_reset()
+        logging.info(f"护士站命令 {name} 已应用到摄像头{camera}")
+    
     def on_close(self):
         """窗口关闭事件处理"""
         try:
             logging.info("系统正在关闭...")
+            if self.station_server:
+                self.station_server.stop()
+            if self.metrics_server:
+                self.metrics_server.stop()
             self.stop_all()
+            if self.clip_recorder:
+                self.clip_recorder.stop()
+            if self.thread_cpu:
+                self.thread_cpu.stop()
+            # 正在进行的采样分析提前结束并写出结果
+            from modules.profiler import profiler
+            profiler.stop()
+            if self.alarm_store:
+                self.alarm_store.stop()
             self.root.destroy()
         except Exception as e:
             logging.error(f"系统关闭异常: {str(e)}")
@@ -19,27 +19,27 @@ class LanguageSelector:
             parent: 父级窗口组件
             callback: 语言切换后的回调函数
         """
-        self.frame = ttk.LabelFrame(parent, text=lang.get_text("language_settings"), padding=5)
+        self.frame = lang.bind(ttk.LabelFrame(parent, padding=5), "language_settings")
         self.language_var = tk.StringVar(value=lang.get_current_language())
         self.callback = callback
         
         # 创建语言选择单选按钮
         self.chinese_radio = ttk.Radiobutton(
             self.frame, 
-            text=lang.get_text("chinese"), 
             value="zh_CN", 
             variable=self.language_var, 
             command=self._on_language_change
         )
+        lang.bind(self.chinese_radio, "chinese")
         self.chinese_radio.pack(side=tk.LEFT, padx=5)
         
         self.english_radio = ttk.Radiobutton(
             self.frame, 
-            text=lang.get_text("english"), 
             value="en_US", 
             variable=self.language_var, 
             command=self._on_language_change
         )
+        lang.bind(self.english_radio, "english")
         self.english_radio.pack(side=tk.LEFT, padx=5)
     
     def _on_language_change(self):
@@ -53,9 +53,4 @@ class LanguageSelector:
     def pack(self, **kwargs):
         """打包组件"""
         self.frame.pack(**kwargs)
-    
-    def update_text(self):
-        """更新组件文本"""
-        self.frame.config(text=lang.get_text("language_settings"))
-        self.chinese_radio.config(text=lang.get_text("chinese"))
-        self.english_radio.config(text=lang.get_text("english"))
\ No newline at end of file
+
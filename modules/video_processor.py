@@ -12,11 +12,55 @@ import traceback
 import os
 import wave
 from threading import Event
+from mediapipe.calculators.tensor import inference_calculator_pb2
+from mediapipe.framework import thread_pool_executor_pb2
 from config import CONFIG
 
 # 导入FPSCounter类和GridOverlay类，使用相对导入
+from .clip_recorder import clip_recorder
+from .event_bus import AlarmAcknowledged, CameraError, event_bus
 from .fps_counter import FPSCounter
+from .frame_pacer import FramePacer
 from .grid_overlay import GridOverlay
+from .hand_landmarks import landmarks_to_array
+from .landmark_recorder import SOURCE_CACHE, SOURCE_INFERENCE, SOURCE_TRACKING, LandmarkRecorder
+from .metrics import INFERENCE_BUCKETS, Histogram
+from .roi_monitor import RoiMonitor, RoiMosaic
+from .status_snapshot import CameraStatus
+from .thread_budget import thread_budget
+from .thread_cpu import thread_cpu
+
+class BudgetedHands(mp.solutions.hands.Hands):
+    """按线程预算限制MediaPipe图调度线程数和XNNPACK推理线程数的 Hands
+
+    SolutionBase 在创建图之前用展开子图后的图配置调用 _modify_calculator_options()，
+    在这里修改默认执行器的线程池大小和各推理节点的线程数。
+    """
+
+    def __init__(self, num_threads, **kwargs):
+        """初始化
+
+        Args:
+            num_threads: 图调度线程数和每个推理节点的线程数
+            kwargs: mp.solutions.hands.Hands 的参数
+        """
+        self._num_threads = num_threads
+        super().__init__(**kwargs)
+
+    def _modify_calculator_options(self, calculator_graph_config, calculator_params):
+        super()._modify_calculator_options(calculator_graph_config, calculator_params)
+        # 图配置中已有默认执行器（名称为空）时不能再设置图级 num_threads，只能修改执行器
+        executors = [executor for executor in calculator_graph_config.executor if not executor.name]
+        executor = executors[0] if executors else calculator_graph_config.executor.add()
+        executor.type = "ThreadPoolExecutor"
+        executor.options.Extensions[thread_pool_executor_pb2.ThreadPoolExecutorOptions.ext].num_threads = \
+            self._num_threads
+        for node in calculator_graph_config.node:
+            if node.calculator.startswith("InferenceCalculator") and node.HasField('options'):
+                options = node.options.Extensions[inference_calculator_pb2.InferenceCalculatorOptions.ext]
+                options.cpu_num_thread = self._num_threads
+                if options.delegate.HasField('xnnpack'):
+                    options.delegate.xnnpack.num_threads = self._num_threads
 
 class VideoProcessor:
     """视频处理器类，负责摄像头视频流的处理、手势检测和报警控制。
@@ -39,15 +83,46 @@ class VideoProcessor:
             self.camera_id = camera_id
             self.config = CONFIG.cameras[camera_id]
             self.stop_event = stop_event
-            self.detection_start_time = 0
             self.last_detection = 0
-            self.alarm_active = False
-            self.played_sounds = set()
             self.fps_counter = FPSCounter()
+            # 摄像头线程内视频读取和显示的累计CPU时间（秒），由线程CPU统计拆分摄像头线程的占用
+            self.stage_cpu = {'capture': 0.0, 'display': 0.0}
+            # 读取、处理和显示共用的帧节拍器（单调时钟），仿真时使用替换后的虚拟时钟
+            self.pacer = FramePacer(1.0 / 30 if CONFIG.max_fps is None else 1.0 / CONFIG.max_fps,
+                                    spin=CONFIG.frame_pacer_spin, clock=time)
+            # 每个监测区域（床位）独立维护手势和报警状态
+            self.monitors = []
+            self._mosaic = RoiMosaic()
+            # 推理统计：实际推理次数和被级联检测跳过的次数
+            self.inference_calls = 0
+            self.inference_skipped = 0
+            self.inference_cache_hits = 0  # 全部区域都命中缓存而跳过推理的次数
+            self.inference_seconds = Histogram(INFERENCE_BUCKETS)  # 单次推理耗时分布
+            # 帧和视频源统计，只由摄像头线程累加，指标服务直接读取
+            self.frames_captured = 0
+            self.frames_processed = 0
+            self.frames_skipped = 0
+            self.stream_errors = 0
+            self.reconnects = 0
+            self.last_inference = 0
+            self._force_detect = False  # 光流跟踪漂移时强制在下一帧推理
+            self._reset_requested = False  # 界面线程请求重置报警，由摄像头线程在帧边界执行
+            # 配置热更新：界面线程发布新版本配置，摄像头线程在帧边界切换
+            self.config_apply_ms = None  # 最近一次配置从发布到生效的延迟（毫秒）
+            self._rejected_config = None  # 无法热更新的配置版本，避免每帧重复检查
+            # 关键点记录：最近一次检测各区域关键点的来源和手部置信度
+            self.landmark_recorder = None
+            self._hand_sources = []
+            self._hand_scores = []
+            # 最新的状态快照，由摄像头线程发布，其他线程只读
+            self.status_snapshot = None
+            self._status_key = None
+            self._last_publish = 0
             # 初始化网格叠加器
             self.grid_overlay = GridOverlay(camera_id)
             self._verify_resources()
             self._init_components()
+            self._publish_status(time.time(), force=True)
             logging.info(f"摄像头{camera_id}初始化完成")
         except Exception as e:
             logging.error(f"摄像头{camera_id}初始化失败: {str(e)}\n{traceback.format_exc()}")
@@ -56,7 +131,7 @@ class VideoProcessor:
     def _verify_resources(self):
         """验证所需资源文件是否存在，如不存在则生成备用资源"""
         try:
-            for path in CONFIG.alarm_sounds.values():
+            for path in self._alarm_settings(self.config)[1].values():
                 if not os.path.exists(path):
                     logging.warning(f"缺少音频文件: {path}")
             if not os.path.exists(CONFIG.fallback_sound):
@@ -86,13 +161,21 @@ class VideoProcessor:
         try:
             # 初始化MediaPipe，使用更高效的配置
             self.mp_hands = mp.solutions.hands
-            self.hands = self.mp_hands.Hands(
+            hands_options = dict(
                 static_image_mode=False,  # 视频模式
-                max_num_hands=1,  # 减少为1只手，提高性能
+                max_num_hands=len(self.config.rois),  # 每个监测区域最多1只手，提高性能
                 min_detection_confidence=self.config.min_confidence,
                 min_tracking_confidence=0.5,
                 model_complexity=0  # 使用最轻量级模型
             )
+            # 应用线程预算时限制OpenCV和该摄像头的MediaPipe线程数，否则使用库的默认值
+            if thread_budget.opencv_threads() is not None:
+                cv2.setNumThreads(thread_budget.opencv_threads())
+            num_threads = thread_budget.camera_threads()
+            if num_threads is None:
+                self.hands = self.mp_hands.Hands(**hands_options)
+            else:
+                self.hands = BudgetedHands(num_threads, **hands_options)
             
             # 初始化摄像头
             self.cap = self._init_capture()
@@ -102,9 +185,29 @@ class VideoProcessor:
             # 初始化音频系统
             if not pygame.mixer.get_init():
                 pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-            self.alarm_sounds = {}
-            self.alarm_channel = pygame.mixer.Channel(self.camera_id)
-            self._load_alarm_sounds()
+            self.alarm_triggers, paths = self._alarm_settings(self.config)
+            self.alarm_sounds = self._load_alarm_sounds(paths)
+            
+            if CONFIG.landmark_record_enabled:
+                try:
+                    self.landmark_recorder = LandmarkRecorder(
+                        os.path.join(CONFIG.landmark_record_dir, f"camera{self.camera_id}"),
+                        block_rows=CONFIG.landmark_record_block_rows
+                    )
+                except OSError as e:
+                    logging.error(f"摄像头{self.camera_id} 关键点记录目录不可用: {str(e)}")
+            
+            # 为每个监测区域分配独立的报警声道
+            if pygame.mixer.get_num_channels() < CONFIG.total_roi_count():
+                pygame.mixer.set_num_channels(CONFIG.total_roi_count())
+            self.monitors = [
+                RoiMonitor(
+                    self.camera_id, i, roi,
+                    pygame.mixer.Channel(CONFIG.alarm_channel_index(self.camera_id, i)),
+                    self.alarm_sounds, self.alarm_triggers
+                )
+                for i, roi in enumerate(self.config.rois)
+            ]
             
             # 初始化性能监控变量
             self._last_fps_update = 0
@@ -142,7 +245,7 @@ class VideoProcessor:
                     self.cap.release()
                     time.sleep(0.5)  # 等待资源释放
                 
-                cap = cv2.VideoCapture(source)
+                cap = self._open_source()
                 if not cap.isOpened():
                     if attempt < max_retries - 1:
                         logging.warning(f"尝试打开视频源失败 (尝试 {attempt + 1}/{max_retries}): {source}")
@@ -187,25 +290,56 @@ class VideoProcessor:
         
         raise RuntimeError(f"无法初始化摄像头: {source}")
             
-    def _load_alarm_sounds(self):
-        """加载报警音频文件"""
-        for duration, path in CONFIG.alarm_sounds.items():
+    def _open_source(self):
+        """打开视频源（仿真测试时由子类替换为合成视频源）
+
+        Returns:
+            cv2.VideoCapture: 视频捕获对象
+        """
+        return cv2.VideoCapture(self.config.source)
+
+    @staticmethod
+    def _alarm_settings(config):
+        """获取配置中的报警触发时长和报警音频路径
+
+        Args:
+            config: 摄像头配置，未设置报警触发时长时使用系统配置
+
+        Returns:
+            tuple: (升序的触发时长元组, {触发时长: 音频文件路径})
+        """
+        if config.alarm_triggers:
+            return tuple(sorted(config.alarm_triggers)), dict(config.alarm_sounds)
+        return tuple(sorted(CONFIG.alarm_triggers)), dict(CONFIG.alarm_sounds)
+
+    def _load_alarm_sounds(self, paths):
+        """加载报警音频文件
+
+        Args:
+            paths: {触发时长: 音频文件路径}
+
+        Returns:
+            dict: {触发时长: pygame.mixer.Sound}
+        """
+        sounds = {}
+        for duration, path in paths.items():
             try:
-                self.alarm_sounds[duration] = pygame.mixer.Sound(path)
+                sounds[duration] = pygame.mixer.Sound(path)
             except FileNotFoundError:
                 logging.warning(f"加载 {path} 失败，使用备用音")
-                self.alarm_sounds[duration] = pygame.mixer.Sound(CONFIG.fallback_sound)
+                sounds[duration] = pygame.mixer.Sound(CONFIG.fallback_sound)
             except Exception as e:
                 logging.error(f"加载音频失败: {str(e)}")
                 raise
+        return sounds
 
     def process_stream(self):
         """处理视频流的主循环"""
         try:
-            prev_time = time.time()
             frame_count = 0
             skip_count = 0
-            target_interval = 1.0 / 30 if CONFIG.max_fps is None else 1.0 / CONFIG.max_fps  # 目标帧间隔时间
+            target_interval = self.pacer.interval
+            prev_time = time.monotonic()
             
             # 确保hands对象存在且有效
             if not hasattr(self, 'hands') or self.hands is None:
@@ -217,57 +351,69 @@ class VideoProcessor:
                 logging.error(f"摄像头{self.camera_id} 视频捕获对象无效")
                 return
             
+            thread_cpu.register_current(self.camera_id, 'camera', self.stage_cpu)
             with self.hands:
                 while not self.stop_event.is_set():
                     try:
-                        # 帧率控制 - 如果距离上一帧时间太短，则等待
-                        current_time = time.time()
-                        elapsed = current_time - prev_time
-                        if elapsed < target_interval:
-                            # 使用短暂睡眠而不是忙等待，减少CPU占用
-                            sleep_time = target_interval - elapsed
-                            if sleep_time > 0.001:  # 避免过短的睡眠
-                                time.sleep(sleep_time)
-                            continue
+                        # 帧率控制 - 等待下一帧的截止时间
+                        self.pacer.wait()
                             
                         # 读取帧
+                        cpu_start = time.thread_time()
                         ret, frame = self.cap.read()
+                        self.stage_cpu['capture'] += time.thread_time() - cpu_start
                         if not ret:
                             self._handle_stream_error()
+                            # 重连的停顿不计入节拍统计
+                            self.pacer.reset()
                             continue
+                        self.frames_captured += 1
+                        self.pacer.mark('capture')
                             
                         # 跳帧处理 - 在高负载时跳过部分帧的处理
                         frame_count += 1
                         if frame_count % (skip_count + 1) != 0:
                             # 即使跳过处理，也要显示原始帧以保持流畅
+                            self.frames_skipped += 1
                             self._display_frame(frame)
+                            self.pacer.mark('display')
                             continue
                             
-                        # 动态调整跳帧数量 - 根据处理时间自适应
-                        if elapsed > 2 * target_interval and skip_count < 2:
-                            skip_count += 1
-                            logging.debug(f"性能优化: 增加跳帧数量至 {skip_count}")
-                        elif elapsed < target_interval * 0.8 and skip_count > 0:
-                            skip_count -= 1
-                            logging.debug(f"性能优化: 减少跳帧数量至 {skip_count}")
-                            
                         # 处理帧
                         processed_frame = self._process_frame(frame)
+                        self.frames_processed += 1
+                        self.pacer.mark('processing')
                         self._display_frame(processed_frame)
                         
                         # 更新FPS计数
-                        current_time = time.time()
-                        self.fps_counter.update(1 / (current_time - prev_time))
+                        current_time = time.monotonic()
+                        self.fps_counter.update(1 / max(current_time - prev_time, 1e-6))
                         prev_time = current_time
                         
-                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                        # 窗口事件处理计入显示
+                        cpu_start = time.thread_time()
+                        key = cv2.waitKey(1)
+                        self.stage_cpu['display'] += time.thread_time() - cpu_start
+                        frame_cost = self.pacer.mark('display')
+                        if key & 0xFF == ord('q'):
                             break
+                            
+                        # 动态调整跳帧数量 - 根据本帧从节拍开始到显示完成的耗时（含读取）自适应
+                        if frame_cost > 2 * target_interval and skip_count < 2:
+                            skip_count += 1
+                            logging.debug(f"性能优化: 增加跳帧数量至 {skip_count}")
+                        elif frame_cost < target_interval * 0.8 and skip_count > 0:
+                            skip_count -= 1
+                            logging.debug(f"性能优化: 减少跳帧数量至 {skip_count}")
                     except Exception as e:
                         logging.error(f"帧处理错误: {str(e)}")
+                        event_bus.publish(CameraError, self.camera_id, time.time(), f"帧处理错误: {str(e)}")
                         continue
         except Exception as e:
             logging.error(f"视频流处理错误: {str(e)}\n{traceback.format_exc()}")
+            event_bus.publish(CameraError, self.camera_id, time.time(), f"视频流处理错误: {str(e)}")
         finally:
+            thread_cpu.unregister_current()
             self._release_resources()
 
     def _process_frame(self, frame):
@@ -279,145 +425,188 @@ class VideoProcessor:
         Returns:
             处理后的图像帧
         """
-        # 避免不必要的复制，直接在原始帧上操作
-        roi_frame = self._safe_crop(frame)
-        
-        # 检查是否需要进行手势检测（基于时间间隔）
         current_time = time.time()
-        should_detect = (current_time - self.last_detection) >= CONFIG.detection_interval
         
-        if should_detect:
-            # 转换颜色空间并进行手势检测
-            rgb_frame = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb_frame)
-            gesture_detected = self._detect_gesture(results)
-
-            if gesture_detected:
-                self.last_detection = current_time
-                self._update_alarm_state()
-                self._draw_landmarks(frame, results)
-            else:
-                self._reset_alarm()
+        if self._reset_requested:
+            self._reset_requested = False
+            self._reset_alarm()
+        
+        # 界面线程发布了新版本配置时在帧边界切换，检测和报警状态保持不变
+        config = CONFIG.cameras[self.camera_id]
+        if config is not self.config and config is not self._rejected_config:
+            self._swap_config(config, frame.shape, current_time)
+        
+        # 报警片段录制：按采样帧率提交各区域的原始图像，压缩在线程池中进行
+        if clip_recorder.due(self.camera_id, current_time):
+            clip_recorder.add_frame(self.camera_id, [monitor.crop(frame) for monitor in self.monitors], current_time)
+        
+        due = self._due_monitors(current_time)
+        if any(due):
+            # 到期的监测区域共用一次推理
+            hands_per_roi = self._detect_hands(frame, current_time, due)
+            self.last_inference = current_time
+            self._force_detect = False
+            for i, (monitor, landmarks) in enumerate(zip(self.monitors, hands_per_roi)):
+                if due[i]:
+                    monitor.last_inference = current_time
+                    self._evaluate_monitor(monitor, landmarks, frame, current_time,
+                                           self._hand_sources[i], self._hand_scores[i])
+                elif monitor.tracking:
+                    self._track_monitor(monitor, frame, current_time)
+        elif CONFIG.tracking_enabled:
+            # 两次推理之间用光流传播关键点，每帧评估手势
+            for monitor in self.monitors:
+                if monitor.tracking:
+                    self._track_monitor(monitor, frame, current_time)
         
         # 添加叠加信息（ROI框、FPS等）
         self._add_overlay(frame)
+        self._publish_status(current_time)
         return frame
 
-    def _safe_crop(self, frame):
-        """安全裁剪图像，确保ROI在图像范围内
-        
+    def _due_monitors(self, now):
+        """判断当前帧哪些监测区域需要进行完整推理（基于时间间隔）
+
+        光流跟踪正常的区域以更长的间隔推理，其他区域按各自上次推理的时间保持
+        detection_interval，一个床位开始跟踪不会推迟同一摄像头其他床位的检测。
+
         Args:
-            frame: 原始图像
-            
+            now: 当前时间戳
+
         Returns:
-            裁剪后的ROI区域图像
+            list: 每个区域是否需要推理
         """
-        # 使用缓存的ROI坐标，避免每帧重新计算
-        if not hasattr(self, '_cached_roi_coords'):
-            h, w = frame.shape[:2]
-            roi = self.config.roi
-            x1 = max(0, min(roi["x"], w - 1))
-            y1 = max(0, min(roi["y"], h - 1))
-            x2 = min(x1 + roi["w"], w)
-            y2 = min(y1 + roi["h"], h)
-            self._cached_roi_coords = (y1, y2, x1, x2)
-        
-        y1, y2, x1, x2 = self._cached_roi_coords
-        return frame[y1:y2, x1:x2]
+        if self._force_detect:
+            return [True] * len(self.monitors)
+        tracking = [CONFIG.tracking_enabled and monitor.tracking for monitor in self.monitors]
+        if not any(tracking):
+            return [(now - self.last_detection) >= CONFIG.detection_interval] * len(self.monitors)
+        return [(now - monitor.last_inference) >= (CONFIG.tracking_detection_interval if tracked
+                                                   else CONFIG.detection_interval)
+                for monitor, tracked in zip(self.monitors, tracking)]
+
+    def _track_monitor(self, monitor, frame, now):
+        """用光流传播区域的关键点并评估手势，漂移时在下一帧强制推理"""
+        landmarks = monitor.track(frame)
+        if landmarks is None:
+            logging.debug(f"{monitor.label} 关键点跟踪漂移，强制重新推理")
+            self._force_detect = True
+            return
+        self._evaluate_monitor(monitor, landmarks, frame, now)
+
+    def _evaluate_monitor(self, monitor, landmarks, frame, now, source=SOURCE_TRACKING, score=float('nan')):
+        """评估单个监测区域的手势并更新报警状态
 
-    def _detect_gesture(self, results):
-        """检测特定手势（拇指和小指靠近）
-        
         Args:
-            results: MediaPipe手部检测结果
-            
+            monitor: 监测区域
+            landmarks: 区域内归一化坐标的关键点数组，无手时为None
+            frame: 原始图像帧
+            now: 当前时间戳
+            source: 关键点来源（用于关键点记录）
+            score: 手部置信度（用于关键点记录）
+        """
+        matched = monitor.detect_gesture(landmarks, now)
+        if self.landmark_recorder is not None and landmarks is not None:
+            self.landmark_recorder.append(now, monitor.index, source, score, landmarks, matched)
+        if matched:
+            self.last_detection = now
+            monitor.update_alarm_state(now)
+            monitor.draw_landmarks(frame)
+        else:
+            monitor.reset_alarm()
+
+    def _detect_hands(self, frame, now, include=None):
+        """对监测区域进行一次批量手部检测
+
+        先用肤色存在性检测过滤掉没有手的区域，再用推理结果缓存过滤掉画面几乎不变的区域，
+        剩余区域都不需要推理时不调用推理；单个区域时直接处理裁剪图像，
+        多个区域时拼接为一张图像只推理一次。
+
+        Args:
+            frame: 原始图像帧
+            now: 当前时间戳
+            include: 每个区域是否参与检测，默认全部参与；不参与的区域结果为None，跟踪状态不变
+
         Returns:
-            bool: 是否检测到目标手势
+            list: 每个区域的关键点数组（区域内归一化坐标），无手时为None
         """
-        # 快速路径：如果没有检测到手，直接返回False
-        if not results.multi_hand_landmarks:
-            return False
-            
-        # 只检查第一只检测到的手（因为我们设置了max_num_hands=1）
-        hand_landmarks = results.multi_hand_landmarks[0]
-        
-        # 只获取需要的关键点，避免不必要的计算
-        thumb = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        pinky = hand_landmarks.landmark[self.mp_hands.HandLandmark.PINKY_TIP]
+        if include is None:
+            include = [True] * len(self.monitors)
+        # 裁剪只返回视图，避免不必要的复制
+        crops = [monitor.crop(frame) for monitor in self.monitors]
+        needed = [used and monitor.needs_inference(crop, now)
+                  for monitor, crop, used in zip(self.monitors, crops, include)]
+        self._hand_sources = [SOURCE_CACHE] * len(crops)
+        self._hand_scores = [float('nan')] * len(crops)
+        if not any(needed):
+            self.inference_skipped += 1
+            return [None] * len(crops)
         
-        # 使用曼哈顿距离计算，比欧氏距离计算更快
-        distance = abs(thumb.x - pinky.x) + abs(thumb.y - pinky.y)
+        # 画面与缓存几乎相同的区域直接复用缓存结果
+        hands = [None] * len(crops)
+        infer = list(needed)
+        for i, monitor in enumerate(self.monitors):
+            if needed[i]:
+                hit, landmarks = monitor.cached_landmarks(crops[i], now)
+                if hit:
+                    hands[i] = landmarks
+                    infer[i] = False
         
-        # 应用平滑因子，减少抖动
-        if not hasattr(self, '_last_distance'):
-            self._last_distance = distance
+        if any(infer):
+            self.inference_calls += 1
+            start = time.perf_counter()
+            if len(crops) == 1:
+                rgb_frame = cv2.cvtColor(crops[0], cv2.COLOR_BGR2RGB)
+                results = self.hands.process(rgb_frame)
+                if results.multi_hand_landmarks:
+                    hands[0] = landmarks_to_array(results.multi_hand_landmarks[0])
+                    if results.multi_handedness:
+                        self._hand_scores[0] = results.multi_handedness[0].classification[0].score
+            else:
+                results = self.hands.process(self._mosaic.compose(crops, infer))
+                for i, landmarks in enumerate(self._mosaic.split(results)):
+                    if infer[i]:
+                        hands[i] = landmarks
+                        self._hand_scores[i] = self._mosaic.scores[i]
+            for i, used in enumerate(infer):
+                if used:
+                    self._hand_sources[i] = SOURCE_INFERENCE
+            elapsed = time.perf_counter() - start
+            self.inference_seconds.observe(elapsed)
+            # 推理耗时按参与推理的区域数分摊，用于估算缓存节省的时间
+            inference_ms = elapsed * 1000 / sum(infer)
+            for i, monitor in enumerate(self.monitors):
+                if infer[i]:
+                    monitor.cache_result(hands[i], now, inference_ms)
         else:
-            # 平滑处理，减少误触发
-            distance = CONFIG.smooth_factor * distance + (1 - CONFIG.smooth_factor) * self._last_distance
-            self._last_distance = distance
-            
-        return distance < CONFIG.gesture_threshold
-
-    def _update_alarm_state(self):
-        """更新报警状态，根据检测持续时间触发不同级别的报警"""
-        current_time = time.time()
-        if self.detection_start_time == 0:
-            self.detection_start_time = current_time
-            self.played_sounds.clear()
-            logging.debug(f"Camera {self.camera_id} 开始计时")
-        detection_duration = current_time - self.detection_start_time
-        logging.debug(f"Camera {self.camera_id} 检测时长: {detection_duration:.1f}秒")
-
-        for duration in sorted(CONFIG.alarm_triggers):
-            if detection_duration >= duration and duration not in self.played_sounds:
-                logging.info(f"Camera {self.camera_id} 触发 {duration}秒 报警")
-                self.alarm_active = True
-                self._trigger_alarm(duration, continuous=(duration == CONFIG.alarm_triggers[-1]))
-                self.played_sounds.add(duration)
-
-    def _trigger_alarm(self, duration, continuous=False):
-        """触发报警声音
+            self.inference_cache_hits += 1
         
-        Args:
-            duration: 报警触发的时长级别
-            continuous: 是否持续播放
-        """
-        if not self.alarm_channel.get_busy():
-            loops = -1 if continuous else 0
-            self.alarm_channel.play(self.alarm_sounds[duration], loops=loops)
+        # 在绘制关键点之前用原始图像更新肤色模型和光流跟踪起点
+        for monitor, crop, landmarks, used in zip(self.monitors, crops, hands, include):
+            if not used:
+                continue
+            monitor.update_presence_model(crop, landmarks, now)
+            monitor.start_tracking(crop, landmarks)
+        return hands
 
     def _reset_alarm(self):
-        """重置报警状态"""
-        if self.detection_start_time > 0:
-            logging.debug(f"Camera {self.camera_id} 检测到手部消失，立即重置状态")
-        self.detection_start_time = 0
-        self.alarm_active = False
-        self.played_sounds.clear()
-        self.alarm_channel.stop()
-
-    def _draw_landmarks(self, frame, results):
-        """在图像上绘制手部关键点
-        
-        Args:
-            frame: 图像帧
-            results: MediaPipe手部检测结果
+        """重置所有监测区域的报警状态"""
+        for monitor in self.monitors:
+            monitor.reset_alarm()
+
+    def request_reset(self):
+        """请求重置报警状态（可在任意线程调用，由摄像头线程在下一帧执行）"""
+        self._reset_requested = True
+
+    def pause_alarm(self):
+        """暂停所有监测区域的报警声音（在界面线程调用）
+
+        确认的报警级别取自最新的状态快照，不读取摄像头线程正在修改的区域状态。
         """
-        # 如果没有检测到手，直接返回
-        if not results.multi_hand_landmarks:
-            return
-            
-        # 使用简化的绘制样式，减少计算量
-        landmark_spec = mp.solutions.drawing_styles.get_default_hand_landmarks_style()
-        connection_spec = mp.solutions.drawing_styles.get_default_hand_connections_style()
-        
-        # 只绘制第一只检测到的手（因为我们设置了max_num_hands=1）
-        mp.solutions.drawing_utils.draw_landmarks(
-            frame,
-            results.multi_hand_landmarks[0],
-            self.mp_hands.HAND_CONNECTIONS,
-            landmark_drawing_spec=landmark_spec,
-            connection_drawing_spec=connection_spec
-        )
+        for monitor in self.monitors:
+            monitor.alarm_channel.stop()
+        status = self.status_snapshot
+        event_bus.publish(AlarmAcknowledged, self.camera_id, time.time(), status.alarm_level if status else 0)
 
     def _add_overlay(self, frame):
         """添加图像叠加信息（ROI框、FPS等）
@@ -432,12 +621,13 @@ class VideoProcessor:
         # 仅在需要时绘制ROI框
         if CONFIG.show_roi:
             # 使用缓存的ROI坐标
-            if hasattr(self, '_cached_roi_coords'):
-                y1, y2, x1, x2 = self._cached_roi_coords
+            for monitor in self.monitors:
+                if monitor.coords is None:
+                    monitor.update_coords(frame.shape)
+                y1, y2, x1, x2 = monitor.coords
                 cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            else:
-                roi = self.config.roi
-                cv2.rectangle(frame, (roi["x"], roi["y"]), (roi["x"] + roi["w"], roi["y"] + roi["h"]), (0, 255, 0), 2)
+                if len(self.monitors) > 1:
+                    cv2.putText(frame, monitor.name, (x1 + 5, y1 + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
         
         # 仅在需要时显示FPS，并减少更新频率
         if CONFIG.show_fps and hasattr(self, '_last_fps_update'):
@@ -458,6 +648,7 @@ class VideoProcessor:
         Args:
             frame: 处理后的图像帧
         """
+        cpu_start = time.thread_time()
         # 检查是否需要调整大小
         h, w = frame.shape[:2]
         if w != 1280 or h != 720:
@@ -468,10 +659,13 @@ class VideoProcessor:
             
         # 使用imshow显示图像
         cv2.imshow(f'Camera {self.camera_id}', display_frame)
+        self.stage_cpu['display'] += time.thread_time() - cpu_start
 
     def _handle_stream_error(self):
         """处理视频流错误，尝试重新连接摄像头"""
         logging.warning(f"摄像头{self.camera_id} 断流，尝试重连...")
+        self.stream_errors += 1
+        event_bus.publish(CameraError, self.camera_id, time.time(), "断流")
         
         # 安全释放摄像头资源
         if hasattr(self, 'cap') and self.cap is not None:
@@ -479,12 +673,14 @@ class VideoProcessor:
             
         time.sleep(1)
         try:
-            self.cap = cv2.VideoCapture(self.config.source)
+            self.cap = self._open_source()
             if not self.cap.isOpened():
                 raise RuntimeError("摄像头打开失败")
+            self.reconnects += 1
             logging.info(f"摄像头{self.camera_id} 重连成功")
         except Exception as e:
             logging.error(f"摄像头{self.camera_id} 重连失败: {str(e)}")
+            event_bus.publish(CameraError, self.camera_id, time.time(), f"重连失败: {str(e)}")
 
     def _release_resources(self):
         """释放所有资源，安全地处理可能为None的对象"""
@@ -493,6 +689,10 @@ class VideoProcessor:
             if hasattr(self, 'cap') and self.cap is not None:
                 self.cap.release()
             
+            # 保存尚未写入磁盘的关键点记录
+            if getattr(self, 'landmark_recorder', None) is not None:
+                self.landmark_recorder.close()
+            
             # 安全释放MediaPipe资源
             if hasattr(self, 'hands') and self.hands is not None:
                 # 使用getattr检查是否有close方法，如果没有则不调用
@@ -521,6 +721,25 @@ class VideoProcessor:
         self._release_resources()
         return False  # 允许异常传播
             
+    @property
+    def alarm_active(self):
+        """是否有任一监测区域处于报警状态"""
+        return any(monitor.alarm_active for monitor in self.monitors)
+
+    @property
+    def played_sounds(self):
+        """所有监测区域已触发的报警级别"""
+        played = set()
+        for monitor in self.monitors:
+            played |= monitor.played_sounds
+        return played
+
+    @property
+    def detection_start_time(self):
+        """最早开始计时的监测区域的开始时间，无检测时为0"""
+        starts = [m.detection_start_time for m in self.monitors if m.detection_start_time > 0]
+        return min(starts) if starts else 0
+            
     def get_detection_duration(self):
         """Get current detection duration
         
@@ -534,64 +753,153 @@ class VideoProcessor:
     def get_status(self):
         """Get current camera status
         
+        Reads the latest published snapshot only, so it is safe to call from
+        any thread without touching state owned by the camera thread.
+        
+        Returns:
+            dict: Status information including fps, detection time, alarm level
+                and per-ROI status under 'rois'
+        """
+        return self.status_snapshot.as_dict()
+
+    def _build_status(self, now):
+        """生成摄像头状态快照（在摄像头线程中调用）
+
         Returns:
-            dict: Status information including fps, detection time, and alarm level
+            CameraStatus: 不可变的摄像头状态
         """
-        status = {
-            'status': self.get_alarm_status(),
-            'fps': self.fps_counter.get_average(),
-            'detection_time': self.get_detection_duration(),
-            'alarm_level': len(self.played_sounds)
+        rois = [monitor.snapshot() for monitor in self.monitors]
+        return CameraStatus(
+            camera_id=self.camera_id,
+            timestamp=now,
+            status=self.get_alarm_status(),
+            fps=self.fps_counter.get_average(),
+            rois=rois,
+            inference_calls=self.inference_calls,
+            inference_skipped=self.inference_skipped,
+            inference_cache=self._inference_cache_stats(rois),
+            config_version=self.config.version,
+            config_apply_ms=self.config_apply_ms,
+            cpu=thread_cpu.camera_usage(self.camera_id)
+        )
+
+    def _publish_status(self, now, force=False):
+        """按间隔发布状态快照
+
+        报警级别或检测状态变化时立即发布，其余情况最多每
+        status_publish_interval 秒发布一次。快照通过一次引用赋值替换，读取方无需加锁。
+
+        Args:
+            now: 当前时间戳
+            force: 是否忽略发布间隔
+        """
+        key = tuple((len(monitor.played_sounds), monitor.detection_start_time > 0) for monitor in self.monitors)
+        if not force and key == self._status_key and now - self._last_publish < CONFIG.status_publish_interval:
+            return
+        self._status_key = key
+        self._last_publish = now
+        self.status_snapshot = self._build_status(now)
+
+    def _inference_cache_stats(self, rois):
+        """汇总各区域的推理结果缓存统计"""
+        stats = [roi.inference_cache for roi in rois if roi.inference_cache]
+        if not stats:
+            return None
+        hits = sum(s['hits'] for s in stats)
+        misses = sum(s['misses'] for s in stats)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'saved_ms': sum(s['saved_ms'] for s in stats),
+            'skipped_calls': self.inference_cache_hits
         }
-        return status
 
     def get_alarm_status(self):
         if self.alarm_active and self.played_sounds:
             last_played = max(self.played_sounds)
-            if last_played == CONFIG.alarm_triggers[-1]:
+            if last_played == self.alarm_triggers[-1]:
                 return f"持续报警 ({last_played}秒)"
             return f"报警触发 ({last_played}秒)"
         elif self.detection_start_time > 0:
             return "检测中"
         return "无报警"
         
-    def update_roi(self):
-        """更新ROI设置，从CONFIG重新加载当前摄像头的ROI配置"""
-        # 更新配置对象引用
-        self.config = CONFIG.cameras[self.camera_id]
-        # 确保更新后的ROI设置被正确应用
-        if hasattr(self, 'hands') and self.hands:
-            # 如果需要，可以根据新的ROI设置更新手部检测参数
-            self.hands.min_detection_confidence = self.config.min_confidence
-            
-        # 清除缓存的ROI坐标，强制在下一帧重新计算
-        if hasattr(self, '_cached_roi_coords'):
-            delattr(self, '_cached_roi_coords')
-            
-        # 验证ROI设置的有效性
-        roi = self.config.roi
-        if roi['x'] < 0 or roi['y'] < 0 or roi['w'] <= 0 or roi['h'] <= 0:
-            logging.warning(f"摄像头{self.camera_id} ROI设置无效: {roi}")
+    def _swap_config(self, config, frame_shape, now):
+        """切换到新版本配置（在摄像头线程的帧边界调用）
+
+        报警触发时长变化时先重新加载报警音频，再让各区域使用新的触发时长；
+        只更新坐标发生变化的监测区域，区域的检测计时和已触发的报警保持不变；
+        区域数量变化时需要重新分配报警声道，不能热更新，继续使用旧配置（报警设置仍然更新）。
+
+        Args:
+            config: 新版本的摄像头配置
+            frame_shape: 当前帧的形状，用于把超出画面的区域限制在画面内
+            now: 当前时间戳
+
+        Returns:
+            bool: 是否已切换到新配置
+        """
+        self._swap_alarm_settings(config)
+        if len(config.rois) != len(self.monitors):
+            logging.warning(f"摄像头{self.camera_id} 监测区域数量已变化，需要重启摄像头")
+            self._rejected_config = config
             return False
-            
-        # 检查ROI是否超出摄像头分辨率范围
-        if self.cap and self.cap.isOpened():
-            frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
+        
+        frame_height, frame_width = frame_shape[:2]
+        rois = []
+        for roi in config.rois:
+            # 验证ROI设置的有效性
+            if roi['x'] < 0 or roi['y'] < 0 or roi['w'] <= 0 or roi['h'] <= 0:
+                logging.warning(f"摄像头{self.camera_id} ROI设置无效: {roi}")
+                self._rejected_config = config
+                return False
+            # 超出画面时把区域限制在画面内（只修改本线程使用的副本，已发布的配置不变）
             if roi['x'] + roi['w'] > frame_width or roi['y'] + roi['h'] > frame_height:
-                logging.warning(f"摄像头{self.camera_id} ROI设置超出范围: {roi}, 摄像头分辨率: {frame_width}x{frame_height}")
-                # 自动调整ROI以适应摄像头分辨率
-                self.config.roi['x'] = min(roi['x'], frame_width - 1)
-                self.config.roi['y'] = min(roi['y'], frame_height - 1)
-                self.config.roi['w'] = min(roi['w'], frame_width - self.config.roi['x'])
-                self.config.roi['h'] = min(roi['h'], frame_height - self.config.roi['y'])
-                logging.info(f"摄像头{self.camera_id} ROI已自动调整为: {self.config.roi}")
+                x = min(roi['x'], frame_width - 1)
+                y = min(roi['y'], frame_height - 1)
+                adjusted = dict(roi, x=x, y=y, w=min(roi['w'], frame_width - x), h=min(roi['h'], frame_height - y))
+                logging.warning(f"摄像头{self.camera_id} ROI设置超出范围: {roi}, 画面尺寸: {frame_width}x{frame_height}，"
+                                f"已自动调整为: {adjusted}")
+                roi = adjusted
+            rois.append(roi)
         
-        # 更新网格叠加器的配置
-        if hasattr(self, 'grid_overlay'):
-            self.grid_overlay.config = self.config
-            
-        # 记录日志
-        logging.info(f"摄像头{self.camera_id} ROI设置已更新: {self.config.roi}")
-        return True
\ No newline at end of file
+        changed = []
+        for i, (monitor, roi) in enumerate(zip(self.monitors, rois)):
+            if roi != monitor.roi:
+                # 清除缓存的ROI坐标和推理结果，下一帧按新区域重新计算
+                monitor.set_roi(roi)
+                changed.append(i)
+        
+        self.config = config
+        self.grid_overlay.config = config
+        if config.updated_at:
+            self.config_apply_ms = (now - config.updated_at) * 1000
+        logging.info(f"摄像头{self.camera_id} 已切换到配置版本 {config.version}，更新区域 {changed}，"
+                     f"生效延迟 {self.config_apply_ms or 0:.1f}ms")
+        self._publish_status(now, force=True)
+        return True
+
+    def _swap_alarm_settings(self, config):
+        """切换到配置中的报警触发时长和报警音频（在摄像头线程的帧边界调用）
+
+        音频全部加载成功后才替换，加载失败时继续使用原来的触发时长和音频。
+        报警音频字典由各区域共享，原地更新。
+
+        Args:
+            config: 新版本的摄像头配置
+        """
+        triggers, paths = self._alarm_settings(config)
+        if triggers == self.alarm_triggers and paths.keys() == self.alarm_sounds.keys():
+            return
+        try:
+            sounds = self._load_alarm_sounds(paths)
+        except Exception as e:
+            logging.error(f"摄像头{self.camera_id} 报警音频加载失败，继续使用原报警设置: {str(e)}")
+            return
+        self.alarm_sounds.clear()
+        self.alarm_sounds.update(sounds)
+        self.alarm_triggers = triggers
+        for monitor in self.monitors:
+            monitor.set_alarm_triggers(triggers)
+        logging.info(f"摄像头{self.camera_id} 报警触发时长已更新为 {list(triggers)}")
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# tests/test_alarm_store.py
+# 报警事件存储测试模块
+
+import unittest
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.alarm_store import AlarmStore
+from modules.event_bus import (
+    EventBus, AlarmAcknowledged, AlarmEscalated, AlarmReset, CameraError, DetectionStarted
+)
+
+class TestAlarmStore(unittest.TestCase):
+    """报警事件存储测试类"""
+
+    def setUp(self):
+        """测试前准备：在临时目录中创建数据库"""
+        self.directory = tempfile.mkdtemp()
+        self.bus = EventBus()
+        self.store = AlarmStore(os.path.join(self.directory, "db", "alarms.db"), retention_days=30,
+                                batch_size=50, flush_interval=0.05, bus=self.bus)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.store.stop()
+        shutil.rmtree(self.directory)
+
+    def test_bus_events_written(self):
+        """测试总线事件在后台批量写入，停止时写入剩余事件"""
+        now = time.time()
+        self.store.start()
+        self.bus.publish(DetectionStarted, 0, 1, now)
+        self.bus.publish(AlarmEscalated, 0, 1, now + 5, 1, 5)
+        self.bus.publish(AlarmAcknowledged, 0, now + 6, 1)
+        self.bus.publish(AlarmReset, 0, 1, now + 7, 1)
+        self.bus.publish(CameraError, 2, now + 8, "断流")
+        self.store.stop()
+        events = self.store.query(now, now + 10)
+        self.assertEqual([e['kind'] for e in events], ['detection', 'alarm', 'ack', 'reset', 'error'])
+        self.assertEqual((events[1]['roi'], events[1]['level'], events[1]['duration']), (1, 1, 5))
+        self.assertEqual(events[4]['message'], "断流")
+        self.assertEqual(self.store.get_stats()['written'], 5)
+
+    def test_background_flush_interval(self):
+        """测试未达到批量大小时按时间间隔写入"""
+        now = time.time()
+        self.store.start()
+        self.bus.publish(AlarmEscalated, 0, 0, now, 1, 5)
+        deadline = now + 2.0
+        while not self.store.query(now, now + 1) and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(len(self.store.query(now, now + 1)), 1)
+
+    def test_range_and_bed_queries(self):
+        """测试时间范围、床位和事件类型查询以及按床位汇总"""
+        rows = []
+        for i in range(100):
+            camera, roi = i % 2, i % 4 // 2
+            rows.append((float(i), 'detection', camera, roi, None, None, None))
+            rows.append((i + 0.5, 'alarm', camera, roi, 1 + i % 3, 5.0, None))
+        self.store.write(rows)
+        self.assertEqual(len(self.store.query(10, 20)), 20)
+        bed = self.store.query(0, 100, camera=1, roi=1, kinds=['alarm'])
+        self.assertEqual(len(bed), 25)
+        self.assertTrue(all((e['camera'], e['roi'], e['kind']) == (1, 1, 'alarm') for e in bed))
+        self.assertEqual([e['time'] for e in self.store.query(0, 100, limit=3)], [0.0, 0.5, 1.0])
+        summary = self.store.summary(0, 100)
+        self.assertEqual([(s['camera'], s['roi']) for s in summary], [(0, 0), (0, 1), (1, 0), (1, 1)])
+        self.assertEqual([s['alarms'] for s in summary], [25] * 4)
+        self.assertEqual(summary[0]['max_level'], 3)
+
+    def test_retention(self):
+        """测试删除超过保留天数的事件"""
+        now = 1000 * 86400.0
+        self.store.write([(now - 40 * 86400, 'alarm', 0, 0, 1, 5.0, None),
+                          (now - 10 * 86400, 'alarm', 0, 0, 1, 5.0, None)])
+        self.assertEqual(self.store.prune(now), 1)
+        self.assertEqual([e['time'] for e in self.store.query(0, now)], [now - 10 * 86400])
+
+    def test_write_failure_retried(self):
+        """测试写入失败一次后保留事件并重试，格式错误的事件被跳过，之后的事件仍然写入"""
+        original = self.store.write
+        calls = []
+
+        def failing_write(rows, connection=None):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("disk I/O error")
+            return original(rows, connection)
+
+        self.store.write = failing_write
+        now = time.time()
+        self.store.start()
+        self.bus.publish(AlarmEscalated, 0, 0, now, 1, 5)
+        deadline = time.time() + 2.0
+        while not calls and time.time() < deadline:
+            time.sleep(0.01)
+        self.store._subscription.offer(object())
+        self.bus.publish(AlarmEscalated, 0, 0, now + 1, 2, 10)
+        deadline = time.time() + 5.0
+        while len(self.store.query(now, now + 2)) < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual([e['level'] for e in self.store.query(now, now + 2)], [1, 2])
+        self.bus.publish(AlarmReset, 0, 0, now + 3, 2)
+        self.store.stop()
+        self.assertEqual(len(self.store.query(now, now + 4)), 3)
+        stats = self.store.get_stats()
+        self.assertEqual((stats['failures'], stats['malformed'], stats['written']), (1, 1, 3))
+
+    def test_pending_capped(self):
+        """测试数据库一直不可用时待写入事件数不超过上限，停止时不会阻塞"""
+        self.store.max_pending = 5
+        self.store.max_backoff = 0.05
+
+        def failing_write(rows, connection=None):
+            raise sqlite3.OperationalError("database is locked")
+
+        self.store.write = failing_write
+        now = time.time()
+        self.store.start()
+        for i in range(20):
+            self.bus.publish(AlarmEscalated, 0, 0, now + i, 1, 5)
+        deadline = time.time() + 2.0
+        while self.store.get_stats()['discarded'] < 15 and time.time() < deadline:
+            time.sleep(0.02)
+        self.store.stop()
+        self.assertEqual(self.store.get_stats()['discarded'], 15)
+        self.assertGreaterEqual(self.store.get_stats()['failures'], 1)
+
+    def test_prune_failure_backs_off(self):
+        """测试数据库无法连接时删除过期事件按退避间隔重试，不会每次循环都重新连接"""
+        self.store.max_backoff = 0.4
+        attempts = []
+
+        def failing_connect():
+            attempts.append(time.monotonic())
+            raise sqlite3.OperationalError("unable to open database file")
+
+        self.store._connect = failing_connect
+        self.store.start()
+        time.sleep(1.0)
+        self.store.stop()
+        self.assertGreaterEqual(len(attempts), 2)
+        self.assertLessEqual(len(attempts), 7)
+        self.assertEqual(self.store.get_stats()['failures'], len(attempts))
+        gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+        self.assertTrue(all(gap >= 0.04 for gap in gaps))
+
+if __name__ == '__main__':
+    unittest.main()
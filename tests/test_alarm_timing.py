@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# tests/test_alarm_timing.py
+# 报警时序回归测试
+#
+# 按实际时间运行仿真摄像头，用缩短的报警级别检查升级时间和第一次报警声音的误差；
+# 完整的帧率和CPU竞争组合见 benchmarks/alarm_timing_benchmark.py。
+
+import unittest
+import os
+import sys
+
+import numpy as np
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG, CameraConfig
+from modules.camera_manager import CameraManager
+from modules.event_bus import AlarmEscalated, event_bus
+from modules.simulation import GestureScript, Simulation, SyntheticSource, VirtualClock, alarm_timing, hand_landmarks
+
+MAX_P99 = 0.5  # 升级误差p99上限（秒）
+
+class TestAlarmTimingAnalysis(unittest.TestCase):
+    """报警时序统计测试类"""
+
+    def test_onsets(self):
+        """测试周期手势的开始时间，相连的有手片段只算一次"""
+        pinch = hand_landmarks(0.1)
+        script = GestureScript([(0, 2, pinch), (2, 3, hand_landmarks(0.5)), (5, 6, pinch)], start=10.0, period=10)
+        self.assertEqual(script.onsets(31.0), [10.0, 15.0, 20.0, 25.0, 30.0])
+        self.assertEqual(GestureScript([(1, 2, pinch)], start=0.0).onsets(100.0), [1.0])
+
+    def test_errors_first_sound_and_missed(self):
+        """测试每次手势只取每个级别的第一次升级，缺失级别和无声手势计数"""
+        events = [AlarmEscalated(0, 0, 105.2, 1, 5), AlarmEscalated(0, 0, 110.1, 2, 10),
+                  AlarmEscalated(0, 0, 118.0, 1, 5), AlarmEscalated(0, 0, 135.3, 1, 5)]
+        plays = [(105.25, 0, 0, 5), (135.4, 0, 0, 5), (135.5, 0, 1, 5)]
+        result = alarm_timing({(0, 0): [100.0, 130.0]}, events, plays, [5, 10])
+        np.testing.assert_allclose(result['errors'][5], [0.2, 0.3])
+        np.testing.assert_allclose(result['errors'][10], [0.1])
+        np.testing.assert_allclose(result['first_sound'], [5.25, 5.4])
+        self.assertEqual(result['missed'], 1)
+        self.assertEqual(result['silent'], 0)
+
+class TestAlarmTimingRegression(unittest.TestCase):
+    """仿真摄像头报警时序回归测试类"""
+
+    def setUp(self):
+        """测试前准备：缩短报警级别，两个监测区域"""
+        self.saved = (CONFIG.cameras, CONFIG.alarm_triggers, CONFIG.alarm_sounds)
+        sounds = [CONFIG.alarm_sounds[t] for t in sorted(CONFIG.alarm_sounds)]
+        CONFIG.alarm_triggers = [1, 2]
+        CONFIG.alarm_sounds = {1: sounds[0], 2: sounds[1]}
+        CONFIG.cameras = [CameraConfig(source=0, roi=None, min_confidence=0.5, resolution=(320, 240),
+                                       rois=[{"name": "Bed A", "x": 0, "y": 0, "w": 160, "h": 240},
+                                             {"name": "Bed B", "x": 160, "y": 0, "w": 160, "h": 240}])]
+
+    def tearDown(self):
+        """测试后恢复配置"""
+        CONFIG.cameras, CONFIG.alarm_triggers, CONFIG.alarm_sounds = self.saved
+
+    def test_escalation_p99_within_bound(self):
+        """测试15帧/秒时各级升级误差和第一次报警声音超时的p99不超过上限"""
+        clock = VirtualClock(speed=1)
+        simulation = Simulation(clock)
+        simulation.sources[0] = SyntheticSource(clock, (320, 240), fps=15)
+        manager = CameraManager(processor_factory=simulation.processor)
+        subscription = event_bus.subscribe(event_types=(AlarmEscalated,), maxsize=1000)
+        hold, period = 2.5, 3.5
+        try:
+            with clock.install():
+                self.assertTrue(manager.start_camera(0))
+                start = clock.time() + 1.0
+                simulation.scripts[0] = [GestureScript([(0, hold, hand_landmarks(0.1))], start + i * 1.75, period)
+                                         for i in range(2)]
+                end = start + 2 * period
+                clock.sleep(end - clock.time())
+                manager.stop_all()
+        finally:
+            subscription.close()
+        onsets = {(0, i): script.onsets(end - hold) for i, script in enumerate(simulation.scripts[0])}
+        result = alarm_timing(onsets, subscription.drain(), simulation.sink.plays, [1, 2])
+        errors = np.abs(np.concatenate([result['errors'][1], result['errors'][2]]))
+        self.assertEqual(result['missed'], 0)
+        self.assertEqual(len(errors), 6)
+        self.assertLessEqual(np.percentile(errors, 99), MAX_P99)
+        self.assertEqual(len(result['first_sound']), 3)
+        self.assertLessEqual(np.percentile(np.array(result['first_sound']) - 1, 99), MAX_P99)
+
+if __name__ == '__main__':
+    unittest.main()
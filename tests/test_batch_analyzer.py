@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# tests/test_batch_analyzer.py
+# 离线批量分析测试模块
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.batch_analyzer import alarm_timeline, analyze_chunk, match_stream, plan_chunks, probe_video, stitch
+from modules.gesture_rules import GestureRuleEngine
+
+RULES = [
+    {"name": "pinch", "conditions": [
+        {"distance": ("THUMB_TIP", "PINKY_TIP"), "metric": "manhattan", "op": "<", "threshold": "gesture_threshold"}]},
+]
+
+def hand(distance):
+    """拇指和小指指尖距离为 distance 的关键点"""
+    landmarks = np.full((21, 3), 0.5, dtype=np.float32)
+    landmarks[20, 0] = 0.5 + distance
+    return landmarks
+
+class TestPlan(unittest.TestCase):
+    """分段规划测试类"""
+
+    def test_chunks_aligned_and_contiguous(self):
+        """测试分段边界对齐采样步长、首尾相接，最后一段读到文件结尾"""
+        tasks = plan_chunks("a.mp4", 30.0, 1000, [(0, 0, 10, 10)], chunk_seconds=10.0,
+                            overlap_seconds=1.0, sample_interval=0.1)
+        self.assertEqual([task.start for task in tasks], [0, 300, 600, 900])
+        self.assertEqual([task.end for task in tasks], [300, 600, 900, None])
+        self.assertEqual([task.warmup_start for task in tasks], [0, 270, 570, 870])
+        self.assertTrue(all(task.step == 3 for task in tasks))
+
+class TestAnalyzeChunk(unittest.TestCase):
+    """分段推理测试类"""
+
+    def setUp(self):
+        """测试前准备：生成短视频"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "clip.avi")
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (160, 120))
+        for i in range(95):
+            writer.write(np.full((120, 160, 3), i, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.directory)
+
+    def test_chunks_cover_every_frame_once(self):
+        """测试分段处理覆盖每一帧且采样帧数与不分段时相同"""
+        fps, frames = probe_video(self.path)
+        rois = [(0, 0, 80, 120), (80, 0, 80, 120)]
+        whole = analyze_chunk(plan_chunks(self.path, fps, frames, rois, chunk_seconds=60.0)[0])
+        tasks = plan_chunks(self.path, fps, frames, rois, chunk_seconds=1.0, overlap_seconds=0.5)
+        self.assertEqual(len(tasks), 4)
+        parts = [analyze_chunk(task) for task in tasks]
+        self.assertEqual(whole['frames'], 95)
+        self.assertEqual(sum(part['frames'] for part in parts), 95)
+        self.assertEqual(sum(part['samples'] for part in parts), whole['samples'])
+        self.assertEqual(whole['samples'], 32)
+        self.assertEqual(len(stitch(parts)), 2)
+
+class TestTimeline(unittest.TestCase):
+    """报警时间线测试类"""
+
+    def setUp(self):
+        """测试前准备：12秒手势、消失3秒后再持续3秒手势，10Hz采样"""
+        self.times = np.concatenate((100.0 + np.arange(120) / 10, 115.0 + np.arange(30) / 10))
+        self.landmarks = np.array([hand(0.1)] * len(self.times))
+        self.engine = GestureRuleEngine(RULES, params=SimpleNamespace(gesture_threshold=0.5, smooth_factor=0.3))
+
+    def test_escalation_and_reset(self):
+        """测试检测开始、逐级报警和检测结束事件"""
+        events = alarm_timeline(self.engine, self.times, self.landmarks, [5, 10, 15], max_gap=0.15)
+        kinds = [(kind, level) for _, kind, level, _ in events]
+        self.assertEqual(kinds, [('detection', 0), ('alarm', 1), ('alarm', 2), ('reset', 2),
+                                 ('detection', 0), ('reset', 0)])
+        self.assertAlmostEqual(events[1][0], 105.0, places=6)
+        self.assertAlmostEqual(events[2][0], 110.0, places=6)
+        self.assertAlmostEqual(events[3][0], 111.9, places=6)
+        self.assertAlmostEqual(events[4][0], 115.0, places=6)
+
+    def test_stitched_chunks_match_whole_stream(self):
+        """测试跨段拼接的时间线与整段处理一致（检测跨越分段边界）"""
+        times = 100.0 + np.arange(3000) / 10
+        landmarks = np.array([hand(0.5 + 0.3 * np.sin(t / 4.0)) for t in times])
+        expected = alarm_timeline(self.engine, times, landmarks, [2, 4], max_gap=0.15)
+        self.assertGreater(len(expected), 10)
+        chunks = []
+        for index, (lo, hi) in enumerate([(0, 37), (37, 1210), (1210, len(times))]):
+            chunks.append({'index': index, 'rois': [{'time': times[lo:hi], 'landmarks': landmarks[lo:hi]}]})
+        stitched = stitch(chunks[::-1])[0]
+        events = alarm_timeline(self.engine, stitched['time'], stitched['landmarks'], [2, 4], max_gap=0.15)
+        self.assertEqual(events, expected)
+
+    def test_matched_rows_follow_timeline(self):
+        """测试逐行重放的 matched 与时间线的检测区间一致，手势持续时间在手部消失后重新计时"""
+        times = 100.0 + np.arange(600) / 10
+        landmarks = np.array([hand(0.5 + 0.3 * np.sin(t / 4.0)) for t in times])
+        times = np.delete(times, np.s_[200:230])
+        landmarks = np.delete(landmarks, np.s_[200:230], axis=0)
+        engine = GestureRuleEngine([dict(RULES[0], min_duration=1.0)], params=self.engine.params)
+        matched = match_stream(engine, times, landmarks, max_gap=0.15)
+        events = alarm_timeline(engine, times, landmarks, [2], max_gap=0.15)
+        expected = np.zeros(len(times), dtype=bool)
+        starts = [now for now, kind, _, _ in events if kind == 'detection']
+        ends = [now for now, kind, _, _ in events if kind == 'reset']
+        for start, end in zip(starts, ends):
+            expected |= (times >= start - 1e-9) & (times <= end + 1e-9)
+        self.assertTrue(matched.any() and not matched.all())
+        np.testing.assert_array_equal(matched, expected)
+
+if __name__ == '__main__':
+    unittest.main()
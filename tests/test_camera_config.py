@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# tests/test_camera_config.py
+# 摄像头配置文件加载测试模块
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CameraConfig, SystemConfig
+
+class TestLoadCameras(unittest.TestCase):
+    """摄像头配置文件加载测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.config = SystemConfig()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cameras.json")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.tmpdir.cleanup()
+
+    def _write(self, data):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_load_with_defaults(self):
+        """测试任意数量的摄像头和默认值合并"""
+        roi = {"x": 0, "y": 0, "w": 320, "h": 240}
+        self._write({
+            "defaults": {"resolution": [640, 480], "min_confidence": 0.7, "ward": "A"},
+            "cameras": [{"source": i, "roi": dict(roi)} for i in range(40)]
+                       + [{"source": "rtsp://cam", "ward": "B", "name": "走廊",
+                           "rois": [dict(roi, name="1床"), dict(roi, x=320, name="2床")]}]
+        })
+        self.config.load_cameras(self.path)
+        self.assertEqual(len(self.config.cameras), 41)
+        self.assertEqual(self.config.cameras[0].resolution, (640, 480))
+        self.assertEqual(self.config.cameras[-1].roi_name(1), "2床")
+        self.assertEqual(self.config.wards(), ["A", "B"])
+        self.assertEqual(self.config.total_roi_count(), 42)
+        self.config.validate()
+
+    def test_missing_roi_rejected(self):
+        """测试未配置ROI的摄像头"""
+        self._write({"cameras": [{"source": 0, "min_confidence": 0.7, "resolution": [640, 480]}]})
+        with self.assertRaises(ValueError):
+            self.config.load_cameras(self.path)
+
+    def test_unknown_field_rejected(self):
+        """测试未知字段"""
+        self._write({"cameras": [{"source": 0, "roi": {"x": 0, "y": 0, "w": 1, "h": 1},
+                                  "min_confidence": 0.7, "resolution": [640, 480], "fps": 30}]})
+        with self.assertRaises(ValueError):
+            self.config.load_cameras(self.path)
+
+    def test_invalid_json_rejected(self):
+        """测试格式错误的文件"""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{cameras: ")
+        with self.assertRaises(ValueError):
+            self.config.load_cameras(self.path)
+
+class TestCameraConfigUpdate(unittest.TestCase):
+    """摄像头配置写时复制更新测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.config = SystemConfig()
+        self.config.cameras = [CameraConfig(source=0, roi=None, min_confidence=0.7, resolution=(640, 480),
+                                            rois=[{"name": "1床", "x": 0, "y": 0, "w": 320, "h": 480},
+                                                  {"name": "2床", "x": 320, "y": 0, "w": 320, "h": 480}])]
+
+    def test_update_publishes_new_version(self):
+        """测试更新生成新版本配置，旧配置对象保持不变"""
+        old = self.config.cameras[0]
+        new = self.config.update_camera_rois(0, {1: {"x": 300, "y": 10, "w": 200, "h": 200}})
+        self.assertIs(self.config.cameras[0], new)
+        self.assertIsNot(new, old)
+        self.assertEqual(new.version, old.version + 1)
+        self.assertGreater(new.updated_at, 0)
+        self.assertEqual(old.rois[1], {"name": "2床", "x": 320, "y": 0, "w": 320, "h": 480})
+        self.assertEqual(new.rois[1], {"name": "2床", "x": 300, "y": 10, "w": 200, "h": 200})
+
+    def test_unchanged_rois_equal(self):
+        """测试未更新的区域内容不变，roi 指向新配置的第一个区域"""
+        old = self.config.cameras[0]
+        new = self.config.update_camera_rois(0, {1: {"x": 300}})
+        self.assertEqual(new.rois[0], old.rois[0])
+        self.assertIsNot(new.rois[0], old.rois[0])
+        self.assertIs(new.roi, new.rois[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# tests/test_clip_recorder.py
+# 报警片段录制测试模块
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.clip_recorder import ClipRecorder
+from modules.event_bus import AlarmEscalated, EventBus
+
+def noise(seed, size=(120, 160)):
+    """生成难以压缩的随机图像"""
+    return np.random.default_rng(seed).integers(0, 256, size + (3,), dtype=np.uint8)
+
+class TestClipRecorder(unittest.TestCase):
+    """报警片段录制测试类"""
+
+    def setUp(self):
+        """测试前准备：在临时目录中启动录制器"""
+        self.directory = tempfile.mkdtemp()
+        self.bus = EventBus()
+        self.recorder = ClipRecorder()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.recorder.stop()
+        shutil.rmtree(self.directory)
+
+    def start(self, **kwargs):
+        options = dict(directory=self.directory, pre_seconds=2.0, post_seconds=1.0, fps=10.0, bus=self.bus)
+        options.update(kwargs)
+        self.recorder.start(**options)
+
+    def feed(self, camera_id, start, end, rois=1, step=0.1):
+        """按采样间隔提交 [start, end) 内的帧，每帧后等待压缩完成"""
+        t = start
+        while t < end - 1e-9:
+            if self.recorder.due(camera_id, t):
+                self.recorder.add_frame(camera_id, [noise(int(t * 10) + i) for i in range(rois)], t)
+                self.recorder.join(2.0)
+            t = round(t + step, 3)
+
+    def test_sampling_rate(self):
+        """测试只按采样帧率提交图像"""
+        self.start()
+        self.assertTrue(self.recorder.due(0, 1000.0))
+        self.recorder.add_frame(0, [noise(0)], 1000.0)
+        self.assertFalse(self.recorder.due(0, 1000.05))
+        self.assertTrue(self.recorder.due(0, 1000.1))
+
+    def test_buffer_window(self):
+        """测试缓冲区只保留最近 pre_seconds 秒的图像"""
+        self.start()
+        self.feed(0, 1000.0, 1005.0)
+        times = list(self.recorder._buffers[0].times)
+        self.assertGreaterEqual(times[0], 1002.9 - 1e-6)
+        self.assertEqual(self.recorder.get_stats()['frames_encoded'], 50)
+
+    def test_memory_limits(self):
+        """测试单个摄像头和整个进程的内存上限"""
+        self.start(pre_seconds=100.0, camera_memory_mb=0.2, total_memory_mb=0.3)
+        self.feed(0, 1000.0, 1003.0)
+        self.assertLessEqual(self.recorder.memory_bytes(0), 0.2 * 1024 * 1024)
+        self.feed(1, 1000.0, 1003.0)
+        self.assertLessEqual(self.recorder.memory_bytes(), 0.3 * 1024 * 1024)
+        self.assertGreater(self.recorder.memory_bytes(0), 0)
+        self.assertGreater(self.recorder.memory_bytes(1), 0)
+        self.assertGreater(self.recorder.get_stats()['frames_evicted'], 0)
+
+    def test_clip_written(self):
+        """测试报警时写出该区域报警前后的片段"""
+        self.start()
+        self.feed(0, 1000.0, 1005.0, rois=2)
+        self.recorder.on_event(AlarmEscalated(0, 1, 1004.95, 1, 5.0))
+        self.feed(0, 1005.0, 1006.5, rois=2)
+        self.recorder.join(2.0)
+        clips = os.listdir(self.directory)
+        self.assertEqual(len(clips), 1)
+        self.assertTrue(clips[0].startswith("camera0_roi2_"))
+        cap = cv2.VideoCapture(os.path.join(self.directory, clips[0]))
+        frames = 0
+        while cap.read()[0]:
+            frames += 1
+        cap.release()
+        # 报警前2秒（1002.9-1004.9，21帧）和报警后1秒（1005.0-1005.9，10帧）
+        self.assertEqual(frames, 31)
+
+    def test_clip_from_bus_flushed_on_stop(self):
+        """测试通过事件总线开始录制，停止时写出未结束的片段"""
+        self.start()
+        self.feed(0, 1000.0, 1001.0)
+        self.bus.publish(AlarmEscalated, 0, 0, 1000.95, 1, 5.0)
+        for _ in range(200):
+            if self.recorder._clips:
+                break
+            self.recorder._idle.acquire()
+            self.recorder._idle.wait(0.01)
+            self.recorder._idle.release()
+        self.recorder.stop()
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(self.recorder.clips_written, 1)
+
+if __name__ == '__main__':
+    unittest.main()
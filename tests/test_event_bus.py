@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# tests/test_event_bus.py
+# 事件总线测试模块
+
+import unittest
+import queue
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.event_bus import (
+    EventBus, AlarmEscalated, AlarmReset, CameraError, DetectionStarted
+)
+
+class TestEventBus(unittest.TestCase):
+    """事件总线测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.bus = EventBus()
+
+    def test_no_subscriber_skips_construction(self):
+        """测试没有订阅方时不创建事件对象"""
+        class Exploding(DetectionStarted):
+            __slots__ = ()
+
+            def __init__(self, *args):
+                raise AssertionError("不应创建事件")
+        self.bus.subscribe(event_types=(AlarmReset,))
+        self.bus.publish(Exploding, 0, 0, 1.0)
+
+    def test_routing_by_type(self):
+        """测试订阅方只收到订阅类型的事件"""
+        alarms = self.bus.subscribe(event_types=(AlarmEscalated,))
+        everything = self.bus.subscribe()
+        self.bus.publish(DetectionStarted, 0, 1, 1.0)
+        self.bus.publish(AlarmEscalated, 0, 1, 6.0, 1, 5)
+        self.assertEqual([e.kind for e in alarms.drain()], ['alarm'])
+        events = everything.drain()
+        self.assertEqual([e.kind for e in events], ['detection', 'alarm'])
+        self.assertEqual(events[1].as_dict(), {'event': 'alarm', 'camera': 0, 'roi': 1, 'time': 6.0,
+                                               'level': 1, 'duration': 5})
+
+    def test_bounded_queue_drops(self):
+        """测试订阅队列满时丢弃事件并计数"""
+        subscription = self.bus.subscribe(maxsize=2)
+        for i in range(5):
+            self.bus.publish(CameraError, i, 0.0, "断流")
+        self.assertEqual([e.camera_id for e in subscription.drain()], [0, 1])
+        self.assertEqual(subscription.dropped, 3)
+
+    def test_slow_callback_does_not_block_publisher(self):
+        """测试慢速回调不阻塞发布方"""
+        release = threading.Event()
+        received = []
+
+        def slow(event):
+            release.wait()
+            received.append(event)
+        self.bus.subscribe(callback=slow, maxsize=10)
+        start = time.perf_counter()
+        for i in range(100):
+            self.bus.publish(DetectionStarted, 0, 0, float(i))
+        self.assertLess(time.perf_counter() - start, 0.05)
+        release.set()
+        deadline = time.time() + 2.0
+        while len(received) < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(received), 10)
+
+    def test_get_and_unsubscribe(self):
+        """测试阻塞读取和取消订阅"""
+        subscription = self.bus.subscribe()
+        threading.Timer(0.05, self.bus.publish, args=(AlarmReset, 2, 0, 1.0, 3)).start()
+        self.assertEqual(subscription.get(timeout=2.0).level, 3)
+        subscription.close()
+        self.bus.publish(AlarmReset, 2, 0, 1.0, 3)
+        with self.assertRaises(queue.Empty):
+            subscription.get(timeout=0.01)
+
+if __name__ == '__main__':
+    unittest.main()
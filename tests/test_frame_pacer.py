@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# tests/test_frame_pacer.py
+# 帧节拍器测试模块
+
+import unittest
+import os
+import sys
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.frame_pacer import FramePacer
+
+class FakeClock:
+    """可控的单调时钟：sleep() 固定多睡 oversleep 纳秒，每次读取前进 step 纳秒"""
+
+    def __init__(self, oversleep=0, step=1000):
+        self.now = 10 ** 12
+        self.oversleep = oversleep
+        self.step = step
+        self.sleeps = []
+
+    def monotonic_ns(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += int(seconds * 1e9) + self.oversleep
+
+    def work(self, seconds):
+        self.now += int(seconds * 1e9)
+
+class TestFramePacer(unittest.TestCase):
+    """帧节拍器测试类"""
+
+    def test_drift_compensation(self):
+        """测试每次唤醒迟到3毫秒时，长时间运行的平均帧间隔仍等于目标间隔"""
+        clock = FakeClock(oversleep=3_000_000)
+        pacer = FramePacer(0.04, spin=0, clock=clock)
+        pacer.wait()
+        start = clock.now
+        for _ in range(100):
+            clock.work(0.01)
+            pacer.wait()
+        self.assertAlmostEqual((clock.now - start) / 1e9 / 100, 0.04, delta=0.0001)
+        self.assertEqual(pacer.missed, 0)
+        cumulative, total = pacer.lateness.snapshot()
+        self.assertEqual(cumulative[-1], 101)
+        self.assertLess(total / 101, 0.0035)
+
+    def test_overrun_drops_missed_ticks(self):
+        """测试一帧耗时2.5个间隔时迟到的帧立即开始，之后已错过的节拍被放弃，不连续补帧"""
+        clock = FakeClock()
+        pacer = FramePacer(0.04, spin=0, clock=clock)
+        pacer.wait()
+        clock.work(0.1)
+        pacer.wait()
+        self.assertEqual(pacer.missed, 1)
+        clock.sleeps.clear()
+        clock.work(0.01)
+        elapsed = pacer.wait()
+        # 下一个截止时间仍在原节拍上（0.12秒）
+        self.assertAlmostEqual(elapsed, 0.02, delta=0.0001)
+        self.assertEqual(len(clock.sleeps), 1)
+
+    def test_hybrid_sleep_spins_only_near_deadline(self):
+        """测试 sleep() 只睡到截止时间前 spin 秒，剩余时间轮询到截止时间"""
+        clock = FakeClock(step=50_000)
+        pacer = FramePacer(0.04, spin=0.001, clock=clock)
+        pacer.wait()
+        deadline = clock.now + 40_000_000
+        pacer.wait()
+        self.assertAlmostEqual(clock.sleeps[0], 0.039, delta=0.0002)
+        self.assertGreaterEqual(clock.now, deadline - 50_000)
+        self.assertLess(clock.now, deadline + 100_000)
+
+    def test_stage_marks(self):
+        """测试各阶段耗时从上一个阶段结束算起，返回从节拍开始的时间"""
+        clock = FakeClock(step=0)
+        pacer = FramePacer(0.04, clock=clock)
+        pacer.wait()
+        clock.work(0.005)
+        pacer.mark('capture')
+        clock.work(0.02)
+        pacer.mark('processing')
+        clock.work(0.003)
+        self.assertAlmostEqual(pacer.mark('display'), 0.028)
+        self.assertAlmostEqual(pacer.stages['processing'].snapshot()[1], 0.02)
+        self.assertAlmostEqual(pacer.stages['display'].snapshot()[1], 0.003)
+
+    def test_real_clock_does_not_busy_wait(self):
+        """测试使用系统时钟时等待期间几乎不占用CPU"""
+        pacer = FramePacer(0.02)
+        cpu_start, start = time.thread_time(), time.monotonic()
+        for _ in range(15):
+            pacer.wait()
+        elapsed = time.monotonic() - start
+        self.assertAlmostEqual(elapsed, 0.28, delta=0.05)
+        self.assertLess((time.thread_time() - cpu_start) / elapsed, 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
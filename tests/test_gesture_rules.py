@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# tests/test_gesture_rules.py
+# 手势规则引擎测试模块
+
+import unittest
+import numpy as np
+import os
+import sys
+from types import SimpleNamespace
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.gesture_rules import GestureRuleEngine
+from modules.hand_landmarks import LANDMARK_INDEX
+
+PINCH_RULE = {
+    "name": "thumb_pinky",
+    "conditions": [
+        {"distance": ("THUMB_TIP", "PINKY_TIP"), "metric": "manhattan",
+         "op": "<", "threshold": "gesture_threshold"},
+    ],
+}
+
+class TestGestureRuleEngine(unittest.TestCase):
+    """手势规则引擎测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.params = SimpleNamespace(gesture_threshold=0.2, smooth_factor=1.0)
+        self.landmarks = np.zeros((21, 3), dtype=np.float32)
+
+    def _place(self, name, x, y):
+        self.landmarks[LANDMARK_INDEX[name], :2] = (x, y)
+
+    def test_manhattan_distance_matches_threshold(self):
+        """测试拇指-小指曼哈顿距离规则"""
+        engine = GestureRuleEngine([PINCH_RULE], params=self.params)
+        self._place("THUMB_TIP", 0.1, 0.1)
+        self._place("PINKY_TIP", 0.15, 0.2)  # 距离 0.15
+        self.assertTrue(engine.should_alarm(engine.evaluate(self.landmarks, 0.0)))
+
+        # 阈值从参数对象实时读取
+        self.params.gesture_threshold = 0.1
+        self.assertFalse(engine.should_alarm(engine.evaluate(self.landmarks, 0.1)))
+
+    def test_smoothing(self):
+        """测试平滑因子作用于特征"""
+        self.params.smooth_factor = 0.5
+        engine = GestureRuleEngine([PINCH_RULE], params=self.params)
+        self._place("PINKY_TIP", 0.1, 0.0)
+        engine.evaluate(self.landmarks, 0.0)
+        self._place("PINKY_TIP", 0.5, 0.0)
+        # 平滑后距离为 0.3，仍大于阈值
+        self.assertFalse(engine.evaluate(self.landmarks, 0.1)[0])
+        self.assertAlmostEqual(engine._smoothed[0], 0.3, places=5)
+
+    def test_min_duration_and_clear(self):
+        """测试规则持续时间"""
+        rule = dict(PINCH_RULE, min_duration=1.0)
+        engine = GestureRuleEngine([rule], params=self.params)
+        self.assertFalse(engine.evaluate(self.landmarks, 10.0)[0])
+        self.assertFalse(engine.evaluate(self.landmarks, 10.5)[0])
+        self.assertTrue(engine.evaluate(self.landmarks, 11.0)[0])
+        engine.clear()
+        self.assertFalse(engine.evaluate(self.landmarks, 11.2)[0])
+
+    def test_multiple_rules_angle_and_position(self):
+        """测试多条规则组合（夹角、坐标、非报警规则）"""
+        rules = [
+            PINCH_RULE,
+            {"name": "straight_index",
+             "conditions": [{"angle": ("INDEX_FINGER_MCP", "INDEX_FINGER_PIP", "INDEX_FINGER_TIP"),
+                             "op": ">", "threshold": 150}],
+             "alarm": False},
+            {"name": "near_head",
+             "conditions": [{"position": ("WRIST", "y"), "op": "<", "threshold": 0.25},
+                            {"distance": ("THUMB_TIP", "PINKY_TIP"), "op": ">", "threshold": 0.5}]},
+            {"name": "disabled", "enabled": False,
+             "conditions": [{"position": ("WRIST", "x"), "op": "<", "threshold": 1.0}]},
+        ]
+        engine = GestureRuleEngine(rules, params=self.params)
+        self.assertEqual(engine.names, ("thumb_pinky", "straight_index", "near_head"))
+
+        self._place("WRIST", 0.5, 0.9)
+        self._place("THUMB_TIP", 0.2, 0.5)
+        self._place("PINKY_TIP", 0.8, 0.5)
+        self._place("INDEX_FINGER_MCP", 0.5, 0.6)
+        self._place("INDEX_FINGER_PIP", 0.5, 0.5)
+        self._place("INDEX_FINGER_TIP", 0.5, 0.4)
+        active = engine.evaluate(self.landmarks, 0.0)
+        self.assertEqual(engine.active_names(active), ("straight_index",))
+        self.assertFalse(engine.should_alarm(active))
+
+        self._place("WRIST", 0.5, 0.1)
+        active = engine.evaluate(self.landmarks, 0.1)
+        self.assertEqual(engine.active_names(active), ("straight_index", "near_head"))
+        self.assertTrue(engine.should_alarm(active))
+
+    def test_batch_features(self):
+        """测试批量特征计算与单帧一致"""
+        engine = GestureRuleEngine([PINCH_RULE], params=self.params)
+        batch = np.random.default_rng(0).random((5, 21, 3)).astype(np.float32)
+        features = engine.compute_features(batch)
+        self.assertEqual(features.shape, (5, 1))
+        np.testing.assert_allclose(features[2], engine.compute_features(batch[2]))
+
+    def test_invalid_rules(self):
+        """测试无效规则定义"""
+        with self.assertRaises(ValueError):
+            GestureRuleEngine([{"name": "bad", "conditions": [
+                {"distance": ("THUMB_TIP", "SIXTH_FINGER"), "threshold": 0.1}]}])
+        with self.assertRaises(ValueError):
+            GestureRuleEngine([{"name": "bad", "conditions": [
+                {"distance": ("THUMB_TIP", "PINKY_TIP"), "op": "<="}]}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# tests/test_inference_cache.py
+# 推理结果缓存测试模块
+
+import unittest
+import numpy as np
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.inference_cache import InferenceCache, dhash, hamming
+
+class TestInferenceCache(unittest.TestCase):
+    """推理结果缓存测试类"""
+
+    def setUp(self):
+        """测试前准备：生成一张带渐变的场景图像"""
+        ramp = np.tile(np.linspace(0, 255, 640, dtype=np.float32), (480, 1))
+        ramp[:, 320:] = 255 - ramp[:, 320:]
+        self.frame = np.dstack([ramp] * 3).astype(np.uint8)
+        self.landmarks = np.random.default_rng(0).random((21, 3)).astype(np.float32)
+        self.cache = InferenceCache(max_entries=2, max_age=2.0, max_distance=3, motion_budget=12)
+
+    def test_hash_ignores_noise(self):
+        """测试感知哈希对轻微噪声不敏感"""
+        noise = np.random.default_rng(1).integers(-3, 4, self.frame.shape)
+        noisy = np.clip(self.frame + noise, 0, 255).astype(np.uint8)
+        self.assertLessEqual(hamming(dhash(self.frame), dhash(noisy)), 3)
+
+    def test_hit_after_store(self):
+        """测试相同画面命中缓存，返回结果的副本"""
+        self.assertEqual(self.cache.lookup(self.frame, now=0.0), (False, None))
+        self.cache.store(self.landmarks, now=0.0, inference_ms=20.0)
+        hit, landmarks = self.cache.lookup(self.frame, now=0.1)
+        self.assertTrue(hit)
+        np.testing.assert_array_equal(landmarks, self.landmarks)
+        landmarks[0, 0] = -1
+        self.assertNotEqual(self.cache.lookup(self.frame, now=0.2)[1][0, 0], -1)
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['saved_ms'], 40.0)
+
+    def test_caches_no_hand_result(self):
+        """测试缓存“无手”结果"""
+        self.cache.lookup(self.frame, now=0.0)
+        self.cache.store(None, now=0.0, inference_ms=20.0)
+        self.assertEqual(self.cache.lookup(self.frame, now=0.1), (True, None))
+
+    def test_max_age_expires_entry(self):
+        """测试超过最长有效时间后强制推理"""
+        self.cache.lookup(self.frame, now=0.0)
+        self.cache.store(self.landmarks, now=0.0, inference_ms=20.0)
+        self.assertFalse(self.cache.lookup(self.frame, now=2.5)[0])
+
+    def test_changed_scene_misses(self):
+        """测试画面变化后未命中，且运动预算耗尽后即使画面恢复也强制推理"""
+        self.cache.lookup(self.frame, now=0.0)
+        self.cache.store(self.landmarks, now=0.0, inference_ms=20.0)
+        flipped = self.frame[:, ::-1].copy()
+        flipped[:240] = 255 - flipped[:240]
+        self.assertFalse(self.cache.lookup(flipped, now=0.1)[0])
+        self.assertFalse(self.cache.lookup(self.frame, now=0.2)[0])
+
+    def test_lru_bound(self):
+        """测试条目数不超过上限"""
+        rng = np.random.default_rng(2)
+        for i in range(5):
+            frame = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+            self.cache.lookup(frame, now=i * 0.1)
+            self.cache.store(None, now=i * 0.1, inference_ms=20.0)
+        self.assertEqual(len(self.cache._entries), 2)
+
+if __name__ == '__main__':
+    unittest.main()
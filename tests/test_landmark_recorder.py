@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# tests/test_landmark_recorder.py
+# 关键点记录测试模块
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.landmark_recorder import (
+    LandmarkArchive, LandmarkRecorder, SOURCE_INFERENCE, SOURCE_TRACKING, read_index
+)
+
+def points(value):
+    """生成所有坐标都等于 value 的关键点数组"""
+    return np.full((21, 3), value, dtype=np.float32)
+
+class TestLandmarkRecorder(unittest.TestCase):
+    """关键点记录测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.directory)
+
+    def record(self, count, start=0, block_rows=8):
+        recorder = LandmarkRecorder(self.directory, block_rows=block_rows)
+        for i in range(start, start + count):
+            recorder.append(1000.0 + i, i % 2, SOURCE_INFERENCE if i % 3 else SOURCE_TRACKING,
+                            0.9, points(i), i % 5 == 0)
+        recorder.close()
+        return recorder
+
+    def test_segments_and_index(self):
+        """测试写满的块保存为分段，关闭时保存剩余数据"""
+        recorder = self.record(20)
+        self.assertEqual([(s[0], s[3]) for s in read_index(self.directory)], [(1, 8), (2, 8), (3, 4)])
+        self.assertEqual(recorder.get_stats()['rows_written'], 20)
+        times = np.load(os.path.join(self.directory, "segment_000002.time.npy"), mmap_mode='r')
+        self.assertEqual(times[0], 1008.0)
+
+    def test_read_range(self):
+        """测试跨分段读取时间范围和按区域过滤"""
+        self.record(20)
+        archive = LandmarkArchive(self.directory)
+        self.assertEqual(archive.rows, 20)
+        data = archive.read(1005.0, 1012.0)
+        np.testing.assert_array_equal(data['time'], np.arange(1005.0, 1012.0))
+        self.assertEqual(data['landmarks'].shape, (7, 21, 3))
+        self.assertEqual(data['landmarks'][0, 20, 2], 5)
+        self.assertEqual(list(data['matched']), [True, False, False, False, False, True, False])
+        odd = archive.read(1000.0, 1020.0, columns=('time', 'source'), roi=1)
+        self.assertEqual(set(odd), {'time', 'source'})
+        np.testing.assert_array_equal(odd['time'], np.arange(1001.0, 1020.0, 2))
+        self.assertEqual(archive.read(2000.0, 3000.0)['landmarks'].shape, (0, 21, 3))
+
+    def test_resume_numbering(self):
+        """测试重新打开目录时分段编号接续"""
+        self.record(8)
+        self.record(8, start=8)
+        self.assertEqual([s[0] for s in read_index(self.directory)], [1, 2])
+        self.assertEqual(len(LandmarkArchive(self.directory).read(0, 2000)['time']), 16)
+
+    def test_drop_when_writer_behind(self):
+        """测试没有空闲块时丢弃当前块而不阻塞"""
+        recorder = LandmarkRecorder(self.directory, block_rows=4, max_pending=1)
+        recorder._free.get()  # 模拟唯一的空闲块正在保存
+        for i in range(4):
+            recorder.append(float(i), 0, SOURCE_INFERENCE, 0.9, points(i), False)
+        self.assertEqual(recorder.rows_dropped, 4)
+        recorder.close()
+        self.assertEqual(read_index(self.directory), [])
+
+class TestMosaicScores(unittest.TestCase):
+    """拼图置信度测试类"""
+
+    def test_split_records_scores(self):
+        """测试拼图检测结果按格子记录手部置信度"""
+        from modules.roi_monitor import RoiMosaic
+        mosaic = RoiMosaic()
+        mosaic.compose([np.zeros((100, 100, 3), np.uint8)] * 2)
+        landmark = SimpleNamespace(x=0.75, y=0.5, z=0.0)
+        results = SimpleNamespace(
+            multi_hand_landmarks=[SimpleNamespace(landmark=[landmark] * 21)],
+            multi_handedness=[SimpleNamespace(classification=[SimpleNamespace(score=0.8)])])
+        mosaic.split(results)
+        self.assertTrue(np.isnan(mosaic.scores[0]))
+        self.assertAlmostEqual(mosaic.scores[1], 0.8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# tests/test_landmark_tracker.py
+# 关键点光流跟踪测试模块
+
+import unittest
+import cv2
+import numpy as np
+import os
+import sys
+from types import SimpleNamespace
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG
+from modules.landmark_tracker import LandmarkTracker
+
+class TestLandmarkTracker(unittest.TestCase):
+    """关键点光流跟踪测试类"""
+
+    def setUp(self):
+        """测试前准备：生成带纹理的场景和两个关键点"""
+        rng = np.random.default_rng(0)
+        texture = cv2.GaussianBlur((rng.random((480, 800)) * 255).astype(np.uint8), (7, 7), 2)
+        self.scene = cv2.cvtColor(texture, cv2.COLOR_GRAY2BGR)
+        self.landmarks = np.zeros((21, 3), dtype=np.float32)
+        self.landmarks[4, :2] = (0.4, 0.5)
+        self.landmarks[20, :2] = (0.5, 0.5)
+        self.tracker = LandmarkTracker([4, 20])
+
+    def test_follows_translation(self):
+        """测试跟踪画面平移"""
+        self.tracker.start(self.scene[:, :640], self.landmarks)
+        for shift in (3, 6, 9):
+            result = self.tracker.track(self.scene[:, shift:shift + 640])
+            self.assertIsNotNone(result)
+        np.testing.assert_allclose(result[[4, 20], 0] * 640, [256 - 9, 320 - 9], atol=0.5)
+        self.assertEqual(self.tracker.get_stats(), {'tracked_frames': 3, 'drifts': 0})
+
+    def test_drift_resets_tracking(self):
+        """测试画面突变时判定为漂移并停止跟踪"""
+        self.tracker.start(self.scene[:, :640], self.landmarks)
+        noise = np.random.default_rng(1).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        self.assertIsNone(self.tracker.track(noise))
+        self.assertFalse(self.tracker.active)
+        self.assertEqual(self.tracker.drifts, 1)
+
+    def test_no_hand_does_not_track(self):
+        """测试无手时不启动跟踪"""
+        self.tracker.start(self.scene[:, :640], None)
+        self.assertFalse(self.tracker.active)
+        self.assertIsNone(self.tracker.track(self.scene[:, :640]))
+
+class TestDetectionSchedule(unittest.TestCase):
+    """跟踪期间各监测区域的推理间隔测试类"""
+
+    def setUp(self):
+        """测试前准备：不初始化摄像头的处理器，1床正在跟踪，2床没有手"""
+        from modules.video_processor import VideoProcessor
+        self.tracking_enabled = CONFIG.tracking_enabled
+        CONFIG.tracking_enabled = True
+        self.processor = VideoProcessor.__new__(VideoProcessor)
+        self.processor._force_detect = False
+        self.processor.last_detection = 10.0
+        self.processor.monitors = [SimpleNamespace(tracking=True, last_inference=10.0),
+                                   SimpleNamespace(tracking=False, last_inference=10.0)]
+
+    def tearDown(self):
+        """测试后恢复配置"""
+        CONFIG.tracking_enabled = self.tracking_enabled
+
+    def test_idle_roi_keeps_detection_interval(self):
+        """测试跟踪中的区域按 tracking_detection_interval 推理，相邻空闲区域仍按 detection_interval 推理"""
+        detection, tracking = CONFIG.detection_interval, CONFIG.tracking_detection_interval
+        now = 10.0 + detection + 0.001
+        # 跟踪中的区域每帧判定为手势时 last_detection 随之更新，不影响空闲区域
+        self.processor.last_detection = now - 0.001
+        self.assertEqual(self.processor._due_monitors(now), [False, True])
+        now = 10.0 + tracking + 0.001
+        self.processor.monitors[1].last_inference = now - detection / 2
+        self.assertEqual(self.processor._due_monitors(now), [True, False])
+
+    def test_force_and_no_tracking(self):
+        """测试漂移时所有区域立即推理，没有区域跟踪时按 detection_interval 统一推理"""
+        self.processor._force_detect = True
+        self.assertEqual(self.processor._due_monitors(10.0), [True, True])
+        self.processor._force_detect = False
+        self.processor.monitors[0].tracking = False
+        self.assertEqual(self.processor._due_monitors(10.0 + CONFIG.detection_interval / 2), [False, False])
+        self.assertEqual(self.processor._due_monitors(10.001 + CONFIG.detection_interval), [True, True])
+
+if __name__ == '__main__':
+    unittest.main()
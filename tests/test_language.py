@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# tests/test_language.py
+# 语言管理器测试模块
+
+import unittest
+import os
+import re
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.language import lang
+
+class FakeWidget:
+    """记录 config() 调用的模拟控件"""
+
+    def __init__(self):
+        self.options = {}
+        self.destroyed = False
+
+    def config(self, **options):
+        if self.destroyed:
+            raise RuntimeError("控件已销毁")
+        self.options.update(options)
+
+class TestLanguageManager(unittest.TestCase):
+    """语言管理器测试类"""
+
+    def setUp(self):
+        """测试前准备：保存当前语言和登记表"""
+        self.language = lang.get_current_language()
+        self.bindings = list(lang._bindings)
+        self.listeners = list(lang._listeners)
+        lang.switch_language("zh_CN")
+
+    def tearDown(self):
+        """测试后恢复语言和登记表"""
+        lang.switch_language(self.language)
+        lang._bindings = self.bindings
+        lang._listeners = self.listeners
+
+    def test_flat_tables(self):
+        """测试每种语言编译为扁平字典，缺失的键返回键名"""
+        self.assertEqual(set(lang._tables), set(lang.languages))
+        self.assertEqual(lang.get_text("start_selected"), lang._tables["zh_CN"]["start_selected"])
+        self.assertEqual(lang.get_text("no_such_key"), "no_such_key")
+
+    def test_format_args(self):
+        """测试带格式化参数的文本"""
+        lang.switch_language("en_US")
+        self.assertIn("3", lang.get_text("cameras_started", 3))
+
+    def test_bind_applies_and_refreshes(self):
+        """测试登记后立即设置文本，切换语言后 refresh() 更新文本"""
+        label = lang.bind(FakeWidget(), "level", template="{}2:")
+        self.assertEqual(label.options["text"], f"{lang._tables['zh_CN']['level']}2:")
+        lang.switch_language("en_US")
+        lang.refresh()
+        self.assertEqual(label.options["text"], f"{lang._tables['en_US']['level']}2:")
+
+    def test_listeners_called(self):
+        """测试 refresh() 调用登记的回调"""
+        calls = []
+        lang.add_listener(lambda: calls.append(lang.get_current_language()))
+        lang.switch_language("en_US")
+        lang.refresh()
+        self.assertEqual(calls, ["en_US"])
+
+    def test_destroyed_widget_pruned(self):
+        """测试已销毁的控件从登记表中移除，不影响其他控件"""
+        alive = lang.bind(FakeWidget(), "stop_all")
+        dead = lang.bind(FakeWidget(), "stop_all")
+        dead.destroyed = True
+        count = len(lang._bindings)
+        lang.switch_language("en_US")
+        lang.refresh()
+        self.assertEqual(len(lang._bindings), count - 1)
+        self.assertEqual(alive.options["text"], lang._tables["en_US"]["stop_all"])
+
+    def test_ui_keys_translated(self):
+        """测试界面组件登记的翻译键在每种语言中都有文本"""
+        directory = os.path.join(os.path.dirname(__file__), '..', 'modules', 'ui')
+        keys = set()
+        for name in os.listdir(directory):
+            if name.endswith('.py'):
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    keys.update(re.findall(r'lang\.bind\(ttk\.\w+\([^()]*\), "(\w+)"', f.read()))
+        self.assertTrue({"grid_settings", "show_grid", "grid_spacing_x", "grid_spacing_y"} <= keys)
+        for language in lang.languages:
+            self.assertEqual(sorted(keys - set(lang._tables[language])), [], language)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# tests/test_metrics.py
+# Prometheus指标测试模块
+
+import unittest
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG, CameraConfig
+from modules.camera_manager import CameraManager
+from modules.metrics import CONTENT_TYPE, Histogram, MetricsServer, render_metrics
+from modules.simulation import GestureScript, Simulation, SyntheticSource, VirtualClock, hand_landmarks
+
+def parse(text):
+    """把指标文本解析为 {带标签的样本名: 数值}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+class TestHistogram(unittest.TestCase):
+    """直方图测试类"""
+
+    def test_cumulative_buckets(self):
+        """测试分桶累积计数、上限包含在桶内、超出范围计入 +Inf"""
+        histogram = Histogram((0.1, 0.5))
+        for value in (0.05, 0.1, 0.3, 2.0):
+            histogram.observe(value)
+        cumulative, total = histogram.snapshot()
+        self.assertEqual(cumulative, [2, 3, 4])
+        self.assertAlmostEqual(total, 2.45)
+
+class TestMetricsServer(unittest.TestCase):
+    """仿真摄像头指标服务测试类"""
+
+    def setUp(self):
+        """测试前准备：缩短报警级别，一个监测区域"""
+        self.saved = (CONFIG.cameras, CONFIG.alarm_triggers, CONFIG.alarm_sounds)
+        sounds = [CONFIG.alarm_sounds[t] for t in sorted(CONFIG.alarm_sounds)]
+        CONFIG.alarm_triggers = [1]
+        CONFIG.alarm_sounds = {1: sounds[0]}
+        CONFIG.cameras = [CameraConfig(source=0, roi=None, min_confidence=0.5, resolution=(320, 240),
+                                       rois=[{"name": "Bed \"A\"", "x": 0, "y": 0, "w": 320, "h": 224}])]
+
+    def tearDown(self):
+        """测试后恢复配置"""
+        CONFIG.cameras, CONFIG.alarm_triggers, CONFIG.alarm_sounds = self.saved
+
+    def test_scrape_running_camera(self):
+        """测试抓取运行中摄像头的帧、重连、报警升级和声音延迟指标"""
+        clock = VirtualClock(speed=1)
+        simulation = Simulation(clock)
+        simulation.sources[0] = SyntheticSource(clock, (320, 240), fps=15, disconnect_interval=2.0)
+        manager = CameraManager(processor_factory=simulation.processor)
+        server = MetricsServer(lambda: render_metrics(manager.processors), port=0)
+        server.start()
+        url = f"http://{server.address[0]}:{server.address[1]}/metrics"
+        try:
+            with clock.install():
+                self.assertTrue(manager.start_camera(0))
+                simulation.scripts[0] = [GestureScript([(0, 1.8, hand_landmarks(0.1))], clock.time() + 0.2)]
+                clock.sleep(3.5)
+                with urllib.request.urlopen(url, timeout=5) as response:
+                    self.assertEqual(response.headers['Content-Type'], CONTENT_TYPE)
+                    text = response.read().decode('utf-8')
+                manager.stop_all()
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(url.replace('/metrics', '/other'), timeout=5)
+        finally:
+            server.stop()
+        samples = parse(text)
+        self.assertIn('# TYPE icu_alarm_sound_latency_seconds histogram', text)
+        self.assertGreater(samples['icu_frames_captured_total{camera="0"}'], 10)
+        # 抓取时摄像头线程可能正在处理刚读取的一帧
+        handled = samples['icu_frames_processed_total{camera="0"}'] + samples['icu_frames_skipped_total{camera="0"}']
+        self.assertIn(samples['icu_frames_captured_total{camera="0"}'] - handled, (0, 1))
+        self.assertGreaterEqual(samples['icu_reconnects_total{camera="0"}'], 1)
+        roi = 'camera="0",roi="0",name="Bed \\"A\\""'
+        self.assertEqual(samples[f'icu_alarm_escalations_total{{{roi}}}'], 1)
+        self.assertEqual(samples[f'icu_alarm_sound_latency_seconds_count{{{roi}}}'], 1)
+        self.assertEqual(samples[f'icu_alarm_sound_latency_seconds_bucket{{{roi},le="+Inf"}}'], 1)
+
+    def test_scrape_does_not_block_camera_thread(self):
+        """测试生成指标时不持有摄像头线程使用的锁：慢速抓取期间摄像头继续处理"""
+        clock = VirtualClock(speed=1)
+        simulation = Simulation(clock)
+        simulation.sources[0] = SyntheticSource(clock, (320, 240), fps=15)
+        manager = CameraManager(processor_factory=simulation.processor)
+        release = threading.Event()
+
+        def slow_collect():
+            text = render_metrics(manager.processors)
+            release.wait(5)
+            return text
+
+        server = MetricsServer(slow_collect, port=0)
+        server.start()
+        url = f"http://{server.address[0]}:{server.address[1]}/metrics"
+        scrape = threading.Thread(target=lambda: urllib.request.urlopen(url, timeout=10).read())
+        try:
+            with clock.install():
+                self.assertTrue(manager.start_camera(0))
+                clock.sleep(0.3)
+                processor = manager.get_processor(0)
+                scrape.start()
+                time.sleep(0.1)
+                before = processor.frames_captured
+                clock.sleep(0.5)
+                self.assertGreater(processor.frames_captured, before)
+                release.set()
+                scrape.join()
+                manager.stop_all()
+        finally:
+            release.set()
+            server.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# tests/test_presence_gate.py
+# 手部存在性检测测试模块
+
+import unittest
+import numpy as np
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.presence_gate import SkinPresenceGate
+
+# BGR格式的典型肤色和蓝色床单颜色
+SKIN_BGR = (120, 150, 210)
+SHEET_BGR = (200, 60, 40)
+
+class TestSkinPresenceGate(unittest.TestCase):
+    """肤色存在性检测测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.gate = SkinPresenceGate(size=64, min_ratio=0.02, max_skip_interval=1.0)
+        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.frame[:] = SHEET_BGR
+
+    def test_rejects_frame_without_skin(self):
+        """测试无肤色区域时拒绝推理"""
+        self.assertFalse(self.gate.check(self.frame, now=0.5))
+        self.assertEqual(self.gate.get_stats(), {'checks': 1, 'rejected': 1})
+
+    def test_accepts_skin_patch(self):
+        """测试有肤色区域时放行"""
+        self.frame[200:300, 300:400] = SKIN_BGR
+        self.assertTrue(self.gate.check(self.frame, now=0.5))
+
+    def test_forced_pass_after_max_skip(self):
+        """测试连续拒绝超过最长时间后强制放行"""
+        self.gate.check(self.frame, now=0.0)
+        self.assertFalse(self.gate.check(self.frame, now=0.5))
+        self.assertTrue(self.gate.check(self.frame, now=1.5))
+
+    def test_grayscale_frame_passes(self):
+        """测试无色度信息（红外画面）时放行"""
+        gray = np.full((480, 640, 3), 90, dtype=np.uint8)
+        self.assertTrue(self.gate.check(gray, now=0.5))
+
+    def test_learn_adapts_histogram(self):
+        """测试学习手部颜色后能识别先验范围外的肤色"""
+        hand_bgr = (60, 200, 90)  # 先验范围之外的颜色
+        self.frame[100:400, 100:400] = hand_bgr
+        landmarks = np.array([[100 / 640, 100 / 480, 0], [400 / 640, 400 / 480, 0]], dtype=np.float32)
+        self.assertFalse(self.gate.check(self.frame, now=0.5))
+        for _ in range(5):
+            self.gate.learn(self.frame, landmarks)
+        self.assertTrue(self.gate.check(self.frame, now=0.6))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# tests/test_profiler.py
+# 按需采样分析测试模块
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.profiler import SamplingProfiler, collapse_stack
+
+def hot_loop(stop):
+    """被采样的热点函数"""
+    while not stop.is_set():
+        sum(range(1000))
+
+class TestProfiler(unittest.TestCase):
+    """采样分析测试类"""
+
+    def setUp(self):
+        """测试前准备：启动名为 Camera7 的工作线程"""
+        self.directory = tempfile.mkdtemp()
+        self.stop = threading.Event()
+        self.worker = threading.Thread(target=hot_loop, args=(self.stop,), name="Camera7")
+        self.worker.start()
+        self.profiler = SamplingProfiler()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.profiler.stop()
+        self.stop.set()
+        self.worker.join()
+        shutil.rmtree(self.directory)
+
+    def test_collapse_stack_outer_first(self):
+        """测试折叠栈从线程名开始、由外到内"""
+        def inner():
+            return collapse_stack(sys._getframe(), "Main")
+        stack = inner().split(';')
+        self.assertEqual(stack[0], "Main")
+        self.assertTrue(stack[-1].startswith("inner (test_profiler.py:"))
+        self.assertTrue(stack[-2].startswith("test_collapse_stack_outer_first ("))
+
+    def test_folded_output(self):
+        """测试只采集指定前缀的线程，输出可用于火焰图的折叠栈"""
+        self.assertTrue(self.profiler.start(duration=0.3, interval=0.005, directory=self.directory,
+                                            thread_prefix="Camera7"))
+        self.assertFalse(self.profiler.start(duration=0.3, directory=self.directory))
+        self.profiler.join()
+        result = self.profiler.last_result
+        with open(result['path'], encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        counts = [int(line.rsplit(' ', 1)[1]) for line in lines]
+        self.assertEqual(sum(counts), result['samples'])
+        self.assertTrue(all(line.startswith("Camera7;") for line in lines))
+        self.assertTrue(any("hot_loop (test_profiler.py:" in line for line in lines))
+
+    def test_overhead_bound(self):
+        """测试采样耗时占比不超过上限（间隔按采样耗时自动拉长）"""
+        self.profiler.start(duration=0.5, interval=0.0001, directory=self.directory, max_overhead=0.01)
+        self.profiler.join()
+        result = self.profiler.last_result
+        self.assertLessEqual(result['overhead'], 0.015)
+        self.assertGreater(result['interval'], 0.0001)
+
+    def test_stop_writes_partial_window(self):
+        """测试提前结束时写出已采集的结果"""
+        self.profiler.start(duration=60, interval=0.005, directory=self.directory, thread_prefix="Camera7")
+        time.sleep(0.1)
+        started = time.perf_counter()
+        self.profiler.stop()
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertFalse(self.profiler.running)
+        self.assertTrue(os.path.exists(self.profiler.last_result['path']))
+        self.assertGreater(self.profiler.last_result['samples'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
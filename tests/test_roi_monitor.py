@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# tests/test_roi_monitor.py
+# 多监测区域批量推理拼图测试模块
+
+import unittest
+import numpy as np
+import os
+import sys
+from types import SimpleNamespace
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.roi_monitor import RoiMosaic
+
+def _fake_hand(x, y):
+    """构造所有关键点位于同一位置的模拟手部"""
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0) for _ in range(21)])
+
+class TestRoiMosaic(unittest.TestCase):
+    """多区域拼图测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.mosaic = RoiMosaic()
+        self.crops = [
+            np.full((100, 200, 3), 10, dtype=np.uint8),
+            np.full((50, 100, 3), 20, dtype=np.uint8),
+            np.full((100, 100, 3), 30, dtype=np.uint8),
+        ]
+
+    def test_compose_layout(self):
+        """测试拼图布局与颜色转换"""
+        rgb = self.mosaic.compose(self.crops)
+        # 3个区域按2列排列：第一行 200+100 宽、100 高，第二行 100 高
+        self.assertEqual(rgb.shape, (200, 300, 3))
+        self.assertEqual(rgb[0, 0, 0], 10)
+        self.assertEqual(rgb[0, 250, 0], 20)
+        self.assertEqual(rgb[75, 250, 0], 0)  # 第二个区域下方为填充
+        self.assertEqual(rgb[150, 50, 0], 30)
+
+    def test_split_assigns_hands_to_tiles(self):
+        """测试检测结果按格子分回各区域并转换为区域坐标"""
+        self.mosaic.compose(self.crops)
+        results = SimpleNamespace(multi_hand_landmarks=[
+            _fake_hand(250 / 300, 25 / 200),   # 第二个区域中心
+            _fake_hand(50 / 300, 150 / 200),   # 第三个区域中心
+            _fake_hand(60 / 300, 160 / 200),   # 同一区域的第二只手被忽略
+        ])
+        hands = self.mosaic.split(results)
+        self.assertIsNone(hands[0])
+        np.testing.assert_allclose(hands[1][0, :2], (0.5, 0.5), atol=1e-5)
+        np.testing.assert_allclose(hands[2][0, :2], (0.5, 0.5), atol=1e-5)
+
+    def test_split_without_hands(self):
+        """测试无手部时的结果"""
+        self.mosaic.compose(self.crops)
+        hands = self.mosaic.split(SimpleNamespace(multi_hand_landmarks=None))
+        self.assertEqual(hands, [None, None, None])
+
+if __name__ == '__main__':
+    unittest.main()
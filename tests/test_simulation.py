@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# tests/test_simulation.py
+# 仿真运行模块测试
+
+import unittest
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG, CameraConfig
+from modules.camera_manager import CameraManager
+from modules.simulation import (AudioSink, GestureScript, Simulation, SyntheticSource, VirtualClock,
+                                hand_landmarks)
+
+class FakeSound:
+    """固定时长的音频"""
+
+    def __init__(self, length):
+        self.length = length
+
+    def get_length(self):
+        return self.length
+
+class TestVirtualClock(unittest.TestCase):
+    """虚拟时钟测试类"""
+
+    def test_speed_and_advance(self):
+        """测试虚拟时间按倍速流逝，sleep按比例缩短"""
+        clock = VirtualClock(speed=50, start=1000.0)
+        started = time.perf_counter()
+        clock.sleep(5.0)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertGreaterEqual(clock.time(), 1005.0)
+        clock.advance(60)
+        self.assertGreaterEqual(clock.time(), 1065.0)
+
+    def test_install_restores_module_time(self):
+        """测试 install() 在退出时恢复模块的 time"""
+        from modules import video_processor
+        clock = VirtualClock(speed=10)
+        with clock.install():
+            self.assertIs(video_processor.time, clock)
+        self.assertIs(video_processor.time, time)
+
+class TestSyntheticSource(unittest.TestCase):
+    """合成视频源测试类"""
+
+    def test_frames_paced_and_disconnect(self):
+        """测试按帧率读取、丢弃过期帧和定时断流"""
+        clock = VirtualClock(speed=1, start=0.0)
+        source = SyntheticSource(clock, resolution=(64, 48), fps=10, disconnect_interval=100)
+        capture = source.open()
+        ok, frame = capture.read()
+        self.assertTrue(ok)
+        self.assertEqual(frame.shape, (48, 64, 3))
+        clock.advance(5.0)
+        self.assertTrue(capture.read()[0])
+        self.assertGreaterEqual(capture.dropped, 48)
+        clock.advance(100)
+        self.assertFalse(capture.read()[0])
+        self.assertEqual(source.open_captures, 1)
+        capture.release()
+        capture.release()
+        self.assertEqual(source.open_captures, 0)
+
+class TestGestureScript(unittest.TestCase):
+    """手势脚本测试类"""
+
+    def test_periodic_segments(self):
+        """测试周期重复的片段查找"""
+        pinch = hand_landmarks(0.1)
+        script = GestureScript([(10, 20, pinch)], start=100.0, period=60)
+        self.assertIsNone(script.landmarks_at(105.0))
+        self.assertIs(script.landmarks_at(115.0), pinch)
+        self.assertIs(script.landmarks_at(175.0), pinch)
+        self.assertIsNone(script.landmarks_at(181.0))
+
+class TestAudioSink(unittest.TestCase):
+    """报警声音记录测试类"""
+
+    def test_channel_busy_and_loops(self):
+        """测试播放记录、播放期间忙碌和循环播放"""
+        clock = VirtualClock(speed=1, start=0.0)
+        sounds = {5: FakeSound(2.0), 10: FakeSound(1.0)}
+        sink = AudioSink(clock)
+        channel = sink.channel(0, 1, sounds)
+        channel.play(sounds[5])
+        self.assertTrue(channel.get_busy())
+        clock.advance(2.5)
+        self.assertFalse(channel.get_busy())
+        channel.play(sounds[10], loops=-1)
+        clock.advance(100)
+        self.assertTrue(channel.get_busy())
+        channel.stop()
+        self.assertFalse(channel.get_busy())
+        self.assertEqual([(cam, roi, trigger) for _, cam, roi, trigger in sink.plays], [(0, 1, 5), (0, 1, 10)])
+
+class TestSimulatedCamera(unittest.TestCase):
+    """仿真摄像头端到端测试类"""
+
+    def setUp(self):
+        """测试前准备：替换摄像头配置"""
+        self.cameras = CONFIG.cameras
+        CONFIG.cameras = [CameraConfig(source=0, roi=None, min_confidence=0.5, resolution=(160, 120),
+                                       rois=[{"name": "Bed", "x": 0, "y": 0, "w": 160, "h": 120}])]
+
+        self.alarm_triggers, self.alarm_sounds = CONFIG.alarm_triggers, CONFIG.alarm_sounds
+
+    def tearDown(self):
+        """测试后恢复配置"""
+        CONFIG.cameras = self.cameras
+        CONFIG.alarm_triggers, CONFIG.alarm_sounds = self.alarm_triggers, self.alarm_sounds
+
+    def test_alarm_and_reconnect(self):
+        """测试脚本手势触发第一级报警，断流后重连，停止后释放全部捕获对象"""
+        clock = VirtualClock(speed=10)
+        simulation = Simulation(clock)
+        simulation.sources[0] = SyntheticSource(clock, (160, 120), fps=10, disconnect_interval=8)
+        simulation.scripts[0] = [GestureScript([(0, 60, hand_landmarks(0.1))], clock.time())]
+        manager = CameraManager(processor_factory=simulation.processor)
+        with clock.install():
+            self.assertTrue(manager.start_camera(0))
+            deadline = time.perf_counter() + 30
+            source = simulation.sources[0]
+            while (not simulation.sink.total or source.opened < 2) and time.perf_counter() < deadline:
+                time.sleep(0.05)
+            manager.stop_all()
+        self.assertGreaterEqual(simulation.sink.total, 1)
+        self.assertEqual(simulation.sink.plays[0][3], CONFIG.alarm_triggers[0])
+        self.assertGreaterEqual(source.opened, 2)
+        self.assertEqual(source.open_captures, 0)
+
+    def test_alarm_triggers_hot_swap(self):
+        """测试运行中修改报警触发时长后在帧边界重新加载报警音频，新的第一级报警正常播放"""
+        clock = VirtualClock(speed=10)
+        simulation = Simulation(clock)
+        simulation.sources[0] = SyntheticSource(clock, (160, 120), fps=10)
+        manager = CameraManager(processor_factory=simulation.processor)
+        with clock.install():
+            try:
+                self.assertTrue(manager.start_camera(0))
+                processor = manager.get_processor(0)
+                deadline = time.perf_counter() + 30
+                while not processor.frames_processed and time.perf_counter() < deadline:
+                    time.sleep(0.02)
+                CONFIG.update_alarm_triggers([3, 10, 15, 30])
+                while processor.config is not CONFIG.cameras[0] and time.perf_counter() < deadline:
+                    time.sleep(0.02)
+                simulation.scripts[0] = [GestureScript([(0, 60, hand_landmarks(0.1))], clock.time())]
+                while not simulation.sink.total and time.perf_counter() < deadline:
+                    time.sleep(0.05)
+                status = processor.status_snapshot
+            finally:
+                manager.stop_all()
+        self.assertEqual(sorted(processor.alarm_sounds), [3, 10, 15, 30])
+        self.assertEqual(simulation.sink.plays[0][3], 3)
+        self.assertEqual(status.rois[0].played_sounds, (3,))
+
+if __name__ == '__main__':
+    unittest.main()
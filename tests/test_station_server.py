@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# tests/test_station_server.py
+# 护士站推送服务测试模块
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.event_bus import AlarmEscalated, EventBus
+from modules.station_server import StationServer, _Client, encode_status, status_delta, status_events
+from modules.status_snapshot import CameraStatus, RoiStatus
+
+def make_status(cam_id, level=0, detection_start=0, fps=25.0):
+    """构造单区域摄像头的状态快照"""
+    roi = RoiStatus(name=f"床位{cam_id}", status="无报警", detection_start=detection_start,
+                    alarm_level=level, played_sounds=(), gestures=())
+    return CameraStatus(camera_id=cam_id, timestamp=time.time(), status="无报警", fps=fps, rois=[roi])
+
+class FakeWriter:
+    """不读取数据的客户端连接替身"""
+
+    def __init__(self):
+        self.closed = False
+
+    def get_extra_info(self, name):
+        return ('127.0.0.1', 0)
+
+    def close(self):
+        self.closed = True
+
+class TestStatusEncoding(unittest.TestCase):
+    """状态编码和增量计算测试类"""
+
+    def test_delta_only_changed_fields(self):
+        """测试增量只包含变化的字段、新摄像头和已停止的摄像头"""
+        previous = {'0': encode_status(make_status(0)), '1': encode_status(make_status(1))}
+        current = {'0': encode_status(make_status(0, fps=20.0)), '2': encode_status(make_status(2))}
+        delta = status_delta(previous, current)
+        self.assertEqual(delta['0'], {'fps': 20.0})
+        self.assertEqual(delta['2'], current['2'])
+        self.assertIsNone(delta['1'])
+        self.assertEqual(status_delta(current, current), {})
+
+    def test_events(self):
+        """测试检测开始、报警升级和复位事件"""
+        idle = {'0': encode_status(make_status(0))}
+        detecting = {'0': encode_status(make_status(0, detection_start=100.0))}
+        alarm = {'0': encode_status(make_status(0, level=1, detection_start=100.0))}
+        self.assertEqual([e['event'] for e in status_events(idle, detecting, 0)], ['detection'])
+        self.assertEqual([(e['event'], e['level']) for e in status_events(detecting, alarm, 0)], [('alarm', 1)])
+        self.assertEqual([e['event'] for e in status_events(alarm, idle, 0)], ['reset'])
+        self.assertEqual(status_events(alarm, alarm, 0), [])
+
+class TestStationServer(unittest.TestCase):
+    """推送服务测试类"""
+
+    def setUp(self):
+        """测试前准备：在本机随机端口启动服务"""
+        self.snapshots = {0: make_status(0)}
+        self.commands = []
+        self.server = StationServer(lambda: dict(self.snapshots),
+                                    commands={'pause': lambda camera: self.commands.append(('pause', camera))},
+                                    port=0, interval=0.02)
+        self.server.start()
+
+    def tearDown(self):
+        """测试后停止服务"""
+        self.server.stop()
+
+    async def _read(self, reader, type_):
+        """读取下一条指定类型的消息"""
+        while True:
+            message = json.loads(await asyncio.wait_for(reader.readline(), 2.0))
+            if message['type'] == type_:
+                return message
+
+    def test_hello_then_deltas(self):
+        """测试连接后收到完整状态，之后只收到变化的字段和事件"""
+        async def client():
+            await asyncio.sleep(0.1)
+            reader, writer = await asyncio.open_connection(*self.server.address)
+            hello = await self._read(reader, 'hello')
+            self.snapshots[0] = make_status(0, level=1, detection_start=time.time())
+            status = await self._read(reader, 'status')
+            event = await self._read(reader, 'event')
+            writer.close()
+            return hello, status, event
+        hello, status, event = asyncio.run(client())
+        self.assertEqual(hello['cameras']['0']['level'], 0)
+        self.assertEqual(set(status['cameras']['0']), {'level', 'rois'})
+        self.assertEqual((event['event'], event['camera'], event['roi'], event['level']), ('alarm', 0, 0, 1))
+
+    def test_commands(self):
+        """测试命令执行和应答"""
+        async def client():
+            reader, writer = await asyncio.open_connection(*self.server.address)
+            writer.write(b'{"cmd": "pause", "camera": 1, "id": 7}\n{"cmd": "eject", "id": 8}\nnot json\n')
+            replies = [await self._read(reader, 'ack') for _ in range(3)]
+            writer.close()
+            return replies
+        ok, unknown, invalid = asyncio.run(client())
+        self.assertEqual((ok['id'], ok['ok']), (7, True))
+        self.assertEqual((unknown['id'], unknown['ok']), (8, False))
+        self.assertFalse(invalid['ok'])
+        self.assertEqual(self.commands, [('pause', 1)])
+
+class TestEventForwarding(unittest.TestCase):
+    """事件总线转发测试类"""
+
+    def test_bus_events_forwarded(self):
+        """测试提供事件总线订阅时转发总线上的事件"""
+        bus = EventBus()
+        server = StationServer(dict, port=0, interval=0.02, events=bus.subscribe())
+        server.start()
+
+        async def client():
+            reader, writer = await asyncio.open_connection(*server.address)
+            await reader.readline()  # hello
+            bus.publish(AlarmEscalated, 3, 1, 12.5, 2, 10)
+            message = json.loads(await asyncio.wait_for(reader.readline(), 2.0))
+            writer.close()
+            return message
+        try:
+            message = asyncio.run(client())
+        finally:
+            server.stop()
+        self.assertEqual(message, {'type': 'event', 'event': 'alarm', 'camera': 3, 'roi': 1, 'time': 12.5,
+                                   'level': 2, 'duration': 10})
+        self.assertIsNone(bus._routes.get(AlarmEscalated))
+
+class TestSlowConsumer(unittest.TestCase):
+    """慢速客户端测试类"""
+
+    def test_slow_client_dropped(self):
+        """测试发送队列满时断开客户端，不影响其他客户端"""
+        server = StationServer(dict, queue_size=2)
+
+        async def broadcast():
+            slow, fast = _Client(FakeWriter(), 2), _Client(FakeWriter(), 10)
+            server._clients.update((slow, fast))
+            for seq in range(3):
+                server._broadcast({'type': 'status', 'seq': seq, 'cameras': {}})
+            return slow, fast
+        slow, fast = asyncio.run(broadcast())
+        self.assertTrue(slow.writer.closed)
+        self.assertEqual(server._clients, {fast})
+        self.assertEqual(fast.queue.qsize(), 3)
+        self.assertEqual(server.clients_dropped, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# tests/test_status_snapshot.py
+# 摄像头状态快照测试模块
+
+import unittest
+import time
+import os
+import sys
+from types import SimpleNamespace
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.event_bus import AlarmAcknowledged, event_bus
+from modules.roi_monitor import RoiMonitor
+from modules.status_snapshot import CameraStatus, RoiStatus
+
+class TestStatusSnapshot(unittest.TestCase):
+    """状态快照测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.roi = RoiStatus(name="床位A", status="检测中", detection_start=time.time() - 3.0,
+                             alarm_level=1, played_sounds=(5,), gestures=('thumb_pinky',))
+        self.camera = CameraStatus(camera_id=0, timestamp=time.time(), status="检测中", fps=25.0,
+                                   rois=[self.roi, RoiStatus("床位B", "无报警", 0, 0, (), ())])
+
+    def test_immutable(self):
+        """测试快照不可修改，也不能添加属性"""
+        with self.assertRaises(AttributeError):
+            self.roi.alarm_level = 2
+        with self.assertRaises(AttributeError):
+            self.camera.extra = 1
+        self.assertFalse(hasattr(self.roi, '__dict__'))
+
+    def test_detection_time_computed_at_read(self):
+        """测试检测时间在读取时计算"""
+        self.assertGreaterEqual(self.roi.detection_time, 3.0)
+        self.assertEqual(self.camera.rois[1].detection_time, 0)
+
+    def test_as_dict_aggregates(self):
+        """测试转换为 get_status() 字典格式"""
+        status = self.camera.as_dict()
+        self.assertEqual(status['alarm_level'], 1)
+        self.assertEqual(status['gestures'], ('thumb_pinky',))
+        self.assertEqual(len(status['rois']), 2)
+        self.assertEqual(status['rois'][0]['played_sounds'], (5,))
+        self.assertGreaterEqual(status['detection_time'], 3.0)
+
+    def test_monitor_snapshot_is_detached(self):
+        """测试区域快照不随区域状态变化"""
+        channel = SimpleNamespace(stop=lambda: None, get_busy=lambda: False)
+        monitor = RoiMonitor(0, 0, {"x": 0, "y": 0, "w": 100, "h": 100}, channel, {})
+        monitor.played_sounds.add(5)
+        snapshot = monitor.snapshot()
+        monitor.played_sounds.add(10)
+        self.assertEqual(snapshot.played_sounds, (5,))
+        self.assertEqual(snapshot.alarm_level, 1)
+
+    def test_pause_alarm_reads_snapshot(self):
+        """测试界面线程暂停报警时从状态快照读取报警级别，不访问区域的可变状态"""
+        from modules.video_processor import VideoProcessor
+
+        class Monitor:
+            """只允许停止声道的区域"""
+            alarm_channel = SimpleNamespace(stop=lambda: None)
+
+            @property
+            def played_sounds(self):
+                raise AssertionError("界面线程不应读取 played_sounds")
+
+        processor = VideoProcessor.__new__(VideoProcessor)
+        processor.camera_id = 0
+        processor.monitors = [Monitor(), Monitor()]
+        processor.status_snapshot = CameraStatus(
+            camera_id=0, timestamp=time.time(), status="报警触发 (10秒)", fps=25.0,
+            rois=[self.roi, RoiStatus("床位B", "报警触发 (10秒)", time.time() - 10, 2, (5, 10), ())])
+        subscription = event_bus.subscribe([AlarmAcknowledged])
+        try:
+            processor.pause_alarm()
+            event = subscription.get(timeout=1)
+        finally:
+            event_bus.unsubscribe(subscription)
+        self.assertEqual((event.camera_id, event.level), (0, 2))
+
+if __name__ == '__main__':
+    unittest.main()
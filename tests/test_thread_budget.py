@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# tests/test_thread_budget.py
+# 线程预算测试模块
+
+import unittest
+import os
+import sys
+import threading
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.thread_budget import ThreadBudget, available_cpus, plan_threads
+
+class TestThreadPlan(unittest.TestCase):
+    """线程预算规划测试类"""
+
+    def test_reserve_ui_core_and_split(self):
+        """测试8核3个摄像头：预留0号核心，其余核心连续分组，线程总数不超过 pool_size"""
+        plan = plan_threads(3, 6, cpus=range(8))
+        self.assertEqual(plan.reserved, (0,))
+        self.assertEqual(plan.camera_cpus, {0: (1, 2, 3), 1: (4, 5), 2: (6, 7)})
+        self.assertEqual(plan.camera_threads, 2)
+        self.assertEqual(plan.opencv_threads, 2)
+        self.assertFalse(plan.pin)
+
+    def test_fewer_cores_than_cameras(self):
+        """测试核心数不多于摄像头数时不预留核心，每个摄像头1个线程，摄像头轮流共用核心"""
+        plan = plan_threads(3, 6, cpus=(4, 5))
+        self.assertEqual(plan.reserved, ())
+        self.assertEqual(plan.camera_threads, 1)
+        self.assertEqual(plan.camera_cpus, {0: (4,), 1: (5,), 2: (4,)})
+
+    def test_pool_size_caps_threads_and_pin_disables_opencv_pool(self):
+        """测试 pool_size 限制线程数，绑定核心时关闭OpenCV线程池"""
+        plan = plan_threads(2, 2, cpus=range(16), reserve_ui=False, pin=True)
+        self.assertEqual(plan.camera_threads, 1)
+        self.assertEqual(plan.camera_cpus[0], tuple(range(8)))
+        self.assertEqual(plan.opencv_threads, 1)
+
+    @unittest.skipUnless(hasattr(os, 'sched_setaffinity'), "需要 os.sched_setaffinity")
+    def test_pinned_threads_inherit_affinity(self):
+        """测试 pinned() 块内创建的线程继承摄像头核心，块结束后当前线程恢复"""
+        original = os.sched_getaffinity(0)
+        cpu = available_cpus()[-1]
+        budget = ThreadBudget()
+        budget.apply(plan_threads(1, 1, cpus=(cpu,), reserve_ui=False, pin=True))
+        seen = []
+        ready, finish = threading.Event(), threading.Event()
+
+        def worker():
+            seen.append(os.sched_getaffinity(0))
+            ready.set()
+            finish.wait()
+
+        with budget.pinned(0):
+            thread = threading.Thread(target=worker)
+            thread.start()
+        ready.wait()
+        finish.set()
+        thread.join()
+        self.assertEqual(seen, [{cpu}])
+        self.assertEqual(os.sched_getaffinity(0), original)
+        with budget.pinned(5):
+            self.assertEqual(os.sched_getaffinity(0), original)
+
+class TestBudgetedHands(unittest.TestCase):
+    """限制线程数的 Hands 测试类"""
+
+    def test_process_with_budget(self):
+        """测试修改执行器和推理节点线程数后图可以正常创建和推理"""
+        from modules.video_processor import BudgetedHands
+        with BudgetedHands(2, static_image_mode=False, max_num_hands=1, model_complexity=0) as hands:
+            results = hands.process(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.assertIsNone(results.multi_hand_landmarks)
+
+if __name__ == '__main__':
+    unittest.main()
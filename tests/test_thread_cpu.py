@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# tests/test_thread_cpu.py
+# 线程CPU统计测试模块
+
+import unittest
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.thread_cpu import ThreadCpuMonitor, read_task_times, supported
+
+def spin(seconds):
+    """占用当前线程的CPU seconds 秒"""
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+@unittest.skipUnless(supported(), "需要 /proc/self/task")
+class TestThreadCpu(unittest.TestCase):
+    """线程CPU统计测试类"""
+
+    def setUp(self):
+        """测试前准备：新的采样器"""
+        self.monitor = ThreadCpuMonitor()
+
+    def test_read_task_times(self):
+        """测试读取到当前线程且CPU时间单调增加"""
+        tid = threading.get_native_id()
+        before = read_task_times()[tid][1]
+        spin(0.05)
+        self.assertGreaterEqual(read_task_times()[tid][1], before)
+
+    def test_camera_thread_split_by_stages(self):
+        """测试摄像头线程按分段计时拆分为读取和帧处理"""
+        ready, go, done, finish = (threading.Event() for _ in range(4))
+
+        def camera():
+            stages = {'capture': 0.0, 'display': 0.0}
+            self.monitor.register_current(3, 'camera', stages)
+            ready.set()
+            go.wait()
+            start = time.thread_time()
+            spin(0.2)
+            stages['capture'] += time.thread_time() - start
+            spin(0.2)
+            done.set()
+            finish.wait()
+            self.monitor.unregister_current()
+
+        thread = threading.Thread(target=camera)
+        thread.start()
+        ready.wait()
+        self.assertIsNone(self.monitor.sample())
+        go.set()
+        done.wait()
+        result = self.monitor.sample()
+        finish.set()
+        thread.join()
+        usage = result['cameras'][3]
+        self.assertEqual(usage['threads'], 1)
+        cpu = usage['capture'] + usage['processing']
+        self.assertGreater(cpu, 0)
+        self.assertAlmostEqual(usage['capture'] / cpu, 0.5, delta=0.15)
+        self.assertEqual(usage['display'], 0)
+        self.assertAlmostEqual(usage['total'], cpu, delta=0.2)
+
+    def test_track_and_classify(self):
+        """测试 track() 内新建的线程计入摄像头推理，其他线程按名称分类"""
+        stop = threading.Event()
+
+        def busy():
+            while not stop.is_set():
+                spin(0.01)
+
+        with self.monitor.track(1):
+            inference = threading.Thread(target=busy, name="Worker")
+            inference.start()
+        service = threading.Thread(target=busy, name="ClipEncode_0")
+        service.start()
+        try:
+            self.monitor.sample()
+            time.sleep(0.3)
+            result = self.monitor.sample()
+        finally:
+            stop.set()
+            inference.join()
+            service.join()
+        threads = {thread['tid']: thread for thread in result['threads']}
+        self.assertEqual((threads[inference.native_id]['camera'], threads[inference.native_id]['subsystem']),
+                         (1, 'inference'))
+        self.assertEqual(threads[service.native_id]['subsystem'], 'services')
+        self.assertGreater(result['cameras'][1]['inference'], 0)
+        self.assertGreater(result['subsystems']['services'], 0)
+        self.assertEqual(self.monitor.camera_usage(1), result['cameras'][1])
+        self.assertIsNone(self.monitor.camera_usage(9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# tests/test_threshold_sweep.py
+# 离线阈值扫描测试模块
+
+import unittest
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.gesture_rules import GestureRuleEngine
+from modules.threshold_sweep import compare_episodes, ema, sweep_stream
+
+RULES = [
+    {"name": "pinch", "conditions": [
+        {"distance": ("THUMB_TIP", "PINKY_TIP"), "metric": "manhattan", "op": "<", "threshold": "gesture_threshold"}]},
+    {"name": "raised", "min_duration": 0.5, "conditions": [
+        {"position": ("WRIST", "y"), "op": "<", "threshold": 0.3},
+        {"distance": ("THUMB_TIP", "PINKY_TIP"), "op": "<", "threshold": "gesture_threshold"}]},
+    {"name": "ignored", "alarm": False, "conditions": [
+        {"position": ("WRIST", "x"), "op": ">", "threshold": 0.0}]},
+]
+TRIGGERS = [1.0, 2.0, 4.0]
+
+def synthetic_stream(seed, rows=1500):
+    """生成拇指和小指距离缓慢变化、带噪声和手部消失间隔的关键点序列"""
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([0.1, 0.1, 0.1, 0.1, 1.5], size=rows)
+    times = 1000.0 + np.cumsum(steps)
+    landmarks = rng.random((rows, 21, 3)).astype(np.float32) * 0.05 + 0.5
+    distance = 0.5 + 0.4 * np.sin(times / 3.0) + rng.normal(0, 0.08, rows)
+    landmarks[:, 4, 0] = 0.5
+    landmarks[:, 20, 0] = 0.5 + distance
+    landmarks[:, 0, 1] = np.where(np.sin(times / 7.0) > 0, 0.2, 0.6)
+    return times, landmarks
+
+def replay(times, landmarks, alpha, threshold, max_gap):
+    """逐行重放：与 RoiMonitor 相同的手势和报警逻辑"""
+    params = SimpleNamespace(gesture_threshold=threshold, smooth_factor=alpha)
+    engine = GestureRuleEngine(RULES, params=params)
+    detections = escalations = 0
+    alarms = []
+    start = 0
+    played = set()
+    previous = None
+    for now, points in zip(times, landmarks):
+        if previous is not None and now - previous > max_gap:
+            # 手部消失：清除规则计时并复位报警
+            engine.clear()
+            start = 0
+            played.clear()
+        previous = now
+        if engine.should_alarm(engine.evaluate(points, now)):
+            if start == 0:
+                start = now
+                played.clear()
+                detections += 1
+            for trigger in TRIGGERS:
+                if now - start >= trigger and trigger not in played:
+                    played.add(trigger)
+                    escalations += 1
+                    if trigger == TRIGGERS[0]:
+                        alarms.append(now)
+        else:
+            start = 0
+            played.clear()
+    return detections, escalations, alarms
+
+class TestEma(unittest.TestCase):
+    """指数平滑测试类"""
+
+    def test_matches_recursion(self):
+        """测试分块闭式解与逐行递推一致"""
+        values = np.random.default_rng(0).normal(size=(5000, 2))
+        for alpha in (0.01, 0.3, 0.95, 1.0):
+            expected = values.copy()
+            for i in range(1, len(values)):
+                expected[i] = alpha * values[i] + (1 - alpha) * expected[i - 1]
+            np.testing.assert_allclose(ema(values, alpha), expected, rtol=1e-9, atol=1e-9)
+
+class TestSweep(unittest.TestCase):
+    """参数网格重放测试类"""
+
+    def test_matches_sequential_replay(self):
+        """测试向量化重放与逐行重放的检测、升级和报警时间一致"""
+        times, landmarks = synthetic_stream(1)
+        engine = GestureRuleEngine(RULES, params=SimpleNamespace(gesture_threshold=0.5))
+        alphas = [0.2, 0.6, 1.0]
+        thresholds = [0.3, 0.5, 0.7]
+        result = sweep_stream(engine, times, landmarks, alphas, thresholds, TRIGGERS,
+                              max_gap=0.5, chunk_elements=3000)
+        for s, alpha in enumerate(alphas):
+            for t, threshold in enumerate(thresholds):
+                detections, escalations, alarms = replay(times, landmarks, alpha, threshold, 0.5)
+                self.assertEqual(result.detections[s, t], detections)
+                self.assertEqual(result.escalations[s, t], escalations)
+                np.testing.assert_allclose(result.episodes[s, t][:, 0], alarms)
+        self.assertGreater(result.alarms.sum(), 0)
+
+    def test_unknown_threshold(self):
+        """测试规则没有引用扫描阈值时报错"""
+        engine = GestureRuleEngine(RULES, params=SimpleNamespace(gesture_threshold=0.5))
+        with self.assertRaises(ValueError):
+            sweep_stream(engine, [0.0], np.zeros((1, 21, 3)), [0.3], [0.5], TRIGGERS, threshold_attr="missing")
+
+class TestCompare(unittest.TestCase):
+    """报警匹配测试类"""
+
+    def test_match_false_alarms_and_delays(self):
+        """测试参考事件匹配、误报计数和报警延迟"""
+        reference = np.array([[10.0, 20.0], [50.0, 55.0], [80.0, 90.0]])
+        episodes = np.array([[12.0, 11.0, 19.0], [15.0, 14.0, 18.0], [56.5, 50.0, 57.0], [70.0, 69.0, 71.0]])
+        matched, false_alarms, delays = compare_episodes(episodes, reference, tolerance=2.0)
+        self.assertEqual(matched, 2)
+        self.assertEqual(false_alarms, 1)
+        np.testing.assert_allclose(delays, [2.0, 6.5])
+
+    def test_adjacent_events_prefer_containing(self):
+        """测试相邻参考事件在容差内重叠时优先匹配包含报警的事件"""
+        reference = np.array([[10.0, 20.0, 12.0], [21.0, 30.0, 23.0]])
+        episodes = np.array([[19.5, 10.0, 20.0], [20.5, 20.5, 25.0]])
+        matched, false_alarms, delays = compare_episodes(episodes, reference, tolerance=2.0)
+        self.assertEqual((matched, false_alarms), (1, 0))
+        np.testing.assert_allclose(delays, [7.5])
+
+        matched, _, delays = compare_episodes(np.array([[19.5, 10.0, 20.0], [22.0, 21.0, 25.0]]), reference)
+        self.assertEqual(matched, 2)
+        np.testing.assert_allclose(delays, [7.5, -1.0])
+
+if __name__ == '__main__':
+    unittest.main()
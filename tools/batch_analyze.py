@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# tools/batch_analyze.py
+# 录制视频离线批量分析工具
+#
+# 把视频按时间切分为若干段，在多个工作进程中并行推理（不节流、不显示），再把各段结果
+# 拼接为连续的关键点序列，用与运行时相同的手势规则和 alarm_triggers 得到报警时间线。
+# 时间为相对视频开头的秒数。
+#
+# 用法：
+#   python tools/batch_analyze.py ward1.mp4 ward2.mp4 --camera 0 --workers 4 --output alarms.csv
+#   python tools/batch_analyze.py ward1.mp4 --roi 200,100,400,300 --roi 700,100,400,300 --record recordings/ward1
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG
+from modules.batch_analyzer import (
+    alarm_timeline, analyze_chunk, match_stream, plan_chunks, probe_video, stitch, throughput
+)
+from modules.gesture_rules import GestureRuleEngine
+from modules.landmark_recorder import SOURCE_INFERENCE, LandmarkRecorder
+
+def _init_worker():
+    """工作进程初始化：OpenCV只用单线程，避免与其他工作进程争用CPU"""
+    cv2.setNumThreads(1)
+
+def _format_time(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+
+def record(directory, stitched, block_rows):
+    """把拼接后的关键点序列保存为关键点记录（可用 tools/threshold_sweep.py 扫描阈值）
+
+    stitched 的每个区域除 time/score/landmarks 外还需要 matched（match_stream() 的结果），
+    与运行时记录相同，保存每行是否判定为需要报警的手势。
+    """
+    # 块容量比分段行数多一行，append() 不会自动交出块（没有空闲块时会丢弃），
+    # 由这里等待空闲块后交出，离线写入不丢数据
+    recorder = LandmarkRecorder(directory, block_rows=block_rows + 1, max_pending=1)
+    times = np.concatenate([roi['time'] for roi in stitched])
+    rois = np.concatenate([np.full(len(roi['time']), i) for i, roi in enumerate(stitched)])
+    scores = np.concatenate([roi['score'] for roi in stitched])
+    landmarks = np.concatenate([roi['landmarks'] for roi in stitched])
+    matched = np.concatenate([roi['matched'] for roi in stitched])
+    order = np.argsort(times, kind='stable')
+    for i, row in enumerate(order):
+        recorder.append(times[row], rois[row], SOURCE_INFERENCE, scores[row], landmarks[row], matched[row])
+        if (i + 1) % block_rows == 0:
+            recorder.flush(wait=True)
+    recorder.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="在录制的视频上并行离线分析手势并生成报警时间线")
+    parser.add_argument('videos', nargs='+', help="视频文件")
+    parser.add_argument('--camera', type=int, default=0, help="使用该摄像头配置的监测区域")
+    parser.add_argument('--roi', action='append', default=None,
+                        help="监测区域 x,y,w,h（可重复指定，默认使用 --camera 的区域）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="工作进程数")
+    parser.add_argument('--chunk-seconds', type=float, default=120.0, help="每段时长（秒）")
+    parser.add_argument('--overlap', type=float, default=2.0, help="每段开始前的预热时长（秒）")
+    parser.add_argument('--sample-interval', type=float, default=CONFIG.detection_interval,
+                        help="推理间隔（秒），默认为 detection_interval")
+    parser.add_argument('--output', default="batch_alarms.csv", help="报警时间线CSV路径")
+    parser.add_argument('--record', default=None, help="同时把关键点保存到该目录（每个视频一个子目录）")
+    args = parser.parse_args()
+
+    if args.roi:
+        rois = [tuple(int(v) for v in roi.split(',')) for roi in args.roi]
+    else:
+        rois = [(r['x'], r['y'], r['w'], r['h']) for r in CONFIG.cameras[args.camera].rois]
+    min_confidence = CONFIG.cameras[args.camera].min_confidence
+
+    tasks = []
+    duration = 0.0
+    for path in args.videos:
+        fps, frames = probe_video(path)
+        duration += frames / fps
+        tasks.extend(plan_chunks(path, fps, frames, rois, args.chunk_seconds, args.overlap,
+                                 args.sample_interval, min_confidence))
+    workers = max(1, min(args.workers, len(tasks)))
+    print(f"{len(args.videos)} 个视频，共 {_format_time(duration)}，{len(tasks)} 段，{workers} 个工作进程")
+
+    started = time.perf_counter()
+    results = {path: [] for path in args.videos}
+    # MediaPipe在fork出的子进程中不可靠，使用spawn启动工作进程
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker) as pool:
+        futures = [pool.submit(analyze_chunk, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[result['path']].append(result)
+            print(f"\r已完成 {done}/{len(tasks)} 段", end='', flush=True)
+    elapsed = time.perf_counter() - started
+    print()
+
+    engine = GestureRuleEngine(CONFIG.gesture_rules, params=CONFIG)
+    # 采样间隔的1.5倍内没有检测到手即视为手部消失
+    max_gap = 1.5 * args.sample_interval
+    alarms = 0
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['video', 'roi', 'event', 'time', 'timestamp', 'level', 'duration'])
+        for path, chunks in results.items():
+            stitched = stitch(chunks)
+            for roi, data in enumerate(stitched):
+                for now, kind, level, trigger in alarm_timeline(engine, data['time'], data['landmarks'],
+                                                                CONFIG.alarm_triggers, max_gap):
+                    writer.writerow([path, roi, kind, round(float(now), 3), _format_time(now), level, trigger])
+                    if kind == 'alarm':
+                        alarms += 1
+                        print(f"{os.path.basename(path)} 区域{roi} {_format_time(now)} 触发 {trigger:g}秒 报警")
+            if args.record:
+                for data in stitched:
+                    data['matched'] = match_stream(engine, data['time'], data['landmarks'], max_gap)
+                name = os.path.splitext(os.path.basename(path))[0]
+                record(os.path.join(args.record, name), stitched, CONFIG.landmark_record_block_rows)
+
+    stats = throughput([r for chunks in results.values() for r in chunks], elapsed, workers)
+    print(f"报警升级 {alarms} 次，时间线已保存到 {args.output}")
+    print(f"{stats['frames']} 帧（推理 {stats['samples']} 帧），耗时 {elapsed:.1f} 秒，"
+          f"实时倍数 {duration / elapsed:.1f}x")
+    print(f"吞吐量 {stats['fps']} 帧/秒，每核 {stats['fps_per_core']} 帧/秒，"
+          f"按工作进程CPU时间 {stats['fps_per_cpu_second']} 帧/秒（CPU {stats['cpu_seconds']} 秒）")
+
+if __name__ == '__main__':
+    main()
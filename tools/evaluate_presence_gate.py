@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# tools/evaluate_presence_gate.py
+# 手部存在性级联检测评估工具
+#
+# 在录制的视频片段上逐帧运行MediaPipe推理作为真值，统计级联检测第一级（肤色存在性检测）
+# 的精确率/召回率以及可节省的推理次数。
+#
+# 用法：
+#   python tools/evaluate_presence_gate.py clip1.mp4 clip2.mp4 --roi 200,100,800,600
+
+import argparse
+import os
+import sys
+
+import cv2
+import mediapipe as mp
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG
+from modules.hand_landmarks import landmarks_to_array
+from modules.presence_gate import SkinPresenceGate
+
+def evaluate_clip(path, roi, min_ratio, max_skip_interval):
+    """评估单个视频片段
+
+    Args:
+        path: 视频文件路径
+        roi: (x, y, w, h)
+        min_ratio: 肤色像素比例阈值
+        max_skip_interval: 连续跳过推理的最长时间（秒）
+
+    Returns:
+        dict: 混淆矩阵计数和跳过的推理次数
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"无法打开视频: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    x, y, w, h = roi
+    gate = SkinPresenceGate(size=CONFIG.presence_gate_size, min_ratio=min_ratio,
+                            max_skip_interval=max_skip_interval)
+    counts = {'frames': 0, 'tp': 0, 'fp': 0, 'fn': 0, 'tn': 0, 'skipped': 0}
+    tracked = False
+    last_learn = -CONFIG.presence_learn_interval
+
+    with mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1,
+                                  min_detection_confidence=0.5, model_complexity=0) as hands:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            now = counts['frames'] / fps
+            counts['frames'] += 1
+            crop = frame[y:y + h, x:x + w]
+
+            # 与运行时相同的级联逻辑：跟踪中直接推理，否则由存在性检测决定
+            run_inference = tracked or gate.check(crop, now)
+
+            results = hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+            has_hand = bool(results.multi_hand_landmarks)
+            if has_hand and now - last_learn >= CONFIG.presence_learn_interval:
+                gate.learn(crop, landmarks_to_array(results.multi_hand_landmarks[0]))
+                last_learn = now
+
+            if run_inference:
+                counts['tp' if has_hand else 'fp'] += 1
+            else:
+                counts['fn' if has_hand else 'tn'] += 1
+                counts['skipped'] += 1
+            # 运行时只有实际推理的帧才会更新跟踪状态
+            tracked = has_hand if run_inference else False
+    cap.release()
+    return counts
+
+def _ratio(a, b):
+    return a / b if b else float('nan')
+
+def main():
+    parser = argparse.ArgumentParser(description="评估手部存在性级联检测的精确率/召回率和节省的推理次数")
+    parser.add_argument('clips', nargs='+', help="录制的视频片段")
+    parser.add_argument('--roi', default=None, help="ROI区域 x,y,w,h（默认使用摄像头0的第一个区域）")
+    parser.add_argument('--min-ratio', type=float, default=CONFIG.presence_min_skin_ratio,
+                        help="肤色像素比例阈值")
+    parser.add_argument('--max-skip', type=float, default=CONFIG.presence_max_skip_interval,
+                        help="连续跳过推理的最长时间（秒）")
+    args = parser.parse_args()
+
+    if args.roi:
+        roi = tuple(int(v) for v in args.roi.split(','))
+    else:
+        r = CONFIG.cameras[0].roi
+        roi = (r['x'], r['y'], r['w'], r['h'])
+
+    total = {'frames': 0, 'tp': 0, 'fp': 0, 'fn': 0, 'tn': 0, 'skipped': 0}
+    print(f"{'片段':<32}{'帧数':>8}{'精确率':>10}{'召回率':>10}{'节省推理':>10}")
+    for clip in args.clips:
+        c = evaluate_clip(clip, roi, args.min_ratio, args.max_skip)
+        for k in total:
+            total[k] += c[k]
+        print(f"{os.path.basename(clip):<32}{c['frames']:>8}"
+              f"{_ratio(c['tp'], c['tp'] + c['fp']):>10.3f}"
+              f"{_ratio(c['tp'], c['tp'] + c['fn']):>10.3f}"
+              f"{_ratio(c['skipped'], c['frames']):>10.1%}")
+    print(f"{'合计':<32}{total['frames']:>8}"
+          f"{_ratio(total['tp'], total['tp'] + total['fp']):>10.3f}"
+          f"{_ratio(total['tp'], total['tp'] + total['fn']):>10.3f}"
+          f"{_ratio(total['skipped'], total['frames']):>10.1%}")
+    print(f"跳过推理 {total['skipped']} 次，漏检（有手但跳过）{total['fn']} 帧")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# tools/threshold_sweep.py
+# 手势阈值离线扫描工具
+#
+# 读取关键点记录（config.py 中 landmark_record_enabled 开启后生成），按与运行时相同的
+# 平滑、手势规则和报警逻辑重放 smooth_factor × gesture_threshold 网格上的全部组合，
+# 输出每个摄像头每种配置的检测次数、报警次数、报警延迟和误报率，以及ROC风格曲线。
+#
+# 提供人工标注（--labels，CSV：camera,roi,start,end，时间为Unix时间戳）时以标注为真值；
+# 否则以当前配置（CONFIG中的 smooth_factor 和 gesture_threshold）的报警为参考，
+# 曲线表示各配置与当前配置的一致程度。
+#
+# 用法：
+#   python tools/threshold_sweep.py recordings/camera0 recordings/camera1 \
+#       --smooth 0.1:0.9:0.05 --thresholds 0.3:1.2:0.01 --output sweep.csv --plot sweep.png
+
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import CONFIG
+from modules.gesture_rules import GestureRuleEngine
+from modules.landmark_recorder import LandmarkArchive
+from modules.threshold_sweep import compare_episodes, sweep_stream
+
+def parse_grid(text):
+    """解析参数网格：'起点:终点:步长'（含终点）或逗号分隔的取值"""
+    if ':' in text:
+        start, stop, step = (float(v) for v in text.split(':'))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(v) for v in text.split(',')])
+
+def load_labels(path):
+    """读取人工标注
+
+    Returns:
+        dict: {(摄像头ID, 区域序号): (M, 2) 按开始时间排序的 (开始时间, 结束时间)}
+    """
+    labels = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            key = (int(row['camera']), int(row['roi']))
+            labels.setdefault(key, []).append((float(row['start']), float(row['end'])))
+    return {key: np.array(sorted(spans)) for key, spans in labels.items()}
+
+def camera_id(directory):
+    """从记录目录名（如 recordings/camera3）解析摄像头ID"""
+    match = re.search(r'(\d+)$', os.path.basename(os.path.normpath(directory)))
+    return int(match.group(1)) if match else 0
+
+def sweep_camera(directory, args, smooth_factors, thresholds, labels):
+    """扫描单个摄像头的全部检测区域并汇总
+
+    Returns:
+        tuple: (汇总计数字典, 每种配置的报警延迟列表, 数据时长（秒）, 行数)
+    """
+    cam = camera_id(directory)
+    data = LandmarkArchive(directory).read(args.start, args.end, columns=('time', 'roi', 'landmarks'))
+    shape = (len(smooth_factors), len(thresholds))
+    totals = {name: np.zeros(shape, dtype=np.int64)
+              for name in ('detections', 'alarms', 'escalations', 'matched', 'false_alarms', 'reference')}
+    delays = np.empty(shape, dtype=object)
+    for index in np.ndindex(shape):
+        delays[index] = []
+    engine = GestureRuleEngine(CONFIG.gesture_rules, params=CONFIG)
+    if len(data['time']) == 0:
+        return totals, delays, 0.0, 0
+    span = float(data['time'].max() - data['time'].min())
+
+    for roi in np.unique(data['roi']):
+        rows = data['roi'] == roi
+        times, landmarks = data['time'][rows], data['landmarks'][rows]
+        result = sweep_stream(engine, times, landmarks, smooth_factors, thresholds, args.triggers,
+                              max_gap=args.max_gap)
+        if labels is not None:
+            reference = labels.get((cam, int(roi)), np.empty((0, 2)))
+        else:
+            # 以当前配置的报警为参考：检测区间用于匹配，首次报警时间作为延迟基准
+            current = sweep_stream(engine, times, landmarks, [CONFIG.smooth_factor], [CONFIG.gesture_threshold],
+                                   args.triggers, max_gap=args.max_gap).episodes[0, 0]
+            reference = current[:, [1, 2, 0]]
+        totals['detections'] += result.detections
+        totals['escalations'] += result.escalations
+        totals['alarms'] += result.alarms
+        totals['reference'] += len(reference)
+        for index in np.ndindex(shape):
+            matched, false_alarms, roi_delays = compare_episodes(result.episodes[index], reference, args.tolerance)
+            totals['matched'][index] += matched
+            totals['false_alarms'][index] += false_alarms
+            delays[index].extend(roi_delays)
+    return totals, delays, span, len(data['time'])
+
+def plot_curves(path, curves, smooth_factors, thresholds, reference_mode):
+    """绘制每个摄像头的ROC风格曲线（每个平滑因子一条，沿阈值变化）"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, len(curves), figsize=(6 * len(curves), 5), squeeze=False)
+    for ax, (cam, (tpr, false_per_hour)) in zip(axes[0], sorted(curves.items())):
+        for s, alpha in enumerate(smooth_factors):
+            ax.plot(false_per_hour[s], tpr[s], marker='.', linewidth=1, label=f"smooth={alpha:g}")
+        ax.set_title(f"camera {cam}")
+        ax.set_xlabel("false alarms / hour")
+        ax.set_ylabel("agreement with current config" if reference_mode else "true positive rate")
+        ax.set_ylim(-0.02, 1.02)
+        ax.grid(True, alpha=0.3)
+        if len(smooth_factors) <= 12:
+            ax.legend(fontsize='small')
+    fig.suptitle(f"gesture_threshold {thresholds[0]:g} - {thresholds[-1]:g}")
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+
+def main():
+    parser = argparse.ArgumentParser(description="在录制的关键点数据上离线扫描手势阈值和平滑因子")
+    parser.add_argument('directories', nargs='*', help="关键点记录目录（默认为 landmark_record_dir 下的全部摄像头）")
+    parser.add_argument('--smooth', default="0.1:1.0:0.05", help="smooth_factor 网格，起点:终点:步长 或逗号分隔")
+    parser.add_argument('--thresholds', default="0.2:1.5:0.01", help="gesture_threshold 网格")
+    parser.add_argument('--triggers', default=None, help="报警触发时长（秒），逗号分隔，默认使用 alarm_triggers")
+    parser.add_argument('--start', type=float, default=0.0, help="开始时间（Unix时间戳）")
+    parser.add_argument('--end', type=float, default=float('inf'), help="结束时间（Unix时间戳）")
+    parser.add_argument('--max-gap', type=float, default=0.5, help="相邻记录间隔超过该值（秒）视为手部消失")
+    parser.add_argument('--labels', default=None, help="人工标注CSV（camera,roi,start,end）")
+    parser.add_argument('--tolerance', type=float, default=2.0, help="报警与参考事件匹配的时间容差（秒）")
+    parser.add_argument('--output', default="threshold_sweep.csv", help="结果CSV路径")
+    parser.add_argument('--plot', default=None, help="ROC风格曲线图片路径（需要matplotlib）")
+    args = parser.parse_args()
+
+    directories = args.directories or sorted(glob.glob(os.path.join(CONFIG.landmark_record_dir, "camera*")))
+    if not directories:
+        parser.error("没有找到关键点记录目录")
+    args.triggers = ([float(v) for v in args.triggers.split(',')] if args.triggers
+                     else [float(v) for v in CONFIG.alarm_triggers])
+    smooth_factors = parse_grid(args.smooth)
+    thresholds = parse_grid(args.thresholds)
+    labels = load_labels(args.labels) if args.labels else None
+    reference_mode = labels is None
+
+    started = time.perf_counter()
+    total_rows = 0
+    curves = {}
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['camera', 'smooth_factor', 'gesture_threshold', 'detections', 'alarms', 'escalations',
+                         'reference', 'matched', 'false_alarms', 'tpr', 'false_per_hour',
+                         'median_delay', 'p90_delay'])
+        for directory in directories:
+            cam = camera_id(directory)
+            totals, delays, span, rows = sweep_camera(directory, args, smooth_factors, thresholds, labels)
+            total_rows += rows
+            hours = span / 3600 if span else float('nan')
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tpr = totals['matched'] / totals['reference']
+                false_per_hour = totals['false_alarms'] / hours
+            curves[cam] = (tpr, false_per_hour)
+            for s, t in np.ndindex(tpr.shape):
+                d = np.asarray(delays[s, t])
+                writer.writerow([cam, smooth_factors[s], thresholds[t], totals['detections'][s, t],
+                                 totals['alarms'][s, t], totals['escalations'][s, t], totals['reference'][s, t],
+                                 totals['matched'][s, t], totals['false_alarms'][s, t],
+                                 round(float(tpr[s, t]), 4), round(float(false_per_hour[s, t]), 3),
+                                 round(float(np.median(d)), 2) if len(d) else '',
+                                 round(float(np.percentile(d, 90)), 2) if len(d) else ''])
+
+            print(f"摄像头{cam}: {rows} 行，{span / 3600:.2f} 小时，参考事件 {int(totals['reference'][0, 0])} 个"
+                  f"（{'当前配置的报警' if reference_mode else '人工标注'}）")
+            # 按召回率从高到低、误报率从低到高列出前5个配置
+            order = sorted(np.ndindex(tpr.shape),
+                           key=lambda i: (-np.nan_to_num(tpr[i]), np.nan_to_num(false_per_hour[i])))
+            for s, t in order[:5]:
+                print(f"  smooth_factor={smooth_factors[s]:<6g} gesture_threshold={thresholds[t]:<6g} "
+                      f"报警 {totals['alarms'][s, t]:>5}  召回 {tpr[s, t]:.3f}  误报 {false_per_hour[s, t]:.2f}/小时")
+
+    elapsed = time.perf_counter() - started
+    configs = len(smooth_factors) * len(thresholds)
+    print(f"{configs} 种配置 × {total_rows} 行，耗时 {elapsed:.1f} 秒，结果已保存到 {args.output}")
+    if args.plot:
+        plot_curves(args.plot, curves, smooth_factors, thresholds, reference_mode)
+        print(f"曲线已保存到 {args.plot}")
+
+if __name__ == '__main__':
+    main()